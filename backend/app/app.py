@@ -5,15 +5,24 @@ import logging
 import os
 import uuid
 from datetime import timedelta
-from pathlib import Path
 
-from flask import Flask, jsonify, request, send_file
+from flask import Flask, jsonify, request
 from flask_cors import CORS
 from flask_jwt_extended import JWTManager
-from werkzeug.utils import secure_filename
 
 from config import settings
+from utils.file_hashing import is_allowed_file, store_upload_by_hash
 from utils.generateStrFileVideo import generate_str_file_and_video
+from utils.model_registry import model_registry
+from utils.session_cache import session_cache
+from utils.transcription_cache import transcription_cache
+from utils.artifact_store import artifact_store
+from utils.transcription_profiles import (
+    available_profiles,
+    parse_profile_request,
+    profile_metrics,
+    resolve_profile,
+)
 from utils.session_cleaner import startup_cleanup
 
 logging.basicConfig(
@@ -46,29 +55,40 @@ init_database(app)
 from routes.auth_routes import auth_bp
 from routes.user_management_routes import users_bp
 from routes.preview_routes import preview_bp
+from routes.job_routes import jobs_bp
+from routes.artifact_routes import artifact_payload, artifacts_bp
 
 app.register_blueprint(auth_bp, url_prefix='/api/auth')
 app.register_blueprint(users_bp, url_prefix='/api')
 app.register_blueprint(preview_bp, url_prefix='/api')
+app.register_blueprint(jobs_bp, url_prefix='/api')
+app.register_blueprint(artifacts_bp, url_prefix='/api')
 
 # Executar limpeza de sessões antigas na inicialização (> 24 horas)
 startup_cleanup(max_age_hours=24)
 
+# Pré-carregar o modelo Whisper para que a primeira requisição não pague o carregamento
+if settings.whisper_preload:
+    preload_model = resolve_profile().model
+    try:
+        model_registry.preload(
+            preload_model,
+            settings.whisper_device,
+            settings.whisper_precision,
+        )
+    except Exception:
+        logger.exception("Falha ao pré-carregar o modelo Whisper %s", preload_model)
+
 # Diretório para armazenar os vídeos enviados
 app.config['UPLOAD_FOLDER'] = str(settings.upload_dir)
+# Envio dos vídeos pelo proxy reverso (X-Sendfile), quando configurado
+app.config['USE_X_SENDFILE'] = settings.video_x_sendfile
 logger.info("UPLOAD_FOLDER configurado em: %s", app.config['UPLOAD_FOLDER'])
 
 # Diretório do backend (ajustado para o seu caminho)
 BACKEND_DIRECTORY = str(settings.base_dir.parent)
 logger.info("BACKEND_DIRECTORY configurado em: %s", BACKEND_DIRECTORY)
 
-ALLOWED_EXTENSIONS = {'.mp4', '.mov', '.mkv', '.avi', '.webm'}
-
-
-def _is_allowed_file(filename: str) -> bool:
-    return Path(filename).suffix.lower() in ALLOWED_EXTENSIONS
-
-
 def _parse_forbidden_words(raw_value: str | None) -> list[str] | None:
     if not raw_value:
         return None
@@ -95,6 +115,27 @@ def get_profanity_words():
         'default_words': list(settings.profanity_words),
     })
 
+@app.route('/api/config/whisper_models', methods=['GET'])
+def get_whisper_models():
+    # ``models``: residentes neste processo; ``loads``: carregamentos de todos os processos (inclui workers)
+    return jsonify({'models': model_registry.stats(), 'loads': model_registry.load_history()})
+
+@app.route('/api/config/transcription_profiles', methods=['GET'])
+def get_transcription_profiles():
+    return jsonify({
+        'default': settings.transcription_profile,
+        'profiles': [profile.to_dict() for profile in available_profiles().values()],
+        'metrics': profile_metrics.snapshot(),
+    })
+
+@app.route('/api/stats/transcription_cache', methods=['GET'])
+def get_transcription_cache_stats():
+    return jsonify(transcription_cache.stats())
+
+@app.route('/api/stats/session_cache', methods=['GET'])
+def get_session_cache_stats():
+    return jsonify(session_cache.stats())
+
 @app.route('/open-api', methods=['GET'])
 def open_api():
     return jsonify({"message": "Access granted to everyone!"})
@@ -110,13 +151,11 @@ def process_video():
         if video_file.filename == '':
             return jsonify({'status': 'error', 'message': "Nenhum arquivo selecionado!"}), 400
 
-        if not _is_allowed_file(video_file.filename):
+        if not is_allowed_file(video_file.filename):
             return jsonify({'status': 'error', 'message': "Formato de arquivo não suportado."}), 400
 
-        safe_name = secure_filename(video_file.filename)
-        video_path = os.path.join(app.config['UPLOAD_FOLDER'], safe_name)
         try:
-            video_file.save(video_path)
+            video_path, upload_hash = store_upload_by_hash(video_file, app.config['UPLOAD_FOLDER'])
             logger.info("Arquivo salvo em: %s", video_path)
         except Exception as e:
             logger.exception("Erro ao salvar o arquivo")
@@ -124,6 +163,11 @@ def process_video():
 
         forbidden_words = _parse_forbidden_words(request.form.get('forbidden_words'))
 
+        try:
+            transcription_profile = parse_profile_request(request.form.get('transcription_profile'))
+        except ValueError as e:
+            return jsonify({'status': 'error', 'message': str(e)}), 400
+
         # Gerando um nome aleatório para o arquivo de saída
         output_video_name = f"{uuid.uuid4().hex}.mp4"
 
@@ -134,21 +178,24 @@ def process_video():
                 BACKEND_DIRECTORY,
                 output_video_name,
                 forbidden_words=forbidden_words,
+                transcription_profile=transcription_profile,
+                video_hash=upload_hash,
             )
             logger.info("Arquivo processado com sucesso! video_hash=%s", video_hash)
         except Exception as e:
             logger.exception("Erro ao processar o vídeo")
             return jsonify({'status': 'error', 'message': f"Erro ao processar o vídeo: {str(e)}"}), 500
 
-        # Preparando a resposta com o caminho dos arquivos gerados e o hash do vídeo
-        response = {
+        # Registrar o vídeo como artefato: o cliente baixa pela URL (com Range),
+        # e pode repetir o download sem refazer o processamento
+        artifact = artifact_store.register(output_video_path, 'subtitled_video', {'video_hash': video_hash})
+
+        return jsonify({
             'status': 'success',
             'video_hash': video_hash,
-            'str_file': str_file_path
-        }
-
-        # Retornando o vídeo diretamente ao cliente
-        return send_file(output_video_path, as_attachment=False, mimetype='video/mp4')
+            'str_file': str_file_path,
+            'artifact': artifact_payload(artifact),
+        })
 
 
     except Exception as e:
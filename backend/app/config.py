@@ -25,6 +25,12 @@ def _parse_csv_list(raw_value: str | None) -> Tuple[str, ...]:
     return tuple(token for token in tokens if token)
 
 
+def _parse_bool(raw_value: str | None, default: bool = False) -> bool:
+    if raw_value is None or not raw_value.strip():
+        return default
+    return raw_value.strip().lower() in {"1", "true", "yes", "on"}
+
+
 @dataclass(slots=True)
 class Settings:
     """Holds runtime configuration loaded from environment variables."""
@@ -32,21 +38,70 @@ class Settings:
     base_dir: Path = field(default_factory=lambda: Path(__file__).resolve().parent)
     upload_dir: Path = field(default_factory=lambda: Path(__file__).resolve().parent / "uploads")
     subtitles_dir_name: str = "videosSubtitles"
+    cache_dir: Path = field(default_factory=lambda: Path(__file__).resolve().parent / "cache")
     ffmpeg_path: Path | None = None
     font_path: Path = Path(r"C:\\Windows\\Fonts\\arial.ttf")
     profanity_words: Tuple[str, ...] = DEFAULT_PROFANITY_WORDS
+    profanity_fuzzy_matching: bool = True
     beep_frequency: int = 1000
     beep_volume: float = 0.4
+    censor_sound: str = "tone"
+    whisper_model: str = "large"
+    whisper_device: str | None = None
+    whisper_precision: str | None = None
+    whisper_preload: bool = False
+    transcription_profile: str = "accurate"
+    transcription_chunk_seconds: float = 0.0
+    transcription_chunk_overlap_seconds: float = 2.0
+    transcription_workers: int = 0
+    transcription_cache_max_mb: int = 512
+    render_engine: str = "moviepy"
+    render_chunked: bool = False
+    render_chunk_seconds: float = 0.0
+    render_chunk_cache_mb: int = 2048
+    render_workers: int = 0
+    encoder_preset: str = "quality"
+    encoder_draft_x264_preset: str = "ultrafast"
+    encoder_draft_crf: int = 28
+    encoder_quality_x264_preset: str = "medium"
+    encoder_quality_crf: int = 20
+    encoder_threads: int = 0
+    encoder_faststart: bool = True
+    proxy_height: int = 360
+    job_backend: str = "process"
+    job_workers: int = 1
+    session_db: Path | None = None
+    session_cache_entries: int = 64
+    session_flush_seconds: float = 2.0
+    web_concurrency: int = 1
+    video_x_sendfile: bool = False
+    video_max_age: int = 3600
+    artifact_root: Path | None = None
+    artifact_retention_hours: float = 72.0
+    artifact_max_mb: int = 0
 
     @property
     def subtitles_dir(self) -> Path:
         return (self.base_dir.parent / self.subtitles_dir_name).resolve()
 
+    @property
+    def jobs_db_path(self) -> Path:
+        return self.cache_dir / "jobs.sqlite3"
+
+    @property
+    def artifact_dir(self) -> Path:
+        return self.artifact_root or self.cache_dir / "artifacts"
+
+    @property
+    def session_db_path(self) -> Path:
+        return self.session_db or self.upload_dir / "sessions.sqlite3"
+
     @classmethod
     def from_env(cls) -> "Settings":
         base_dir = Path(os.getenv("TEXTWAVES_BASE_DIR", Path(__file__).resolve().parent))
         upload_dir = Path(os.getenv("TEXTWAVES_UPLOAD_DIR", base_dir / "uploads"))
         subtitles_dir_name = os.getenv("TEXTWAVES_SUBTITLES_DIR_NAME", "videosSubtitles")
+        cache_dir = Path(os.getenv("TEXTWAVES_CACHE_DIR", base_dir / "cache"))
 
         ffmpeg_env = os.getenv("TEXTWAVES_FFMPEG_PATH")
         ffmpeg_path = Path(ffmpeg_env) if ffmpeg_env else None
@@ -60,23 +115,118 @@ class Settings:
             profanity_words = words
         else:
             profanity_words = DEFAULT_PROFANITY_WORDS
+        # Ignora acentos, leetspeak e letras repetidas ao procurar palavrões
+        profanity_fuzzy_matching = _parse_bool(os.getenv("TEXTWAVES_PROFANITY_FUZZY"), default=True)
 
         beep_frequency = int(os.getenv("TEXTWAVES_BEEP_FREQUENCY", "1000"))
         beep_volume = float(os.getenv("TEXTWAVES_BEEP_VOLUME", "0.4"))
+        # "tone", "silence" ou o caminho de um WAV tocado nos trechos censurados
+        censor_sound = os.getenv("TEXTWAVES_CENSOR_SOUND", "tone")
+
+        whisper_model = os.getenv("TEXTWAVES_WHISPER_MODEL", "large")
+        whisper_device = os.getenv("TEXTWAVES_WHISPER_DEVICE") or None
+        whisper_precision = os.getenv("TEXTWAVES_WHISPER_PRECISION") or None
+        whisper_preload = _parse_bool(os.getenv("TEXTWAVES_WHISPER_PRELOAD"))
+        transcription_profile = os.getenv("TEXTWAVES_TRANSCRIPTION_PROFILE", "accurate")
+        # 0 desativa a transcrição em janelas paralelas
+        transcription_chunk_seconds = float(os.getenv("TEXTWAVES_TRANSCRIPTION_CHUNK_SECONDS", "0"))
+        transcription_chunk_overlap_seconds = float(
+            os.getenv("TEXTWAVES_TRANSCRIPTION_CHUNK_OVERLAP", "2.0")
+        )
+        # 0 usa um processo por núcleo disponível
+        transcription_workers = int(os.getenv("TEXTWAVES_TRANSCRIPTION_WORKERS", "0"))
+        # 0 desativa o cache de transcrições
+        transcription_cache_max_mb = int(os.getenv("TEXTWAVES_TRANSCRIPTION_CACHE_MB", "512"))
+
+        # "moviepy" compõe quadro a quadro; "ffmpeg" queima ASS em uma única passada
+        render_engine = os.getenv("TEXTWAVES_RENDER_ENGINE", "moviepy").strip().lower() or "moviepy"
+        # Com a engine ffmpeg, renderiza em pedaços paralelos e reaproveitáveis
+        render_chunked = _parse_bool(os.getenv("TEXTWAVES_RENDER_CHUNKED"))
+        # Tamanho dos pedaços; 0 divide o vídeo conforme a quantidade de processos
+        render_chunk_seconds = float(os.getenv("TEXTWAVES_RENDER_CHUNK_SECONDS", "0"))
+        render_chunk_cache_mb = int(os.getenv("TEXTWAVES_RENDER_CHUNK_CACHE_MB", "2048"))
+        # Processos do FFmpeg por render em pedaços; 0 usa um por núcleo
+        render_workers = int(os.getenv("TEXTWAVES_RENDER_WORKERS", "0"))
+        # "draft" (prévias) ou "quality" (vídeo final); threads 0 deixa o codec decidir
+        encoder_preset = os.getenv("TEXTWAVES_ENCODER_PRESET", "quality")
+        encoder_draft_x264_preset = os.getenv("TEXTWAVES_ENCODER_DRAFT_PRESET", "ultrafast")
+        encoder_draft_crf = int(os.getenv("TEXTWAVES_ENCODER_DRAFT_CRF", "28"))
+        encoder_quality_x264_preset = os.getenv("TEXTWAVES_ENCODER_QUALITY_PRESET", "medium")
+        encoder_quality_crf = int(os.getenv("TEXTWAVES_ENCODER_QUALITY_CRF", "20"))
+        encoder_threads = int(os.getenv("TEXTWAVES_ENCODER_THREADS", "0"))
+        encoder_faststart = _parse_bool(os.getenv("TEXTWAVES_ENCODER_FASTSTART"), default=True)
+        # Altura máxima das prévias de baixa resolução (preset "draft")
+        proxy_height = int(os.getenv("TEXTWAVES_PROXY_HEIGHT", "360"))
+        # Fila de jobs: "process" (pool de processos) ou "local" (mesmo processo, para testes)
+        job_backend = os.getenv("TEXTWAVES_JOB_BACKEND", "process").strip().lower()
+        job_workers = int(os.getenv("TEXTWAVES_JOB_WORKERS", "1"))
+        # Banco SQLite das sessões de edição (padrão: sessions.sqlite3 na pasta de uploads)
+        session_db_env = os.getenv("TEXTWAVES_SESSION_DB")
+        session_db = Path(session_db_env) if session_db_env else None
+        # Sessões em memória (LRU) e intervalo da gravação adiada; 0 grava a cada edição
+        session_cache_entries = int(os.getenv("TEXTWAVES_SESSION_CACHE_ENTRIES", "64"))
+        session_flush_seconds = float(os.getenv("TEXTWAVES_SESSION_FLUSH_SECONDS", "2.0"))
+        # Processos do servidor (gunicorn/uvicorn); com mais de um a escrita adiada é desativada
+        web_concurrency = int(os.getenv("WEB_CONCURRENCY", "1") or "1")
+        # Vídeos: delegar o envio ao proxy reverso (X-Sendfile) e cache dos vídeos originais
+        video_x_sendfile = _parse_bool(os.getenv("TEXTWAVES_VIDEO_X_SENDFILE"))
+        video_max_age = int(os.getenv("TEXTWAVES_VIDEO_MAX_AGE", "3600"))
+        # Vídeos gerados (artefatos endereçados por conteúdo): pasta, retenção e limite total (0 = sem limite)
+        artifact_root_env = os.getenv("TEXTWAVES_ARTIFACT_DIR")
+        artifact_root = Path(artifact_root_env) if artifact_root_env else None
+        artifact_retention_hours = float(os.getenv("TEXTWAVES_ARTIFACT_RETENTION_HOURS", "72"))
+        artifact_max_mb = int(os.getenv("TEXTWAVES_ARTIFACT_MAX_MB", "0"))
 
         settings = cls(
             base_dir=base_dir,
             upload_dir=upload_dir,
             subtitles_dir_name=subtitles_dir_name,
+            cache_dir=cache_dir,
             ffmpeg_path=ffmpeg_path,
             font_path=font_path,
             profanity_words=profanity_words,
+            profanity_fuzzy_matching=profanity_fuzzy_matching,
             beep_frequency=beep_frequency,
             beep_volume=beep_volume,
+            censor_sound=censor_sound,
+            whisper_model=whisper_model,
+            whisper_device=whisper_device,
+            whisper_precision=whisper_precision,
+            whisper_preload=whisper_preload,
+            transcription_profile=transcription_profile,
+            transcription_chunk_seconds=transcription_chunk_seconds,
+            transcription_chunk_overlap_seconds=transcription_chunk_overlap_seconds,
+            transcription_workers=transcription_workers,
+            transcription_cache_max_mb=transcription_cache_max_mb,
+            render_engine=render_engine,
+            render_chunked=render_chunked,
+            render_chunk_seconds=render_chunk_seconds,
+            render_chunk_cache_mb=render_chunk_cache_mb,
+            render_workers=render_workers,
+            encoder_preset=encoder_preset,
+            encoder_draft_x264_preset=encoder_draft_x264_preset,
+            encoder_draft_crf=encoder_draft_crf,
+            encoder_quality_x264_preset=encoder_quality_x264_preset,
+            encoder_quality_crf=encoder_quality_crf,
+            encoder_threads=encoder_threads,
+            encoder_faststart=encoder_faststart,
+            proxy_height=proxy_height,
+            job_backend=job_backend,
+            job_workers=job_workers,
+            session_db=session_db,
+            session_cache_entries=session_cache_entries,
+            session_flush_seconds=session_flush_seconds,
+            web_concurrency=web_concurrency,
+            video_x_sendfile=video_x_sendfile,
+            video_max_age=video_max_age,
+            artifact_root=artifact_root,
+            artifact_retention_hours=artifact_retention_hours,
+            artifact_max_mb=artifact_max_mb,
         )
 
         settings.upload_dir.mkdir(parents=True, exist_ok=True)
         settings.subtitles_dir.mkdir(parents=True, exist_ok=True)
+        settings.cache_dir.mkdir(parents=True, exist_ok=True)
         return settings
 
 
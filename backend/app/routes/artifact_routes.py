@@ -0,0 +1,49 @@
+from __future__ import annotations
+
+from flask import Blueprint, jsonify, request, url_for
+
+try:
+    from app.config import settings
+except ImportError:  # pragma: no cover - fallback for script execution
+    from config import settings
+from utils.artifact_store import Artifact, artifact_store
+from utils.video_streaming import send_video
+
+artifacts_bp = Blueprint('artifacts', __name__)
+
+DEFAULT_DOWNLOAD_NAME = "video_com_legendas.mp4"
+
+
+def artifact_payload(artifact: Artifact) -> dict:
+    """Metadados do artefato com as URLs de streaming e de download"""
+    payload = artifact.to_dict()
+    payload['url'] = url_for('artifacts.get_artifact', artifact_id=artifact.id)
+    payload['download_url'] = url_for('artifacts.get_artifact', artifact_id=artifact.id, download=1)
+    payload['info_url'] = url_for('artifacts.get_artifact_info', artifact_id=artifact.id)
+    return payload
+
+
+@artifacts_bp.route('/artifacts/<artifact_id>', methods=['GET'])
+def get_artifact(artifact_id):
+    """Serve o artefato (Range e ETag pelo hash); ``?download=1`` força o download"""
+    artifact = artifact_store.get(artifact_id)
+    if artifact is None:
+        return jsonify({'status': 'error', 'message': 'Artefato não encontrado ou expirado'}), 404
+
+    # O conteúdo de um id nunca muda: pode ficar em cache no navegador
+    return send_video(
+        artifact.path,
+        etag=artifact.id,
+        max_age=settings.video_max_age,
+        as_attachment=bool(request.args.get('download')),
+        download_name=request.args.get('filename') or DEFAULT_DOWNLOAD_NAME,
+    )
+
+
+@artifacts_bp.route('/artifacts/<artifact_id>/info', methods=['GET'])
+def get_artifact_info(artifact_id):
+    """Metadados do artefato"""
+    artifact = artifact_store.get(artifact_id, touch=False)
+    if artifact is None:
+        return jsonify({'status': 'error', 'message': 'Artefato não encontrado ou expirado'}), 404
+    return jsonify({'status': 'success', 'artifact': artifact_payload(artifact)})
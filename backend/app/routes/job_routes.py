@@ -0,0 +1,223 @@
+from __future__ import annotations
+
+import json
+import os
+import time
+import uuid
+
+from flask import Blueprint, Response, jsonify, redirect, request, url_for
+
+try:
+    from app.config import settings
+except ImportError:  # pragma: no cover - fallback for script execution
+    from config import settings
+from utils.artifact_store import artifact_store
+from utils.file_hashing import is_allowed_file, store_upload_by_hash
+from utils.job_queue import FAILED, SUCCEEDED, get_job_queue
+from utils.pipeline_jobs import SESSION_DIR
+from utils.session_cache import session_cache
+from utils.transcription_profiles import parse_profile_request
+from routes.artifact_routes import artifact_payload
+from routes.preview_routes import _parse_forbidden_words
+
+jobs_bp = Blueprint('jobs', __name__)
+
+# Intervalo de leitura do banco no stream SSE e do comentário de keep-alive
+EVENT_POLL_SECONDS = 0.5
+EVENT_KEEPALIVE_SECONDS = 15.0
+
+
+def _job_payload(record):
+    """Estado do job, com as URLs do artefato gerado quando houver"""
+    payload = record.to_dict()
+    artifact_id = ((record.result or {}).get('artifact') or {}).get('artifact_id')
+    artifact = artifact_store.get(artifact_id, touch=False) if artifact_id else None
+    if artifact is not None:
+        payload['result'] = {**record.result, 'artifact': artifact_payload(artifact)}
+    return payload
+
+
+def _accepted(record):
+    """Resposta 202 com os links de acompanhamento do job"""
+    payload = _job_payload(record)
+    payload['status_url'] = url_for('jobs.get_job', job_id=record.id)
+    payload['result_url'] = url_for('jobs.get_job_result', job_id=record.id)
+    payload['progress_url'] = url_for('jobs.get_job_progress', job_id=record.id)
+    payload['events_url'] = url_for('jobs.stream_job_events', job_id=record.id)
+    return jsonify(payload), 202
+
+
+def _read_upload(upload_folder: str):
+    """Valida o upload e o grava calculando o hash; retorna (erro, caminho, hash, nome, segundos)"""
+    if 'video' not in request.files:
+        return (jsonify({'status': 'error', 'message': "Nenhum arquivo de vídeo enviado!"}), 400), None, None, None, 0.0
+
+    video_file = request.files['video']
+    if video_file.filename == '':
+        return (jsonify({'status': 'error', 'message': "Nenhum arquivo selecionado!"}), 400), None, None, None, 0.0
+
+    if not is_allowed_file(video_file.filename):
+        return (jsonify({'status': 'error', 'message': "Formato de arquivo não suportado."}), 400), None, None, None, 0.0
+
+    # Nome final pelo hash: uploads simultâneos com o mesmo nome não se sobrescrevem
+    started = time.perf_counter()
+    video_path, video_hash = store_upload_by_hash(video_file, upload_folder)
+    return None, video_path, video_hash, video_file.filename, time.perf_counter() - started
+
+
+@jobs_bp.route('/jobs/process_video', methods=['POST'])
+def submit_process_video():
+    """Enfileira transcrição + renderização completa (equivalente assíncrono de /process_video)"""
+    try:
+        try:
+            transcription_profile = parse_profile_request(request.form.get('transcription_profile'))
+        except ValueError as e:
+            return jsonify({'status': 'error', 'message': str(e)}), 400
+
+        error, video_path, video_hash, _, upload_seconds = _read_upload(str(settings.upload_dir))
+        if error:
+            return error
+
+        record = get_job_queue().submit('process_video', {
+            'video_path': os.path.abspath(video_path),
+            'backend_directory': str(settings.base_dir.parent),
+            'output_name': f"{uuid.uuid4().hex}.mp4",
+            'forbidden_words': _parse_forbidden_words(request.form.get('forbidden_words')),
+            'transcription_profile': transcription_profile.to_dict(),
+            'video_hash': video_hash,
+            'upload_seconds': upload_seconds,
+        })
+        return _accepted(record)
+
+    except Exception as e:
+        return jsonify({'status': 'error', 'message': str(e)}), 500
+
+
+@jobs_bp.route('/jobs/process_video_preview', methods=['POST'])
+def submit_process_video_preview():
+    """Enfileira a transcrição da sessão de edição (equivalente assíncrono de /api/process_video_preview)"""
+    try:
+        try:
+            transcription_profile = parse_profile_request(request.form.get('transcription_profile'))
+        except ValueError as e:
+            return jsonify({'status': 'error', 'message': str(e)}), 400
+
+        error, video_path, video_hash, filename, upload_seconds = _read_upload(SESSION_DIR)
+        if error:
+            return error
+
+        record = get_job_queue().submit('process_video_preview', {
+            'video_path': video_path,
+            'video_hash': video_hash,
+            'filename': filename,
+            'forbidden_words': _parse_forbidden_words(request.form.get('forbidden_words')),
+            'transcription_profile': transcription_profile.to_dict(),
+            'upload_seconds': upload_seconds,
+        })
+        return _accepted(record)
+
+    except Exception as e:
+        return jsonify({'status': 'error', 'message': str(e)}), 500
+
+
+@jobs_bp.route('/jobs/render_final_video', methods=['POST'])
+def submit_render_final_video():
+    """Enfileira o render final da sessão (equivalente assíncrono de /api/render_final_video)"""
+    try:
+        data = request.get_json() or {}
+        video_hash = data.get('video_hash')
+
+        if not video_hash:
+            return jsonify({'status': 'error', 'message': 'Hash do vídeo é obrigatório'}), 400
+        if not session_cache.exists(video_hash):
+            return jsonify({'status': 'error', 'message': 'Sessão não encontrada'}), 404
+        # O worker lê a sessão do banco: gravar antes as edições ainda em memória
+        session_cache.flush(video_hash)
+
+        record = get_job_queue().submit('render_final_video', {
+            'video_hash': video_hash,
+            'forbidden_words': data.get('forbidden_words'),
+            'beep_intervals': data.get('beep_intervals'),
+        })
+        return _accepted(record)
+
+    except Exception as e:
+        return jsonify({'status': 'error', 'message': str(e)}), 500
+
+
+@jobs_bp.route('/jobs/<job_id>', methods=['GET'])
+def get_job(job_id):
+    """Estado do job"""
+    record = get_job_queue().get(job_id)
+    if record is None:
+        return jsonify({'status': 'error', 'message': 'Job não encontrado'}), 404
+    return jsonify(_job_payload(record))
+
+
+@jobs_bp.route('/jobs/<job_id>/progress', methods=['GET'])
+def get_job_progress(job_id):
+    """Progresso por etapa (fração, ETA) para polling"""
+    record = get_job_queue().get(job_id)
+    if record is None:
+        return jsonify({'status': 'error', 'message': 'Job não encontrado'}), 404
+    return jsonify({'job_id': record.id, 'status': record.status, 'progress': record.progress})
+
+
+def _sse(event: str, payload: dict) -> str:
+    return f"event: {event}\ndata: {json.dumps(payload, ensure_ascii=False)}\n\n"
+
+
+@jobs_bp.route('/jobs/<job_id>/events', methods=['GET'])
+def stream_job_events(job_id):
+    """Server-Sent Events: um evento ``progress`` a cada mudança e ``done`` ao terminar"""
+    queue = get_job_queue()
+    if queue.get(job_id) is None:
+        return jsonify({'status': 'error', 'message': 'Job não encontrado'}), 404
+
+    def generate():
+        last_payload = None
+        last_sent = time.monotonic()
+        while True:
+            record = queue.get(job_id)
+            if record is None:
+                return
+            payload = {'job_id': record.id, 'status': record.status, 'progress': record.progress}
+            if record.done:
+                payload['error'] = record.error
+                yield _sse('done', payload)
+                return
+            if payload != last_payload:
+                yield _sse('progress', payload)
+                last_payload = payload
+                last_sent = time.monotonic()
+            elif time.monotonic() - last_sent > EVENT_KEEPALIVE_SECONDS:
+                yield ": keep-alive\n\n"
+                last_sent = time.monotonic()
+            time.sleep(EVENT_POLL_SECONDS)
+
+    return Response(
+        generate(),
+        mimetype='text/event-stream',
+        headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'},
+    )
+
+
+@jobs_bp.route('/jobs/<job_id>/result', methods=['GET'])
+def get_job_result(job_id):
+    """Resultado do job: redireciona para o vídeo gerado, ou o JSON do resultado quando não há vídeo"""
+    record = get_job_queue().get(job_id)
+    if record is None:
+        return jsonify({'status': 'error', 'message': 'Job não encontrado'}), 404
+    if record.status == FAILED:
+        return jsonify({'status': 'error', 'job_status': record.status, 'message': record.error}), 500
+    if record.status != SUCCEEDED:
+        return jsonify({'status': 'pending', 'job_status': record.status}), 409
+
+    artifact_id = ((record.result or {}).get('artifact') or {}).get('artifact_id')
+    if artifact_id:
+        if artifact_store.get(artifact_id, touch=False) is None:
+            return jsonify({'status': 'error', 'message': 'Vídeo não encontrado ou expirado'}), 404
+        # O download fica no endpoint do artefato (Range, ETag, cache)
+        return redirect(url_for('artifacts.get_artifact', artifact_id=artifact_id))
+
+    return jsonify(record.result)
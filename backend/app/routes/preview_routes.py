@@ -1,25 +1,34 @@
 from __future__ import annotations
 
 import json
+import logging
 import os
-import hashlib
 
-from flask import Blueprint, jsonify, request, send_file
+from flask import Blueprint, jsonify, request
 
 try:
     from app.config import settings
 except ImportError:  # pragma: no cover - fallback for script execution
     from config import settings
-from utils.audioExtract import extract_audio_from_video
-from utils.transcribeAudio import transcribe_audio
-from utils.profanity_filter import censor_segments
-from utils.session_cleaner import clean_session_by_hash
-from utils.CreateVideoWinthSubtitles import (
-    SubtitleRenderingOptions,
-    create_video_with_subtitles,
+from utils.file_hashing import is_allowed_file, store_upload_by_hash
+from utils.transcription_profiles import parse_profile_request
+from utils.censor_index import recensor_session
+from utils.CreateVideoWinthSubtitles import SubtitleRenderingOptions
+from utils.pipeline_jobs import (
+    create_preview_session,
+    rebuild_censor_index,
+    render_final_session,
+    resolve_beep_intervals,
+    session_censor_index,
 )
+from utils.proxy_render import render_proxy_preview
+from utils.session_cache import session_cache
+from utils.session_store import RevisionConflict
+from utils.video_streaming import send_video
+from routes.artifact_routes import artifact_payload
 
 preview_bp = Blueprint('preview', __name__)
+logger = logging.getLogger(__name__)
 
 
 def _parse_forbidden_words(raw_value: str | None) -> list[str] | None:
@@ -52,74 +61,27 @@ def process_video_preview():
         if video_file.filename == '':
             return jsonify({'status': 'error', 'message': "Nenhum arquivo selecionado!"}), 400
 
-        forbidden_words = _parse_forbidden_words(request.form.get('forbidden_words'))
-
-        # Salvar arquivo temporário
-        upload_folder = 'uploads'
-        os.makedirs(upload_folder, exist_ok=True)
-
-        video_path = os.path.join(upload_folder, video_file.filename)
-        video_file.save(video_path)
-
-        # Gerar hash único
-        with open(video_path, 'rb') as vf:
-            video_hash = hashlib.sha256(vf.read()).hexdigest()[:10]
-
-        # Extrair áudio
-        audio_path = os.path.join(upload_folder, f"temp_audio_{video_hash}.wav")
-        extract_audio_from_video(video_path, audio_path)
-
-        # Transcrever áudio
-        transcribed_result = transcribe_audio(audio_path)
-        segments = transcribed_result['segments']
-
-        sanitized_subtitles, beep_intervals = censor_segments(
-            segments,
-            forbidden_words=forbidden_words,
-        )
+        if not is_allowed_file(video_file.filename):
+            return jsonify({'status': 'error', 'message': "Formato de arquivo não suportado."}), 400
 
-        # Criar estrutura de legendas
-        subtitles = []
-        for i, (start, end, text) in enumerate(sanitized_subtitles):
-            subtitle = {
-                'id': i,
-                'start': start,
-                'end': end,
-                'text': text.strip(),
-                'raw_text': segments[i].get('text', '').strip(),
-                'confidence': segments[i].get('confidence', 0.5)
-            }
-            subtitles.append(subtitle)
-
-        # Salvar dados da sessão
-        session_data = {
-            'video_hash': video_hash,
-            'video_path': video_path,
-            'subtitles': subtitles,
-            'video_info': {
-                'filename': video_file.filename,
-                'duration': transcribed_result.get('duration', 0)
-            },
-            'forbidden_words': forbidden_words or list(settings.profanity_words),
-            'beep_intervals': beep_intervals,
-        }
+        forbidden_words = _parse_forbidden_words(request.form.get('forbidden_words'))
 
-        session_file = os.path.join(upload_folder, f"session_{video_hash}.json")
-        with open(session_file, 'w', encoding='utf-8') as f:
-            json.dump(session_data, f, ensure_ascii=False, indent=2)
+        try:
+            transcription_profile = parse_profile_request(request.form.get('transcription_profile'))
+        except ValueError as e:
+            return jsonify({'status': 'error', 'message': str(e)}), 400
 
-        # Limpar arquivo de áudio temporário
-        if os.path.exists(audio_path):
-            os.remove(audio_path)
+        # Gravar o upload calculando o hash em blocos; o arquivo leva o nome do
+        # hash para que uploads com o mesmo nome não se sobrescrevam
+        video_path, video_hash = store_upload_by_hash(video_file, 'uploads')
 
-        return jsonify({
-            'status': 'success',
-            'video_hash': video_hash,
-            'subtitles': subtitles,
-            'video_info': session_data['video_info'],
-            'forbidden_words': session_data['forbidden_words'],
-            'beep_intervals': beep_intervals,
-        })
+        return jsonify(create_preview_session(
+            video_path,
+            video_hash,
+            video_file.filename,
+            forbidden_words,
+            transcription_profile,
+        ))
 
     except Exception as e:
         print(f"Erro no processo de preview: {str(e)}")
@@ -135,44 +97,128 @@ def update_subtitles():
         updated_subtitles = data.get('subtitles')
         forbidden_words = data.get('forbidden_words')
         beep_intervals = data.get('beep_intervals')  # Novo: aceitar beeps editados
+        expected_revision = data.get('revision')
 
         if not video_hash or not updated_subtitles:
             return jsonify({'status': 'error', 'message': 'Dados incompletos'}), 400
 
+        # A revisão lida pelo cliente é obrigatória: sem ela, duas abas salvando
+        # a mesma sessão se sobrescreveriam sem aviso
+        if isinstance(expected_revision, bool) or not isinstance(expected_revision, int):
+            return jsonify({'status': 'error', 'message': 'Revisão da sessão é obrigatória'}), 400
+
         # Carregar sessão existente
-        session_file = os.path.join('uploads', f"session_{video_hash}.json")
-        if not os.path.exists(session_file):
+        session_data = session_cache.get(video_hash)
+        if session_data is None:
             return jsonify({'status': 'error', 'message': 'Sessão não encontrada'}), 404
 
-        with open(session_file, 'r', encoding='utf-8') as f:
-            session_data = json.load(f)
-
         # Atualizar legendas
         session_data['subtitles'] = updated_subtitles
-        if forbidden_words is not None:
-            filtered_words = [str(word).strip() for word in forbidden_words if str(word).strip()]
-            if filtered_words:
-                session_data['forbidden_words'] = filtered_words
-            else:
-                session_data['forbidden_words'] = list(settings.profanity_words)
-        
+
         # Atualizar beep intervals se fornecidos
         if beep_intervals is not None:
             session_data['beep_intervals'] = beep_intervals
 
-        # Salvar sessão atualizada
-        with open(session_file, 'w', encoding='utf-8') as f:
-            json.dump(session_data, f, ensure_ascii=False, indent=2)
+        changed_segments: set[int] = set()
+        beeps_changed = beep_intervals is not None
+        censor_index_data = None
+        metadata = None
+        if forbidden_words is not None:
+            filtered_words = [str(word).strip() for word in forbidden_words if str(word).strip()]
+            new_words = filtered_words or list(settings.profanity_words)
+            censor_index = session_censor_index(session_data)
+            if censor_index is None:
+                # Índice descartado (legendas divididas ou juntadas): reconstruir com as
+                # palavras anteriores para que a troca abaixo mascare as legendas atuais
+                previous_words = session_data.get('forbidden_words') or list(settings.profanity_words)
+                censor_index = rebuild_censor_index(session_data['subtitles'], previous_words)
+                censor_index_data = censor_index.to_dict()
+            if tuple(new_words) != tuple(censor_index.words):
+                # Só os segmentos afetados pela troca de palavras são recensurados
+                changed_segments, session_data['beep_intervals'] = recensor_session(
+                    censor_index,
+                    session_data['subtitles'],
+                    session_data.get('beep_intervals') or [],
+                    new_words,
+                )
+                censor_index_data = censor_index.to_dict()
+                beeps_changed = True
+            metadata = {'forbidden_words': new_words}
+
+        # Salvar sessão atualizada; a revisão enviada pelo cliente impede
+        # sobrescrever uma edição concorrente
+        try:
+            revision = session_cache.update(
+                video_hash,
+                subtitles=session_data['subtitles'],
+                beep_intervals=session_data['beep_intervals'] if beeps_changed else None,
+                metadata=metadata,
+                censor_index=censor_index_data,
+                expected_revision=expected_revision,
+            )
+        except RevisionConflict as e:
+            return jsonify({
+                'status': 'error',
+                'message': 'A sessão foi alterada por outra edição; recarregue e tente novamente',
+                'revision': e.current,
+            }), 409
 
         return jsonify({
             'status': 'success',
-            'message': 'Legendas e beeps atualizados com sucesso'
+            'message': 'Legendas e beeps atualizados com sucesso',
+            'revision': revision,
+            'updated_subtitles': [
+                session_data['subtitles'][index]
+                for index in sorted(changed_segments)
+                if index < len(session_data['subtitles'])
+            ],
+            'beep_intervals': session_data.get('beep_intervals', []),
         })
 
     except Exception as e:
         return jsonify({'status': 'error', 'message': str(e)}), 500
 
 
+@preview_bp.route('/session/<video_hash>', methods=['PATCH'])
+def patch_session(video_hash):
+    """Aplica uma lista de operações (texto, tempo, dividir, juntar, beeps) sobre uma revisão"""
+    try:
+        data = request.get_json() or {}
+        operations = data.get('operations')
+        revision = data.get('revision')
+
+        if not operations or isinstance(revision, bool) or not isinstance(revision, int):
+            return jsonify({'status': 'error', 'message': 'Operações e revisão são obrigatórias'}), 400
+
+        try:
+            new_revision, written, subtitle_count, beep_intervals = session_cache.patch(video_hash, operations, revision)
+        except KeyError:
+            return jsonify({'status': 'error', 'message': 'Sessão não encontrada'}), 404
+        except RevisionConflict as e:
+            return jsonify({
+                'status': 'error',
+                'message': 'A sessão foi alterada por outra edição; recarregue e tente novamente',
+                'revision': e.current,
+            }), 409
+        except ValueError as e:
+            return jsonify({'status': 'error', 'message': str(e)}), 400
+
+        # Resposta proporcional à edição: só as legendas regravadas
+        response = {
+            'status': 'success',
+            'revision': new_revision,
+            'updated_subtitles': [dict(subtitle, index=index) for index, subtitle in written],
+        }
+        if subtitle_count is not None:
+            response['subtitle_count'] = subtitle_count
+        if beep_intervals is not None:
+            response['beep_intervals'] = beep_intervals
+        return jsonify(response)
+
+    except Exception as e:
+        return jsonify({'status': 'error', 'message': str(e)}), 500
+
+
 @preview_bp.route('/render_final_video', methods=['POST'])
 def render_final_video():
     """Renderiza o vídeo final com as legendas editadas"""
@@ -180,82 +226,68 @@ def render_final_video():
         data = request.get_json()
         video_hash = data.get('video_hash')
         subtitle_config = data.get('subtitle_config', {})
-        requested_words = data.get('forbidden_words')
-        custom_beep_intervals = data.get('beep_intervals')  # Novo: beeps editados do frontend
 
         if not video_hash:
             return jsonify({'status': 'error', 'message': 'Hash do vídeo é obrigatório'}), 400
 
         # Carregar sessão
-        session_file = os.path.join('uploads', f"session_{video_hash}.json")
-        if not os.path.exists(session_file):
+        session_data = session_cache.get(video_hash)
+        if session_data is None:
             return jsonify({'status': 'error', 'message': 'Sessão não encontrada'}), 404
 
-        with open(session_file, 'r', encoding='utf-8') as f:
-            session_data = json.load(f)
+        artifact, render_mode = render_final_session(video_hash, session_data, data)
 
-        video_path = session_data['video_path']
-        subtitles = session_data['subtitles']
-        session_words = session_data.get('forbidden_words', list(settings.profanity_words))
+        # A sessão continua disponível para novos ajustes de beeps; o vídeo fica
+        # no armazenamento de artefatos e é baixado pela URL (com Range), não
+        # nesta resposta, então uma desconexão não perde o render
+
+        response = jsonify({
+            'status': 'success',
+            'video_hash': video_hash,
+            'render_mode': render_mode,
+            'artifact': artifact_payload(artifact),
+        })
+        response.headers['X-Render-Mode'] = render_mode
+        return response
+
+    except Exception as e:
+        print(f"Erro na renderização: {str(e)}")
+        return jsonify({'status': 'error', 'message': str(e)}), 500
 
-        if isinstance(requested_words, (list, tuple)):
-            forbidden_words = [str(word).strip() for word in requested_words if str(word).strip()]
-            if not forbidden_words:
-                forbidden_words = session_words
-        else:
-            forbidden_words = session_words
-
-        # Usar beeps editados se fornecidos, senão recalcular
-        if custom_beep_intervals is not None and isinstance(custom_beep_intervals, list):
-            # Usar beeps editados pelo usuário
-            beep_intervals = [
-                (float(b[0]), float(b[1]))
-                for b in custom_beep_intervals
-                if isinstance(b, (list, tuple)) and len(b) >= 2
-            ]
-        else:
-            # Recalcular beeps automaticamente
-            segment_dicts = [
-                {
-                    'start': sub['start'],
-                    'end': sub['end'],
-                    'text': sub.get('raw_text', sub['text']),
-                }
-                for sub in subtitles
-            ]
-
-            sanitized_subtitles, beep_intervals = censor_segments(
-                segment_dicts,
-                forbidden_words=forbidden_words,
-            )
 
-        # Sempre usar legendas da sessão (já editadas)
-        subtitle_tuples = [(sub['start'], sub['end'], sub['text']) for sub in subtitles]
+@preview_bp.route('/render_preview_proxy', methods=['POST'])
+def render_preview_proxy():
+    """Prévia em baixa resolução (legendas e beeps queimados) para conferir edições"""
+    try:
+        data = request.get_json()
+        video_hash = data.get('video_hash')
 
-        # Caminho do vídeo final
-        output_video_name = f"final_{video_hash}.mp4"
-        output_video_path = os.path.join('uploads', output_video_name)
+        if not video_hash:
+            return jsonify({'status': 'error', 'message': 'Hash do vídeo é obrigatório'}), 400
 
-        # Renderizar vídeo
-        subtitle_options = SubtitleRenderingOptions(font_path=str(settings.font_path))
-        create_video_with_subtitles(
-            video_path,
+        session_data = session_cache.get(video_hash)
+        if session_data is None:
+            return jsonify({'status': 'error', 'message': 'Sessão não encontrada'}), 404
+
+        beep_intervals = resolve_beep_intervals(session_data, data)
+        subtitle_tuples = [(sub['start'], sub['end'], sub['text']) for sub in session_data['subtitles']]
+
+        proxy_path, cached = render_proxy_preview(
+            video_hash,
+            session_data['video_path'],
             subtitle_tuples,
-            output_video_path,
-            subtitle_options,
+            SubtitleRenderingOptions(font_path=str(settings.font_path)),
             beep_intervals=beep_intervals,
             beep_frequency=settings.beep_frequency,
             beep_volume=settings.beep_volume,
         )
 
-        # Limpar sessão e arquivos temporários após renderização
-        # (mantém apenas o vídeo final por 24h para download)
-        clean_session_by_hash(video_hash, keep_final_video=True)
-
-        return send_file(output_video_path, as_attachment=False, mimetype='video/mp4')
+        response = send_video(proxy_path)
+        response.headers['X-Proxy-Cache'] = 'hit' if cached else 'miss'
+        return response
 
     except Exception as e:
-        print(f"Erro na renderização: {str(e)}")
+        logger.exception("Erro na prévia da sessão")
         return jsonify({'status': 'error', 'message': str(e)}), 500
 
 
@@ -263,13 +295,10 @@ def render_final_video():
 def get_session(video_hash):
     """Recupera dados da sessão"""
     try:
-        session_file = os.path.join('uploads', f"session_{video_hash}.json")
-        if not os.path.exists(session_file):
+        session_data = session_cache.get(video_hash)
+        if session_data is None:
             return jsonify({'status': 'error', 'message': 'Sessão não encontrada'}), 404
 
-        with open(session_file, 'r', encoding='utf-8') as f:
-            session_data = json.load(f)
-
         return jsonify({
             'status': 'success',
             'data': session_data
@@ -283,18 +312,16 @@ def get_session(video_hash):
 def get_video(video_hash):
     """Serve o vídeo original para preview"""
     try:
-        session_file = os.path.join('uploads', f"session_{video_hash}.json")
-        if not os.path.exists(session_file):
+        # Só o caminho do vídeo: não precisa carregar legendas nem o índice
+        video_path = session_cache.video_path(video_hash)
+        if video_path is None:
             return jsonify({'status': 'error', 'message': 'Sessão não encontrada'}), 404
 
-        with open(session_file, 'r', encoding='utf-8') as f:
-            session_data = json.load(f)
-
-        video_path = session_data.get('video_path')
         if not video_path or not os.path.exists(video_path):
             return jsonify({'status': 'error', 'message': 'Vídeo não encontrado'}), 404
 
-        return send_file(video_path, mimetype='video/mp4')
+        # O hash do upload identifica o conteúdo: serve de ETag e permite cache
+        return send_video(video_path, etag=video_hash, max_age=settings.video_max_age)
 
     except Exception as e:
         return jsonify({'status': 'error', 'message': str(e)}), 500
\ No newline at end of file
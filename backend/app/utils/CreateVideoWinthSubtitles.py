@@ -4,19 +4,23 @@ from dataclasses import dataclass
 from pathlib import Path
 from typing import Iterable, Sequence, Tuple
 
-import numpy as np
-import moviepy.audio.fx.all as afx
 import moviepy.editor as mp
-from moviepy.audio.AudioClip import AudioClip, CompositeAudioClip
 from moviepy.video.tools.subtitles import SubtitlesClip
 
 try:
     from app.config import settings
 except ImportError:  # pragma: no cover - fallback for script execution
     from config import settings
+from .censor_audio import get_censor_track, pad_intervals
+from .encoder_presets import EncoderPreset, resolve_encoder_preset
+from .progress import ProgressReporter
+from .subtitle_raster import render_text_image
 
 logger = logging.getLogger(__name__)
 
+# Amostras por bloco de áudio pedido ao clip (o padrão do MoviePy é 2000)
+AUDIO_BUFFER_SIZE = 44100
+
 
 def _configure_ffmpeg_binary() -> None:
     candidate_paths = []
@@ -132,10 +136,62 @@ def create_video_with_subtitles(
     beep_frequency: int = 1000,
     beep_volume: float = 0.6,
     ducking_volume: float | None = 0.12,
-    codec: str = "libx264",
-    fps: int = 24,
+    codec: str | None = None,
+    fps: float | None = None,
+    engine: str | None = None,
+    censor_sound: str | None = None,
+    encoder_preset: str | EncoderPreset | None = None,
+    progress: ProgressReporter | None = None,
 ):
-    """Renderiza um vídeo com legendas e, opcionalmente, insere beeps nos trechos proibidos."""
+    """Renderiza um vídeo com legendas e, opcionalmente, insere beeps nos trechos proibidos.
+
+    ``engine`` escolhe entre a composição do MoviePy (``"moviepy"``) e a
+    passada única do FFmpeg (``"ffmpeg"``); o padrão vem de ``settings.render_engine``.
+    Com ``settings.render_chunked`` a engine ffmpeg renderiza em pedaços
+    paralelos e só recodifica os trechos cujas legendas mudaram.
+    ``censor_sound`` troca o beep por ``"silence"`` ou por um arquivo WAV.
+    ``encoder_preset`` escolhe o preset x264 (``"draft"``/``"quality"``); sem
+    ``fps`` a taxa de quadros da origem é preservada. Com ``progress``, a
+    escrita do MoviePy avança a etapa ``render`` quadro a quadro.
+    """
+
+    engine = (engine or settings.render_engine or "moviepy").lower()
+    preset = resolve_encoder_preset(encoder_preset, codec)
+    if engine == "ffmpeg" and settings.render_chunked:
+        from .chunked_render import render_chunked
+
+        render_chunked(
+            video_path,
+            subtitles,
+            output_video_path,
+            subtitle_options,
+            beep_intervals=beep_intervals,
+            beep_frequency=beep_frequency,
+            beep_volume=beep_volume,
+            ducking_volume=ducking_volume,
+            fps=fps,
+            censor_sound=censor_sound,
+            encoder_preset=preset,
+        )
+        return output_video_path
+    if engine == "ffmpeg":
+        from .ffmpeg_renderer import render_with_ffmpeg
+
+        return render_with_ffmpeg(
+            video_path,
+            subtitles,
+            output_video_path,
+            subtitle_options,
+            beep_intervals=beep_intervals,
+            beep_frequency=beep_frequency,
+            beep_volume=beep_volume,
+            ducking_volume=ducking_volume,
+            fps=fps,
+            censor_sound=censor_sound,
+            encoder_preset=preset,
+        )
+    if engine != "moviepy":
+        raise ValueError(f"Engine de renderização desconhecida: {engine}")
 
     logger.info("Iniciando processamento de legendas para %s", video_path)
     video_clip = mp.VideoFileClip(video_path)
@@ -154,23 +210,24 @@ def create_video_with_subtitles(
 
     resolved_font = _resolve_font_path(subtitle_options.font_path)
 
-    def _make_textclip(txt: str) -> mp.TextClip:
-        textclip_kwargs = {
-            "txt": txt,
-            "fontsize": params["font_size"],
-            "color": subtitle_options.font_color,
-            "bg_color": subtitle_options.bg_color,
-            "method": subtitle_options.method,
-            "align": subtitle_options.align,
-            "size": (params["subtitle_width"], params["subtitle_height"]),
-        }
-        if resolved_font:
-            textclip_kwargs["font"] = resolved_font
-        if subtitle_options.stroke_color and subtitle_options.stroke_width > 0:
-            textclip_kwargs["stroke_color"] = subtitle_options.stroke_color
-            textclip_kwargs["stroke_width"] = subtitle_options.stroke_width
-
-        return mp.TextClip(**textclip_kwargs)
+    subtitle_size = (params["subtitle_width"], params["subtitle_height"])
+    stroke_width = subtitle_options.stroke_width if subtitle_options.stroke_color else 0
+
+    def _make_textclip(txt: str) -> mp.ImageClip:
+        # Bitmaps desenhados com Pillow e memorizados: sem ImageMagick por linha
+        pixels = render_text_image(
+            txt,
+            resolved_font,
+            params["font_size"],
+            subtitle_options.font_color,
+            subtitle_options.bg_color,
+            subtitle_options.stroke_color,
+            stroke_width,
+            subtitle_size,
+            subtitle_options.align,
+            subtitle_options.method,
+        )
+        return mp.ImageClip(pixels, transparent=True)
 
     formatted_subtitles = [
         ((float(start), float(end)), str(text))
@@ -186,82 +243,24 @@ def create_video_with_subtitles(
     # Preparar áudio com beeps
     audio_clip = video_clip.audio
 
-    def _normalize_interval(item: Iterable[float]) -> Tuple[float, float] | None:
-        try:
-            start, end = float(item[0]), float(item[1])
-        except (TypeError, ValueError, IndexError):
-            return None
-        if end <= start:
-            return None
-        return start, end
-
-    raw_beep_items = [_normalize_interval(item) for item in (beep_intervals or [])]
-    beep_items: list[Tuple[float, float]] = [item for item in raw_beep_items if item]
-
-    if audio_clip and beep_items:
-        pad_seconds = 0.02
-        clip_duration = float(video_clip.duration)
-        padded_beep_items: list[Tuple[float, float]] = []
-
-        for start, end in beep_items:
-            padded_start = max(0.0, start - pad_seconds)
-            padded_end = min(clip_duration, end + pad_seconds)
-            if padded_end - padded_start <= 0:
-                continue
-            padded_beep_items.append((padded_start, padded_end))
-
-        base_audio = audio_clip
-        if ducking_volume is not None:
-            clamped_duck = max(0.0, min(1.0, ducking_volume))
-
-            def volume_curve(t):
-                # t pode ser escalar ou array, tratar ambos
-                t_array = np.atleast_1d(t)
-                result = np.ones_like(t_array, dtype=float)
-                for start, end in padded_beep_items:
-                    mask = (t_array >= start) & (t_array <= end)
-                    result[mask] = clamped_duck
-                # Retornar como escalar ou array dependendo da entrada
-                if np.isscalar(t):
-                    return float(result[0])
-                return result
-
-            def apply_ducking(get_frame, t):
-                frame = get_frame(t)
-                curve = volume_curve(t)
-                # Se frame é stereo (shape N,2) e curve é (N,), expandir curve
-                if frame.ndim == 2 and curve.ndim == 1:
-                    curve = curve[:, np.newaxis]
-                return frame * curve
-
-            base_audio = audio_clip.fl(apply_ducking)
-
-        # Detectar número de canais do áudio original
-        test_frame = audio_clip.get_frame(0)
-        nchannels = 2 if test_frame.ndim == 1 or getattr(test_frame, "shape", (0,))[0] == 2 else 1
-
-        def make_beep(duration: float) -> AudioClip:
-            def _tone(t: float | np.ndarray) -> np.ndarray:
-                mono_signal = beep_volume * np.sin(2 * np.pi * beep_frequency * t)
-                if nchannels == 2:
-                    if np.isscalar(t):
-                        return np.array([mono_signal, mono_signal])
-                    return np.column_stack([mono_signal, mono_signal])
-                return mono_signal
-
-            clip = AudioClip(_tone, duration=duration, fps=44100)
-            # Fade-in/out rápido evita cliques audíveis
-            clip = clip.fx(afx.audio_fadein, 0.01).fx(afx.audio_fadeout, 0.02)
-            return clip
-
-        beep_clips = []
-        for start, end in padded_beep_items:
-            duration = max(0.05, end - start)
-            beep_clip = make_beep(duration).set_start(start)
-            beep_clips.append(beep_clip)
-
-        composite_parts: list[AudioClip] = [base_audio, *beep_clips]
-        composite_audio: AudioClip = CompositeAudioClip(composite_parts)
+    padded_beep_items = pad_intervals(beep_intervals, float(video_clip.duration))
+
+    if audio_clip and padded_beep_items:
+        # Uma única trilha pré-mixada em vez de um AudioClip por beep
+        censor_track = get_censor_track(
+            padded_beep_items,
+            int(getattr(audio_clip, "fps", None) or 44100),
+            beep_frequency,
+            beep_volume,
+            censor_sound or settings.censor_sound,
+        )
+        envelope = censor_track.ducking(ducking_volume)
+
+        def apply_censor(get_frame, t):
+            # t pode ser escalar ou array; ducking e beep saem do mesmo bloco vetorizado
+            return censor_track.mix(get_frame(t), t, envelope)
+
+        composite_audio = audio_clip.fl(apply_censor)
     else:
         composite_audio = audio_clip
 
@@ -270,10 +269,11 @@ def create_video_with_subtitles(
         final_video = final_video.set_audio(composite_audio)
 
     logger.info("Exportando vídeo legendado para %s", output_video_path)
-    final_video.write_videofile(output_video_path, codec=codec, fps=fps)
+    final_video.write_videofile(
+        output_video_path,
+        fps=fps or video_clip.fps,
+        audio_bufsize=AUDIO_BUFFER_SIZE,
+        logger=progress.proglog_logger("render") if progress is not None else "bar",
+        **preset.moviepy_kwargs(),
+    )
     return final_video
-
-
-
-
-
@@ -0,0 +1,254 @@
+"""Vídeos gerados guardados por conteúdo, servidos por URL em vez de na resposta do POST.
+
+Cada render concluído é registrado como artefato: o arquivo é movido para
+``<raiz>/<aa>/<sha256>.mp4`` e os metadados (tipo, sessão, modo de render,
+tamanho) ficam ao lado em ``<sha256>.json``. O id é o SHA-256 do conteúdo,
+então o mesmo vídeo registrado duas vezes ocupa um único arquivo, e o id
+serve de ETag para os downloads (com ``Range``, via ``utils.video_streaming``).
+
+Retenção: ``prune`` remove artefatos sem acesso há mais de
+``TEXTWAVES_ARTIFACT_RETENTION_HOURS`` e, se ``TEXTWAVES_ARTIFACT_MAX_MB`` for
+maior que zero, os menos usados até o total caber no limite. Além da limpeza
+na inicialização, ``register`` aplica a retenção quando o total conhecido
+passa do limite ou a cada ``PRUNE_INTERVAL_SECONDS``; o artefato recém
+registrado nunca é removido nessa limpeza.
+"""
+from __future__ import annotations
+
+import json
+import logging
+import os
+import re
+import shutil
+import tempfile
+import threading
+import time
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Iterable, Mapping
+
+try:
+    from app.config import settings
+except ImportError:  # pragma: no cover - fallback for script execution
+    from config import settings
+from .file_hashing import hash_file
+
+logger = logging.getLogger(__name__)
+
+_ARTIFACT_ID = re.compile(r"^[0-9a-f]{64}$")
+
+# Intervalo mínimo entre duas limpezas disparadas por ``register``
+PRUNE_INTERVAL_SECONDS = 15 * 60
+
+
+@dataclass(frozen=True, slots=True)
+class Artifact:
+    id: str
+    path: Path
+    size: int
+    kind: str
+    mimetype: str = "video/mp4"
+    created_at: float = 0.0
+    metadata: dict[str, Any] = field(default_factory=dict)
+
+    def to_dict(self) -> dict[str, Any]:
+        return {
+            "artifact_id": self.id,
+            "kind": self.kind,
+            "size": self.size,
+            "mimetype": self.mimetype,
+            "created_at": self.created_at,
+            "metadata": self.metadata,
+        }
+
+
+class ArtifactStore:
+    def __init__(
+        self,
+        directory: Path | str,
+        max_age_seconds: float | None = None,
+        max_bytes: int | None = None,
+        prune_interval: float = PRUNE_INTERVAL_SECONDS,
+    ) -> None:
+        """``max_age_seconds``/``max_bytes`` são a retenção aplicada após ``register`` (``None`` desativa)."""
+        self.directory = Path(directory)
+        self.max_age_seconds = max_age_seconds
+        self.max_bytes = max_bytes
+        self.prune_interval = prune_interval
+        self._lock = threading.Lock()
+        self._prune_lock = threading.Lock()
+        # Total em disco visto na última limpeza, mais o que foi registrado depois
+        self._known_bytes: int | None = None
+        self._last_prune: float | None = None
+
+    def _paths(self, artifact_id: str, suffix: str = ".mp4") -> tuple[Path, Path]:
+        if not _ARTIFACT_ID.match(artifact_id):
+            raise ValueError(f"Identificador de artefato inválido: {artifact_id!r}")
+        folder = self.directory / artifact_id[:2]
+        return folder / f"{artifact_id}{suffix}", folder / f"{artifact_id}.json"
+
+    def register(
+        self,
+        source: str | os.PathLike,
+        kind: str,
+        metadata: Mapping[str, Any] | None = None,
+        *,
+        move: bool = True,
+        content_hash: str | None = None,
+    ) -> Artifact:
+        """Guarda ``source`` pelo hash do conteúdo; ``move=False`` copia em vez de mover.
+
+        Conteúdo já registrado devolve o artefato existente, com os metadados e
+        a retenção (mtime) originais; só o atime do arquivo é atualizado.
+        """
+        source = Path(source)
+        artifact_id = content_hash or hash_file(source)
+        path, meta_path = self._paths(artifact_id, source.suffix or ".mp4")
+        path.parent.mkdir(parents=True, exist_ok=True)
+
+        with self._lock:
+            existing = self.get(artifact_id, touch=False) if path.exists() else None
+            if existing is not None:
+                os.utime(path, (time.time(), path.stat().st_mtime))
+                if move:
+                    source.unlink(missing_ok=True)
+                return existing
+
+            is_new = not path.exists()
+            if not is_new:
+                # Arquivo sem metadados legíveis: reaproveita o conteúdo e regrava o JSON
+                os.utime(path)
+                if move:
+                    source.unlink(missing_ok=True)
+            elif move:
+                shutil.move(str(source), path)
+            else:
+                with tempfile.NamedTemporaryFile(dir=path.parent, suffix=".tmp", delete=False) as handle:
+                    temp_path = Path(handle.name)
+                shutil.copyfile(source, temp_path)
+                os.replace(temp_path, path)
+
+            artifact = Artifact(
+                id=artifact_id,
+                path=path,
+                size=path.stat().st_size,
+                kind=kind,
+                mimetype="video/mp4" if path.suffix == ".mp4" else "application/octet-stream",
+                created_at=time.time(),
+                metadata=dict(metadata or {}),
+            )
+            temp_meta = meta_path.with_suffix(".json.tmp")
+            temp_meta.write_text(
+                json.dumps({**artifact.to_dict(), "filename": path.name}, ensure_ascii=False), encoding="utf-8"
+            )
+            os.replace(temp_meta, meta_path)
+            if is_new and self._known_bytes is not None:
+                self._known_bytes += artifact.size
+        logger.info("Artefato %s registrado (%s, %.1f MiB)", artifact_id[:12], kind, artifact.size / 2**20)
+        self._prune_if_due(keep=artifact_id)
+        return artifact
+
+    def _prune_if_due(self, keep: str) -> None:
+        """Aplica a retenção configurada se o total passou do limite ou o intervalo venceu."""
+        if self.max_age_seconds is None and not self.max_bytes:
+            return
+        over_budget = bool(self.max_bytes) and (self._known_bytes is None or self._known_bytes > self.max_bytes)
+        due = self._last_prune is None or time.monotonic() - self._last_prune >= self.prune_interval
+        if not (over_budget or due):
+            return
+        # Uma limpeza por vez; quem chega durante uma limpeza não espera
+        if not self._prune_lock.acquire(blocking=False):
+            return
+        try:
+            removed = self.prune(self.max_age_seconds, self.max_bytes, keep=(keep,))
+        except OSError as exc:
+            logger.warning("Falha ao aplicar a retenção de artefatos: %s", exc)
+        else:
+            if removed:
+                logger.info("%d artefato(s) removido(s) pela retenção", removed)
+        finally:
+            self._prune_lock.release()
+
+    def get(self, artifact_id: str, touch: bool = True) -> Artifact | None:
+        try:
+            _, meta_path = self._paths(artifact_id)
+        except ValueError:
+            return None
+        try:
+            data = json.loads(meta_path.read_text(encoding="utf-8"))
+        except (OSError, json.JSONDecodeError):
+            return None
+        path = meta_path.with_name(data.get("filename", f"{artifact_id}.mp4"))
+        if not path.exists():
+            return None
+        if touch:
+            # mtime marca o último acesso, usado pela retenção
+            os.utime(path)
+        return Artifact(
+            id=artifact_id,
+            path=path,
+            size=data["size"],
+            kind=data["kind"],
+            mimetype=data.get("mimetype", "video/mp4"),
+            created_at=data.get("created_at", 0.0),
+            metadata=data.get("metadata") or {},
+        )
+
+    def discard(self, artifact_id: str) -> bool:
+        artifact = self.get(artifact_id, touch=False)
+        if artifact is None:
+            return False
+        with self._lock:
+            artifact.path.unlink(missing_ok=True)
+            artifact.path.with_name(f"{artifact_id}.json").unlink(missing_ok=True)
+        return True
+
+    def prune(
+        self,
+        max_age_seconds: float | None = None,
+        max_bytes: int | None = None,
+        keep: Iterable[str] = (),
+    ) -> int:
+        """Remove artefatos sem acesso há mais de ``max_age_seconds`` e os menos usados além de ``max_bytes``.
+
+        Os ids em ``keep`` nunca são removidos.
+        """
+        if not self.directory.exists():
+            return 0
+        keep = set(keep)
+        entries = []
+        for meta_path in self.directory.glob("??/*.json"):
+            artifact = self.get(meta_path.stem, touch=False)
+            if artifact is None:
+                meta_path.unlink(missing_ok=True)
+                continue
+            entries.append((artifact.path.stat().st_mtime, artifact))
+        entries.sort(key=lambda item: item[0])
+
+        cutoff = time.time() - max_age_seconds if max_age_seconds is not None else None
+        total = sum(artifact.size for _, artifact in entries)
+        removed = 0
+        for last_used, artifact in entries:
+            expired = cutoff is not None and last_used < cutoff
+            over_limit = bool(max_bytes) and total > max_bytes
+            if not (expired or over_limit) or artifact.id in keep:
+                continue
+            if self.discard(artifact.id):
+                total -= artifact.size
+                removed += 1
+        self._known_bytes = total
+        self._last_prune = time.monotonic()
+        return removed
+
+
+artifact_store = ArtifactStore(
+    settings.artifact_dir,
+    max_age_seconds=settings.artifact_retention_hours * 3600,
+    max_bytes=settings.artifact_max_mb * 1024 * 1024 if settings.artifact_max_mb > 0 else None,
+)
+
+
+def prune_artifacts(store: ArtifactStore | None = None) -> int:
+    """Aplica a retenção configurada."""
+    store = store or artifact_store
+    return store.prune(store.max_age_seconds, store.max_bytes)
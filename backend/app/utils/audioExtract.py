@@ -1,7 +1,38 @@
-from moviepy.editor import VideoFileClip
+import numpy as np
+
+from .ffmpeg_tools import run_ffmpeg
+
+WHISPER_SAMPLE_RATE = 16000
+
 
 def extract_audio_from_video(video_path, audio_path):
     """Extrai áudio de um vídeo e salva no formato WAV."""
+    from moviepy.editor import VideoFileClip
+
     video = VideoFileClip(video_path)
     audio = video.audio
     audio.write_audiofile(audio_path, codec='pcm_s16le')  # Forçando o codec WAV adequado
+
+
+def load_audio_samples(video_path, sample_rate=WHISPER_SAMPLE_RATE):
+    """Decodifica o áudio do vídeo com uma única chamada ao FFmpeg.
+
+    O FFmpeg já entrega as amostras em float32 mono na taxa esperada pelo
+    Whisper, lidas direto do pipe para um array NumPy, sem arquivo WAV
+    temporário nem segunda decodificação.
+    """
+    raw_audio = run_ffmpeg(
+        [
+            "-threads", "0",
+            "-i", str(video_path),
+            "-vn",
+            "-ac", "1",
+            "-ar", str(sample_rate),
+            "-f", "f32le",
+            "-acodec", "pcm_f32le",
+            "pipe:1",
+        ],
+        capture_stdout=True,
+    )
+    # bytearray torna o buffer gravável (torch.from_numpy rejeita buffers somente leitura)
+    return np.frombuffer(bytearray(raw_audio), dtype=np.float32)
@@ -0,0 +1,89 @@
+"""Envelope de ducking vetorizado para os trechos censurados.
+
+Os intervalos de beep são mesclados e guardados em arrays ordenados de início
+e fim; o ganho de qualquer bloco de tempos sai de um único
+``np.searchsorted``, em vez de uma máscara por intervalo a cada bloco de
+áudio pedido pelo MoviePy.
+"""
+from __future__ import annotations
+
+from typing import Iterable, Sequence
+
+import numpy as np
+
+
+def merge_intervals(intervals: Iterable[Sequence[float]]) -> list[tuple[float, float]]:
+    """Ordena e funde intervalos sobrepostos ou encostados; descarta os vazios."""
+    ordered = sorted(
+        (float(item[0]), float(item[1])) for item in intervals if float(item[1]) > float(item[0])
+    )
+    merged: list[tuple[float, float]] = []
+    for start, end in ordered:
+        if merged and start <= merged[-1][1]:
+            merged[-1] = (merged[-1][0], max(merged[-1][1], end))
+        else:
+            merged.append((start, end))
+    return merged
+
+
+class DuckingEnvelope:
+    """Ganho ``duck_gain`` dentro dos intervalos (bordas inclusas) e 1 fora deles."""
+
+    def __init__(self, intervals: Iterable[Sequence[float]], duck_gain: float) -> None:
+        merged = merge_intervals(intervals)
+        self.intervals = merged
+        self.duck_gain = float(max(0.0, min(1.0, duck_gain)))
+        self._starts = np.array([start for start, _ in merged], dtype=np.float64)
+        self._ends = np.array([end for _, end in merged], dtype=np.float64)
+
+    def __len__(self) -> int:
+        return len(self.intervals)
+
+    def inside(self, t: float | np.ndarray) -> np.ndarray:
+        times = np.atleast_1d(np.asarray(t, dtype=np.float64))
+        if not self.intervals:
+            return np.zeros(times.shape, dtype=bool)
+        if times.size > 1 and times.ndim == 1 and np.all(times[1:] >= times[:-1]):
+            return self._inside_sorted(times)
+        # Último intervalo que começa antes de t; como estão fundidos, basta olhar o fim dele
+        index = np.searchsorted(self._starts, times, side="right") - 1
+        clipped = np.maximum(index, 0)
+        return (index >= 0) & (times <= self._ends[clipped])
+
+    def _inside_sorted(self, times: np.ndarray) -> np.ndarray:
+        # Blocos do MoviePy vêm ordenados: só as bordas dos intervalos do bloco são buscadas
+        first = np.searchsorted(self._ends, times[0], side="left")
+        last = np.searchsorted(self._starts, times[-1], side="right")
+        if first >= last:
+            return np.zeros(times.shape, dtype=bool)
+        opens = np.searchsorted(times, self._starts[first:last], side="left")
+        closes = np.searchsorted(times, self._ends[first:last], side="right")
+        delta = np.zeros(times.size + 1, dtype=np.int32)
+        np.add.at(delta, opens, 1)
+        np.add.at(delta, closes, -1)
+        return np.cumsum(delta[:-1]) > 0
+
+    def gain(self, t: float | np.ndarray) -> float | np.ndarray:
+        result = np.where(self.inside(t), self.duck_gain, 1.0)
+        if np.isscalar(t):
+            return float(result[0])
+        return result
+
+    def apply(self, frame: np.ndarray, t: float | np.ndarray) -> np.ndarray:
+        """Multiplica um bloco de áudio (mono ou com canais em colunas) pelo ganho."""
+        curve = self.gain(t)
+        if isinstance(curve, float):
+            return frame * curve
+        if frame.ndim == 2 and curve.ndim == 1:
+            curve = curve[:, np.newaxis]
+        return frame * curve
+
+    def sample_gains(self, sample_rate: int, num_samples: int) -> np.ndarray:
+        """Envelope completo amostra a amostra, preenchido por fatias."""
+        gains = np.ones(num_samples, dtype=np.float32)
+        for start, end in self.intervals:
+            first = max(0, int(np.ceil(start * sample_rate)))
+            last = min(num_samples, int(np.floor(end * sample_rate)) + 1)
+            if last > first:
+                gains[first:last] = self.duck_gain
+        return gains
@@ -0,0 +1,273 @@
+"""Trilha de censura pré-mixada para os trechos com beep.
+
+Os intervalos (já com a folga de ``BEEP_PAD_SECONDS``) são fundidos e o som
+de censura de todos eles é sintetizado uma única vez em um buffer ``float32``
+na taxa de amostragem do áudio de origem. Só as amostras dos trechos
+censurados são guardadas, concatenadas, com um índice de deslocamentos; a
+leitura de qualquer bloco de tempos é vetorizada. As bordas usam rampas de
+cosseno levantado e o ducking do áudio original sai do mesmo conjunto de
+intervalos.
+
+O som pode ser um tom senoidal (``"tone"``), silêncio (``"silence"``, que
+emudece o trecho) ou o caminho de um WAV usado como amostra.
+"""
+from __future__ import annotations
+
+import logging
+import os
+import threading
+import wave
+from collections import OrderedDict
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Iterable, Sequence
+
+import numpy as np
+
+from .audio_ducking import DuckingEnvelope, merge_intervals
+
+logger = logging.getLogger(__name__)
+
+BEEP_PAD_SECONDS = 0.02
+BEEP_FADE_IN_SECONDS = 0.01
+BEEP_FADE_OUT_SECONDS = 0.02
+BEEP_MIN_SECONDS = 0.05
+CENSOR_TRACK_CACHE_SIZE = 8
+WAV_WRITE_BLOCK = 1 << 20
+
+
+@dataclass(frozen=True, slots=True)
+class CensorSound:
+    kind: str
+    path: str | None = None
+
+    @property
+    def cache_key(self) -> tuple:
+        if self.kind != "sample" or not self.path:
+            return (self.kind,)
+        stat = os.stat(self.path)
+        return (self.kind, self.path, stat.st_mtime_ns, stat.st_size)
+
+
+def parse_censor_sound(raw: str | CensorSound | None) -> CensorSound:
+    """Aceita ``"tone"``, ``"silence"`` ou o caminho de um arquivo WAV."""
+    if isinstance(raw, CensorSound):
+        return raw
+    value = (raw or "tone").strip()
+    if value.lower() in {"tone", "beep"}:
+        return CensorSound("tone")
+    if value.lower() in {"silence", "mute"}:
+        return CensorSound("silence")
+    path = Path(value)
+    if path.suffix.lower() != ".wav" or not path.exists():
+        raise ValueError(f"Som de censura inválido: {raw}")
+    return CensorSound("sample", str(path.resolve()))
+
+
+def pad_intervals(
+    intervals: Iterable[Sequence[float]] | None,
+    duration: float | None = None,
+    pad_seconds: float = BEEP_PAD_SECONDS,
+) -> list[tuple[float, float]]:
+    """Normaliza os intervalos de beep e acrescenta a folga nas duas bordas."""
+    padded = []
+    for item in intervals or []:
+        try:
+            start, end = float(item[0]), float(item[1])
+        except (TypeError, ValueError, IndexError):
+            continue
+        if end <= start:
+            continue
+        padded_start = max(0.0, start - pad_seconds)
+        padded_end = end + pad_seconds
+        if duration:
+            padded_end = min(float(duration), padded_end)
+        if padded_end > padded_start:
+            padded.append((padded_start, padded_end))
+    return padded
+
+
+def raised_cosine(length: int) -> np.ndarray:
+    """Rampa de 0 a 1 em ``length`` amostras, sem descontinuidade na derivada."""
+    if length <= 0:
+        return np.zeros(0, dtype=np.float32)
+    return (0.5 - 0.5 * np.cos(np.pi * np.arange(length) / length)).astype(np.float32)
+
+
+def _load_sample(path: str, sample_rate: int) -> np.ndarray:
+    with wave.open(path, "rb") as wav_file:
+        channels = wav_file.getnchannels()
+        width = wav_file.getsampwidth()
+        source_rate = wav_file.getframerate()
+        frames = wav_file.readframes(wav_file.getnframes())
+
+    if width == 1:
+        data = (np.frombuffer(frames, dtype=np.uint8).astype(np.float32) - 128) / 128
+    elif width == 2:
+        data = np.frombuffer(frames, dtype="<i2").astype(np.float32) / 32768
+    elif width == 4:
+        data = np.frombuffer(frames, dtype="<i4").astype(np.float32) / 2147483648
+    else:
+        raise ValueError(f"WAV com {width * 8} bits não é suportado: {path}")
+    data = data.reshape(-1, channels).mean(axis=1)
+
+    if source_rate != sample_rate and data.size:
+        positions = np.arange(int(data.size * sample_rate / source_rate)) * source_rate / sample_rate
+        data = np.interp(positions, np.arange(data.size), data).astype(np.float32)
+    peak = float(np.abs(data).max()) if data.size else 0.0
+    return data / peak if peak > 0 else data
+
+
+class CensorTrack:
+    """Amostras de censura de todos os intervalos em um único buffer ``float32``."""
+
+    def __init__(
+        self,
+        intervals: Iterable[Sequence[float]],
+        sample_rate: int,
+        frequency: float = 1000,
+        volume: float = 0.6,
+        sound: CensorSound | None = None,
+    ) -> None:
+        self.sample_rate = int(sample_rate)
+        self.frequency = float(frequency)
+        self.volume = float(volume)
+        self.sound = sound or CensorSound("tone")
+        self.intervals = merge_intervals(intervals)
+
+        starts, lengths = [], []
+        minimum = int(BEEP_MIN_SECONDS * self.sample_rate)
+        for start, end in self.intervals:
+            first = int(round(start * self.sample_rate))
+            length = max(minimum, int(round((end - start) * self.sample_rate)))
+            if starts and first < starts[-1] + lengths[-1]:
+                # A duração mínima pode encostar no próximo trecho: estende o anterior
+                lengths[-1] = max(lengths[-1], first + length - starts[-1])
+                continue
+            starts.append(first)
+            lengths.append(length)
+
+        self._starts = np.array(starts, dtype=np.int64)
+        self._lengths = np.array(lengths, dtype=np.int64)
+        self._offsets = np.concatenate(([0], np.cumsum(self._lengths)[:-1])).astype(np.int64)
+        self.buffer = self._synthesize()
+        self.buffer.flags.writeable = False
+
+    @property
+    def mutes_source(self) -> bool:
+        return self.sound.kind == "silence"
+
+    @property
+    def nbytes(self) -> int:
+        return int(self.buffer.nbytes)
+
+    def _synthesize(self) -> np.ndarray:
+        total = int(self._lengths.sum()) if self._lengths.size else 0
+        buffer = np.zeros(total, dtype=np.float32)
+        if self.mutes_source or not total:
+            return buffer
+
+        sample = _load_sample(self.sound.path, self.sample_rate) if self.sound.kind == "sample" else None
+        fade_in = int(BEEP_FADE_IN_SECONDS * self.sample_rate)
+        fade_out = int(BEEP_FADE_OUT_SECONDS * self.sample_rate)
+        for offset, length in zip(self._offsets, self._lengths):
+            if sample is not None and sample.size:
+                segment = np.resize(sample, length)
+            else:
+                t = np.arange(length, dtype=np.float64) / self.sample_rate
+                segment = np.sin(2 * np.pi * self.frequency * t).astype(np.float32)
+            segment = segment * np.float32(self.volume)
+            ramp_in, ramp_out = min(fade_in, length // 2), min(fade_out, length // 2)
+            segment[:ramp_in] *= raised_cosine(ramp_in)
+            if ramp_out:
+                segment[-ramp_out:] *= raised_cosine(ramp_out)[::-1]
+            buffer[offset:offset + length] = segment
+        return buffer
+
+    def samples(self, indices: np.ndarray) -> np.ndarray:
+        """Valores da trilha (mono) nos índices de amostra pedidos; zero fora dos trechos."""
+        indices = np.asarray(indices, dtype=np.int64)
+        result = np.zeros(indices.shape, dtype=np.float32)
+        if not self._starts.size:
+            return result
+        segment = np.searchsorted(self._starts, indices, side="right") - 1
+        clipped = np.maximum(segment, 0)
+        position = indices - self._starts[clipped]
+        inside = (segment >= 0) & (position < self._lengths[clipped])
+        result[inside] = self.buffer[self._offsets[clipped[inside]] + position[inside]]
+        return result
+
+    def at(self, t: float | np.ndarray) -> np.ndarray:
+        times = np.atleast_1d(np.asarray(t, dtype=np.float64))
+        return self.samples(np.round(times * self.sample_rate).astype(np.int64))
+
+    def block(self, first_sample: int, count: int) -> np.ndarray:
+        return self.samples(np.arange(first_sample, first_sample + count, dtype=np.int64))
+
+    def ducking(self, ducking_volume: float | None) -> DuckingEnvelope | None:
+        """Envelope do áudio original; o som ``silence`` zera os trechos."""
+        if self.mutes_source:
+            return DuckingEnvelope(self.intervals, 0.0)
+        if ducking_volume is None:
+            return None
+        return DuckingEnvelope(self.intervals, ducking_volume)
+
+    def mix(
+        self, frame: np.ndarray, t: float | np.ndarray, envelope: DuckingEnvelope | None
+    ) -> np.ndarray:
+        """Aplica o ducking a um bloco de áudio e soma o som de censura em todos os canais."""
+        mixed = envelope.apply(frame, t) if envelope is not None else frame
+        censor = self.at(t)
+        if np.isscalar(t):
+            censor = censor[0]
+        elif mixed.ndim == 2:
+            censor = censor[:, np.newaxis]
+        return mixed + censor
+
+    def write_wav(self, path: str | Path, num_samples: int, channels: int = 1) -> None:
+        """Grava a trilha inteira em PCM 16 bits, bloco a bloco."""
+        with wave.open(str(path), "wb") as wav_file:
+            wav_file.setnchannels(channels)
+            wav_file.setsampwidth(2)
+            wav_file.setframerate(self.sample_rate)
+            for first in range(0, num_samples, WAV_WRITE_BLOCK):
+                block = self.block(first, min(WAV_WRITE_BLOCK, num_samples - first))
+                pcm = (np.clip(block, -1.0, 1.0) * 32767).astype("<i2")
+                if channels > 1:
+                    pcm = np.repeat(pcm[:, np.newaxis], channels, axis=1)
+                wav_file.writeframes(pcm.tobytes())
+
+
+_track_cache: "OrderedDict[tuple, CensorTrack]" = OrderedDict()
+_track_lock = threading.Lock()
+
+
+def get_censor_track(
+    intervals: Iterable[Sequence[float]],
+    sample_rate: int,
+    frequency: float = 1000,
+    volume: float = 0.6,
+    sound: str | CensorSound | None = None,
+) -> CensorTrack:
+    """Retorna a trilha de censura, reaproveitando-a entre renderizações iguais."""
+    censor_sound = parse_censor_sound(sound)
+    merged = tuple((round(start, 4), round(end, 4)) for start, end in merge_intervals(intervals))
+    key = (merged, int(sample_rate), float(frequency), float(volume), censor_sound.cache_key)
+    with _track_lock:
+        track = _track_cache.get(key)
+        if track is not None:
+            _track_cache.move_to_end(key)
+            return track
+
+    track = CensorTrack(merged, sample_rate, frequency, volume, censor_sound)
+    with _track_lock:
+        _track_cache[key] = track
+        while len(_track_cache) > CENSOR_TRACK_CACHE_SIZE:
+            _track_cache.popitem(last=False)
+    logger.debug("Trilha de censura criada: %s trechos, %.1f KiB", len(merged), track.nbytes / 1024)
+    return track
+
+
+def clear_censor_track_cache() -> None:
+    with _track_lock:
+        _track_cache.clear()
@@ -0,0 +1,347 @@
+"""Índice de tokens por segmento para recensurar sem reprocessar a transcrição.
+
+O índice guarda, para cada segmento, o texto normalizado, os tokens (com seus
+trechos no texto normalizado e no original) e as palavras do Whisper com seus
+tempos. Trocar a lista de palavras proibidas vira uma diferença de conjuntos:
+termos removidos descartam suas ocorrências e termos novos são procurados na
+lista invertida de tokens, sem varrer a transcrição inteira.
+"""
+from __future__ import annotations
+
+from collections import defaultdict
+from dataclasses import dataclass
+from typing import Any, Iterable, Mapping, Sequence
+
+try:
+    from app.config import settings
+except ImportError:  # pragma: no cover - fallback for script execution
+    from config import settings
+from .profanity_filter import find_forbidden_words, mask_hits, segment_beep_intervals
+from .text_normalization import NormalizedText, normalize_with_offsets
+from .word_matcher import WordHit, fold_case, get_matcher
+
+BeepInterval = tuple[float, float, str]
+
+
+def _is_word_char(char: str) -> bool:
+    return char.isalnum() or char == "_"
+
+
+def _normalize(text: str, fuzzy: bool) -> NormalizedText:
+    if fuzzy:
+        return normalize_with_offsets(text)
+    positions = tuple(range(len(text)))
+    return NormalizedText(fold_case(text), positions, tuple(index + 1 for index in positions))
+
+
+def _token_bounds(text: str) -> list[tuple[int, int]]:
+    bounds = []
+    start = None
+    for index, char in enumerate(text):
+        if _is_word_char(char):
+            if start is None:
+                start = index
+        elif start is not None:
+            bounds.append((start, index))
+            start = None
+    if start is not None:
+        bounds.append((start, len(text)))
+    return bounds
+
+
+@dataclass(slots=True)
+class IndexedSegment:
+    start: float
+    end: float
+    text: str
+    normalized: str
+    # (início, fim) no texto normalizado e (início, fim) no texto original
+    tokens: list[tuple[int, int, int, int]]
+    words: list[dict] | None
+
+    @classmethod
+    def from_segment(cls, segment: dict, fuzzy: bool) -> "IndexedSegment":
+        text = str(segment.get("text", ""))
+        normalized = _normalize(text, fuzzy)
+        tokens = []
+        for norm_start, norm_end in _token_bounds(normalized.text):
+            original_start, original_end = normalized.original_span(norm_start, norm_end)
+            tokens.append((norm_start, norm_end, original_start, original_end))
+        raw_words = segment.get("words")
+        words = None
+        if isinstance(raw_words, list) and raw_words:
+            words = [
+                {"word": str(word.get("word", "")), "start": word.get("start"), "end": word.get("end")}
+                for word in raw_words
+            ]
+        start = float(segment.get("start", 0.0))
+        return cls(start, float(segment.get("end", start)), text, normalized.text, tokens, words)
+
+
+@dataclass(slots=True)
+class WordListDiff:
+    words: tuple[str, ...]
+    removed: set[str]
+    added: dict[str, list[tuple[int, int, int]]]
+    changed: set[int]
+
+
+class CensorIndex:
+    def __init__(self, segments: list[IndexedSegment], fuzzy: bool) -> None:
+        self.segments = segments
+        self.fuzzy = fuzzy
+        self.words: tuple[str, ...] = ()
+        # termo normalizado -> [(segmento, início, fim)] no texto original
+        self._term_hits: dict[str, list[tuple[int, int, int]]] = {}
+        # segmento -> termo -> [(início, fim)]
+        self._segment_terms: dict[int, dict[str, list[tuple[int, int]]]] = defaultdict(dict)
+        self._postings: dict[str, list[tuple[int, int]]] = defaultdict(list)
+        for segment_index, segment in enumerate(segments):
+            for token_index, (norm_start, norm_end, _, _) in enumerate(segment.tokens):
+                token = segment.normalized[norm_start:norm_end]
+                self._postings[token].append((segment_index, token_index))
+
+    @classmethod
+    def build(
+        cls,
+        segments: Sequence[dict],
+        forbidden_words: Iterable[str] | None = None,
+        fuzzy: bool | None = None,
+    ) -> "CensorIndex":
+        if fuzzy is None:
+            fuzzy = settings.profanity_fuzzy_matching
+        index = cls([IndexedSegment.from_segment(segment, fuzzy) for segment in segments], fuzzy)
+        if forbidden_words is None:
+            forbidden_words = settings.profanity_words
+        index.apply_words(forbidden_words)
+        return index
+
+    def _normalize_term(self, word: str) -> str:
+        return _normalize(str(word).strip(), self.fuzzy).text
+
+    def _find_term(self, term: str) -> list[tuple[int, int, int]]:
+        bounds = _token_bounds(term)
+        if not bounds:
+            return []
+        regular = bounds[0][0] == 0 and bounds[-1][1] == len(term)
+        if not regular:
+            return self._scan_term(term)
+
+        first_token = term[bounds[0][0]:bounds[0][1]]
+        hits = []
+        for segment_index, token_index in self._postings.get(first_token, ()):
+            segment = self.segments[segment_index]
+            last_index = token_index + len(bounds) - 1
+            if last_index >= len(segment.tokens):
+                continue
+            norm_start = segment.tokens[token_index][0]
+            norm_end = segment.tokens[last_index][1]
+            if segment.normalized[norm_start:norm_end] != term:
+                continue
+            hits.append((segment_index, segment.tokens[token_index][2], segment.tokens[last_index][3]))
+        return hits
+
+    def _scan_term(self, term: str) -> list[tuple[int, int, int]]:
+        # Termos que começam/terminam com símbolos não cabem na lista invertida
+        matcher = get_matcher([term])
+        hits = []
+        for segment_index, segment in enumerate(self.segments):
+            for hit in find_forbidden_words(segment.text, matcher, self.fuzzy):
+                hits.append((segment_index, hit.start, hit.end))
+        return hits
+
+    def diff_words(self, forbidden_words: Iterable[str]) -> "WordListDiff":
+        """Calcula o efeito de uma nova lista de palavras sem alterar o índice."""
+        words = tuple(str(word).strip() for word in forbidden_words if str(word).strip())
+        new_terms = {term for term in (self._normalize_term(word) for word in words) if term}
+        old_terms = set(self._term_hits)
+        removed = old_terms - new_terms
+        added = {term: self._find_term(term) for term in new_terms - old_terms}
+
+        changed = {segment_index for term in removed for segment_index, _, _ in self._term_hits[term]}
+        changed.update(segment_index for hits in added.values() for segment_index, _, _ in hits)
+        return WordListDiff(words, removed, added, changed)
+
+    def commit(self, diff: "WordListDiff") -> set[int]:
+        for term in diff.removed:
+            for segment_index, _, _ in self._term_hits.pop(term):
+                self._segment_terms[segment_index].pop(term, None)
+        for term, hits in diff.added.items():
+            self._add_term_hits(term, hits)
+        self.words = diff.words
+        return diff.changed
+
+    def _add_term_hits(self, term: str, hits: list[tuple[int, int, int]]) -> None:
+        self._term_hits[term] = hits
+        for segment_index, start, end in hits:
+            self._segment_terms[segment_index].setdefault(term, []).append((start, end))
+
+    def apply_words(self, forbidden_words: Iterable[str]) -> set[int]:
+        """Atualiza a lista de palavras e retorna os índices dos segmentos afetados."""
+        return self.commit(self.diff_words(forbidden_words))
+
+    def segment_hits(self, segment_index: int) -> list[WordHit]:
+        """Ocorrências do segmento, da esquerda para a direita e sem sobreposição."""
+        candidates = sorted(
+            (start, -end)
+            for spans in self._segment_terms.get(segment_index, {}).values()
+            for start, end in spans
+        )
+        text = self.segments[segment_index].text
+        hits: list[WordHit] = []
+        cursor = 0
+        for start, negative_end in candidates:
+            if start < cursor:
+                continue
+            end = -negative_end
+            hits.append(WordHit(start, end, text[start:end]))
+            cursor = end
+        return hits
+
+    def sanitized_text(self, segment_index: int) -> str:
+        return mask_hits(self.segments[segment_index].text, self.segment_hits(segment_index))
+
+    def beep_intervals(self, segment_index: int) -> list[BeepInterval]:
+        segment = self.segments[segment_index]
+        hits = self.segment_hits(segment_index)
+        if not hits:
+            return []
+        terms = sorted(self._segment_terms.get(segment_index, ()))
+        word_matcher = get_matcher(terms)
+        return segment_beep_intervals(
+            segment.start,
+            segment.end,
+            segment.text,
+            segment.words,
+            hits,
+            lambda raw_word: bool(find_forbidden_words(raw_word, word_matcher, self.fuzzy)),
+        )
+
+    def retime_segment(self, segment_index: int, start: float, end: float) -> None:
+        """Move o segmento para ``(start, end)``; os tempos das palavras acompanham proporcionalmente."""
+        segment = self.segments[segment_index]
+        duration = segment.end - segment.start
+        scale = (end - start) / duration if duration > 0 else 0.0
+
+        def shift(value: Any) -> Any:
+            return value if value is None else start + (float(value) - segment.start) * scale
+
+        if segment.words:
+            segment.words = [
+                dict(word, start=shift(word.get("start")), end=shift(word.get("end"))) for word in segment.words
+            ]
+        segment.start, segment.end = float(start), float(end)
+
+    def results(self) -> tuple[list[tuple[float, float, str]], list[BeepInterval]]:
+        """Mesmo formato de ``censor_segments``."""
+        sanitized = []
+        beeps: list[BeepInterval] = []
+        for segment_index, segment in enumerate(self.segments):
+            sanitized.append((segment.start, segment.end, self.sanitized_text(segment_index)))
+            beeps.extend(self.beep_intervals(segment_index))
+        return sanitized, beeps
+
+    def to_dict(self) -> dict[str, Any]:
+        return {
+            "fuzzy": self.fuzzy,
+            "words": list(self.words),
+            "segments": [
+                {
+                    "start": segment.start,
+                    "end": segment.end,
+                    "text": segment.text,
+                    "normalized": segment.normalized,
+                    "tokens": [list(token) for token in segment.tokens],
+                    "words": segment.words,
+                }
+                for segment in self.segments
+            ],
+            "hits": {term: [list(hit) for hit in hits] for term, hits in self._term_hits.items()},
+        }
+
+    @classmethod
+    def from_dict(cls, data: dict[str, Any]) -> "CensorIndex":
+        segments = [
+            IndexedSegment(
+                start=float(item["start"]),
+                end=float(item["end"]),
+                text=item["text"],
+                normalized=item["normalized"],
+                tokens=[tuple(token) for token in item["tokens"]],
+                words=item.get("words"),
+            )
+            for item in data.get("segments", [])
+        ]
+        index = cls(segments, bool(data.get("fuzzy", True)))
+        index.words = tuple(data.get("words", ()))
+        for term, hits in data.get("hits", {}).items():
+            index._add_term_hits(term, [tuple(hit) for hit in hits])
+        return index
+
+
+def _interval_key(beep: Sequence[Any]) -> tuple[float, float]:
+    # Beeps iguais até o milissegundo são o mesmo beep
+    return round(float(beep[0]), 3), round(float(beep[1]), 3)
+
+
+def recensor_session(
+    index: CensorIndex,
+    subtitles: list[dict],
+    beep_intervals: list[Sequence[Any]],
+    forbidden_words: Iterable[str],
+) -> tuple[set[int], list[Sequence[Any]]]:
+    """Aplica uma nova lista de palavras às legendas e beeps de uma sessão.
+
+    Só os segmentos cujas ocorrências mudaram são tocados. Legendas editadas
+    manualmente (texto diferente do mascaramento automático anterior) são
+    preservadas; beeps antigos dos segmentos afetados são trocados pelos novos
+    e beeps manuais ou movidos pelo usuário permanecem.
+
+    Returns:
+        (índices dos segmentos alterados, nova lista de beeps)
+    """
+    diff = index.diff_words(forbidden_words)
+    previous_text = {i: index.sanitized_text(i) for i in diff.changed}
+    previous_beeps = [beep for i in sorted(diff.changed) for beep in index.beep_intervals(i)]
+
+    changed = index.commit(diff)
+
+    for segment_index in changed:
+        if segment_index >= len(subtitles):
+            continue
+        subtitle = subtitles[segment_index]
+        if str(subtitle.get("text", "")).strip() == previous_text.get(segment_index, "").strip():
+            subtitle["text"] = index.sanitized_text(segment_index).strip()
+
+    previous_keys = {_interval_key(beep) for beep in previous_beeps}
+    remaining = [beep for beep in beep_intervals if _interval_key(beep) not in previous_keys]
+    added = [list(beep) for i in sorted(changed) for beep in index.beep_intervals(i)]
+    updated_beeps = sorted(remaining + added, key=lambda beep: (float(beep[0]), float(beep[1])))
+    return changed, updated_beeps
+
+
+def retime_moved_segments(
+    index_data: Mapping[str, Any],
+    subtitles: Sequence[Mapping[str, Any]],
+    positions: Iterable[int],
+    beep_intervals: Sequence[Sequence[Any]],
+) -> tuple[dict[str, Any], list[Sequence[Any]]] | None:
+    """Leva ao índice os novos tempos das legendas movidas (nas posições ``positions``).
+
+    Os beeps automáticos desses segmentos acompanham a legenda; beeps manuais
+    ficam onde estão. Retorna o índice serializado e a nova lista de beeps, ou
+    ``None`` se não houver o que mover (ou o índice não corresponder às legendas).
+    """
+    positions = sorted(set(positions))
+    if not positions or len(index_data.get("segments", ())) != len(subtitles):
+        return None
+    index = CensorIndex.from_dict(dict(index_data))
+    previous_beeps = [beep for i in positions for beep in index.beep_intervals(i)]
+    for i in positions:
+        index.retime_segment(i, float(subtitles[i]["start"]), float(subtitles[i]["end"]))
+
+    previous_keys = {_interval_key(beep) for beep in previous_beeps}
+    remaining = [beep for beep in beep_intervals if _interval_key(beep) not in previous_keys]
+    added = [list(beep) for i in positions for beep in index.beep_intervals(i)]
+    updated_beeps = sorted(remaining + added, key=lambda beep: (float(beep[0]), float(beep[1])))
+    return index.to_dict(), updated_beeps
@@ -0,0 +1,325 @@
+"""Re-renderização incremental em pedaços alinhados a GOP.
+
+O vídeo de saída é dividido em pedaços com um número fixo de quadros; cada
+pedaço é codificado separadamente (começa em um quadro-chave) com as legendas
+que se sobrepõem a ele e fica em um cache endereçado pelo conteúdo. A chave
+de um pedaço cobre o vídeo de origem, a geometria do pedaço, o estilo e as
+legendas sobrepostas com tempos relativos ao início do pedaço. Ao corrigir uma
+linha, só os pedaços que ela toca mudam de chave e são codificados de novo; o
+resto é concatenado com cópia de stream. Os pedaços que faltam são
+codificados em paralelo, um processo do FFmpeg por pedaço.
+
+O áudio não entra nos pedaços: ele é mixado para a trilha inteira (ducking e
+som de censura) no passo final, junto com a concatenação. Isso evita os
+cliques de priming do AAC nas emendas e custa pouco perto do vídeo.
+"""
+from __future__ import annotations
+
+import hashlib
+import json
+import logging
+import math
+import os
+import tempfile
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import Iterable, Sequence, Tuple
+
+try:
+    from app.config import settings
+except ImportError:  # pragma: no cover - fallback for script execution
+    from config import settings
+from .CreateVideoWinthSubtitles import SubtitleRenderingOptions, _resolve_font_path
+from .encoder_presets import EncoderPreset, resolve_encoder_preset
+from .ffmpeg_renderer import build_ass_document, build_filter_graph, remux_with_censored_audio
+from .ffmpeg_tools import VideoInfo, probe_video, run_ffmpeg
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_FPS = 25.0
+MIN_AUTO_CHUNK_SECONDS = 5
+
+
+@dataclass(frozen=True, slots=True)
+class RenderChunk:
+    index: int
+    start_frame: int
+    frames: int
+    fps: float
+    subtitles: tuple[tuple[float, float, str], ...]
+    key: str
+
+    @property
+    def start(self) -> float:
+        return self.start_frame / self.fps
+
+    @property
+    def end(self) -> float:
+        return (self.start_frame + self.frames) / self.fps
+
+
+@dataclass(slots=True)
+class ChunkedRenderStats:
+    chunks: int
+    encoded: int
+    reused: int
+
+
+def _source_identity(video_path: str) -> str:
+    stat = os.stat(video_path)
+    return f"{Path(video_path).resolve()}:{stat.st_mtime_ns}:{stat.st_size}"
+
+
+def plan_chunks(
+    info: VideoInfo,
+    subtitles: Sequence[Tuple[float, float, str]],
+    fps: float,
+    chunk_seconds: float,
+    base_fingerprint: str,
+) -> list[RenderChunk]:
+    """Divide a saída em pedaços de ``chunk_seconds`` arredondados para quadros inteiros."""
+    total_frames = max(1, int(round(info.duration * fps)))
+    chunk_frames = max(1, int(round(chunk_seconds * fps)))
+    ordered = sorted((float(start), float(end), str(text)) for start, end, text in subtitles)
+
+    chunks = []
+    for index, start_frame in enumerate(range(0, total_frames, chunk_frames)):
+        frames = min(chunk_frames, total_frames - start_frame)
+        start, end = start_frame / fps, (start_frame + frames) / fps
+        overlapping = tuple(
+            (round(sub_start - start, 3), round(sub_end - start, 3), text)
+            for sub_start, sub_end, text in ordered
+            if sub_end > start and sub_start < end and sub_end > sub_start and text.strip()
+        )
+        payload = json.dumps(
+            [base_fingerprint, start_frame, frames, overlapping],
+            ensure_ascii=False,
+            separators=(",", ":"),
+        )
+        key = hashlib.sha256(payload.encode("utf-8")).hexdigest()
+        chunks.append(RenderChunk(index, start_frame, frames, fps, overlapping, key))
+    return chunks
+
+
+class ChunkCache:
+    """Pedaços codificados, endereçados pela chave, com limite total em bytes (LRU por mtime)."""
+
+    def __init__(self, directory: Path | str, max_bytes: int) -> None:
+        self.directory = Path(directory)
+        self.max_bytes = int(max_bytes)
+        self._lock = threading.Lock()
+
+    def path_for(self, key: str) -> Path:
+        return self.directory / key[:2] / f"{key}.mp4"
+
+    def get(self, key: str) -> Path | None:
+        path = self.path_for(key)
+        if not path.exists():
+            return None
+        os.utime(path)
+        return path
+
+    def put(self, key: str, encoded_path: Path) -> Path:
+        target = self.path_for(key)
+        target.parent.mkdir(parents=True, exist_ok=True)
+        os.replace(encoded_path, target)
+        return target
+
+    def prune(self, keep: Iterable[str] = ()) -> int:
+        """Apaga os pedaços menos usados até caber em ``max_bytes``, preservando ``keep``."""
+        protected = set(keep)
+        with self._lock:
+            entries = []
+            total = 0
+            for path in self.directory.glob("*/*.mp4"):
+                try:
+                    stat = path.stat()
+                except FileNotFoundError:
+                    continue
+                total += stat.st_size
+                entries.append((stat.st_mtime, stat.st_size, path))
+            removed = 0
+            for _mtime, size, path in sorted(entries):
+                if total <= self.max_bytes:
+                    break
+                if path.stem in protected:
+                    continue
+                path.unlink(missing_ok=True)
+                total -= size
+                removed += 1
+            return removed
+
+
+chunk_cache = ChunkCache(
+    settings.cache_dir / "render_chunks", settings.render_chunk_cache_mb * 1024 * 1024
+)
+
+
+def encode_chunk(
+    video_path: str,
+    chunk: RenderChunk,
+    output_path: str,
+    width: int,
+    height: int,
+    subtitle_options: SubtitleRenderingOptions,
+    font_path: str | None,
+    encoder_preset: EncoderPreset,
+    threads: int = 0,
+    source: VideoInfo | None = None,
+) -> str:
+    """Codifica só o vídeo de um pedaço, com as legendas dele queimadas.
+
+    ``source`` limita o bitrate ao do vídeo de origem, como no render em uma passada.
+    """
+    with tempfile.TemporaryDirectory(prefix="textwaves_chunk_") as work_dir:
+        work_path = Path(work_dir)
+        ass_path = work_path / "subtitles.ass"
+        ass_path.write_text(
+            build_ass_document(chunk.subtitles, width, height, subtitle_options, font_path),
+            encoding="utf-8",
+        )
+        graph_path = work_path / "filters.txt"
+        fonts_dir = str(Path(font_path).parent) if font_path else None
+        graph_path.write_text(build_filter_graph(ass_path, fonts_dir), encoding="utf-8")
+        run_ffmpeg(
+            [
+                "-y",
+                "-ss", f"{chunk.start:.6f}",
+                "-i", str(video_path),
+                "-filter_complex_script", str(graph_path),
+                "-map", "[vout]",
+                "-frames:v", str(chunk.frames),
+                "-an",
+                *encoder_preset.video_args(source, threads=threads),
+                "-r", f"{chunk.fps:g}",
+                str(output_path),
+            ]
+        )
+    return str(output_path)
+
+
+def render_chunked(
+    video_path: str,
+    subtitles: Sequence[Tuple[float, float, str]],
+    output_video_path: str,
+    subtitle_options: SubtitleRenderingOptions,
+    beep_intervals: Iterable[Sequence[float]] | None = None,
+    beep_frequency: int = 1000,
+    beep_volume: float = 0.6,
+    ducking_volume: float | None = 0.12,
+    fps: float | None = None,
+    censor_sound: str | None = None,
+    encoder_preset: str | EncoderPreset | None = None,
+    chunk_seconds: float | None = None,
+    workers: int | None = None,
+    cache: ChunkCache | None = None,
+) -> ChunkedRenderStats:
+    """Renderiza reaproveitando os pedaços cujas legendas não mudaram.
+
+    Os pedaços que faltam no cache são codificados em paralelo por até
+    ``workers`` processos do FFmpeg (``settings.render_workers``; 0 usa um
+    por núcleo). Sem ``chunk_seconds`` configurado, a linha do tempo é
+    dividida em duas faixas por processo, com no mínimo
+    ``MIN_AUTO_CHUNK_SECONDS`` cada. Sem ``fps`` os pedaços usam a taxa de
+    quadros da origem.
+    """
+    cache = cache or chunk_cache
+    workers = workers if workers is not None else settings.render_workers
+    workers = workers or os.cpu_count() or 1
+    info = probe_video(video_path)
+    preset = resolve_encoder_preset(encoder_preset)
+    chunk_seconds = chunk_seconds or settings.render_chunk_seconds
+    if not chunk_seconds:
+        chunk_seconds = max(MIN_AUTO_CHUNK_SECONDS, math.ceil(info.duration / (2 * workers)))
+    output_fps = float(fps or info.fps or DEFAULT_FPS)
+    resolved_font = _resolve_font_path(subtitle_options.font_path)
+
+    fingerprint = json.dumps(
+        {
+            "source": _source_identity(video_path),
+            "size": [info.width, info.height],
+            "fps": output_fps,
+            "encoder": preset.signature,
+            "font": resolved_font,
+            "options": {key: str(value) for key, value in asdict(subtitle_options).items()},
+        },
+        sort_keys=True,
+    )
+    chunks = plan_chunks(info, subtitles, output_fps, chunk_seconds, fingerprint)
+
+    cache.directory.mkdir(parents=True, exist_ok=True)
+    chunk_paths: dict[int, Path] = {}
+    missing = []
+    for chunk in chunks:
+        cached = cache.get(chunk.key)
+        if cached is None:
+            missing.append(chunk)
+        else:
+            chunk_paths[chunk.index] = cached
+
+    worker_count = max(1, min(workers, len(missing))) if missing else 1
+    # Cada pedaço é um processo do FFmpeg; os núcleos são divididos entre eles
+    encoder_threads = max(1, (os.cpu_count() or worker_count) // worker_count)
+
+    def _encode(chunk: RenderChunk) -> Path:
+        with tempfile.NamedTemporaryFile(dir=cache.directory, suffix=".mp4", delete=False) as handle:
+            temp_path = Path(handle.name)
+        try:
+            encode_chunk(
+                video_path, chunk, str(temp_path), info.width, info.height,
+                subtitle_options, resolved_font, preset, encoder_threads, info,
+            )
+            return cache.put(chunk.key, temp_path)
+        finally:
+            temp_path.unlink(missing_ok=True)
+
+    if missing:
+        logger.info(
+            "Codificando %d de %d pedaço(s) com %d processo(s) do FFmpeg",
+            len(missing),
+            len(chunks),
+            worker_count,
+        )
+    if worker_count == 1:
+        for chunk in missing:
+            chunk_paths[chunk.index] = _encode(chunk)
+    else:
+        with ThreadPoolExecutor(max_workers=worker_count) as executor:
+            for chunk, path in zip(missing, executor.map(_encode, missing)):
+                chunk_paths[chunk.index] = path
+    encoded = len(missing)
+
+    with tempfile.TemporaryDirectory(prefix="textwaves_concat_") as work_dir:
+        work_path = Path(work_dir)
+        list_path = work_path / "chunks.txt"
+        list_path.write_text(
+            "".join(
+                f"file '{chunk_paths[chunk.index].resolve().as_posix()}'\n" for chunk in chunks
+            ),
+            encoding="utf-8",
+        )
+        video_only = work_path / "video.mp4"
+        run_ffmpeg(["-y", "-f", "concat", "-safe", "0", "-i", str(list_path), "-c", "copy", str(video_only)])
+        remux_with_censored_audio(
+            str(video_only),
+            video_path,
+            output_video_path,
+            beep_intervals=beep_intervals,
+            beep_frequency=beep_frequency,
+            beep_volume=beep_volume,
+            ducking_volume=ducking_volume,
+            censor_sound=censor_sound,
+            encoder_preset=preset,
+        )
+
+    cache.prune(keep=(chunk.key for chunk in chunks))
+    stats = ChunkedRenderStats(len(chunks), encoded, len(chunks) - encoded)
+    logger.info(
+        "Render em pedaços: %s pedaços, %s codificados, %s reaproveitados",
+        stats.chunks,
+        stats.encoded,
+        stats.reused,
+    )
+    return stats
@@ -0,0 +1,272 @@
+"""Transcrição em janelas paralelas para vídeos longos.
+
+O áudio é dividido em pontos de silêncio, cada janela (com uma pequena
+sobreposição nas bordas) é transcrita em um processo separado e os segmentos
+são reunidos no mesmo formato ``{"segments": [...]}`` produzido pelo Whisper.
+"""
+from __future__ import annotations
+
+import logging
+import os
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from dataclasses import dataclass
+from typing import Callable, Sequence
+
+import numpy as np
+
+from .model_registry import model_registry
+from .transcription_profiles import TranscriptionProfile
+
+logger = logging.getLogger(__name__)
+
+SAMPLE_RATE = 16000
+FRAME_SECONDS = 0.02
+SILENCE_TOLERANCE = 1e-4
+
+
+@dataclass(frozen=True, slots=True)
+class ChunkWindow:
+    """Janela de áudio a transcrever.
+
+    ``start``/``end`` delimitam as amostras enviadas ao modelo (incluindo a
+    sobreposição); ``keep_start``/``keep_end`` delimitam o trecho cujas
+    palavras pertencem a esta janela no resultado final.
+    """
+
+    start: float
+    end: float
+    keep_start: float
+    keep_end: float
+
+
+def find_split_points(
+    samples: np.ndarray,
+    sample_rate: int = SAMPLE_RATE,
+    chunk_seconds: float = 600.0,
+    search_seconds: float = 15.0,
+) -> list[float]:
+    """Escolhe pontos de corte (em segundos) no trecho mais silencioso perto de cada alvo."""
+    total_seconds = len(samples) / float(sample_rate)
+    if chunk_seconds <= 0 or total_seconds <= chunk_seconds:
+        return []
+
+    frame = max(1, int(sample_rate * FRAME_SECONDS))
+    n_frames = len(samples) // frame
+    frames = np.asarray(samples[: n_frames * frame], dtype=np.float32).reshape(n_frames, frame)
+    energy = np.sqrt(np.mean(np.square(frames), axis=1))
+    frame_seconds = frame / float(sample_rate)
+    # A busca nunca recua mais que meia janela, garantindo janelas de tamanho útil
+    search_seconds = min(search_seconds, chunk_seconds / 2.0)
+
+    points: list[float] = []
+    target = chunk_seconds
+    last_frame = 0
+    # Evita uma última janela minúscula
+    while total_seconds - target > chunk_seconds * 0.25:
+        lo = max(int((target - search_seconds) / frame_seconds), last_frame + 1)
+        hi = min(int((target + search_seconds) / frame_seconds), n_frames)
+        target_frame = min(int(target / frame_seconds), n_frames - 1)
+        if hi <= lo:
+            cut_frame = target_frame
+        else:
+            window_energy = energy[lo:hi]
+            # Entre quadros igualmente silenciosos, fica com o mais próximo do alvo
+            quiet = np.flatnonzero(window_energy <= window_energy.min() + SILENCE_TOLERANCE) + lo
+            cut_frame = int(quiet[np.argmin(np.abs(quiet - target_frame))])
+        cut = (cut_frame + 0.5) * frame_seconds
+        points.append(cut)
+        last_frame = cut_frame
+        target = cut + chunk_seconds
+    return points
+
+
+def plan_windows(
+    total_seconds: float,
+    split_points: Sequence[float],
+    overlap_seconds: float = 2.0,
+) -> list[ChunkWindow]:
+    cuts = [0.0, *split_points, total_seconds]
+    windows = []
+    for keep_start, keep_end in zip(cuts, cuts[1:]):
+        windows.append(
+            ChunkWindow(
+                start=max(0.0, keep_start - overlap_seconds),
+                end=min(total_seconds, keep_end + overlap_seconds),
+                keep_start=keep_start,
+                keep_end=keep_end,
+            )
+        )
+    return windows
+
+
+def _shift_result(result: dict, offset: float) -> dict:
+    shifted_segments = []
+    for segment in result.get("segments", []):
+        shifted = dict(segment)
+        shifted["start"] = float(segment.get("start", 0.0)) + offset
+        shifted["end"] = float(segment.get("end", 0.0)) + offset
+        if isinstance(segment.get("words"), list):
+            shifted["words"] = [
+                {
+                    **word,
+                    "start": float(word.get("start", 0.0)) + offset,
+                    "end": float(word.get("end", 0.0)) + offset,
+                }
+                for word in segment["words"]
+            ]
+        shifted_segments.append(shifted)
+    return {**result, "segments": shifted_segments}
+
+
+def _init_worker(torch_threads: int) -> None:
+    try:
+        import torch
+    except ImportError:  # pragma: no cover - depende do ambiente
+        return
+    torch.set_num_threads(max(1, torch_threads))
+
+
+def _transcribe_window(
+    samples: np.ndarray,
+    offset: float,
+    profile: TranscriptionProfile,
+    device: str | None,
+    precision: str | None,
+) -> dict:
+    model_key = model_registry.make_key(profile.model, device, precision)
+    with model_registry.acquire(*model_key) as model:
+        result = model.transcribe(
+            samples,
+            verbose=False,
+            task="transcribe",
+            fp16=model_key[2] == "fp16",
+            **profile.decode_options(),
+        )
+    return _shift_result(result, offset)
+
+
+def _word_midpoint(word: dict) -> float:
+    return (float(word.get("start", 0.0)) + float(word.get("end", 0.0))) / 2.0
+
+
+def merge_chunk_results(chunks: Sequence[tuple[ChunkWindow, dict]]) -> dict:
+    """Une os resultados das janelas descartando o que cai fora de ``keep_start``/``keep_end``.
+
+    Cada palavra é atribuída a uma única janela pelo seu ponto médio, o que
+    remove as duplicatas das sobreposições; os tempos são então ajustados para
+    que inícios e fins fiquem monotônicos.
+    """
+    merged_segments: list[dict] = []
+    last_end = 0.0
+    language = None
+
+    for window, result in chunks:
+        language = language or result.get("language")
+        for segment in result.get("segments", []):
+            words = segment.get("words")
+            if isinstance(words, list) and words:
+                kept_words = []
+                for word in words:
+                    if not window.keep_start <= _word_midpoint(word) < window.keep_end:
+                        continue
+                    word = dict(word)
+                    word["start"] = max(float(word["start"]), last_end)
+                    word["end"] = max(float(word["end"]), word["start"])
+                    last_end = word["end"]
+                    kept_words.append(word)
+                if not kept_words:
+                    continue
+                merged = dict(segment)
+                merged["words"] = kept_words
+                merged["start"] = kept_words[0]["start"]
+                merged["end"] = kept_words[-1]["end"]
+                if len(kept_words) != len(words):
+                    merged["text"] = "".join(str(word.get("word", "")) for word in kept_words)
+            else:
+                start = float(segment.get("start", 0.0))
+                end = float(segment.get("end", start))
+                if not window.keep_start <= (start + end) / 2.0 < window.keep_end:
+                    continue
+                merged = dict(segment)
+                merged["start"] = max(start, last_end)
+                merged["end"] = max(end, merged["start"])
+                last_end = merged["end"]
+            merged_segments.append(merged)
+
+    for index, segment in enumerate(merged_segments):
+        segment["id"] = index
+
+    return {
+        "text": "".join(str(segment.get("text", "")) for segment in merged_segments),
+        "segments": merged_segments,
+        "language": language,
+    }
+
+
+def transcribe_chunked(
+    samples: np.ndarray,
+    profile: TranscriptionProfile,
+    *,
+    chunk_seconds: float,
+    overlap_seconds: float = 2.0,
+    workers: int | None = None,
+    device: str | None = None,
+    precision: str | None = None,
+    sample_rate: int = SAMPLE_RATE,
+    on_window_done: Callable[[int, int], None] | None = None,
+) -> dict:
+    """Transcreve ``samples`` (float32 mono 16 kHz) em janelas paralelas.
+
+    ``on_window_done(concluídas, total)`` é chamado a cada janela terminada.
+    """
+    total_seconds = len(samples) / float(sample_rate)
+    windows = plan_windows(
+        total_seconds,
+        find_split_points(samples, sample_rate, chunk_seconds),
+        overlap_seconds,
+    )
+    worker_count = max(1, min(workers or os.cpu_count() or 1, len(windows)))
+    logger.info(
+        "Transcrição em %d janela(s) de até %.0fs com %d processo(s)",
+        len(windows),
+        chunk_seconds,
+        worker_count,
+    )
+
+    def _window_samples(window: ChunkWindow) -> np.ndarray:
+        return samples[int(window.start * sample_rate): int(window.end * sample_rate)]
+
+    def _window_done(done: int) -> None:
+        if on_window_done is not None:
+            on_window_done(done, len(windows))
+
+    if worker_count == 1:
+        results = []
+        for window in windows:
+            results.append(
+                _transcribe_window(_window_samples(window), window.start, profile, device, precision)
+            )
+            _window_done(len(results))
+    else:
+        torch_threads = max(1, (os.cpu_count() or worker_count) // worker_count)
+        with ProcessPoolExecutor(
+            max_workers=worker_count,
+            initializer=_init_worker,
+            initargs=(torch_threads,),
+        ) as executor:
+            futures = [
+                executor.submit(
+                    _transcribe_window,
+                    _window_samples(window),
+                    window.start,
+                    profile,
+                    device,
+                    precision,
+                )
+                for window in windows
+            ]
+            for done, _ in enumerate(as_completed(futures), start=1):
+                _window_done(done)
+            results = [future.result() for future in futures]
+
+    return merge_chunk_results(list(zip(windows, results)))
@@ -0,0 +1,115 @@
+"""Presets de codificação do vídeo final (x264 preset/CRF, threads, faststart)."""
+from __future__ import annotations
+
+from dataclasses import dataclass, replace
+from typing import Any
+
+try:
+    from app.config import settings
+except ImportError:  # pragma: no cover - fallback for script execution
+    from config import settings
+from .ffmpeg_tools import VideoInfo
+
+# Codecs que entendem -preset/-crf no estilo do x264
+_CRF_CODECS = {"libx264", "libx265"}
+
+
+@dataclass(frozen=True, slots=True)
+class EncoderPreset:
+    name: str
+    codec: str = "libx264"
+    x264_preset: str = "medium"
+    crf: int = 20
+    threads: int = 0
+    faststart: bool = True
+    audio_bitrate: str = "192k"
+
+    @property
+    def signature(self) -> str:
+        """Identificador estável dos parâmetros que influenciam os quadros codificados."""
+        return f"codec={self.codec};preset={self.x264_preset};crf={self.crf}"
+
+    def video_args(self, source: VideoInfo | None = None, threads: int | None = None) -> list[str]:
+        args = ["-c:v", self.codec]
+        if self.codec in _CRF_CODECS:
+            args += ["-preset", self.x264_preset, "-crf", str(self.crf)]
+            if source is not None and source.bit_rate:
+                # Teto relativo à origem: CRF baixo não infla vídeos já comprimidos
+                args += ["-maxrate", str(source.bit_rate * 2), "-bufsize", str(source.bit_rate * 4)]
+        args += ["-pix_fmt", "yuv420p", "-threads", str(self.threads if threads is None else threads)]
+        return args
+
+    def audio_args(self) -> list[str]:
+        return ["-c:a", "aac", "-b:a", self.audio_bitrate]
+
+    def container_args(self) -> list[str]:
+        return ["-movflags", "+faststart"] if self.faststart else []
+
+    def moviepy_kwargs(self) -> dict[str, Any]:
+        """Argumentos equivalentes para ``VideoClip.write_videofile``."""
+        ffmpeg_params = ["-pix_fmt", "yuv420p", *self.container_args()]
+        if self.codec in _CRF_CODECS:
+            ffmpeg_params = ["-crf", str(self.crf), *ffmpeg_params]
+        return {
+            "codec": self.codec,
+            "preset": self.x264_preset,
+            "threads": self.threads or None,
+            "audio_codec": "aac",
+            "audio_bitrate": self.audio_bitrate,
+            "ffmpeg_params": ffmpeg_params,
+        }
+
+    def to_dict(self) -> dict[str, Any]:
+        return {
+            "name": self.name,
+            "codec": self.codec,
+            "x264_preset": self.x264_preset,
+            "crf": self.crf,
+            "threads": self.threads,
+            "faststart": self.faststart,
+            "audio_bitrate": self.audio_bitrate,
+        }
+
+
+def available_presets() -> dict[str, EncoderPreset]:
+    """``draft`` para prévias rápidas e ``quality`` para o vídeo final, ambos via ``Settings``."""
+    return {
+        "draft": EncoderPreset(
+            "draft",
+            x264_preset=settings.encoder_draft_x264_preset,
+            crf=settings.encoder_draft_crf,
+            threads=settings.encoder_threads,
+            faststart=settings.encoder_faststart,
+            audio_bitrate="96k",
+        ),
+        "quality": EncoderPreset(
+            "quality",
+            x264_preset=settings.encoder_quality_x264_preset,
+            crf=settings.encoder_quality_crf,
+            threads=settings.encoder_threads,
+            faststart=settings.encoder_faststart,
+        ),
+    }
+
+
+def resolve_encoder_preset(
+    preset: str | EncoderPreset | None = None, codec: str | None = None
+) -> EncoderPreset:
+    """Resolve um preset pelo nome (padrão ``settings.encoder_preset``).
+
+    Raises:
+        ValueError: preset desconhecido.
+    """
+    if isinstance(preset, EncoderPreset):
+        resolved = preset
+    else:
+        presets = available_presets()
+        name = (preset or settings.encoder_preset).strip().lower()
+        if name not in presets:
+            raise ValueError(
+                f"Preset de codificação desconhecido: {name} (disponíveis: {', '.join(sorted(presets))})"
+            )
+        resolved = presets[name]
+    if codec and codec != resolved.codec:
+        resolved = replace(resolved, codec=codec)
+    return resolved
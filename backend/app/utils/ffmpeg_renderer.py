@@ -0,0 +1,331 @@
+"""Renderização das legendas e beeps em uma única chamada ao FFmpeg.
+
+Alternativa ao caminho do MoviePy, que decodifica cada quadro para NumPy,
+compõe as legendas em Python e codifica de novo. Aqui as legendas viram um
+arquivo ASS queimado pelo filtro ``ass`` (libass), o áudio é abaixado nos
+trechos censurados com ``volume`` e o beep entra como uma trilha pronta
+misturada com ``amix``. O tamanho da fonte, as margens e a faixa da legenda
+vêm de ``calculate_subtitle_parameters``, como no MoviePy.
+"""
+from __future__ import annotations
+
+import logging
+import tempfile
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Iterable, Sequence, Tuple
+
+try:
+    from app.config import settings
+except ImportError:  # pragma: no cover - fallback for script execution
+    from config import settings
+from .CreateVideoWinthSubtitles import (
+    SubtitleRenderingOptions,
+    _resolve_font_path,
+    calculate_subtitle_parameters,
+)
+from .censor_audio import get_censor_track, pad_intervals
+from .encoder_presets import EncoderPreset, resolve_encoder_preset
+from .ffmpeg_tools import VideoInfo, probe_video, run_ffmpeg
+from .subtitle_style import ass_color, font_family, parse_color
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_AUDIO_SAMPLE_RATE = 44100
+
+_ASS_ALIGNMENT = {"west": 1, "left": 1, "center": 2, "east": 3, "right": 3}
+
+
+def _ass_time(seconds: float) -> str:
+    centiseconds = max(0, int(round(seconds * 100)))
+    hours, remainder = divmod(centiseconds, 360000)
+    minutes, remainder = divmod(remainder, 6000)
+    secs, centis = divmod(remainder, 100)
+    return f"{hours}:{minutes:02d}:{secs:02d}.{centis:02d}"
+
+
+def _ass_text(text: str) -> str:
+    # Chaves abririam blocos de override e "\" seguido de n/N/h viraria comando
+    escaped = text.replace("\\", "\\\u200b").replace("{", "\\{").replace("}", "\\}")
+    return escaped.replace("\r\n", "\n").replace("\n", "\\N")
+
+
+def build_ass_document(
+    subtitles: Sequence[Tuple[float, float, str]],
+    video_width: int,
+    video_height: int,
+    subtitle_options: SubtitleRenderingOptions,
+    font_path: str | None = None,
+) -> str:
+    """Gera o arquivo ASS com o mesmo dimensionamento usado pelo MoviePy."""
+    params = calculate_subtitle_parameters(video_width, video_height)
+    font_size = params["font_size"]
+    # O MoviePy centraliza o texto numa faixa de subtitle_height pixels acima de bottom_margin
+    margin_v = params["bottom_margin"] + max(0, (params["subtitle_height"] - font_size) // 2)
+
+    primary = ass_color(parse_color(subtitle_options.font_color) or (255, 255, 255, 255))
+    background = parse_color(subtitle_options.bg_color)
+    stroke = parse_color(subtitle_options.stroke_color) if subtitle_options.stroke_width > 0 else None
+
+    if background is not None and stroke is None:
+        # BorderStyle 3 desenha uma caixa opaca com a cor de contorno
+        border_style, outline, outline_color = 3, max(2, font_size // 4), ass_color(background)
+    else:
+        border_style = 1
+        outline = subtitle_options.stroke_width if stroke is not None else 0
+        outline_color = ass_color(stroke)
+    back_color = ass_color(background)
+    alignment = _ASS_ALIGNMENT.get(str(subtitle_options.align).lower(), 2)
+
+    lines = [
+        "[Script Info]",
+        "ScriptType: v4.00+",
+        f"PlayResX: {video_width}",
+        f"PlayResY: {video_height}",
+        "WrapStyle: 0",
+        "ScaledBorderAndShadow: yes",
+        "",
+        "[V4+ Styles]",
+        "Format: Name, Fontname, Fontsize, PrimaryColour, SecondaryColour, OutlineColour, "
+        "BackColour, Bold, Italic, Underline, StrikeOut, ScaleX, ScaleY, Spacing, Angle, "
+        "BorderStyle, Outline, Shadow, Alignment, MarginL, MarginR, MarginV, Encoding",
+        (
+            f"Style: Default,{font_family(font_path)},{font_size},{primary},{primary},"
+            f"{outline_color},{back_color},0,0,0,0,100,100,0,0,{border_style},{outline},0,"
+            f"{alignment},{params['side_margin']},{params['side_margin']},{margin_v},1"
+        ),
+        "",
+        "[Events]",
+        "Format: Layer, Start, End, Style, Name, MarginL, MarginR, MarginV, Effect, Text",
+    ]
+    for start, end, text in subtitles:
+        start, end = float(start), float(end)
+        if end <= start or not str(text).strip():
+            continue
+        lines.append(
+            f"Dialogue: 0,{_ass_time(start)},{_ass_time(end)},Default,,0,0,0,,{_ass_text(str(text))}"
+        )
+    return "\n".join(lines) + "\n"
+
+
+def _escape_filter_value(value: str) -> str:
+    """Escapa um valor de opção para uso dentro de um filtergraph.
+
+    São dois níveis: o da opção (``:`` separa opções) e o do grafo
+    (``,``, ``;`` e colchetes separam filtros).
+    """
+    option_level = "".join("\\" + char if char in "\\':" else char for char in value)
+    return "".join("\\" + char if char in "\\'[],;" else char for char in option_level)
+
+
+def _duck_expression(intervals: Sequence[tuple[float, float]]) -> str:
+    return "+".join(f"between(t,{start:.3f},{end:.3f})" for start, end in intervals)
+
+
+@dataclass(slots=True)
+class CensorAudioPlan:
+    intervals: list[tuple[float, float]]
+    ducking_volume: float | None
+    beep_path: Path | None = None
+
+
+def prepare_censor_audio(
+    info: VideoInfo,
+    beep_intervals: Iterable[Sequence[float]] | None,
+    work_path: Path,
+    beep_frequency: int,
+    beep_volume: float,
+    ducking_volume: float | None,
+    censor_sound: str | None,
+) -> CensorAudioPlan:
+    """Resolve os trechos censurados e grava a trilha de censura, se houver uma."""
+    intervals = pad_intervals(beep_intervals, info.duration)
+    if not info.has_audio or not intervals:
+        return CensorAudioPlan(intervals, ducking_volume)
+
+    sample_rate = info.audio_sample_rate or DEFAULT_AUDIO_SAMPLE_RATE
+    censor_track = get_censor_track(
+        intervals,
+        sample_rate,
+        beep_frequency,
+        beep_volume,
+        censor_sound or settings.censor_sound,
+    )
+    intervals = censor_track.intervals
+    if censor_track.mutes_source:
+        return CensorAudioPlan(intervals, 0.0)
+
+    beep_path = work_path / "beeps.wav"
+    num_samples = int(max(info.duration, intervals[-1][1]) * sample_rate) + 1
+    censor_track.write_wav(beep_path, num_samples, info.audio_channels or 2)
+    return CensorAudioPlan(intervals, ducking_volume, beep_path)
+
+
+def build_audio_chains(
+    source: str,
+    intervals: Sequence[tuple[float, float]],
+    ducking_volume: float | None,
+    beep_source: str | None,
+) -> tuple[list[str], str]:
+    """Cadeias de ducking e mixagem; retorna as cadeias e o rótulo do áudio final."""
+    chains: list[str] = []
+    if not intervals:
+        return chains, source
+
+    audio_label = source
+    if ducking_volume is not None:
+        duck = max(0.0, min(1.0, ducking_volume))
+        chains.append(
+            f"[{source}]volume=volume={duck:.4f}:enable='{_duck_expression(intervals)}'[ducked]"
+        )
+        audio_label = "ducked"
+    if beep_source is not None:
+        chains.append(
+            f"[{audio_label}][{beep_source}]amix=inputs=2:duration=first:normalize=0[aout]"
+        )
+        audio_label = "aout"
+    return chains, audio_label
+
+
+def scaled_size(width: int, height: int, max_height: int | None) -> tuple[int, int]:
+    """Reduz para no máximo ``max_height`` linhas mantendo o aspecto (dimensões pares)."""
+    if not max_height or height <= max_height:
+        return width, height
+    scaled_width = max(2, int(round(width * max_height / height / 2)) * 2)
+    return scaled_width, max_height - max_height % 2
+
+
+def build_filter_graph(
+    ass_path: Path,
+    fonts_dir: str | None,
+    audio_chains: Sequence[str] = (),
+    size: tuple[int, int] | None = None,
+) -> str:
+    ass_filter = f"ass=filename={_escape_filter_value(ass_path.as_posix())}"
+    if fonts_dir:
+        ass_filter += f":fontsdir={_escape_filter_value(Path(fonts_dir).as_posix())}"
+    if size is not None:
+        # Escala antes das legendas: o ASS é montado já para o tamanho reduzido
+        ass_filter = f"scale={size[0]}:{size[1]},{ass_filter}"
+    return ";".join([f"[0:v]{ass_filter}[vout]", *audio_chains])
+
+
+def _map_audio(label: str | None) -> list[str]:
+    if label is None:
+        return []
+    if ":" in label:
+        # Stream de entrada sem filtro
+        return ["-map", label]
+    return ["-map", f"[{label}]"]
+
+
+def render_with_ffmpeg(
+    video_path: str,
+    subtitles: Sequence[Tuple[float, float, str]],
+    output_video_path: str,
+    subtitle_options: SubtitleRenderingOptions,
+    beep_intervals: Iterable[Sequence[float]] | None = None,
+    beep_frequency: int = 1000,
+    beep_volume: float = 0.6,
+    ducking_volume: float | None = 0.12,
+    fps: float | None = None,
+    censor_sound: str | None = None,
+    encoder_preset: str | EncoderPreset | None = None,
+    max_height: int | None = None,
+) -> str:
+    """Queima as legendas e mistura os beeps com uma única execução do FFmpeg.
+
+    Sem ``fps`` a taxa de quadros da origem é mantida (nada de ``-r``).
+    ``max_height`` reduz a resolução (prévias), com legendas dimensionadas
+    para o tamanho de saída.
+    """
+    logger.info("Renderizando %s com FFmpeg", video_path)
+    info = probe_video(video_path)
+    preset = resolve_encoder_preset(encoder_preset)
+    resolved_font = _resolve_font_path(subtitle_options.font_path)
+    width, height = scaled_size(info.width, info.height, max_height)
+    scale = (width, height) if (width, height) != (info.width, info.height) else None
+
+    with tempfile.TemporaryDirectory(prefix="textwaves_render_") as work_dir:
+        work_path = Path(work_dir)
+        ass_path = work_path / "subtitles.ass"
+        ass_path.write_text(
+            build_ass_document(subtitles, width, height, subtitle_options, resolved_font),
+            encoding="utf-8",
+        )
+
+        plan = prepare_censor_audio(
+            info, beep_intervals, work_path, beep_frequency, beep_volume, ducking_volume, censor_sound
+        )
+        inputs = ["-i", str(video_path)]
+        if plan.beep_path is not None:
+            inputs += ["-i", str(plan.beep_path)]
+
+        audio_chains, audio_label = [], None
+        if info.has_audio:
+            audio_chains, audio_label = build_audio_chains(
+                "0:a", plan.intervals, plan.ducking_volume, "1:a" if plan.beep_path else None
+            )
+
+        fonts_dir = str(Path(resolved_font).parent) if resolved_font else None
+        graph_path = work_path / "filters.txt"
+        graph_path.write_text(
+            build_filter_graph(ass_path, fonts_dir, audio_chains, scale), encoding="utf-8"
+        )
+
+        args = ["-y", *inputs, "-filter_complex_script", str(graph_path), "-map", "[vout]"]
+        args += _map_audio(audio_label)
+        args += preset.video_args(info)
+        if fps:
+            args += ["-r", f"{fps:g}"]
+        if audio_label:
+            args += preset.audio_args()
+        args += preset.container_args()
+        args.append(str(output_video_path))
+
+        run_ffmpeg(args)
+
+    logger.info("Vídeo legendado exportado para %s", output_video_path)
+    return str(output_video_path)
+
+
+def remux_with_censored_audio(
+    rendered_video_path: str,
+    source_video_path: str,
+    output_video_path: str,
+    beep_intervals: Iterable[Sequence[float]] | None = None,
+    beep_frequency: int = 1000,
+    beep_volume: float = 0.6,
+    ducking_volume: float | None = 0.12,
+    censor_sound: str | None = None,
+    encoder_preset: str | EncoderPreset | None = None,
+) -> str:
+    """Copia o vídeo já legendado (``-c:v copy``) e mixa de novo só o áudio censurado."""
+    logger.info("Remux de áudio a partir de %s", rendered_video_path)
+    info = probe_video(source_video_path)
+    preset = resolve_encoder_preset(encoder_preset)
+
+    with tempfile.TemporaryDirectory(prefix="textwaves_remux_") as work_dir:
+        work_path = Path(work_dir)
+        plan = prepare_censor_audio(
+            info, beep_intervals, work_path, beep_frequency, beep_volume, ducking_volume, censor_sound
+        )
+        inputs = ["-i", str(rendered_video_path), "-i", str(source_video_path)]
+        if plan.beep_path is not None:
+            inputs += ["-i", str(plan.beep_path)]
+
+        args = ["-y", *inputs, "-map", "0:v:0"]
+        if info.has_audio:
+            audio_chains, audio_label = build_audio_chains(
+                "1:a", plan.intervals, plan.ducking_volume, "2:a" if plan.beep_path else None
+            )
+            if audio_chains:
+                graph_path = work_path / "filters.txt"
+                graph_path.write_text(";".join(audio_chains), encoding="utf-8")
+                args += ["-filter_complex_script", str(graph_path)]
+            args += _map_audio(audio_label) + preset.audio_args()
+        args += ["-c:v", "copy", *preset.container_args(), str(output_video_path)]
+
+        run_ffmpeg(args)
+
+    return str(output_video_path)
@@ -0,0 +1,169 @@
+"""Localização e execução do binário do FFmpeg."""
+from __future__ import annotations
+
+import logging
+import os
+import re
+import shutil
+import subprocess
+from dataclasses import dataclass
+from functools import lru_cache
+from pathlib import Path
+from typing import Sequence
+
+try:
+    from app.config import settings
+except ImportError:  # pragma: no cover - fallback for script execution
+    from config import settings
+
+logger = logging.getLogger(__name__)
+
+
+class FFmpegError(RuntimeError):
+    """Falha ao executar o FFmpeg; a mensagem inclui o final do stderr."""
+
+
+@lru_cache(maxsize=1)
+def ffmpeg_binary() -> str:
+    """Retorna o executável do FFmpeg seguindo a mesma ordem usada pelo MoviePy."""
+    candidates: list[Path] = []
+    if settings.ffmpeg_path:
+        candidates.append(Path(settings.ffmpeg_path))
+    env_binary = os.environ.get("FFMPEG_BINARY")
+    if env_binary and env_binary != "ffmpeg-imageio":
+        candidates.append(Path(env_binary))
+    candidates.append(Path(settings.base_dir) / "ffmpeg" / "bin" / "ffmpeg.exe")
+
+    for path in candidates:
+        if path.exists():
+            return str(path)
+
+    system_binary = shutil.which("ffmpeg")
+    if system_binary:
+        return system_binary
+
+    try:
+        import imageio_ffmpeg
+    except ImportError:
+        return "ffmpeg"
+    return imageio_ffmpeg.get_ffmpeg_exe()
+
+
+def run_ffmpeg(args: Sequence[str], *, capture_stdout: bool = False) -> bytes:
+    """Executa ``ffmpeg`` com ``args`` e retorna o stdout (quando capturado)."""
+    command = [ffmpeg_binary(), "-hide_banner", "-nostdin", "-loglevel", "error", *args]
+    logger.debug("Executando: %s", " ".join(command))
+    completed = subprocess.run(
+        command,
+        stdout=subprocess.PIPE if capture_stdout else subprocess.DEVNULL,
+        stderr=subprocess.PIPE,
+        check=False,
+    )
+    if completed.returncode != 0:
+        stderr_tail = completed.stderr.decode("utf-8", errors="replace").strip()[-2000:]
+        raise FFmpegError(f"FFmpeg falhou (código {completed.returncode}): {stderr_tail}")
+    return completed.stdout or b""
+
+
+@dataclass(frozen=True, slots=True)
+class VideoInfo:
+    width: int
+    height: int
+    duration: float
+    fps: float | None
+    codec: str | None
+    pix_fmt: str | None
+    bit_rate: int | None
+    has_audio: bool
+    audio_sample_rate: int | None
+    audio_channels: int | None
+
+
+_CHANNEL_LAYOUTS = {"mono": 1, "stereo": 2, "2.1": 3, "quad": 4, "5.0": 5, "5.1": 6, "7.1": 8}
+
+
+def _strip_parentheses(text: str) -> str:
+    previous = None
+    while previous != text:
+        previous, text = text, re.sub(r"\([^()]*\)", "", text)
+    return text
+
+
+def parse_probe_output(stderr: str) -> VideoInfo:
+    """Interpreta o cabeçalho que ``ffmpeg -i`` escreve no stderr."""
+    duration = 0.0
+    duration_match = re.search(r"Duration: (\d+):(\d+):(\d+(?:\.\d+)?)", stderr)
+    if duration_match:
+        hours, minutes, seconds = duration_match.groups()
+        duration = int(hours) * 3600 + int(minutes) * 60 + float(seconds)
+
+    width = height = 0
+    fps = codec = pix_fmt = bit_rate = None
+    has_audio = False
+    audio_sample_rate = audio_channels = None
+
+    for line in stderr.splitlines():
+        stream = re.search(r"Stream #\d+:\d+.*?: (Video|Audio): (.*)", line)
+        if not stream:
+            continue
+        kind, description = stream.groups()
+        parts = [part.strip() for part in _strip_parentheses(description).split(",")]
+        if kind == "Video" and codec is None:
+            codec = parts[0].split()[0] if parts and parts[0] else None
+            pix_fmt = parts[1].split()[0] if len(parts) > 1 and parts[1] else None
+            for part in parts:
+                size = re.match(r"(\d+)x(\d+)", part)
+                if size and not width:
+                    width, height = int(size.group(1)), int(size.group(2))
+                rate = re.match(r"([\d.]+)k? fps", part)
+                if rate:
+                    fps = float(rate.group(1)) * (1000 if "k fps" in part else 1)
+                kbps = re.match(r"(\d+) kb/s", part)
+                if kbps:
+                    bit_rate = int(kbps.group(1)) * 1000
+        elif kind == "Audio" and not has_audio:
+            has_audio = True
+            for part in parts:
+                hertz = re.match(r"(\d+) Hz", part)
+                if hertz:
+                    audio_sample_rate = int(hertz.group(1))
+                layout = part.split()[0] if part else ""
+                if layout in _CHANNEL_LAYOUTS:
+                    audio_channels = _CHANNEL_LAYOUTS[layout]
+                channels = re.match(r"(\d+) channels", part)
+                if channels:
+                    audio_channels = int(channels.group(1))
+
+    return VideoInfo(
+        width=width,
+        height=height,
+        duration=duration,
+        fps=fps,
+        codec=codec,
+        pix_fmt=pix_fmt,
+        bit_rate=bit_rate,
+        has_audio=has_audio,
+        audio_sample_rate=audio_sample_rate,
+        audio_channels=audio_channels,
+    )
+
+
+@lru_cache(maxsize=64)
+def _probe_cached(path: str, mtime_ns: int, size: int) -> VideoInfo:
+    completed = subprocess.run(
+        [ffmpeg_binary(), "-hide_banner", "-nostdin", "-i", path],
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.PIPE,
+        check=False,
+    )
+    stderr = completed.stderr.decode("utf-8", errors="replace")
+    info = parse_probe_output(stderr)
+    if not info.width:
+        raise FFmpegError(f"Não foi possível ler o stream de vídeo de {path}: {stderr.strip()[-500:]}")
+    return info
+
+
+def probe_video(path: str | os.PathLike) -> VideoInfo:
+    """Lê dimensões, fps, codec e áudio do vídeo; o resultado fica em cache por arquivo."""
+    stat = os.stat(path)
+    return _probe_cached(str(path), stat.st_mtime_ns, stat.st_size)
@@ -0,0 +1,75 @@
+"""Hash SHA-256 calculado em blocos, sem carregar o arquivo inteiro na memória."""
+from __future__ import annotations
+
+import hashlib
+import os
+import re
+import tempfile
+from pathlib import Path
+from typing import BinaryIO
+
+HASH_CHUNK_SIZE = 1024 * 1024
+
+_SAFE_SUFFIX = re.compile(r"^\.[a-z0-9]{1,8}$")
+
+# Formatos de vídeo aceitos no upload
+ALLOWED_EXTENSIONS = {'.mp4', '.mov', '.mkv', '.avi', '.webm'}
+
+
+def is_allowed_file(filename: str) -> bool:
+    return Path(filename).suffix.lower() in ALLOWED_EXTENSIONS
+
+
+def save_upload_with_hash(file_storage, destination: str | os.PathLike, chunk_size: int = HASH_CHUNK_SIZE) -> str:
+    """Grava o upload em ``destination`` e devolve o SHA-256 completo do conteúdo.
+
+    O digest é atualizado a cada bloco gravado, então o arquivo é lido uma
+    única vez e o pico de memória não depende do tamanho do vídeo.
+    """
+    stream: BinaryIO = getattr(file_storage, "stream", file_storage)
+    digest = hashlib.sha256()
+    with open(destination, "wb") as output:
+        while True:
+            chunk = stream.read(chunk_size)
+            if not chunk:
+                break
+            digest.update(chunk)
+            output.write(chunk)
+    return digest.hexdigest()
+
+
+def store_upload_by_hash(
+    file_storage, directory: str | os.PathLike, filename: str | None = None, chunk_size: int = HASH_CHUNK_SIZE
+) -> tuple[str, str]:
+    """Grava o upload como ``<sha256><extensão>`` em ``directory``; devolve (caminho, hash).
+
+    O conteúdo vai primeiro para um arquivo temporário exclusivo e só é
+    renomeado depois de hasheado, então dois uploads com o mesmo nome não se
+    sobrescrevem (e o mesmo vídeo enviado de novo reaproveita o arquivo).
+    """
+    os.makedirs(directory, exist_ok=True)
+    suffix = Path(filename or getattr(file_storage, "filename", "") or "").suffix.lower()
+    if not _SAFE_SUFFIX.match(suffix):
+        suffix = ""
+    with tempfile.NamedTemporaryFile(dir=directory, suffix=".part", delete=False) as handle:
+        temp_path = handle.name
+    try:
+        digest = save_upload_with_hash(file_storage, temp_path, chunk_size)
+        destination = os.path.join(directory, f"{digest}{suffix}")
+        os.replace(temp_path, destination)
+    except BaseException:
+        Path(temp_path).unlink(missing_ok=True)
+        raise
+    return destination, digest
+
+
+def hash_file(path: str | os.PathLike, chunk_size: int = HASH_CHUNK_SIZE) -> str:
+    """SHA-256 completo de um arquivo já gravado, lido em blocos de ``chunk_size``."""
+    digest = hashlib.sha256()
+    with Path(path).open("rb") as source:
+        while True:
+            chunk = source.read(chunk_size)
+            if not chunk:
+                break
+            digest.update(chunk)
+    return digest.hexdigest()
@@ -1,7 +1,7 @@
 from __future__ import annotations
 
-import hashlib
 import logging
+import time
 from pathlib import Path
 from typing import Iterable
 
@@ -9,10 +9,14 @@ try:
     from app.config import settings
 except ImportError:  # pragma: no cover - fallback for script execution
     from config import settings
-from .audioExtract import extract_audio_from_video
+from .audioExtract import WHISPER_SAMPLE_RATE, load_audio_samples
 from .CreateVideoWinthSubtitles import SubtitleRenderingOptions, create_video_with_subtitles
+from .file_hashing import hash_file
 from .profanity_filter import censor_segments
+from .progress import ProgressReporter
 from .transcribeAudio import transcribe_audio
+from .transcription_cache import transcription_cache
+from .transcription_profiles import TranscriptionProfile, resolve_profile
 
 
 logger = logging.getLogger(__name__)
@@ -23,7 +27,11 @@ def generate_str_file_and_video(
     backend_directory: str | None,
     name_output: str,
     forbidden_words: Iterable[str] | None = None,
+    transcription_profile: TranscriptionProfile | None = None,
+    video_hash: str | None = None,
+    progress: ProgressReporter | None = None,
 ) -> tuple[str, str, str]:
+    progress = progress or ProgressReporter()
     source_video = Path(video_path)
     if not source_video.exists():
         raise FileNotFoundError(f"Vídeo de origem não encontrado: {source_video}")
@@ -32,31 +40,49 @@ def generate_str_file_and_video(
     subtitles_dir = (base_dir / settings.subtitles_dir_name).resolve()
     subtitles_dir.mkdir(parents=True, exist_ok=True)
 
-    with source_video.open('rb') as video_file:
-        video_hash = hashlib.sha256(video_file.read()).hexdigest()[:10]
+    # O hash pode vir pronto do upload; caso contrário, o arquivo é lido em blocos
+    with progress.stage("hash"):
+        video_hash = video_hash or hash_file(source_video)
     logger.info("Processando vídeo %s | hash=%s", source_video, video_hash)
 
     output_video_path = subtitles_dir / f"{video_hash}_{name_output}.mp4"
     str_file_path = subtitles_dir / f"{video_hash}.str"
-    audio_path = subtitles_dir / f"temp_audio_{video_hash}.wav"
 
-    try:
-        extract_audio_from_video(str(source_video), str(audio_path))
-        logger.debug("Áudio temporário gerado em %s", audio_path)
+    profile = transcription_profile or resolve_profile()
+    transcribed_result = transcription_cache.get(video_hash, profile)
+    if transcribed_result is None:
+        with progress.stage("audio"):
+            audio_samples = load_audio_samples(str(source_video))
+        logger.debug("Áudio decodificado: %d amostras", len(audio_samples))
+
+        started = time.perf_counter()
+        transcribed_result = transcribe_audio(audio_samples, profile=profile, progress=progress)
+        transcription_cache.put(
+            video_hash,
+            profile,
+            transcribed_result,
+            elapsed_seconds=time.perf_counter() - started,
+            audio_seconds=len(audio_samples) / WHISPER_SAMPLE_RATE,
+        )
+
+    else:
+        progress.finish("audio", "cache")
+        progress.finish("transcription", "cache")
 
-        transcribed_result = transcribe_audio(str(audio_path))
-        segments = transcribed_result['segments']
-        logger.debug("%d segmentos transcritos", len(segments))
+    segments = transcribed_result['segments']
+    logger.debug("%d segmentos transcritos", len(segments))
 
+    with progress.stage("censor"):
         subtitles, beep_intervals = censor_segments(segments, forbidden_words=forbidden_words)
 
-        with str_file_path.open('w', encoding='utf-8') as str_file:
-            for start, end, text in subtitles:
-                str_file.write(f"{start:.3f} --> {end:.3f}\n{text}\n\n")
-        logger.info("Arquivo .str salvo em %s", str_file_path)
+    with str_file_path.open('w', encoding='utf-8') as str_file:
+        for start, end, text in subtitles:
+            str_file.write(f"{start:.3f} --> {end:.3f}\n{text}\n\n")
+    logger.info("Arquivo .str salvo em %s", str_file_path)
 
-        subtitle_options = SubtitleRenderingOptions(font_path=str(settings.font_path))
+    subtitle_options = SubtitleRenderingOptions(font_path=str(settings.font_path))
 
+    with progress.stage("render"):
         create_video_with_subtitles(
             str(source_video),
             subtitles,
@@ -65,16 +91,10 @@ def generate_str_file_and_video(
             beep_intervals=beep_intervals,
             beep_frequency=settings.beep_frequency,
             beep_volume=settings.beep_volume,
+            progress=progress,
         )
-        logger.info("Novo vídeo com legendas salvo em %s", output_video_path)
-
-    finally:
-        if audio_path.exists():
-            try:
-                audio_path.unlink()
-                logger.debug("Arquivo de áudio temporário removido: %s", audio_path)
-            except OSError:
-                logger.warning("Não foi possível remover o áudio temporário: %s", audio_path)
+    logger.info("Novo vídeo com legendas salvo em %s", output_video_path)
+    logger.info("Tempos por etapa (s): %s", progress.timings())
 
     return str(str_file_path), str(output_video_path), video_hash
 
@@ -0,0 +1,450 @@
+"""Fila de jobs assíncronos (transcrição e renderização) fora da thread do Flask.
+
+O envio grava o job no SQLite e devolve o id na hora; um pool limitado de
+processos executa o pipeline (Whisper e codificação ocupam CPU, então threads
+não ajudam). O estado fica no banco: o processo filho marca ``running`` ao
+começar e o processo principal grava o resultado ou o erro.
+
+Vários processos do servidor podem compartilhar o banco. O worker só executa
+o job se conseguir reivindicá-lo (``queued`` -> ``running`` num único
+``UPDATE``), gravando o dono (o processo que despachou e vai registrar o
+resultado) e um heartbeat renovado durante a execução. ``recover`` reenvia os
+jobs na fila e só os ``running`` cujo dono morreu ou cujo heartbeat parou;
+jobs ainda em execução em outro processo vivo ficam com ele.
+
+Durante a execução o worker grava no mesmo banco o progresso por etapa
+(``utils.progress``), lido pelas rotas de polling e de Server-Sent Events.
+
+O backend ``local`` executa o job no próprio processo, de forma síncrona;
+serve para testes e para depuração.
+"""
+from __future__ import annotations
+
+import json
+import logging
+import multiprocessing
+import os
+import socket
+import sqlite3
+import threading
+import time
+import uuid
+from concurrent.futures import Future, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from dataclasses import dataclass
+from functools import partial
+from pathlib import Path
+from typing import Any, Callable, Sequence
+
+try:
+    from app.config import settings
+except ImportError:  # pragma: no cover - fallback for script execution
+    from config import settings
+from .progress import PIPELINE_STAGES, ProgressReporter
+
+logger = logging.getLogger(__name__)
+
+JobHandler = Callable[[dict[str, Any], ProgressReporter], dict[str, Any]]
+
+QUEUED = "queued"
+RUNNING = "running"
+SUCCEEDED = "succeeded"
+FAILED = "failed"
+PENDING_STATUSES = (QUEUED, RUNNING)
+
+# O worker renova o heartbeat a cada HEARTBEAT_INTERVAL segundos; sem
+# renovação por HEARTBEAT_TIMEOUT o job é considerado abandonado
+HEARTBEAT_INTERVAL = 10.0
+HEARTBEAT_TIMEOUT = 60.0
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    id TEXT PRIMARY KEY,
+    kind TEXT NOT NULL,
+    status TEXT NOT NULL,
+    params TEXT NOT NULL,
+    result TEXT,
+    error TEXT,
+    created_at REAL NOT NULL,
+    started_at REAL,
+    finished_at REAL,
+    progress TEXT,
+    owner TEXT,
+    heartbeat REAL
+);
+CREATE INDEX IF NOT EXISTS jobs_status ON jobs (status, created_at);
+"""
+
+
+@dataclass(slots=True)
+class JobRecord:
+    id: str
+    kind: str
+    status: str
+    params: dict[str, Any]
+    result: dict[str, Any] | None = None
+    error: str | None = None
+    created_at: float = 0.0
+    started_at: float | None = None
+    finished_at: float | None = None
+    progress: dict[str, Any] | None = None
+    owner: str | None = None
+    heartbeat: float | None = None
+
+    @property
+    def done(self) -> bool:
+        return self.status in (SUCCEEDED, FAILED)
+
+    def to_dict(self) -> dict[str, Any]:
+        return {
+            "job_id": self.id,
+            "kind": self.kind,
+            "status": self.status,
+            "result": self.result,
+            "error": self.error,
+            "created_at": self.created_at,
+            "started_at": self.started_at,
+            "finished_at": self.finished_at,
+            "progress": self.progress,
+        }
+
+
+class JobClaimed(Exception):
+    """O job já foi reivindicado por outro worker; esta execução é descartada."""
+
+
+def current_owner() -> str:
+    """Identifica o processo que despacha jobs (``host:pid``)."""
+    return f"{socket.gethostname()}:{os.getpid()}"
+
+
+def _owner_alive(owner: str | None) -> bool:
+    """Se o dono é um processo vivo nesta máquina; de outra máquina, só o heartbeat decide."""
+    if not owner:
+        return False
+    host, _, pid = owner.rpartition(":")
+    if host != socket.gethostname() or not pid.isdigit() or os.name == "nt":
+        # No Windows ``os.kill`` encerraria o processo
+        return True
+    try:
+        os.kill(int(pid), 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+class JobStore:
+    """Estado dos jobs em SQLite (WAL), acessível pelo processo principal e pelos filhos."""
+
+    def __init__(self, path: Path | str) -> None:
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        with self._connect() as connection:
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.executescript(_SCHEMA)
+
+    def _connect(self) -> sqlite3.Connection:
+        connection = sqlite3.connect(self.path, timeout=30)
+        connection.row_factory = sqlite3.Row
+        return connection
+
+    @staticmethod
+    def _record(row: sqlite3.Row) -> JobRecord:
+        return JobRecord(
+            id=row["id"],
+            kind=row["kind"],
+            status=row["status"],
+            params=json.loads(row["params"]),
+            result=json.loads(row["result"]) if row["result"] else None,
+            error=row["error"],
+            created_at=row["created_at"],
+            started_at=row["started_at"],
+            finished_at=row["finished_at"],
+            progress=json.loads(row["progress"]) if row["progress"] else None,
+            owner=row["owner"],
+            heartbeat=row["heartbeat"],
+        )
+
+    def _execute(self, query: str, *args: Any) -> None:
+        with self._connect() as connection:
+            connection.execute(query, args)
+
+    def create(self, kind: str, params: dict[str, Any]) -> JobRecord:
+        record = JobRecord(uuid.uuid4().hex, kind, QUEUED, params, created_at=time.time())
+        self._execute(
+            "INSERT INTO jobs (id, kind, status, params, created_at) VALUES (?, ?, ?, ?, ?)",
+            record.id,
+            record.kind,
+            record.status,
+            json.dumps(params, ensure_ascii=False),
+            record.created_at,
+        )
+        return record
+
+    def get(self, job_id: str) -> JobRecord | None:
+        with self._connect() as connection:
+            row = connection.execute("SELECT * FROM jobs WHERE id = ?", (job_id,)).fetchone()
+        return self._record(row) if row else None
+
+    def pending(self) -> list[JobRecord]:
+        with self._connect() as connection:
+            rows = connection.execute(
+                "SELECT * FROM jobs WHERE status IN (?, ?) ORDER BY created_at", PENDING_STATUSES
+            ).fetchall()
+        return [self._record(row) for row in rows]
+
+    def requeue(self, record: JobRecord) -> bool:
+        """Devolve à fila um job abandonado, desde que ninguém o tenha renovado ou reivindicado."""
+        with self._connect() as connection:
+            cursor = connection.execute(
+                "UPDATE jobs SET status = ?, owner = NULL, heartbeat = NULL, started_at = NULL "
+                "WHERE id = ? AND status = ? AND owner IS ? AND heartbeat IS ?",
+                (QUEUED, record.id, RUNNING, record.owner, record.heartbeat),
+            )
+        return cursor.rowcount == 1
+
+    def claim(self, job_id: str, owner: str) -> bool:
+        """Passa o job de ``queued`` para ``running``; falso se outro worker chegou antes."""
+        now = time.time()
+        with self._connect() as connection:
+            cursor = connection.execute(
+                "UPDATE jobs SET status = ?, owner = ?, heartbeat = ?, started_at = ? "
+                "WHERE id = ? AND status = ?",
+                (RUNNING, owner, now, now, job_id, QUEUED),
+            )
+        return cursor.rowcount == 1
+
+    def heartbeat(self, job_id: str) -> None:
+        self._execute("UPDATE jobs SET heartbeat = ? WHERE id = ?", time.time(), job_id)
+
+    def is_abandoned(self, record: JobRecord, timeout: float = HEARTBEAT_TIMEOUT) -> bool:
+        """Job em execução cujo dono morreu ou cujo heartbeat parou."""
+        if record.status != RUNNING:
+            return False
+        if record.heartbeat is None or time.time() - record.heartbeat > timeout:
+            return True
+        return not _owner_alive(record.owner)
+
+    def save_progress(self, job_id: str, snapshot: dict[str, Any]) -> None:
+        self._execute(
+            "UPDATE jobs SET progress = ?, heartbeat = ? WHERE id = ?",
+            json.dumps(snapshot, ensure_ascii=False),
+            time.time(),
+            job_id,
+        )
+
+    def mark_succeeded(self, job_id: str, result: dict[str, Any] | None) -> None:
+        self._execute(
+            "UPDATE jobs SET status = ?, result = ?, error = NULL, finished_at = ? WHERE id = ?",
+            SUCCEEDED,
+            json.dumps(result, ensure_ascii=False) if result is not None else None,
+            time.time(),
+            job_id,
+        )
+
+    def mark_failed(self, job_id: str, error: str) -> None:
+        self._execute(
+            "UPDATE jobs SET status = ?, error = ?, finished_at = ? WHERE id = ?",
+            FAILED,
+            error,
+            time.time(),
+            job_id,
+        )
+
+
+def _heartbeat_loop(store: JobStore, job_id: str, stop: threading.Event, interval: float) -> None:
+    while not stop.wait(interval):
+        try:
+            store.heartbeat(job_id)
+        except sqlite3.Error as exc:
+            logger.warning("Heartbeat do job %s falhou: %s", job_id, exc)
+
+
+def _execute_job(
+    db_path: str,
+    job_id: str,
+    handler: JobHandler,
+    params: dict[str, Any],
+    stages: tuple[str, ...] = PIPELINE_STAGES,
+    owner: str | None = None,
+) -> dict[str, Any]:
+    """Ponto de entrada no processo do worker.
+
+    Raises:
+        JobClaimed: o job não estava mais na fila (outro worker o executa).
+    """
+    store = JobStore(db_path)
+    if not store.claim(job_id, owner or current_owner()):
+        raise JobClaimed(job_id)
+    stop = threading.Event()
+    beat = threading.Thread(
+        target=_heartbeat_loop,
+        args=(store, job_id, stop, HEARTBEAT_INTERVAL),
+        name=f"job-heartbeat-{job_id[:8]}",
+        daemon=True,
+    )
+    beat.start()
+    progress = ProgressReporter(stages, sink=partial(store.save_progress, job_id))
+    progress.flush()
+    try:
+        return handler(params, progress)
+    finally:
+        stop.set()
+        progress.flush()
+        logger.info("Job %s | tempos por etapa (s): %s", job_id, progress.timings())
+
+
+class LocalBackend:
+    """Executa o job na hora, no próprio processo (testes e depuração)."""
+
+    def submit(self, fn: Callable[..., Any], *args: Any) -> Future:
+        future: Future = Future()
+        try:
+            future.set_result(fn(*args))
+        except BaseException as exc:  # noqa: BLE001 - o erro vai para o registro do job
+            future.set_exception(exc)
+        return future
+
+    def shutdown(self, wait: bool = True) -> None:
+        pass
+
+
+class ProcessPoolBackend:
+    """Pool limitado de processos ``spawn``; recria o pool se um worker morrer."""
+
+    def __init__(self, max_workers: int) -> None:
+        self.max_workers = max(1, max_workers)
+        self._lock = threading.Lock()
+        self._executor: ProcessPoolExecutor | None = None
+
+    def _pool(self) -> ProcessPoolExecutor:
+        if self._executor is None:
+            # spawn: não herda threads do Flask nem modelos já carregados no pai
+            self._executor = ProcessPoolExecutor(
+                max_workers=self.max_workers, mp_context=multiprocessing.get_context("spawn")
+            )
+        return self._executor
+
+    def submit(self, fn: Callable[..., Any], *args: Any) -> Future:
+        with self._lock:
+            try:
+                return self._pool().submit(fn, *args)
+            except BrokenProcessPool:
+                logger.warning("Pool de jobs quebrado; recriando os processos")
+                self._executor = None
+                return self._pool().submit(fn, *args)
+
+    def shutdown(self, wait: bool = True) -> None:
+        with self._lock:
+            if self._executor is not None:
+                self._executor.shutdown(wait=wait)
+                self._executor = None
+
+
+class JobQueue:
+    def __init__(self, store: JobStore, backend: LocalBackend | ProcessPoolBackend) -> None:
+        self.store = store
+        self.backend = backend
+        self._handlers: dict[str, tuple[JobHandler, tuple[str, ...]]] = {}
+        self.owner = current_owner()
+
+    def register(self, kind: str, handler: JobHandler, stages: Sequence[str] = PIPELINE_STAGES) -> None:
+        """``handler`` precisa ser uma função de módulo (é serializada por nome para o worker).
+
+        ``stages`` lista as etapas cujo progresso o job reporta.
+        """
+        self._handlers[kind] = (handler, tuple(stages))
+
+    def submit(self, kind: str, params: dict[str, Any]) -> JobRecord:
+        """Grava o job e o envia ao pool.
+
+        Raises:
+            ValueError: tipo de job sem handler registrado.
+        """
+        if kind not in self._handlers:
+            raise ValueError(f"Tipo de job desconhecido: {kind}")
+        record = self.store.create(kind, params)
+        self._dispatch(record)
+        return self.store.get(record.id) or record
+
+    def get(self, job_id: str) -> JobRecord | None:
+        return self.store.get(job_id)
+
+    def recover(self, stale_after: float = HEARTBEAT_TIMEOUT) -> int:
+        """Reenvia os jobs na fila e os abandonados em execução (dono morto ou heartbeat parado).
+
+        Jobs em execução em outro processo vivo não são tocados; um job na fila
+        despachado por dois processos roda uma vez só (ver ``JobStore.claim``).
+        """
+        recovered = 0
+        for record in self.store.pending():
+            if record.status == RUNNING:
+                if not self.store.is_abandoned(record, stale_after) or not self.store.requeue(record):
+                    continue
+            if record.kind not in self._handlers:
+                self.store.mark_failed(record.id, f"Tipo de job desconhecido: {record.kind}")
+                continue
+            self._dispatch(record)
+            recovered += 1
+        if recovered:
+            logger.info("%d job(s) pendente(s) reenviado(s) para a fila", recovered)
+        return recovered
+
+    def shutdown(self, wait: bool = True) -> None:
+        self.backend.shutdown(wait=wait)
+
+    def _dispatch(self, record: JobRecord) -> None:
+        handler, stages = self._handlers[record.kind]
+        future = self.backend.submit(
+            _execute_job, str(self.store.path), record.id, handler, record.params, stages, self.owner
+        )
+        future.add_done_callback(partial(self._finish, record.id))
+
+    def _finish(self, job_id: str, future: Future) -> None:
+        try:
+            result = future.result()
+        except JobClaimed:
+            logger.info("Job %s já está com outro worker; envio duplicado ignorado", job_id)
+        except BaseException as exc:  # noqa: BLE001 - o erro vai para o registro do job
+            logger.error("Job %s falhou: %s", job_id, exc)
+            self.store.mark_failed(job_id, f"{type(exc).__name__}: {exc}")
+        else:
+            self.store.mark_succeeded(job_id, result)
+
+
+def create_job_queue(
+    backend: str | None = None, db_path: Path | str | None = None, workers: int | None = None
+) -> JobQueue:
+    """Monta a fila com o backend configurado.
+
+    Raises:
+        ValueError: backend desconhecido.
+    """
+    backend_name = (backend or settings.job_backend).strip().lower()
+    if backend_name == "local":
+        executor: LocalBackend | ProcessPoolBackend = LocalBackend()
+    elif backend_name == "process":
+        executor = ProcessPoolBackend(workers or settings.job_workers)
+    else:
+        raise ValueError(f"Backend de jobs desconhecido: {backend_name} (use process ou local)")
+    return JobQueue(JobStore(db_path or settings.jobs_db_path), executor)
+
+
+_job_queue: JobQueue | None = None
+_job_queue_lock = threading.Lock()
+
+
+def get_job_queue() -> JobQueue:
+    """Fila compartilhada, criada no primeiro uso com os jobs do pipeline e os pendentes reenviados."""
+    global _job_queue
+    with _job_queue_lock:
+        if _job_queue is None:
+            from .pipeline_jobs import register_pipeline_jobs
+
+            queue = create_job_queue()
+            register_pipeline_jobs(queue)
+            queue.recover()
+            _job_queue = queue
+        return _job_queue
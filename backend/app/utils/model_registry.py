@@ -0,0 +1,215 @@
+"""Registro de modelos Whisper compartilhado por todo o processo."""
+from __future__ import annotations
+
+import logging
+import os
+import sys
+import threading
+import time
+from contextlib import contextmanager
+from dataclasses import asdict, dataclass
+from typing import Any, Callable, Iterator, Tuple
+
+from .shared_stats import LocalStats, shared_stats
+
+logger = logging.getLogger(__name__)
+
+ModelKey = Tuple[str, str, str]
+ModelLoader = Callable[[str, str, str], Any]
+
+
+@dataclass(slots=True)
+class ModelLoadInfo:
+    """Métricas coletadas ao carregar um modelo."""
+
+    name: str
+    device: str
+    precision: str
+    load_seconds: float
+    rss_before_mb: float | None
+    rss_after_mb: float | None
+
+    @property
+    def rss_delta_mb(self) -> float | None:
+        if self.rss_before_mb is None or self.rss_after_mb is None:
+            return None
+        return self.rss_after_mb - self.rss_before_mb
+
+    def to_dict(self) -> dict:
+        data = asdict(self)
+        data["rss_delta_mb"] = self.rss_delta_mb
+        return data
+
+
+def resident_memory_mb() -> float | None:
+    """Retorna a memória residente do processo em MB (ou None se indisponível)."""
+    try:
+        with open("/proc/self/statm", "r", encoding="ascii") as statm:
+            resident_pages = int(statm.read().split()[1])
+        return resident_pages * os.sysconf("SC_PAGE_SIZE") / (1024 * 1024)
+    except (OSError, ValueError, IndexError, AttributeError):
+        pass
+
+    try:
+        import resource
+    except ImportError:  # pragma: no cover - Windows
+        return None
+
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # macOS reporta bytes; Linux reporta KB
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+
+def _resolve_device(device: str | None) -> str:
+    if device and device != "auto":
+        return device
+    try:
+        import torch
+    except ImportError:
+        return "cpu"
+    return "cuda" if torch.cuda.is_available() else "cpu"
+
+
+def _resolve_precision(precision: str | None, device: str) -> str:
+    if precision and precision != "auto":
+        return precision
+    return "fp32" if device == "cpu" else "fp16"
+
+
+def _default_loader(name: str, device: str, precision: str) -> Any:
+    import whisper
+
+    model = whisper.load_model(name, device=device)
+    if precision == "fp16" and device != "cpu":
+        model = model.half()
+    return model
+
+
+class WhisperModelRegistry:
+    """Carrega cada combinação (modelo, device, precisão) uma única vez por processo.
+
+    O carregamento é protegido por um lock por chave, de forma que requisições
+    concorrentes esperem o primeiro carregamento em vez de duplicá-lo. O uso do
+    modelo via :meth:`acquire` também é serializado por chave, já que o mesmo
+    objeto PyTorch é compartilhado entre as threads do Flask.
+
+    Cada processo (servidor e workers da fila) tem os próprios modelos; os
+    carregamentos também são somados em ``stats_store`` para aparecerem em
+    :meth:`load_history` independente do processo que carregou.
+    """
+
+    SCOPE_PREFIX = "model:"
+
+    def __init__(self, loader: ModelLoader | None = None, stats_store=None) -> None:
+        self._loader: ModelLoader = loader or _default_loader
+        self.stats_store = stats_store if stats_store is not None else LocalStats()
+        self._models: dict[ModelKey, Any] = {}
+        self._load_info: dict[ModelKey, ModelLoadInfo] = {}
+        self._load_locks: dict[ModelKey, threading.Lock] = {}
+        self._use_locks: dict[ModelKey, threading.Lock] = {}
+        self._registry_lock = threading.Lock()
+
+    @staticmethod
+    def make_key(name: str, device: str | None = None, precision: str | None = None) -> ModelKey:
+        resolved_device = _resolve_device(device)
+        return name, resolved_device, _resolve_precision(precision, resolved_device)
+
+    def _locks_for(self, key: ModelKey) -> tuple[threading.Lock, threading.Lock]:
+        with self._registry_lock:
+            load_lock = self._load_locks.setdefault(key, threading.Lock())
+            use_lock = self._use_locks.setdefault(key, threading.Lock())
+        return load_lock, use_lock
+
+    def get(self, name: str, device: str | None = None, precision: str | None = None) -> Any:
+        """Retorna o modelo, carregando-o na primeira chamada."""
+        key = self.make_key(name, device, precision)
+        model = self._models.get(key)
+        if model is not None:
+            return model
+
+        load_lock, _ = self._locks_for(key)
+        with load_lock:
+            model = self._models.get(key)
+            if model is None:
+                model = self._load(key)
+        return model
+
+    @contextmanager
+    def acquire(
+        self, name: str, device: str | None = None, precision: str | None = None
+    ) -> Iterator[Any]:
+        """Context manager que entrega o modelo com uso exclusivo durante o bloco."""
+        key = self.make_key(name, device, precision)
+        model = self.get(*key)
+        _, use_lock = self._locks_for(key)
+        with use_lock:
+            yield model
+
+    def _load(self, key: ModelKey) -> Any:
+        name, device, precision = key
+        logger.info("Carregando modelo Whisper %s (device=%s, precision=%s)", name, device, precision)
+        rss_before = resident_memory_mb()
+        started = time.perf_counter()
+        model = self._loader(name, device, precision)
+        elapsed = time.perf_counter() - started
+        info = ModelLoadInfo(
+            name=name,
+            device=device,
+            precision=precision,
+            load_seconds=elapsed,
+            rss_before_mb=rss_before,
+            rss_after_mb=resident_memory_mb(),
+        )
+        self._models[key] = model
+        self._load_info[key] = info
+        self.stats_store.update(
+            self.SCOPE_PREFIX + "|".join(key),
+            {"loads": 1, "load_seconds": elapsed},
+            {"name": name, "device": device, "precision": precision, "last": info.to_dict()},
+        )
+        logger.info(
+            "Modelo Whisper %s carregado em %.2fs | RSS=%s MB (delta=%s MB)",
+            name,
+            elapsed,
+            f"{info.rss_after_mb:.0f}" if info.rss_after_mb is not None else "?",
+            f"{info.rss_delta_mb:.0f}" if info.rss_delta_mb is not None else "?",
+        )
+        return model
+
+    def preload(self, name: str, device: str | None = None, precision: str | None = None) -> ModelLoadInfo:
+        """Carrega o modelo antecipadamente (ex.: na inicialização do servidor)."""
+        key = self.make_key(name, device, precision)
+        self.get(*key)
+        return self._load_info[key]
+
+    def register(self, model: Any, name: str, device: str = "cpu", precision: str = "fp32") -> None:
+        """Registra um modelo já instanciado (útil para injetar stubs em testes)."""
+        key = self.make_key(name, device, precision)
+        with self._registry_lock:
+            self._models[key] = model
+            self._load_info[key] = ModelLoadInfo(name, key[1], key[2], 0.0, None, None)
+
+    def set_loader(self, loader: ModelLoader | None) -> None:
+        """Substitui a função de carregamento; ``None`` restaura o loader do Whisper."""
+        self._loader = loader or _default_loader
+
+    def is_loaded(self, name: str, device: str | None = None, precision: str | None = None) -> bool:
+        return self.make_key(name, device, precision) in self._models
+
+    def clear(self) -> None:
+        with self._registry_lock:
+            self._models.clear()
+            self._load_info.clear()
+            self._load_locks.clear()
+            self._use_locks.clear()
+
+    def stats(self) -> list[dict]:
+        """Métricas de carregamento de cada modelo residente."""
+        return [info.to_dict() for info in self._load_info.values()]
+
+    def load_history(self) -> list[dict]:
+        """Carregamentos somados de todos os processos que usam o mesmo ``stats_store``."""
+        return list(self.stats_store.scan(self.SCOPE_PREFIX).values())
+
+
+model_registry = WhisperModelRegistry(stats_store=shared_stats)
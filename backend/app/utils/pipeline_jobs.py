@@ -0,0 +1,278 @@
+"""Etapas do pipeline usadas pelas rotas síncronas e pelos jobs da fila.
+
+Cada ``*_job`` recebe só parâmetros JSON (mais o ``ProgressReporter`` do job)
+e devolve um dicionário JSON, para poder ser gravado no banco de jobs e
+executado em outro processo.
+"""
+from __future__ import annotations
+
+import logging
+import os
+import time
+from typing import Any, Iterable, Mapping
+
+try:
+    from app.config import settings
+except ImportError:  # pragma: no cover - fallback for script execution
+    from config import settings
+from .CreateVideoWinthSubtitles import SubtitleRenderingOptions
+from .artifact_store import Artifact, artifact_store
+from .audioExtract import WHISPER_SAMPLE_RATE, load_audio_samples
+from .censor_index import CensorIndex
+from .generateStrFileVideo import generate_str_file_and_video
+from .profanity_filter import censor_segments
+from .progress import ProgressReporter
+from .render_cache import render_session_video
+from .session_cache import session_cache
+from .session_store import session_store
+from .transcribeAudio import transcribe_audio
+from .transcription_cache import transcription_cache
+from .transcription_profiles import TranscriptionProfile, parse_profile_request
+
+logger = logging.getLogger(__name__)
+
+SESSION_DIR = "uploads"
+
+PREVIEW_STAGES = ("upload", "hash", "audio", "transcription", "censor")
+RENDER_STAGES = ("render",)
+
+
+def load_session(video_hash: str) -> dict | None:
+    # Lido no processo do job: direto do banco (o cache do servidor grava antes de enfileirar)
+    return session_store.get(video_hash)
+
+
+def create_preview_session(
+    video_path: str,
+    video_hash: str,
+    filename: str,
+    forbidden_words: Iterable[str] | None,
+    transcription_profile: TranscriptionProfile,
+    progress: ProgressReporter | None = None,
+) -> dict[str, Any]:
+    """Transcreve (ou reaproveita do cache), censura e grava a sessão de edição."""
+    progress = progress or ProgressReporter(PREVIEW_STAGES)
+    # Reaproveitar transcrição anterior do mesmo conteúdo + perfil
+    transcribed_result = transcription_cache.get(video_hash, transcription_profile)
+    if transcribed_result is None:
+        # Extrair áudio direto para memória (sem WAV temporário)
+        with progress.stage("audio"):
+            audio_samples = load_audio_samples(video_path)
+        audio_seconds = len(audio_samples) / WHISPER_SAMPLE_RATE
+
+        # Transcrever áudio
+        started = time.perf_counter()
+        transcribed_result = transcribe_audio(audio_samples, profile=transcription_profile, progress=progress)
+        if transcribed_result is not None:
+            transcribed_result.setdefault('duration', audio_seconds)
+        transcription_cache.put(
+            video_hash,
+            transcription_profile,
+            transcribed_result,
+            elapsed_seconds=time.perf_counter() - started,
+            audio_seconds=audio_seconds,
+        )
+    else:
+        progress.finish("audio", "cache")
+        progress.finish("transcription", "cache")
+    segments = transcribed_result['segments']
+    forbidden_words = list(forbidden_words or [])
+
+    # Índice de tokens permite recensurar depois sem reprocessar a transcrição
+    with progress.stage("censor"):
+        censor_index = CensorIndex.build(segments, forbidden_words or settings.profanity_words)
+        sanitized_subtitles, beep_intervals = censor_index.results()
+
+    # Criar estrutura de legendas
+    subtitles = []
+    for i, (start, end, text) in enumerate(sanitized_subtitles):
+        subtitle = {
+            'id': i,
+            'start': start,
+            'end': end,
+            'text': text.strip(),
+            'raw_text': segments[i].get('text', '').strip(),
+            'confidence': segments[i].get('confidence', 0.5)
+        }
+        subtitles.append(subtitle)
+
+    # Salvar dados da sessão
+    session_data = {
+        'video_hash': video_hash,
+        'video_path': video_path,
+        'subtitles': subtitles,
+        'video_info': {
+            'filename': filename,
+            'duration': transcribed_result.get('duration', 0),
+        },
+        'forbidden_words': forbidden_words or list(settings.profanity_words),
+        'beep_intervals': beep_intervals,
+        'transcription_profile': transcription_profile.to_dict(),
+        'censor_index': censor_index.to_dict(),
+    }
+
+    revision = session_cache.save(session_data)
+
+    return {
+        'status': 'success',
+        'video_hash': video_hash,
+        'revision': revision,
+        'subtitles': subtitles,
+        'video_info': session_data['video_info'],
+        'forbidden_words': session_data['forbidden_words'],
+        'beep_intervals': beep_intervals,
+        'transcription_profile': session_data['transcription_profile'],
+    }
+
+
+def session_censor_index(session_data: Mapping[str, Any]) -> CensorIndex | None:
+    """Índice de censura da sessão, se ainda corresponder às legendas atuais.
+
+    O índice é posicional (segmento ``i`` = legenda ``i``); depois de dividir
+    ou juntar legendas ele é descartado e aqui vira ``None``.
+    """
+    index_data = session_data.get('censor_index')
+    if not index_data or len(index_data.get('segments', ())) != len(session_data['subtitles']):
+        return None
+    return CensorIndex.from_dict(index_data)
+
+
+def rebuild_censor_index(subtitles: Iterable[Mapping[str, Any]], forbidden_words: Iterable[str]) -> CensorIndex:
+    """Novo índice a partir das legendas atuais (texto original), com as palavras já aplicadas."""
+    return CensorIndex.build(
+        [
+            {'start': sub['start'], 'end': sub['end'], 'text': sub.get('raw_text', sub['text'])}
+            for sub in subtitles
+        ],
+        forbidden_words,
+    )
+
+
+def resolve_beep_intervals(session_data: Mapping[str, Any], data: Mapping[str, Any]) -> list:
+    """Beeps editados pelo frontend ou recalculados com as palavras proibidas pedidas."""
+    subtitles = session_data['subtitles']
+    requested_words = data.get('forbidden_words')
+    custom_beep_intervals = data.get('beep_intervals')  # Novo: beeps editados do frontend
+    session_words = session_data.get('forbidden_words', list(settings.profanity_words))
+
+    if isinstance(requested_words, (list, tuple)):
+        forbidden_words = [str(word).strip() for word in requested_words if str(word).strip()]
+        if not forbidden_words:
+            forbidden_words = session_words
+    else:
+        forbidden_words = session_words
+
+    # Usar beeps editados se fornecidos, senão recalcular
+    if custom_beep_intervals is not None and isinstance(custom_beep_intervals, list):
+        # Usar beeps editados pelo usuário
+        beep_intervals = [
+            (float(b[0]), float(b[1]))
+            for b in custom_beep_intervals
+            if isinstance(b, (list, tuple)) and len(b) >= 2
+        ]
+    elif (censor_index := session_censor_index(session_data)) is not None:
+        # Recalcular beeps a partir do índice, tocando só o que mudou na lista
+        censor_index.apply_words(forbidden_words)
+        _, beep_intervals = censor_index.results()
+    else:
+        # Recalcular beeps automaticamente
+        segment_dicts = [
+            {
+                'start': sub['start'],
+                'end': sub['end'],
+                'text': sub.get('raw_text', sub['text']),
+            }
+            for sub in subtitles
+        ]
+
+        _, beep_intervals = censor_segments(
+            segment_dicts,
+            forbidden_words=forbidden_words,
+        )
+
+    return beep_intervals
+
+
+def render_final_session(
+    video_hash: str,
+    session_data: Mapping[str, Any],
+    data: Mapping[str, Any],
+    progress: ProgressReporter | None = None,
+) -> tuple[Artifact, str]:
+    """Renderiza o vídeo final da sessão e o registra como artefato; retorna o artefato e o modo (``full``/``remux``)."""
+    beep_intervals = resolve_beep_intervals(session_data, data)
+
+    # Sempre usar legendas da sessão (já editadas)
+    subtitle_tuples = [(sub['start'], sub['end'], sub['text']) for sub in session_data['subtitles']]
+
+    # Caminho do vídeo final
+    output_video_path = os.path.join(SESSION_DIR, f"final_{video_hash}.mp4")
+
+    # Renderizar vídeo (só o áudio é refeito se as legendas não mudaram)
+    subtitle_options = SubtitleRenderingOptions(font_path=str(settings.font_path))
+    progress = progress or ProgressReporter(RENDER_STAGES)
+    with progress.stage("render"):
+        render_mode = render_session_video(
+            video_hash,
+            session_data['video_path'],
+            subtitle_tuples,
+            output_video_path,
+            subtitle_options,
+            beep_intervals=beep_intervals,
+            beep_frequency=settings.beep_frequency,
+            beep_volume=settings.beep_volume,
+            progress=progress,
+        )
+    artifact = artifact_store.register(
+        output_video_path, 'final_video', {'video_hash': video_hash, 'render_mode': render_mode}
+    )
+    return artifact, render_mode
+
+
+def _record_upload(params: Mapping[str, Any], progress: ProgressReporter) -> None:
+    # Upload e hash acontecem juntos na rota, antes do job existir
+    if params.get('upload_seconds') is not None:
+        progress.record("upload", params['upload_seconds'])
+        progress.record("hash", 0.0, "calculado no upload")
+
+
+def process_video_job(params: dict[str, Any], progress: ProgressReporter) -> dict[str, Any]:
+    _record_upload(params, progress)
+    str_file_path, output_video_path, video_hash = generate_str_file_and_video(
+        params['video_path'],
+        params.get('backend_directory'),
+        params['output_name'],
+        forbidden_words=params.get('forbidden_words'),
+        transcription_profile=parse_profile_request(params.get('transcription_profile')),
+        video_hash=params.get('video_hash'),
+        progress=progress,
+    )
+    artifact = artifact_store.register(output_video_path, 'subtitled_video', {'video_hash': video_hash})
+    return {'video_hash': video_hash, 'str_file': str_file_path, 'artifact': artifact.to_dict()}
+
+
+def preview_session_job(params: dict[str, Any], progress: ProgressReporter) -> dict[str, Any]:
+    _record_upload(params, progress)
+    return create_preview_session(
+        params['video_path'],
+        params['video_hash'],
+        params['filename'],
+        params.get('forbidden_words'),
+        parse_profile_request(params.get('transcription_profile')),
+        progress=progress,
+    )
+
+
+def render_final_job(params: dict[str, Any], progress: ProgressReporter) -> dict[str, Any]:
+    video_hash = params['video_hash']
+    session_data = load_session(video_hash)
+    if session_data is None:
+        raise FileNotFoundError(f"Sessão não encontrada: {video_hash}")
+    artifact, render_mode = render_final_session(video_hash, session_data, params, progress)
+    return {'video_hash': video_hash, 'artifact': artifact.to_dict(), 'render_mode': render_mode}
+
+
+def register_pipeline_jobs(queue) -> None:
+    queue.register('process_video', process_video_job)
+    queue.register('process_video_preview', preview_session_job, PREVIEW_STAGES)
+    queue.register('render_final_video', render_final_job, RENDER_STAGES)
@@ -1,22 +1,154 @@
 import re
 import string
-from typing import Iterable, Sequence, Tuple
+from typing import Callable, Iterable, Sequence, Tuple
 
 try:
     from app.config import settings, DEFAULT_PROFANITY_WORDS
 except ImportError:  # pragma: no cover - fallback for script execution
     from config import settings, DEFAULT_PROFANITY_WORDS
+from .text_normalization import normalize_with_offsets, normalize_words
+from .word_matcher import WordHit, WordMatcher, get_matcher
 
 DEFAULT_FORBIDDEN_WORDS: Tuple[str, ...] = DEFAULT_PROFANITY_WORDS
 
 
 def _build_pattern(words: Iterable[str]) -> re.Pattern:
+    """Regex equivalente ao autômato; mantida como referência para o benchmark."""
     escaped = [re.escape(word) for word in words if word]
     if not escaped:
         return re.compile(r"^$", re.IGNORECASE)  # pattern that never matches
     return re.compile(r"\b(" + "|".join(escaped) + r")\b", re.IGNORECASE)
 
 
+def build_matcher(words: Iterable[str], fuzzy: bool | None = None) -> WordMatcher:
+    """Autômato da lista; com ``fuzzy`` as palavras entram no índice já normalizadas."""
+    if fuzzy is None:
+        fuzzy = settings.profanity_fuzzy_matching
+    return get_matcher(normalize_words(words) if fuzzy else words)
+
+
+def find_forbidden_words(text: str, matcher: WordMatcher, fuzzy: bool | None = None) -> list[WordHit]:
+    """Ocorrências em ``text`` com os índices sempre relativos ao texto original."""
+    if fuzzy is None:
+        fuzzy = settings.profanity_fuzzy_matching
+    if not fuzzy:
+        return matcher.find_all(text)
+
+    normalized = normalize_with_offsets(text)
+    hits = []
+    for hit in matcher.find_all(normalized.text):
+        start, end = normalized.original_span(hit.start, hit.end)
+        hits.append(WordHit(start, end, text[start:end]))
+    return hits
+
+
+def _word_spans(text: str, words: Sequence[dict]) -> list[tuple[int, int]] | None:
+    """Localiza cada palavra do Whisper dentro do texto do segmento.
+
+    Retorna ``None`` quando alguma palavra não é encontrada em sequência; nesse
+    caso as palavras são verificadas individualmente.
+    """
+    spans: list[tuple[int, int]] = []
+    cursor = 0
+    for word_info in words:
+        token = str(word_info.get("word", "")).strip()
+        if not token:
+            spans.append((cursor, cursor))
+            continue
+        position = text.find(token, cursor)
+        if position < 0:
+            return None
+        spans.append((position, position + len(token)))
+        cursor = position + len(token)
+    return spans
+
+
+def mask_hits(text: str, hits: Sequence[WordHit]) -> str:
+    """Troca cada ocorrência por asteriscos do mesmo tamanho."""
+    if not hits:
+        return text
+    pieces: list[str] = []
+    cursor = 0
+    for hit in hits:
+        pieces.append(text[cursor:hit.start])
+        pieces.append('*' * (hit.end - hit.start))
+        cursor = hit.end
+    pieces.append(text[cursor:])
+    return "".join(pieces)
+
+
+def segment_beep_intervals(
+    start: float,
+    end: float,
+    text: str,
+    segment_words: Sequence[dict] | None,
+    matches: Sequence[WordHit],
+    word_has_match: Callable[[str], bool],
+) -> list[tuple[float, float, str]]:
+    """Intervalos de beep de um segmento a partir das ocorrências já encontradas.
+
+    Usa os tempos por palavra do Whisper quando disponíveis; caso contrário
+    estima a posição de cada ocorrência pela posição do caractere no texto.
+    ``word_has_match`` só é usado quando as palavras não podem ser localizadas
+    no texto do segmento.
+    """
+    beep_intervals: list[tuple[float, float, str]] = []
+    if not matches:
+        return beep_intervals
+
+    duration = end - start
+    used_precise_timing = False
+    if isinstance(segment_words, list) and segment_words:
+        spans = _word_spans(text, segment_words)
+        for index, word_info in enumerate(segment_words):
+            raw_word = str(word_info.get("word", ""))
+            if not raw_word.strip():
+                continue
+
+            if spans is not None:
+                word_start, word_end = spans[index]
+                if not any(hit.start < word_end and hit.end > word_start for hit in matches):
+                    continue
+            elif not word_has_match(raw_word):
+                continue
+
+            precise_start = word_info.get("start")
+            precise_end = word_info.get("end")
+            if precise_start is None or precise_end is None:
+                continue
+
+            clean_label = raw_word.strip()
+            # Remover pontuações das extremidades para exibir
+            clean_label = clean_label.strip(string.punctuation + " ") or raw_word.strip()
+
+            beep_intervals.append(
+                (float(precise_start), float(precise_end), clean_label)
+            )
+            used_precise_timing = True
+
+    if not used_precise_timing:
+        # Calcular timing aproximado de cada palavra dentro do segmento
+        words_in_segment = text.split()
+        total_words = len(words_in_segment)
+
+        for match in matches:
+            # Estimar posição temporal da palavra no segmento
+            # Baseado na posição do caractere no texto
+            char_ratio = match.start / len(text) if len(text) > 0 else 0
+
+            # Estimar duração da palavra (proporcional ao tamanho)
+            avg_word_duration = duration / total_words if total_words > 0 else duration
+            word_duration = avg_word_duration * 0.8  # Palavra individual é menor que média
+
+            # Calcular timing do beep
+            word_start = start + (duration * char_ratio)
+            word_end = min(word_start + word_duration, end)
+
+            beep_intervals.append((word_start, word_end, match.text))
+
+    return beep_intervals
+
+
 def censor_segments(
     segments: Sequence[dict],
     forbidden_words: Iterable[str] | None = None,
@@ -36,7 +168,8 @@ def censor_segments(
         word_list = tuple(forbidden_words)
     else:
         word_list = settings.profanity_words or DEFAULT_FORBIDDEN_WORDS
-    pattern = _build_pattern(word_list)
+    fuzzy = settings.profanity_fuzzy_matching
+    matcher = build_matcher(word_list, fuzzy)
 
     sanitized: list[tuple[float, float, str]] = []
     beep_intervals: list[tuple[float, float, str]] = []
@@ -45,65 +178,22 @@ def censor_segments(
         start = float(segment.get("start", 0.0))
         end = float(segment.get("end", start))
         text = str(segment.get("text", ""))
-        duration = end - start
-
-        # Encontrar todas as ocorrências de palavras proibidas
-        matches = list(pattern.finditer(text))
-
-        segment_words = segment.get("words")
-        used_precise_timing = False
-        if isinstance(segment_words, list) and segment_words:
-            for word_info in segment_words:
-                raw_word = str(word_info.get("word", ""))
-                if not raw_word.strip():
-                    continue
 
-                if not pattern.search(raw_word):
-                    continue
+        # Uma única passada encontra todas as ocorrências do segmento
+        matches = find_forbidden_words(text, matcher, fuzzy)
 
-                precise_start = word_info.get("start")
-                precise_end = word_info.get("end")
-                if precise_start is None or precise_end is None:
-                    continue
+        beep_intervals.extend(
+            segment_beep_intervals(
+                start,
+                end,
+                text,
+                segment.get("words"),
+                matches,
+                lambda raw_word: bool(find_forbidden_words(raw_word, matcher, fuzzy)),
+            )
+        )
 
-                clean_label = raw_word.strip()
-                # Remover pontuações das extremidades para exibir
-                clean_label = clean_label.strip(string.punctuation + " ") or raw_word.strip()
-
-                beep_intervals.append(
-                    (float(precise_start), float(precise_end), clean_label)
-                )
-                used_precise_timing = True
-        
-        if matches and not used_precise_timing:
-            # Calcular timing aproximado de cada palavra dentro do segmento
-            words_in_segment = text.split()
-            total_words = len(words_in_segment)
-            
-            for match in matches:
-                matched_word = match.group(0)
-                word_length = len(matched_word)
-                
-                # Estimar posição temporal da palavra no segmento
-                # Baseado na posição do caractere no texto
-                char_pos = match.start()
-                char_ratio = char_pos / len(text) if len(text) > 0 else 0
-                
-                # Estimar duração da palavra (proporcional ao tamanho)
-                avg_word_duration = duration / total_words if total_words > 0 else duration
-                word_duration = avg_word_duration * 0.8  # Palavra individual é menor que média
-                
-                # Calcular timing do beep
-                word_start = start + (duration * char_ratio)
-                word_end = min(word_start + word_duration, end)
-                
-                beep_intervals.append((word_start, word_end, matched_word))
-        
         # Substituir cada palavra pelo número correto de asteriscos
-        def _mask(match: re.Match) -> str:
-            return '*' * len(match.group(0))
-        
-        new_text = pattern.sub(_mask, text)
-        sanitized.append((start, end, new_text))
+        sanitized.append((start, end, mask_hits(text, matches)))
 
     return sanitized, beep_intervals
@@ -0,0 +1,199 @@
+"""Progresso por etapa do pipeline (upload, hash, áudio, transcrição, censura, render).
+
+``ProgressReporter`` guarda o início, o fim e a fração concluída de cada
+etapa e estima o tempo restante a partir do ritmo observado (ou de uma
+duração esperada, quando a etapa não informa frações, como o Whisper sem
+janelas). Os instantâneos vão para um ``sink`` opcional, com no máximo um
+envio a cada ``min_interval`` segundos nas atualizações intermediárias; os
+jobs usam isso para gravar o progresso no banco. Sem ``sink`` o reporter só
+mede os tempos de cada etapa.
+"""
+from __future__ import annotations
+
+import logging
+import threading
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass
+from typing import Any, Callable, Iterator, Sequence
+
+logger = logging.getLogger(__name__)
+
+ProgressSink = Callable[[dict[str, Any]], None]
+
+PIPELINE_STAGES = ("upload", "hash", "audio", "transcription", "censor", "render")
+
+
+@dataclass(slots=True)
+class StageProgress:
+    name: str
+    fraction: float = 0.0
+    started_at: float | None = None
+    finished_at: float | None = None
+    expected_seconds: float | None = None
+    message: str | None = None
+
+    @property
+    def done(self) -> bool:
+        return self.finished_at is not None
+
+    def elapsed(self, now: float) -> float:
+        if self.started_at is None:
+            return 0.0
+        return (self.finished_at or now) - self.started_at
+
+    def estimated_fraction(self, now: float) -> float:
+        if self.done:
+            return 1.0
+        if self.fraction <= 0 and self.expected_seconds and self.started_at is not None:
+            # Sem frações reportadas: estimativa pela duração esperada, sem chegar a 100%
+            return min(0.99, self.elapsed(now) / self.expected_seconds)
+        return self.fraction
+
+    def eta_seconds(self, now: float) -> float | None:
+        if self.done or self.started_at is None:
+            return None
+        if self.fraction > 0:
+            elapsed = self.elapsed(now)
+            return elapsed * (1.0 - self.fraction) / self.fraction
+        if self.expected_seconds:
+            return max(0.0, self.expected_seconds - self.elapsed(now))
+        return None
+
+    def to_dict(self, now: float) -> dict[str, Any]:
+        eta = self.eta_seconds(now)
+        return {
+            "name": self.name,
+            "fraction": round(self.estimated_fraction(now), 4),
+            "elapsed_seconds": round(self.elapsed(now), 3),
+            "eta_seconds": round(eta, 1) if eta is not None else None,
+            "done": self.done,
+            "message": self.message,
+        }
+
+
+class ProgressReporter:
+    def __init__(
+        self,
+        stages: Sequence[str] = PIPELINE_STAGES,
+        sink: ProgressSink | None = None,
+        min_interval: float = 0.5,
+        clock: Callable[[], float] = time.time,
+    ) -> None:
+        self._stages = {name: StageProgress(name) for name in stages}
+        self._sink = sink
+        self._min_interval = min_interval
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._current: str | None = None
+        self._last_emit = float("-inf")
+
+    def _stage(self, name: str) -> StageProgress:
+        if name not in self._stages:
+            self._stages[name] = StageProgress(name)
+        return self._stages[name]
+
+    def start(self, name: str, message: str | None = None, expected_seconds: float | None = None) -> None:
+        with self._lock:
+            stage = self._stage(name)
+            stage.started_at = self._clock()
+            stage.finished_at = None
+            stage.fraction = 0.0
+            stage.expected_seconds = expected_seconds
+            stage.message = message
+            self._current = name
+        self._emit(force=True)
+
+    def update(self, name: str, fraction: float, message: str | None = None) -> None:
+        with self._lock:
+            stage = self._stage(name)
+            if stage.started_at is None:
+                stage.started_at = self._clock()
+            stage.fraction = max(0.0, min(1.0, float(fraction)))
+            if message is not None:
+                stage.message = message
+            self._current = name
+        self._emit()
+
+    def finish(self, name: str, message: str | None = None) -> None:
+        with self._lock:
+            stage = self._stage(name)
+            now = self._clock()
+            if stage.started_at is None:
+                stage.started_at = now
+            stage.finished_at = now
+            stage.fraction = 1.0
+            if message is not None:
+                stage.message = message
+        self._emit(force=True)
+
+    def record(self, name: str, seconds: float, message: str | None = None) -> None:
+        """Registra uma etapa já concluída fora do reporter (ex.: o upload, medido na rota)."""
+        with self._lock:
+            stage = self._stage(name)
+            now = self._clock()
+            stage.started_at = now - max(0.0, float(seconds))
+            stage.finished_at = now
+            stage.fraction = 1.0
+            stage.message = message
+        self._emit(force=True)
+
+    @contextmanager
+    def stage(self, name: str, message: str | None = None, expected_seconds: float | None = None) -> Iterator[None]:
+        self.start(name, message, expected_seconds)
+        yield
+        self.finish(name)
+
+    def snapshot(self) -> dict[str, Any]:
+        with self._lock:
+            now = self._clock()
+            stages = [stage.to_dict(now) for stage in self._stages.values()]
+            current = next((item for item in stages if item["name"] == self._current), None)
+            fraction = sum(item["fraction"] for item in stages) / len(stages) if stages else 0.0
+            return {
+                "stage": self._current,
+                "fraction": round(fraction, 4),
+                "eta_seconds": current["eta_seconds"] if current else None,
+                "stages": stages,
+                "updated_at": now,
+            }
+
+    def timings(self) -> dict[str, float]:
+        """Duração de cada etapa concluída, em segundos."""
+        with self._lock:
+            now = self._clock()
+            return {name: round(stage.elapsed(now), 3) for name, stage in self._stages.items() if stage.done}
+
+    def flush(self) -> None:
+        self._emit(force=True)
+
+    def _emit(self, force: bool = False) -> None:
+        if self._sink is None:
+            return
+        now = time.monotonic()
+        with self._lock:
+            if not force and now - self._last_emit < self._min_interval:
+                return
+            self._last_emit = now
+        try:
+            self._sink(self.snapshot())
+        except Exception:  # noqa: BLE001 - progresso nunca derruba o pipeline
+            logger.warning("Falha ao publicar progresso", exc_info=True)
+
+    def proglog_logger(self, name: str = "render"):
+        """Logger do proglog para ``write_videofile``: a barra de quadros (``t``) vira a fração da etapa."""
+        from proglog import ProgressBarLogger
+
+        reporter = self
+
+        class _StageLogger(ProgressBarLogger):
+            def bars_callback(self, bar, attr, value, old_value=None):
+                if attr != "index":
+                    return
+                total = self.bars[bar].get("total")
+                if bar == "t" and total:
+                    reporter.update(name, value / total, f"quadro {value}/{total}")
+                elif bar == "chunk":
+                    reporter.update(name, 0.0, "áudio")
+
+        return _StageLogger()
@@ -0,0 +1,117 @@
+"""Prévias de baixa resolução para conferir edições antes do render final.
+
+A prévia usa as mesmas entradas do vídeo final (legendas, estilo e beeps da
+sessão), mas sai reduzida para ``settings.proxy_height`` linhas e codificada
+com o preset ``draft``. Cada revisão da sessão (legendas + beeps + som de
+censura) tem uma chave; pedir a prévia de novo sem editar nada devolve o
+arquivo em cache sem chamar o FFmpeg.
+"""
+from __future__ import annotations
+
+import hashlib
+import json
+import logging
+import tempfile
+from pathlib import Path
+from typing import Iterable, Sequence, Tuple
+
+try:
+    from app.config import settings
+except ImportError:  # pragma: no cover - fallback for script execution
+    from config import settings
+from .CreateVideoWinthSubtitles import SubtitleRenderingOptions
+from .censor_audio import pad_intervals
+from .encoder_presets import resolve_encoder_preset
+from .ffmpeg_renderer import render_with_ffmpeg
+from .render_cache import RenderCache, video_track_key
+
+logger = logging.getLogger(__name__)
+
+PROXY_ENCODER_PRESET = "draft"
+
+proxy_cache = RenderCache(settings.cache_dir / "proxies")
+
+
+def proxy_revision_key(
+    session_id: str,
+    subtitles: Sequence[Tuple[float, float, str]],
+    subtitle_options: SubtitleRenderingOptions,
+    beep_intervals: Iterable[Sequence[float]] | None,
+    beep_frequency: int,
+    beep_volume: float,
+    ducking_volume: float | None,
+    censor_sound: str | None,
+    height: int,
+) -> str:
+    """Chave da revisão: a trilha de vídeo da prévia mais tudo o que muda o áudio."""
+    video_key = video_track_key(
+        session_id,
+        subtitles,
+        subtitle_options,
+        "ffmpeg",
+        f"{resolve_encoder_preset(PROXY_ENCODER_PRESET).signature};height={height}",
+        None,
+    )
+    payload = {
+        "video": video_key,
+        "beeps": [[round(start, 3), round(end, 3)] for start, end in pad_intervals(beep_intervals)],
+        "beep": [beep_frequency, beep_volume, ducking_volume, censor_sound or settings.censor_sound],
+    }
+    encoded = json.dumps(payload, sort_keys=True, separators=(",", ":"))
+    return hashlib.sha256(encoded.encode("utf-8")).hexdigest()
+
+
+def render_proxy_preview(
+    session_id: str,
+    video_path: str,
+    subtitles: Sequence[Tuple[float, float, str]],
+    subtitle_options: SubtitleRenderingOptions,
+    beep_intervals: Iterable[Sequence[float]] | None = None,
+    beep_frequency: int = 1000,
+    beep_volume: float = 0.6,
+    ducking_volume: float | None = 0.12,
+    censor_sound: str | None = None,
+    height: int | None = None,
+    cache: RenderCache | None = None,
+) -> tuple[Path, bool]:
+    """Renderiza (ou reaproveita) a prévia reduzida da revisão atual da sessão.
+
+    Returns:
+        Caminho da prévia no cache e ``True`` quando ela já existia.
+    """
+    cache = cache or proxy_cache
+    height = height or settings.proxy_height
+    beep_intervals = list(beep_intervals or [])
+    key = proxy_revision_key(
+        session_id,
+        subtitles,
+        subtitle_options,
+        beep_intervals,
+        beep_frequency,
+        beep_volume,
+        ducking_volume,
+        censor_sound,
+        height,
+    )
+
+    cached = cache.lookup(session_id, key)
+    if cached is not None:
+        logger.info("Prévia reaproveitada do cache (%s)", session_id)
+        return cached, True
+
+    with tempfile.TemporaryDirectory(prefix="textwaves_proxy_") as work_dir:
+        proxy_path = Path(work_dir) / "proxy.mp4"
+        render_with_ffmpeg(
+            video_path,
+            subtitles,
+            str(proxy_path),
+            subtitle_options,
+            beep_intervals=beep_intervals,
+            beep_frequency=beep_frequency,
+            beep_volume=beep_volume,
+            ducking_volume=ducking_volume,
+            censor_sound=censor_sound,
+            encoder_preset=PROXY_ENCODER_PRESET,
+            max_height=height,
+        )
+        return cache.store(session_id, key, proxy_path), False
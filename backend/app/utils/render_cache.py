@@ -0,0 +1,183 @@
+"""Cache da última renderização de cada sessão para re-renderizar só o áudio.
+
+A chave da trilha de vídeo cobre tudo o que é queimado na imagem: o vídeo de
+origem, as legendas, as opções de estilo, a engine, o preset do codificador e o fps. Se a
+chave não mudou desde a renderização anterior da sessão (o usuário só mexeu
+nos beeps), o vídeo em cache é reaproveitado com ``-c:v copy`` e apenas o
+áudio censurado é mixado de novo.
+"""
+from __future__ import annotations
+
+import hashlib
+import json
+import logging
+import os
+import re
+import shutil
+import threading
+import time
+import uuid
+from dataclasses import asdict
+from pathlib import Path
+from typing import Iterable, Sequence, Tuple
+
+try:
+    from app.config import settings
+except ImportError:  # pragma: no cover - fallback for script execution
+    from config import settings
+from .CreateVideoWinthSubtitles import SubtitleRenderingOptions, create_video_with_subtitles
+from .encoder_presets import EncoderPreset, resolve_encoder_preset
+from .ffmpeg_renderer import remux_with_censored_audio
+from .ffmpeg_tools import FFmpegError
+from .progress import ProgressReporter
+
+logger = logging.getLogger(__name__)
+
+_SAFE_SESSION_ID = re.compile(r"^[A-Za-z0-9_-]{1,128}$")
+
+
+def video_track_key(
+    source_id: str,
+    subtitles: Sequence[Tuple[float, float, str]],
+    subtitle_options: SubtitleRenderingOptions,
+    engine: str,
+    encoder: str,
+    fps: float | None,
+) -> str:
+    """Fingerprint de tudo o que afeta os quadros do vídeo final (o áudio fica de fora)."""
+    payload = {
+        "source": source_id,
+        "subtitles": [
+            [round(float(start), 3), round(float(end), 3), str(text)] for start, end, text in subtitles
+        ],
+        "options": {key: str(value) for key, value in asdict(subtitle_options).items()},
+        "engine": engine,
+        "encoder": encoder,
+        "fps": fps,
+    }
+    encoded = json.dumps(payload, ensure_ascii=False, sort_keys=True, separators=(",", ":"))
+    return hashlib.sha256(encoded.encode("utf-8")).hexdigest()
+
+
+class RenderCache:
+    """Guarda um único vídeo renderizado por sessão, nomeado pela chave da trilha de vídeo."""
+
+    def __init__(self, directory: Path | str) -> None:
+        self.directory = Path(directory)
+        self._lock = threading.Lock()
+
+    def _session_dir(self, session_id: str) -> Path:
+        if not _SAFE_SESSION_ID.match(session_id):
+            raise ValueError(f"Identificador de sessão inválido: {session_id!r}")
+        return self.directory / session_id
+
+    def lookup(self, session_id: str, key: str) -> Path | None:
+        path = self._session_dir(session_id) / f"{key}.mp4"
+        if not path.exists():
+            return None
+        os.utime(path)
+        return path
+
+    def store(self, session_id: str, key: str, rendered_path: str | os.PathLike) -> Path:
+        session_dir = self._session_dir(session_id)
+        session_dir.mkdir(parents=True, exist_ok=True)
+        target = session_dir / f"{key}.mp4"
+        # Link (ou cópia) em nome temporário + replace; o link evita copiar o MP4 inteiro.
+        # A saída nunca é reescrita no lugar (``render_session_video`` apaga antes)
+        temp_path = session_dir / f"{key}.{uuid.uuid4().hex}.tmp"
+        try:
+            os.link(rendered_path, temp_path)
+        except OSError:
+            # Outro sistema de arquivos ou sem suporte a hard links
+            shutil.copyfile(rendered_path, temp_path)
+        with self._lock:
+            os.replace(temp_path, target)
+            for stale in session_dir.glob("*.mp4"):
+                if stale != target:
+                    stale.unlink(missing_ok=True)
+        return target
+
+    def discard(self, session_id: str) -> bool:
+        session_dir = self._session_dir(session_id)
+        if not session_dir.exists():
+            return False
+        shutil.rmtree(session_dir, ignore_errors=True)
+        return True
+
+    def prune(self, max_age_seconds: float) -> int:
+        """Remove sessões cujo último uso é mais antigo que ``max_age_seconds``."""
+        if not self.directory.exists():
+            return 0
+        cutoff = time.time() - max_age_seconds
+        removed = 0
+        for session_dir in self.directory.iterdir():
+            if not session_dir.is_dir():
+                continue
+            mtimes = [path.stat().st_mtime for path in session_dir.glob("*.mp4")]
+            if not mtimes or max(mtimes) < cutoff:
+                shutil.rmtree(session_dir, ignore_errors=True)
+                removed += 1
+        return removed
+
+
+render_cache = RenderCache(settings.cache_dir / "renders")
+
+
+def render_session_video(
+    session_id: str,
+    video_path: str,
+    subtitles: Sequence[Tuple[float, float, str]],
+    output_video_path: str,
+    subtitle_options: SubtitleRenderingOptions,
+    beep_intervals: Iterable[Sequence[float]] | None = None,
+    beep_frequency: int = 1000,
+    beep_volume: float = 0.6,
+    ducking_volume: float | None = 0.12,
+    fps: float | None = None,
+    engine: str | None = None,
+    censor_sound: str | None = None,
+    encoder_preset: str | EncoderPreset | None = None,
+    cache: RenderCache | None = None,
+    progress: ProgressReporter | None = None,
+) -> str:
+    """Renderiza o vídeo da sessão, refazendo só o áudio quando as legendas não mudaram.
+
+    Returns:
+        ``"remux"`` quando o vídeo em cache foi reaproveitado, ``"full"`` caso contrário.
+    """
+    cache = cache or render_cache
+    engine = (engine or settings.render_engine or "moviepy").lower()
+    preset = resolve_encoder_preset(encoder_preset)
+    key = video_track_key(session_id, subtitles, subtitle_options, engine, preset.signature, fps)
+    audio_options = {
+        "beep_intervals": beep_intervals,
+        "beep_frequency": beep_frequency,
+        "beep_volume": beep_volume,
+        "ducking_volume": ducking_volume,
+        "censor_sound": censor_sound,
+        "encoder_preset": preset,
+    }
+
+    # A saída anterior pode ser um link para o vídeo em cache: apagar em vez de sobrescrever
+    Path(output_video_path).unlink(missing_ok=True)
+    cached_render = cache.lookup(session_id, key)
+    if cached_render is not None:
+        try:
+            remux_with_censored_audio(str(cached_render), video_path, output_video_path, **audio_options)
+            logger.info("Legendas inalteradas: vídeo reaproveitado do cache (%s)", session_id)
+            return "remux"
+        except FFmpegError:
+            logger.warning("Remux falhou; renderizando o vídeo completo", exc_info=True)
+
+    create_video_with_subtitles(
+        video_path,
+        subtitles,
+        output_video_path,
+        subtitle_options,
+        fps=fps,
+        engine=engine,
+        progress=progress,
+        **audio_options,
+    )
+    cache.store(session_id, key, output_video_path)
+    return "full"
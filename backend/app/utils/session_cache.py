@@ -0,0 +1,416 @@
+"""Sessões de edição quentes em memória, com gravação adiada no ``SessionRepository``.
+
+As rotas de prévia leem e editam a mesma sessão várias vezes por minuto.
+O cache guarda as sessões já montadas (LRU, limitado a ``max_entries``) e
+as edições só mudam a cópia em memória; uma thread grava as sessões
+alteradas a cada ``flush_interval`` segundos, juntando várias edições numa
+única transação (só as legendas tocadas pelas operações são regravadas). Tudo o
+que estiver pendente é gravado no encerramento do processo e antes de
+qualquer leitura feita por outro processo (render em job).
+
+Uma entrada limpa é revalidada só quando o arquivo do banco (ou o WAL) muda
+de mtime: então a revisão gravada é comparada com a da entrada e, se outro
+processo alterou ou removeu a sessão, a entrada é descartada. Uma entrada com
+edições pendentes confere a revisão gravada (uma linha) antes de aceitar
+outra edição; se outro processo gravou no meio tempo, a edição é recusada
+com ``RevisionConflict`` e as pendentes são descartadas.
+
+Com ``flush_interval <= 0`` cada edição é gravada na hora (sem escrita adiada)
+e um conflito na gravação chega a quem editou. A escrita adiada supõe um
+único processo servindo as rotas: com ``WEB_CONCURRENCY`` maior que 1 ela é
+desativada (``write_behind_interval``).
+"""
+from __future__ import annotations
+
+import atexit
+import logging
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Any, Mapping, Sequence
+
+try:
+    from app.config import settings
+except ImportError:  # pragma: no cover - fallback for script execution
+    from config import settings
+from .censor_index import retime_moved_segments
+from .session_store import RevisionConflict, SessionRepository, session_store
+from .subtitle_patch import (
+    apply_operations,
+    ensure_subtitle_ids,
+    moved_positions,
+    restructures_subtitles,
+    touches_beeps,
+    touches_subtitles,
+)
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(slots=True)
+class _Entry:
+    session: dict[str, Any]
+    revision: int
+    persisted_revision: int
+    db_signature: tuple
+    dirty: set[str] = field(default_factory=set)
+    dirty_metadata: set[str] = field(default_factory=set)
+    # Legendas editadas por operações desde a última gravação (id -> legenda) e ids apagados
+    dirty_subtitles: dict[int, dict[str, Any]] = field(default_factory=dict)
+    removed_subtitles: set[int] = field(default_factory=set)
+    # Revisão sendo gravada pela thread neste momento
+    flushing_revision: int | None = None
+
+    @property
+    def pending(self) -> bool:
+        return bool(self.dirty or self.dirty_metadata or self.dirty_subtitles or self.removed_subtitles)
+
+
+class SessionCache:
+    def __init__(
+        self,
+        repository: SessionRepository,
+        max_entries: int = 64,
+        flush_interval: float = 2.0,
+    ) -> None:
+        self.repository = repository
+        self.max_entries = max(1, max_entries)
+        self.flush_interval = flush_interval
+        self._entries: "OrderedDict[str, _Entry]" = OrderedDict()
+        self._lock = threading.RLock()
+        self._flush_lock = threading.Lock()
+        self._wake = threading.Event()
+        self._stopped = False
+        self._thread: threading.Thread | None = None
+        self.hits = 0
+        self.misses = 0
+
+    def _db_signature(self) -> tuple:
+        signature = []
+        for path in (self.repository.path, self.repository.path.with_name(self.repository.path.name + "-wal")):
+            try:
+                signature.append(path.stat().st_mtime_ns)
+            except OSError:
+                signature.append(None)
+        return tuple(signature)
+
+    # Leitura
+
+    def _entry(self, video_hash: str) -> _Entry | None:
+        with self._lock:
+            entry = self._entries.get(video_hash)
+            if entry is not None and not entry.pending:
+                signature = self._db_signature()
+                if signature != entry.db_signature:
+                    # O banco mudou desde a última validação: conferir a revisão gravada
+                    if self.repository.revision(video_hash) != entry.persisted_revision:
+                        del self._entries[video_hash]
+                        entry = None
+                    else:
+                        entry.db_signature = signature
+            if entry is not None:
+                self._entries.move_to_end(video_hash)
+                self.hits += 1
+                return entry
+            self.misses += 1
+
+        signature = self._db_signature()
+        session = self.repository.get(video_hash)
+        if session is None:
+            return None
+        revision = session.pop("revision")
+        entry = _Entry(session, revision, revision, signature)
+        with self._lock:
+            current = self._entries.get(video_hash)
+            if current is not None:
+                return current
+            self._entries[video_hash] = entry
+            self._evict()
+        return entry
+
+    def get(self, video_hash: str) -> dict[str, Any] | None:
+        """Sessão no formato do antigo JSON, com ``revision``; não altere as listas devolvidas."""
+        entry = self._entry(video_hash)
+        if entry is None:
+            return None
+        with self._lock:
+            return {**entry.session, "revision": entry.revision}
+
+    def exists(self, video_hash: str) -> bool:
+        with self._lock:
+            if video_hash in self._entries:
+                return True
+        return self.repository.exists(video_hash)
+
+    def video_path(self, video_hash: str) -> str | None:
+        with self._lock:
+            entry = self._entries.get(video_hash)
+            if entry is not None:
+                return entry.session["video_path"]
+        return self.repository.video_path(video_hash)
+
+    # Escrita
+
+    def save(self, session_data: Mapping[str, Any]) -> int:
+        """Sessão nova (transcrição): gravada na hora, não fica pendente."""
+        revision = self.repository.save(session_data)
+        session = {key: value for key, value in session_data.items() if key != "revision"}
+        session["subtitles"] = ensure_subtitle_ids(session.get("subtitles") or [])
+        with self._lock:
+            self._entries[session["video_hash"]] = _Entry(session, revision, revision, self._db_signature())
+            self._entries.move_to_end(session["video_hash"])
+            self._evict()
+        return revision
+
+    def update(
+        self,
+        video_hash: str,
+        *,
+        subtitles: Sequence[Mapping[str, Any]] | None = None,
+        beep_intervals: Sequence[Sequence[Any]] | None = None,
+        metadata: Mapping[str, Any] | None = None,
+        censor_index: Mapping[str, Any] | None = None,
+        expected_revision: int | None = None,
+    ) -> int:
+        """Mesmo contrato de ``SessionRepository.update``, aplicado em memória."""
+        entry = self._entry(video_hash)
+        if entry is None:
+            raise KeyError(video_hash)
+        with self._lock:
+            self._check_revision(video_hash, entry, expected_revision)
+            if subtitles is not None:
+                self._set(entry, "subtitles", ensure_subtitle_ids([dict(subtitle) for subtitle in subtitles]))
+                # A lista inteira será gravada: as edições por id ficam cobertas
+                entry.dirty_subtitles.clear()
+                entry.removed_subtitles.clear()
+            if beep_intervals is not None:
+                self._set(entry, "beep_intervals", [list(beep) for beep in beep_intervals])
+            if censor_index is not None:
+                self._set(entry, "censor_index", censor_index)
+            for key, value in (metadata or {}).items():
+                entry.session[key] = value
+                entry.dirty_metadata.add(key)
+            entry.revision += 1
+            revision = entry.revision
+        self._after_write(video_hash)
+        return revision
+
+    def patch(
+        self,
+        video_hash: str,
+        operations: Sequence[Mapping[str, Any]],
+        expected_revision: int | None = None,
+    ) -> tuple[int, list[tuple[int, dict[str, Any]]], int | None, list[list] | None]:
+        """Mesmo contrato de ``SessionRepository.patch``, aplicado em memória."""
+        entry = self._entry(video_hash)
+        if entry is None:
+            raise KeyError(video_hash)
+        edits_subtitles = touches_subtitles(operations)
+        edits_beeps = touches_beeps(operations)
+        with self._lock:
+            self._check_revision(video_hash, entry, expected_revision)
+            result = apply_operations(
+                entry.session.get("subtitles") or [], entry.session.get("beep_intervals") or [], operations
+            )
+            subtitles, beeps = result.subtitles, result.beep_intervals
+            written = []
+            if edits_subtitles:
+                written = result.changed
+                entry.session["subtitles"] = subtitles
+                if "subtitles" not in entry.dirty:
+                    # Só as legendas tocadas vão para o banco na próxima gravação
+                    for subtitle_id in result.removed:
+                        entry.dirty_subtitles.pop(subtitle_id, None)
+                        entry.removed_subtitles.add(subtitle_id)
+                    for _, subtitle in written:
+                        entry.dirty_subtitles[subtitle["id"]] = subtitle
+            if restructures_subtitles(operations):
+                if entry.session.get("censor_index") is not None:
+                    # O índice de censura é posicional: sem ele, a recensura reconstrói a partir das legendas
+                    self._set(entry, "censor_index", None)
+            elif entry.session.get("censor_index") is not None:
+                # Legendas movidas levam seus tempos (e beeps automáticos) para o índice
+                retimed = retime_moved_segments(
+                    entry.session["censor_index"], subtitles, moved_positions(operations), beeps
+                )
+                if retimed is not None:
+                    index_data, beeps = retimed
+                    self._set(entry, "censor_index", index_data)
+                    edits_beeps = True
+            if edits_beeps:
+                self._set(entry, "beep_intervals", beeps)
+            entry.revision += 1
+            revision = entry.revision
+        self._after_write(video_hash)
+        return (
+            revision,
+            written,
+            len(subtitles) if edits_subtitles else None,
+            beeps if edits_beeps else None,
+        )
+
+    def delete(self, video_hash: str) -> bool:
+        with self._lock:
+            self._entries.pop(video_hash, None)
+        return self.repository.delete(video_hash)
+
+    def _check_revision(self, video_hash: str, entry: _Entry, expected_revision: int | None) -> None:
+        if entry.pending:
+            # Edições ainda não gravadas: se outro processo gravou a sessão, elas não
+            # podem mais ser gravadas e esta edição não deve ser aceita sobre elas
+            stored = self.repository.revision(video_hash)
+            if stored not in (entry.persisted_revision, entry.flushing_revision):
+                logger.error(
+                    "Sessão %s alterada por outro processo (revisão %s); edições pendentes descartadas",
+                    video_hash,
+                    stored,
+                )
+                self._entries.pop(video_hash, None)
+                if stored is None:
+                    raise KeyError(video_hash)
+                raise RevisionConflict(
+                    video_hash, int(expected_revision if expected_revision is not None else entry.revision), stored
+                )
+        if expected_revision is not None and int(expected_revision) != entry.revision:
+            raise RevisionConflict(video_hash, int(expected_revision), entry.revision)
+
+    @staticmethod
+    def _set(entry: _Entry, key: str, value: Any) -> None:
+        # Sempre uma lista nova: quem leu a sessão antes continua com a versão anterior
+        entry.session[key] = value
+        entry.dirty.add(key)
+
+    def _after_write(self, video_hash: str) -> None:
+        if self.flush_interval <= 0 or self._stopped:
+            self.flush(video_hash, strict=True)
+        else:
+            self._ensure_thread()
+
+    def _evict(self) -> None:
+        # Entradas com edições pendentes ficam até a próxima gravação
+        for video_hash in list(self._entries):
+            if len(self._entries) <= self.max_entries:
+                break
+            entry = self._entries[video_hash]
+            if not entry.pending:
+                del self._entries[video_hash]
+
+    # Gravação adiada
+
+    def pending(self) -> list[str]:
+        with self._lock:
+            return [key for key, entry in self._entries.items() if entry.pending]
+
+    def flush(self, video_hash: str | None = None, strict: bool = False) -> int:
+        """Grava as edições pendentes (de uma sessão ou de todas); retorna quantas sessões foram gravadas.
+
+        Sessão removida ou alterada por outro processo descarta as edições
+        pendentes; com ``strict`` o ``KeyError``/``RevisionConflict`` é relançado.
+        """
+        flushed = 0
+        with self._flush_lock:
+            for key in [video_hash] if video_hash else self.pending():
+                with self._lock:
+                    entry = self._entries.get(key)
+                    if entry is None or not entry.pending:
+                        continue
+                    dirty, dirty_metadata = entry.dirty, entry.dirty_metadata
+                    changed, removed = entry.dirty_subtitles, entry.removed_subtitles
+                    entry.dirty, entry.dirty_metadata = set(), set()
+                    entry.dirty_subtitles, entry.removed_subtitles = {}, set()
+                    session = dict(entry.session)
+                    revision, expected = entry.revision, entry.persisted_revision
+                    entry.flushing_revision = revision
+                # Sem a lista inteira pendente, só as legendas editadas são gravadas
+                incremental = "subtitles" not in dirty and bool(changed or removed)
+                try:
+                    self.repository.update(
+                        key,
+                        subtitles=session["subtitles"] if "subtitles" in dirty or incremental else None,
+                        changed_subtitles=list(changed.values()) if incremental else None,
+                        removed_subtitle_ids=removed if incremental else (),
+                        beep_intervals=session["beep_intervals"] if "beep_intervals" in dirty else None,
+                        metadata={name: session[name] for name in dirty_metadata},
+                        censor_index=session.get("censor_index") if "censor_index" in dirty else None,
+                        clear_censor_index="censor_index" in dirty and session.get("censor_index") is None,
+                        expected_revision=expected,
+                        revision=revision,
+                    )
+                except (KeyError, RevisionConflict) as exc:
+                    # Sessão removida ou alterada por outro processo: a versão gravada prevalece
+                    logger.error("Edições da sessão %s descartadas na gravação: %s", key, exc)
+                    with self._lock:
+                        self._entries.pop(key, None)
+                    if strict:
+                        raise
+                    continue
+                except Exception:
+                    with self._lock:
+                        entry.dirty |= dirty
+                        entry.dirty_metadata |= dirty_metadata
+                        for subtitle_id, subtitle in changed.items():
+                            entry.dirty_subtitles.setdefault(subtitle_id, subtitle)
+                        entry.removed_subtitles |= removed
+                        entry.flushing_revision = None
+                    raise
+                with self._lock:
+                    entry.persisted_revision = revision
+                    entry.flushing_revision = None
+                    entry.db_signature = self._db_signature()
+                flushed += 1
+        if flushed:
+            logger.debug("%d sessão(ões) gravada(s) no banco", flushed)
+        return flushed
+
+    def _ensure_thread(self) -> None:
+        with self._lock:
+            if self._thread is not None or self._stopped:
+                return
+            self._thread = threading.Thread(target=self._run, name="session-flush", daemon=True)
+            self._thread.start()
+            atexit.register(self.shutdown)
+
+    def _run(self) -> None:
+        while not self._wake.wait(self.flush_interval):
+            try:
+                self.flush()
+            except Exception:  # noqa: BLE001 - a próxima rodada tenta de novo
+                logger.exception("Falha ao gravar sessões pendentes")
+
+    def shutdown(self) -> None:
+        """Para a thread de gravação e grava o que estiver pendente."""
+        with self._lock:
+            self._stopped = True
+            thread, self._thread = self._thread, None
+        self._wake.set()
+        if thread is not None:
+            thread.join(timeout=5)
+        self.flush()
+
+    def stats(self) -> dict[str, Any]:
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "max_entries": self.max_entries,
+                "pending": len(self.pending()),
+                "hits": self.hits,
+                "misses": self.misses,
+            }
+
+
+def write_behind_interval(flush_seconds: float, web_concurrency: int) -> float:
+    """Intervalo da escrita adiada; 0 (gravar a cada edição) com mais de um processo servindo."""
+    if web_concurrency > 1 and flush_seconds > 0:
+        logger.warning(
+            "WEB_CONCURRENCY=%d: escrita adiada das sessões desativada (cada edição é gravada na hora)",
+            web_concurrency,
+        )
+        return 0.0
+    return flush_seconds
+
+
+session_cache = SessionCache(
+    session_store,
+    max_entries=settings.session_cache_entries,
+    flush_interval=write_behind_interval(settings.session_flush_seconds, settings.web_concurrency),
+)
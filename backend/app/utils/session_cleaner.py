@@ -32,6 +32,9 @@ def clean_old_sessions(max_age_hours: int = 24) -> dict[str, int]:
         'sessions': 0,
         'temp_audio': 0,
         'final_videos': 0,
+        'cached_renders': 0,
+        'cached_proxies': 0,
+        'artifacts': 0,
         'errors': 0
     }
     
@@ -39,7 +42,16 @@ def clean_old_sessions(max_age_hours: int = 24) -> dict[str, int]:
         logger.warning(f"Diretório de uploads não existe: {upload_dir}")
         return counters
     
-    # Limpar sessões antigas (session_*.json)
+    # Limpar sessões antigas do banco (sem edição há mais de max_age_hours)
+    from .session_store import session_store
+
+    try:
+        counters['sessions'] += session_store.prune(max_age_seconds)
+    except Exception as e:
+        counters['errors'] += 1
+        logger.error(f"Erro ao limpar sessões do banco: {e}")
+
+    # Limpar sessões antigas em JSON que ainda não foram importadas (session_*.json)
     for session_file in upload_dir.glob("session_*.json"):
         try:
             file_age = now - os.path.getmtime(session_file)
@@ -89,6 +101,33 @@ def clean_old_sessions(max_age_hours: int = 24) -> dict[str, int]:
                 counters['errors'] += 1
                 logger.error(f"Erro ao remover áudio (raiz) {temp_audio.name}: {e}")
     
+    # Limpar renders em cache usados pelo remux de áudio
+    try:
+        from .render_cache import render_cache
+
+        counters['cached_renders'] = render_cache.prune(max_age_seconds)
+    except Exception as e:
+        counters['errors'] += 1
+        logger.error(f"Erro ao limpar renders em cache: {e}")
+
+    # Limpar prévias de baixa resolução
+    try:
+        from .proxy_render import proxy_cache
+
+        counters['cached_proxies'] = proxy_cache.prune(max_age_seconds)
+    except Exception as e:
+        counters['errors'] += 1
+        logger.error(f"Erro ao limpar prévias em cache: {e}")
+
+    # Vídeos gerados: retenção própria (TEXTWAVES_ARTIFACT_RETENTION_HOURS / _MAX_MB)
+    try:
+        from .artifact_store import prune_artifacts
+
+        counters['artifacts'] = prune_artifacts()
+    except Exception as e:
+        counters['errors'] += 1
+        logger.error(f"Erro ao limpar artefatos: {e}")
+
     total_removed = counters['sessions'] + counters['temp_audio'] + counters['final_videos']
     if total_removed > 0:
         logger.info(f"Limpeza concluída: {total_removed} arquivos removidos "
@@ -111,7 +150,13 @@ def clean_session_by_hash(video_hash: str, *, keep_final_video: bool = False) ->
     removed = False
     
     try:
-        # Remover session JSON
+        # Remover sessão do banco e o JSON antigo, se ainda existir
+        from .session_cache import session_cache
+
+        if session_cache.delete(video_hash):
+            logger.info(f"Sessão removida: {video_hash}")
+            removed = True
+
         session_file = upload_dir / f"session_{video_hash}.json"
         if session_file.exists():
             session_file.unlink()
@@ -132,6 +177,17 @@ def clean_session_by_hash(video_hash: str, *, keep_final_video: bool = False) ->
                 root_audio.unlink()
                 logger.info(f"Áudio temporário removido (raiz): {root_audio.name}")
         
+        # Remover render em cache da sessão
+        from .render_cache import render_cache
+
+        if render_cache.discard(video_hash):
+            logger.info(f"Render em cache removido: {video_hash}")
+
+        from .proxy_render import proxy_cache
+
+        if proxy_cache.discard(video_hash):
+            logger.info(f"Prévia em cache removida: {video_hash}")
+
         # Remover vídeo final
         final_video = upload_dir / f"final_{video_hash}.mp4"
         if final_video.exists():
@@ -0,0 +1,672 @@
+"""Sessões de edição em SQLite (WAL) no lugar dos ``session_<hash>.json``.
+
+Cada sessão é uma linha em ``sessions`` (caminho do vídeo, metadados,
+índice de censura e o número de revisão); legendas e beeps ficam em tabelas
+próprias, uma linha por item. A linha de cada legenda é identificada pelo
+``id`` da legenda (estável) e ordenada por ``sort_key``, um inteiro com
+folga entre vizinhos: dividir uma legenda insere uma linha com uma chave
+intermediária e juntar duas apaga uma, sem renumerar as seguintes. Salvar
+uma lista de legendas compara com o que está gravado e só escreve as
+linhas que mudaram, e quem precisa só do caminho do vídeo lê uma única linha.
+
+Concorrência é otimista: toda escrita incrementa ``revision`` e pode exigir
+a revisão que o cliente leu (``expected_revision``); se outra edição chegou
+antes, ``RevisionConflict`` é levantado em vez de sobrescrever.
+
+Sessões antigas em JSON são importadas na primeira leitura (ou em lote com
+``import_json_sessions``) e o arquivo é renomeado para ``.imported``.
+"""
+from __future__ import annotations
+
+import json
+import logging
+import sqlite3
+import threading
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Iterable, Iterator, Mapping, Sequence
+
+try:
+    from app.config import settings
+except ImportError:  # pragma: no cover - fallback for script execution
+    from config import settings
+from .censor_index import retime_moved_segments
+from .subtitle_patch import (
+    apply_operations,
+    ensure_subtitle_ids,
+    moved_positions,
+    restructures_subtitles,
+    touches_beeps,
+    touches_subtitles,
+)
+
+logger = logging.getLogger(__name__)
+
+LEGACY_SESSION_DIRS = ("uploads",)
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS sessions (
+    video_hash TEXT PRIMARY KEY,
+    revision INTEGER NOT NULL,
+    video_path TEXT NOT NULL,
+    metadata TEXT NOT NULL,
+    censor_index TEXT,
+    created_at REAL NOT NULL,
+    updated_at REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS subtitles (
+    video_hash TEXT NOT NULL REFERENCES sessions (video_hash) ON DELETE CASCADE,
+    subtitle_id INTEGER NOT NULL,
+    sort_key INTEGER NOT NULL,
+    start REAL NOT NULL,
+    end REAL NOT NULL,
+    text TEXT NOT NULL,
+    raw_text TEXT,
+    confidence REAL,
+    extra TEXT,
+    PRIMARY KEY (video_hash, subtitle_id)
+);
+CREATE INDEX IF NOT EXISTS subtitles_order ON subtitles (video_hash, sort_key);
+CREATE TABLE IF NOT EXISTS beeps (
+    video_hash TEXT NOT NULL REFERENCES sessions (video_hash) ON DELETE CASCADE,
+    position INTEGER NOT NULL,
+    start REAL NOT NULL,
+    end REAL NOT NULL,
+    label TEXT,
+    PRIMARY KEY (video_hash, position)
+);
+CREATE INDEX IF NOT EXISTS sessions_updated ON sessions (updated_at);
+"""
+
+_SUBTITLE_COLUMNS = ("id", "start", "end", "text", "raw_text", "confidence")
+
+# Folga entre as chaves de ordem de legendas vizinhas; quando uma inserção
+# não cabe mais entre duas chaves, a sessão inteira é renumerada
+ORDER_GAP = 1 << 20
+# Ids por consulta ``IN (...)`` (abaixo do limite de parâmetros do SQLite)
+_SQL_BATCH = 500
+
+
+class RevisionConflict(Exception):
+    """A sessão mudou desde a revisão que o cliente leu."""
+
+    def __init__(self, video_hash: str, expected: int, current: int) -> None:
+        super().__init__(
+            f"Sessão {video_hash} está na revisão {current} (esperada {expected})"
+        )
+        self.video_hash = video_hash
+        self.expected = expected
+        self.current = current
+
+
+def _subtitle_row(subtitle: Mapping[str, Any]) -> tuple:
+    extra = {key: value for key, value in subtitle.items() if key not in _SUBTITLE_COLUMNS}
+    confidence = subtitle.get("confidence")
+    return (
+        subtitle.get("id"),
+        float(subtitle["start"]),
+        float(subtitle["end"]),
+        str(subtitle.get("text", "")),
+        subtitle.get("raw_text"),
+        float(confidence) if confidence is not None else None,
+        json.dumps(extra, ensure_ascii=False) if extra else None,
+    )
+
+
+def _subtitle_dict(row: Sequence[Any]) -> dict[str, Any]:
+    subtitle_id, start, end, text, raw_text, confidence, extra = row
+    subtitle: dict[str, Any] = {"id": subtitle_id, "start": start, "end": end, "text": text}
+    if raw_text is not None:
+        subtitle["raw_text"] = raw_text
+    if confidence is not None:
+        subtitle["confidence"] = confidence
+    if extra:
+        subtitle.update(json.loads(extra))
+    return subtitle
+
+
+def _kept_positions(keys: Sequence[int | None]) -> set[int]:
+    """Posições da maior subsequência crescente de chaves já gravadas (essas não mudam)."""
+    tails: list[int] = []
+    tail_positions: list[int] = []
+    previous = [-1] * len(keys)
+    for position, key in enumerate(keys):
+        if key is None:
+            continue
+        slot = bisect_left(tails, key)
+        if slot == len(tails):
+            tails.append(key)
+            tail_positions.append(position)
+        else:
+            tails[slot] = key
+            tail_positions[slot] = position
+        previous[position] = tail_positions[slot - 1] if slot else -1
+    kept = set()
+    position = tail_positions[-1] if tail_positions else -1
+    while position >= 0:
+        kept.add(position)
+        position = previous[position]
+    return kept
+
+
+def _order_keys(current: Sequence[int | None]) -> list[int]:
+    """Chaves de ordem para a nova sequência, reaproveitando as gravadas (``None`` para linhas novas)."""
+    kept = _kept_positions(current)
+    keys: list[int | None] = [key if position in kept else None for position, key in enumerate(current)]
+    position = 0
+    while position < len(keys):
+        if keys[position] is not None:
+            position += 1
+            continue
+        end = position
+        while end < len(keys) and keys[end] is None:
+            end += 1
+        low = keys[position - 1] if position else 0
+        high = keys[end] if end < len(keys) else low + ORDER_GAP * (end - position + 1)
+        step = (high - low) // (end - position + 1)
+        if step < 1:
+            # Sem folga entre as vizinhas: renumerar tudo
+            return [(index + 1) * ORDER_GAP for index in range(len(keys))]
+        for offset in range(end - position):
+            keys[position + offset] = low + step * (offset + 1)
+        position = end
+    return keys
+
+
+def _stored_sort_keys(
+    connection: sqlite3.Connection, video_hash: str, subtitle_ids: Iterable[int]
+) -> dict[int, int]:
+    """Chaves de ordem gravadas para os ids informados (ausentes ficam de fora)."""
+    subtitle_ids = list(subtitle_ids)
+    keys: dict[int, int] = {}
+    for offset in range(0, len(subtitle_ids), _SQL_BATCH):
+        batch = subtitle_ids[offset:offset + _SQL_BATCH]
+        keys.update(
+            connection.execute(
+                f"SELECT subtitle_id, sort_key FROM subtitles WHERE video_hash = ? "
+                f"AND subtitle_id IN ({', '.join('?' * len(batch))})",
+                (video_hash, *batch),
+            ).fetchall()
+        )
+    return keys
+
+
+def _beep_row(beep: Sequence[Any]) -> tuple:
+    label = beep[2] if len(beep) > 2 else None
+    return (float(beep[0]), float(beep[1]), str(label) if label is not None else None)
+
+
+def _beep_list(row: Sequence[Any]) -> list:
+    start, end, label = row
+    return [start, end] if label is None else [start, end, label]
+
+
+class SessionRepository:
+    def __init__(self, path: Path | str, legacy_dirs: Iterable[Path | str] = LEGACY_SESSION_DIRS) -> None:
+        self.path = Path(path)
+        self.legacy_dirs = tuple(Path(directory) for directory in legacy_dirs)
+        self._schema_lock = threading.Lock()
+        self._schema_ready = False
+
+    def _connect(self) -> sqlite3.Connection:
+        if not self._schema_ready:
+            with self._schema_lock:
+                if not self._schema_ready:
+                    self.path.parent.mkdir(parents=True, exist_ok=True)
+                    connection = sqlite3.connect(self.path, timeout=30)
+                    try:
+                        connection.execute("PRAGMA journal_mode=WAL")
+                        connection.executescript(_SCHEMA)
+                    finally:
+                        connection.close()
+                    self._schema_ready = True
+        connection = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+        connection.execute("PRAGMA foreign_keys=ON")
+        connection.execute("PRAGMA synchronous=NORMAL")
+        return connection
+
+    @contextmanager
+    def _read(self) -> Iterator[sqlite3.Connection]:
+        connection = self._connect()
+        try:
+            yield connection
+        finally:
+            connection.close()
+
+    @contextmanager
+    def _write(self) -> Iterator[sqlite3.Connection]:
+        """Transação ``IMMEDIATE``: escritores concorrentes esperam em vez de se sobrescrever."""
+        connection = self._connect()
+        try:
+            connection.execute("BEGIN IMMEDIATE")
+            try:
+                yield connection
+            except BaseException:
+                connection.execute("ROLLBACK")
+                raise
+            connection.execute("COMMIT")
+        finally:
+            connection.close()
+
+    # Leitura
+
+    def revision(self, video_hash: str) -> int | None:
+        with self._read() as connection:
+            row = connection.execute(
+                "SELECT revision FROM sessions WHERE video_hash = ?", (video_hash,)
+            ).fetchone()
+        if row is None and self._import_pending(video_hash):
+            return self.revision(video_hash)
+        return row[0] if row else None
+
+    def exists(self, video_hash: str) -> bool:
+        return self.revision(video_hash) is not None
+
+    def video_path(self, video_hash: str) -> str | None:
+        """Só o caminho do vídeo, sem ler legendas nem metadados."""
+        with self._read() as connection:
+            row = connection.execute(
+                "SELECT video_path FROM sessions WHERE video_hash = ?", (video_hash,)
+            ).fetchone()
+        if row is None and self._import_pending(video_hash):
+            return self.video_path(video_hash)
+        return row[0] if row else None
+
+    def subtitles(self, video_hash: str) -> list[dict[str, Any]]:
+        with self._read() as connection:
+            return self._subtitles(connection, video_hash)
+
+    def beep_intervals(self, video_hash: str) -> list[list]:
+        with self._read() as connection:
+            return self._beeps(connection, video_hash)
+
+    def get(self, video_hash: str) -> dict[str, Any] | None:
+        """Sessão completa no mesmo formato do antigo JSON, com ``revision``."""
+        with self._read() as connection:
+            connection.execute("BEGIN")
+            row = connection.execute(
+                "SELECT revision, video_path, metadata, censor_index FROM sessions WHERE video_hash = ?",
+                (video_hash,),
+            ).fetchone()
+            if row is not None:
+                subtitles = self._subtitles(connection, video_hash)
+                beeps = self._beeps(connection, video_hash)
+            connection.execute("COMMIT")
+        if row is None:
+            return self.get(video_hash) if self._import_pending(video_hash) else None
+
+        revision, video_path, metadata, censor_index = row
+        session = json.loads(metadata)
+        session.update(
+            {
+                "video_hash": video_hash,
+                "video_path": video_path,
+                "subtitles": subtitles,
+                "beep_intervals": beeps,
+                "revision": revision,
+            }
+        )
+        if censor_index:
+            session["censor_index"] = json.loads(censor_index)
+        return session
+
+    @staticmethod
+    def _subtitles(connection: sqlite3.Connection, video_hash: str) -> list[dict[str, Any]]:
+        rows = connection.execute(
+            "SELECT subtitle_id, start, end, text, raw_text, confidence, extra FROM subtitles "
+            "WHERE video_hash = ? ORDER BY sort_key",
+            (video_hash,),
+        ).fetchall()
+        return [_subtitle_dict(row) for row in rows]
+
+    @staticmethod
+    def _beeps(connection: sqlite3.Connection, video_hash: str) -> list[list]:
+        rows = connection.execute(
+            "SELECT start, end, label FROM beeps WHERE video_hash = ? ORDER BY position", (video_hash,)
+        ).fetchall()
+        return [_beep_list(row) for row in rows]
+
+    def _import_pending(self, video_hash: str) -> bool:
+        """Importa o JSON antigo da sessão, se existir; ``True`` se algo entrou no banco."""
+        for directory in self.legacy_dirs:
+            legacy_file = directory / f"session_{video_hash}.json"
+            if legacy_file.exists():
+                return self.import_json_file(legacy_file) == video_hash
+        return False
+
+    # Escrita
+
+    def save(self, session_data: Mapping[str, Any]) -> int:
+        """Cria ou substitui a sessão inteira (nova transcrição); retorna a revisão."""
+        video_hash = session_data["video_hash"]
+        metadata = {
+            key: value
+            for key, value in session_data.items()
+            if key not in ("video_hash", "video_path", "subtitles", "beep_intervals", "censor_index", "revision")
+        }
+        censor_index = session_data.get("censor_index")
+        now = time.time()
+        with self._write() as connection:
+            row = connection.execute(
+                "SELECT revision FROM sessions WHERE video_hash = ?", (video_hash,)
+            ).fetchone()
+            revision = (row[0] + 1) if row else 1
+            connection.execute(
+                "INSERT INTO sessions (video_hash, revision, video_path, metadata, censor_index, created_at, updated_at) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?) "
+                "ON CONFLICT (video_hash) DO UPDATE SET revision = excluded.revision, "
+                "video_path = excluded.video_path, metadata = excluded.metadata, "
+                "censor_index = excluded.censor_index, updated_at = excluded.updated_at",
+                (
+                    video_hash,
+                    revision,
+                    str(session_data["video_path"]),
+                    json.dumps(metadata, ensure_ascii=False),
+                    json.dumps(censor_index, ensure_ascii=False) if censor_index is not None else None,
+                    now,
+                    now,
+                ),
+            )
+            self._write_subtitles(connection, video_hash, ensure_subtitle_ids(session_data.get("subtitles") or []))
+            self._write_beeps(connection, video_hash, session_data.get("beep_intervals") or [])
+        return revision
+
+    def update(
+        self,
+        video_hash: str,
+        *,
+        subtitles: Sequence[Mapping[str, Any]] | None = None,
+        beep_intervals: Sequence[Sequence[Any]] | None = None,
+        metadata: Mapping[str, Any] | None = None,
+        censor_index: Mapping[str, Any] | None = None,
+        expected_revision: int | None = None,
+        revision: int | None = None,
+        clear_censor_index: bool = False,
+        changed_subtitles: Sequence[Mapping[str, Any]] | None = None,
+        removed_subtitle_ids: Iterable[int] = (),
+    ) -> int:
+        """Atualiza só as partes informadas, numa transação; retorna a nova revisão.
+
+        ``revision`` grava um número de revisão já atribuído fora do banco (a
+        escrita adiada do ``utils.session_cache``), desde que seja maior que o atual.
+        ``clear_censor_index`` descarta o índice de censura (legendas divididas ou juntadas).
+        Com ``changed_subtitles`` só essas legendas são gravadas (e as de
+        ``removed_subtitle_ids`` apagadas), sem comparar a lista ``subtitles`` inteira.
+
+        Raises:
+            KeyError: sessão inexistente.
+            RevisionConflict: ``expected_revision`` diferente da revisão atual.
+        """
+        if not self.exists(video_hash):
+            raise KeyError(video_hash)
+        with self._write() as connection:
+            revision = self._bump(connection, video_hash, expected_revision, revision)
+            if subtitles is not None and changed_subtitles is not None:
+                self._write_subtitle_changes(
+                    connection, video_hash, subtitles, changed_subtitles, removed_subtitle_ids
+                )
+            elif subtitles is not None:
+                self._write_subtitles(connection, video_hash, ensure_subtitle_ids(subtitles))
+            if beep_intervals is not None:
+                self._write_beeps(connection, video_hash, beep_intervals)
+            if metadata:
+                current = json.loads(
+                    connection.execute(
+                        "SELECT metadata FROM sessions WHERE video_hash = ?", (video_hash,)
+                    ).fetchone()[0]
+                )
+                current.update(metadata)
+                connection.execute(
+                    "UPDATE sessions SET metadata = ? WHERE video_hash = ?",
+                    (json.dumps(current, ensure_ascii=False), video_hash),
+                )
+            if censor_index is not None or clear_censor_index:
+                serialized = json.dumps(censor_index, ensure_ascii=False) if censor_index is not None else None
+                connection.execute(
+                    "UPDATE sessions SET censor_index = ? WHERE video_hash = ?", (serialized, video_hash)
+                )
+        return revision
+
+    def patch(
+        self,
+        video_hash: str,
+        operations: Sequence[Mapping[str, Any]],
+        expected_revision: int | None = None,
+    ) -> tuple[int, list[tuple[int, dict[str, Any]]], int | None, list[list] | None]:
+        """Aplica operações de ``utils.subtitle_patch`` numa única transação.
+
+        Só as linhas alteradas pelas operações são regravadas (dividir insere
+        uma linha, juntar apaga uma). Retorna a nova revisão, as legendas que
+        as operações alteraram ou criaram (posição, legenda), o novo total de
+        legendas e os beeps; os dois últimos são ``None`` quando nenhuma
+        operação mexeu neles. Dividir ou juntar legendas descarta o índice de
+        censura, que é posicional; mover uma legenda leva os novos tempos ao
+        índice e aos beeps automáticos dela.
+
+        Raises:
+            KeyError: sessão inexistente.
+            RevisionConflict: ``expected_revision`` diferente da revisão atual.
+            ValueError: operação inválida (nada é gravado).
+        """
+        if not self.exists(video_hash):
+            raise KeyError(video_hash)
+        edits_subtitles = touches_subtitles(operations)
+        edits_beeps = touches_beeps(operations)
+        restructures = restructures_subtitles(operations)
+        moved = [] if restructures else moved_positions(operations)
+        with self._write() as connection:
+            revision = self._bump(connection, video_hash, expected_revision)
+            result = apply_operations(
+                self._subtitles(connection, video_hash) if edits_subtitles else [],
+                self._beeps(connection, video_hash) if edits_beeps or moved else [],
+                operations,
+            )
+            subtitles, beeps = result.subtitles, result.beep_intervals
+            if edits_subtitles:
+                self._write_subtitle_changes(
+                    connection, video_hash, subtitles, [subtitle for _, subtitle in result.changed], result.removed
+                )
+            if restructures:
+                connection.execute("UPDATE sessions SET censor_index = NULL WHERE video_hash = ?", (video_hash,))
+            elif moved:
+                # Legendas movidas levam seus tempos (e beeps automáticos) para o índice
+                row = connection.execute(
+                    "SELECT censor_index FROM sessions WHERE video_hash = ?", (video_hash,)
+                ).fetchone()
+                retimed = retime_moved_segments(json.loads(row[0]), subtitles, moved, beeps) if row[0] else None
+                if retimed is not None:
+                    index_data, beeps = retimed
+                    connection.execute(
+                        "UPDATE sessions SET censor_index = ? WHERE video_hash = ?",
+                        (json.dumps(index_data, ensure_ascii=False), video_hash),
+                    )
+                    edits_beeps = True
+            if edits_beeps:
+                self._write_beeps(connection, video_hash, beeps)
+        return (
+            revision,
+            result.changed if edits_subtitles else [],
+            len(subtitles) if edits_subtitles else None,
+            beeps if edits_beeps else None,
+        )
+
+    @staticmethod
+    def _bump(
+        connection: sqlite3.Connection,
+        video_hash: str,
+        expected_revision: int | None,
+        new_revision: int | None = None,
+    ) -> int:
+        row = connection.execute(
+            "SELECT revision FROM sessions WHERE video_hash = ?", (video_hash,)
+        ).fetchone()
+        if row is None:
+            raise KeyError(video_hash)
+        current = row[0]
+        if expected_revision is not None and int(expected_revision) != current:
+            raise RevisionConflict(video_hash, int(expected_revision), current)
+        revision = new_revision if new_revision is not None and new_revision > current else current + 1
+        connection.execute(
+            "UPDATE sessions SET revision = ?, updated_at = ? WHERE video_hash = ?",
+            (revision, time.time(), video_hash),
+        )
+        return revision
+
+    @staticmethod
+    def _write_subtitles(
+        connection: sqlite3.Connection, video_hash: str, subtitles: Sequence[Mapping[str, Any]]
+    ) -> list[int]:
+        """Diferença por ``subtitle_id``: grava só as linhas novas, alteradas ou que mudaram de ordem.
+
+        ``subtitles`` precisa ter ids únicos (``ensure_subtitle_ids``). Retorna
+        os ids das legendas cujo conteúdo mudou ou que foram criadas.
+        """
+        stored = connection.execute(
+            "SELECT subtitle_id, sort_key, start, end, text, raw_text, confidence, extra FROM subtitles "
+            "WHERE video_hash = ?",
+            (video_hash,),
+        ).fetchall()
+        existing = {row[0]: (row[1], tuple(row[2:])) for row in stored}
+        rows = [_subtitle_row(subtitle) for subtitle in subtitles]
+        keys = _order_keys([existing[row[0]][0] if row[0] in existing else None for row in rows])
+
+        changed, writes = [], []
+        for row, key in zip(rows, keys):
+            current = existing.get(row[0])
+            if current is None or current[1] != row[1:]:
+                changed.append(row[0])
+                writes.append((video_hash, row[0], key, *row[1:]))
+            elif current[0] != key:
+                writes.append((video_hash, row[0], key, *row[1:]))
+        connection.executemany(
+            "INSERT OR REPLACE INTO subtitles "
+            "(video_hash, subtitle_id, sort_key, start, end, text, raw_text, confidence, extra) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+            writes,
+        )
+        removed = existing.keys() - {row[0] for row in rows}
+        connection.executemany(
+            "DELETE FROM subtitles WHERE video_hash = ? AND subtitle_id = ?",
+            [(video_hash, subtitle_id) for subtitle_id in removed],
+        )
+        return changed
+
+    @staticmethod
+    def _write_subtitle_changes(
+        connection: sqlite3.Connection,
+        video_hash: str,
+        subtitles: Sequence[Mapping[str, Any]],
+        changed: Sequence[Mapping[str, Any]],
+        removed: Iterable[int],
+    ) -> None:
+        """Grava só as legendas ``changed`` e apaga as de ``removed``.
+
+        Legendas já gravadas mantêm a chave de ordem; as novas recebem uma chave
+        entre as vizinhas na lista completa ``subtitles``, que só é percorrida
+        quando há legenda nova.
+        """
+        connection.executemany(
+            "DELETE FROM subtitles WHERE video_hash = ? AND subtitle_id = ?",
+            [(video_hash, subtitle_id) for subtitle_id in removed],
+        )
+        rows = {row[0]: row for row in (_subtitle_row(subtitle) for subtitle in changed)}
+        if not rows:
+            return
+        keys = _stored_sort_keys(connection, video_hash, rows)
+        new_ids = rows.keys() - keys.keys()
+        if new_ids:
+            # Trechos de legendas novas seguidas ficam entre as vizinhas já gravadas
+            order = [subtitle["id"] for subtitle in subtitles]
+            positions = [position for position, subtitle_id in enumerate(order) if subtitle_id in new_ids]
+            runs: list[tuple[int, int]] = []
+            for position in positions:
+                if runs and runs[-1][1] == position:
+                    runs[-1] = (runs[-1][0], position + 1)
+                else:
+                    runs.append((position, position + 1))
+            neighbours = {order[start - 1] for start, _ in runs if start} | {
+                order[end] for _, end in runs if end < len(order)
+            }
+            keys.update(_stored_sort_keys(connection, video_hash, neighbours - keys.keys()))
+            for start, end in runs:
+                low = keys.get(order[start - 1]) if start else 0
+                if end < len(order):
+                    high = keys.get(order[end])
+                else:
+                    high = low + ORDER_GAP * (end - start + 1) if low is not None else None
+                if low is None or high is None or (high - low) // (end - start + 1) < 1:
+                    # Sem folga entre as vizinhas (ou vizinha fora do banco): regravar pela lista inteira
+                    SessionRepository._write_subtitles(connection, video_hash, subtitles)
+                    return
+                step = (high - low) // (end - start + 1)
+                for offset in range(end - start):
+                    keys[order[start + offset]] = low + step * (offset + 1)
+        connection.executemany(
+            "INSERT OR REPLACE INTO subtitles "
+            "(video_hash, subtitle_id, sort_key, start, end, text, raw_text, confidence, extra) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+            [(video_hash, subtitle_id, keys[subtitle_id], *row[1:]) for subtitle_id, row in rows.items()],
+        )
+
+    @staticmethod
+    def _write_beeps(connection: sqlite3.Connection, video_hash: str, beeps: Sequence[Sequence[Any]]) -> None:
+        rows = [_beep_row(beep) for beep in beeps if isinstance(beep, (list, tuple)) and len(beep) >= 2]
+        connection.execute("DELETE FROM beeps WHERE video_hash = ?", (video_hash,))
+        connection.executemany(
+            "INSERT INTO beeps (video_hash, position, start, end, label) VALUES (?, ?, ?, ?, ?)",
+            [(video_hash, position, *row) for position, row in enumerate(rows)],
+        )
+
+    def delete(self, video_hash: str) -> bool:
+        with self._write() as connection:
+            cursor = connection.execute("DELETE FROM sessions WHERE video_hash = ?", (video_hash,))
+        return cursor.rowcount > 0
+
+    def prune(self, max_age_seconds: float) -> int:
+        """Remove sessões sem edição há mais de ``max_age_seconds``."""
+        if not self.path.exists():
+            return 0
+        with self._write() as connection:
+            cursor = connection.execute(
+                "DELETE FROM sessions WHERE updated_at < ?", (time.time() - max_age_seconds,)
+            )
+        return cursor.rowcount
+
+    # Importação dos JSON antigos
+
+    def import_json_file(self, session_file: Path | str) -> str | None:
+        session_file = Path(session_file)
+        try:
+            with session_file.open("r", encoding="utf-8") as f:
+                session_data = json.load(f)
+        except (OSError, json.JSONDecodeError) as exc:
+            logger.warning("Sessão JSON ilegível %s: %s", session_file.name, exc)
+            return None
+        video_hash = session_data.get("video_hash") or session_file.stem.removeprefix("session_")
+        session_data["video_hash"] = video_hash
+        if not self.exists_in_db(video_hash):
+            self.save(session_data)
+            logger.info("Sessão %s importada de %s", video_hash, session_file)
+        session_file.replace(session_file.with_name(session_file.name + ".imported"))
+        return video_hash
+
+    def exists_in_db(self, video_hash: str) -> bool:
+        with self._read() as connection:
+            return connection.execute(
+                "SELECT 1 FROM sessions WHERE video_hash = ?", (video_hash,)
+            ).fetchone() is not None
+
+    def import_json_sessions(self, directories: Iterable[Path | str] | None = None) -> int:
+        imported = 0
+        for directory in directories or self.legacy_dirs:
+            for session_file in sorted(Path(directory).glob("session_*.json")):
+                if self.import_json_file(session_file):
+                    imported += 1
+        return imported
+
+
+session_store = SessionRepository(
+    settings.session_db_path, legacy_dirs=(*LEGACY_SESSION_DIRS, settings.upload_dir)
+)
@@ -0,0 +1,145 @@
+"""Estatísticas de uso compartilhadas entre o servidor e os processos dos jobs.
+
+Transcrição e render rodam nos workers da fila (outros processos), então
+contadores guardados em variáveis do módulo só mostrariam o trabalho feito
+no processo web. ``SharedStats`` guarda cada grupo de contadores (``scope``)
+como JSON no banco SQLite dos jobs; cada atualização é uma transação curta
+``IMMEDIATE``, então incrementos de processos diferentes não se perdem.
+``LocalStats`` tem a mesma interface em memória (testes e uso avulso).
+"""
+from __future__ import annotations
+
+import json
+import logging
+import sqlite3
+import threading
+from pathlib import Path
+from typing import Any, Mapping
+
+try:
+    from app.config import settings
+except ImportError:  # pragma: no cover - fallback for script execution
+    from config import settings
+
+logger = logging.getLogger(__name__)
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS stats (
+    scope TEXT PRIMARY KEY,
+    data TEXT NOT NULL
+);
+"""
+
+
+def _merge(data: dict[str, Any], counters: Mapping[str, float] | None, values: Mapping[str, Any] | None) -> None:
+    for name, amount in (counters or {}).items():
+        data[name] = data.get(name, 0) + amount
+    data.update(values or {})
+
+
+class LocalStats:
+    """Contadores só deste processo."""
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._scopes: dict[str, dict[str, Any]] = {}
+
+    def update(
+        self, scope: str, counters: Mapping[str, float] | None = None, values: Mapping[str, Any] | None = None
+    ) -> None:
+        """Soma ``counters`` e grava ``values`` no grupo ``scope``."""
+        with self._lock:
+            _merge(self._scopes.setdefault(scope, {}), counters, values)
+
+    def get(self, scope: str) -> dict[str, Any]:
+        with self._lock:
+            return dict(self._scopes.get(scope, {}))
+
+    def scan(self, prefix: str) -> dict[str, dict[str, Any]]:
+        with self._lock:
+            return {scope: dict(data) for scope, data in self._scopes.items() if scope.startswith(prefix)}
+
+    def clear(self, prefix: str = "") -> None:
+        with self._lock:
+            for scope in [scope for scope in self._scopes if scope.startswith(prefix)]:
+                del self._scopes[scope]
+
+
+class SharedStats:
+    """Contadores gravados no SQLite, somados entre todos os processos.
+
+    Falhas do banco só geram aviso: estatística nunca interrompe uma transcrição.
+    """
+
+    def __init__(self, path: Path | str) -> None:
+        self.path = Path(path)
+        self._schema_lock = threading.Lock()
+        self._schema_ready = False
+
+    def _connect(self) -> sqlite3.Connection:
+        if not self._schema_ready:
+            with self._schema_lock:
+                if not self._schema_ready:
+                    self.path.parent.mkdir(parents=True, exist_ok=True)
+                    with sqlite3.connect(self.path, timeout=30) as connection:
+                        connection.execute("PRAGMA journal_mode=WAL")
+                        connection.executescript(_SCHEMA)
+                    connection.close()
+                    self._schema_ready = True
+        return sqlite3.connect(self.path, timeout=30, isolation_level=None)
+
+    def update(
+        self, scope: str, counters: Mapping[str, float] | None = None, values: Mapping[str, Any] | None = None
+    ) -> None:
+        """Soma ``counters`` e grava ``values`` no grupo ``scope``."""
+        try:
+            connection = self._connect()
+            try:
+                connection.execute("BEGIN IMMEDIATE")
+                try:
+                    row = connection.execute("SELECT data FROM stats WHERE scope = ?", (scope,)).fetchone()
+                    data = json.loads(row[0]) if row else {}
+                    _merge(data, counters, values)
+                    connection.execute(
+                        "INSERT INTO stats (scope, data) VALUES (?, ?) "
+                        "ON CONFLICT (scope) DO UPDATE SET data = excluded.data",
+                        (scope, json.dumps(data, ensure_ascii=False)),
+                    )
+                except BaseException:
+                    connection.execute("ROLLBACK")
+                    raise
+                connection.execute("COMMIT")
+            finally:
+                connection.close()
+        except (OSError, sqlite3.Error, ValueError) as exc:
+            logger.warning("Falha ao gravar estatísticas de %s: %s", scope, exc)
+
+    def get(self, scope: str) -> dict[str, Any]:
+        return self.scan(scope).get(scope, {})
+
+    def scan(self, prefix: str) -> dict[str, dict[str, Any]]:
+        try:
+            connection = self._connect()
+            try:
+                rows = connection.execute(
+                    "SELECT scope, data FROM stats WHERE substr(scope, 1, ?) = ?", (len(prefix), prefix)
+                ).fetchall()
+            finally:
+                connection.close()
+        except (OSError, sqlite3.Error) as exc:
+            logger.warning("Falha ao ler estatísticas (%s): %s", prefix, exc)
+            return {}
+        return {scope: json.loads(data) for scope, data in rows}
+
+    def clear(self, prefix: str = "") -> None:
+        try:
+            connection = self._connect()
+            try:
+                connection.execute("DELETE FROM stats WHERE substr(scope, 1, ?) = ?", (len(prefix), prefix))
+            finally:
+                connection.close()
+        except (OSError, sqlite3.Error) as exc:
+            logger.warning("Falha ao limpar estatísticas (%s): %s", prefix, exc)
+
+
+shared_stats = SharedStats(settings.jobs_db_path)
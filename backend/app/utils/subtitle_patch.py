@@ -0,0 +1,226 @@
+"""Operações de edição incremental sobre as legendas e os beeps de uma sessão.
+
+O frontend envia só o que mudou (uma lista de operações) em vez da lista
+inteira de legendas. As operações são aplicadas em ordem sobre cópias das
+listas (só as legendas tocadas são copiadas); qualquer operação inválida
+levanta ``ValueError`` e nada é gravado.
+
+Operações (``index`` é a posição da legenda na revisão que o cliente leu,
+já considerando as operações anteriores do mesmo lote):
+
+- ``{"op": "edit_text", "index": i, "text": "..."}``
+- ``{"op": "move", "index": i, "start": s, "end": e}`` (``start``/``end`` opcionais)
+- ``{"op": "split", "index": i, "at": t}`` divide no instante ``t``; o texto é
+  repartido pelas palavras, ou pelos campos opcionais ``text_before``/``text_after``
+- ``{"op": "merge", "index": i}`` junta a legenda ``i`` com a seguinte
+- ``{"op": "add_beep", "start": s, "end": e, "label": "..."}`` (``label`` opcional)
+- ``{"op": "remove_beep", "index": j}``
+"""
+from __future__ import annotations
+
+import copy
+from dataclasses import dataclass
+from typing import Any, Mapping, Sequence
+
+SUBTITLE_OPERATIONS = ("edit_text", "move", "split", "merge")
+# Mudam a quantidade de legendas (e a posição das seguintes)
+RESTRUCTURING_OPERATIONS = ("split", "merge")
+BEEP_OPERATIONS = ("add_beep", "remove_beep")
+
+
+def _number(operation: Mapping[str, Any], key: str, position: int) -> float:
+    try:
+        return float(operation[key])
+    except (KeyError, TypeError, ValueError):
+        raise ValueError(f"Operação {position}: '{key}' deve ser um número") from None
+
+
+def _index(operation: Mapping[str, Any], size: int, position: int, key: str = "index") -> int:
+    value = operation.get(key)
+    if isinstance(value, bool) or not isinstance(value, int) or not 0 <= value < size:
+        raise ValueError(f"Operação {position}: índice inválido {value!r}")
+    return value
+
+
+def _check_interval(start: float, end: float, position: int) -> None:
+    if start < 0 or end <= start:
+        raise ValueError(f"Operação {position}: intervalo inválido ({start}, {end})")
+
+
+def _split_words(text: str, fraction: float) -> tuple[str, str]:
+    words = text.split()
+    if len(words) < 2:
+        return text.strip(), ""
+    cut = min(len(words) - 1, max(1, round(len(words) * fraction)))
+    return " ".join(words[:cut]), " ".join(words[cut:])
+
+
+@dataclass(slots=True)
+class SubtitlePatch:
+    subtitles: list[dict[str, Any]]
+    beep_intervals: list[list]
+    # (posição, legenda) das legendas alteradas ou criadas, em ordem
+    changed: list[tuple[int, dict[str, Any]]]
+    # ids das legendas apagadas (juntadas na anterior)
+    removed: set[int]
+
+
+def apply_operations(
+    subtitles: Sequence[Mapping[str, Any]],
+    beep_intervals: Sequence[Sequence[Any]],
+    operations: Sequence[Mapping[str, Any]],
+) -> SubtitlePatch:
+    """Aplica as operações e retorna as novas listas de legendas e de beeps.
+
+    As listas devolvidas são novas, mas só as legendas tocadas pelas
+    operações são copiadas; as demais são os mesmos objetos recebidos.
+
+    Raises:
+        ValueError: operação desconhecida ou com parâmetros inválidos.
+    """
+    if not isinstance(operations, (list, tuple)) or not operations:
+        raise ValueError("Nenhuma operação enviada")
+
+    subtitles = list(subtitles)
+    beeps = list(beep_intervals)
+    # Cópias feitas neste lote (por id do objeto) e legendas criadas por divisão
+    owned: dict[int, dict[str, Any]] = {}
+    created: set[int] = set()
+    positions: set[int] = set()
+    removed: set[int] = set()
+    restructured = False
+    next_id: int | None = None
+
+    def own(position: int) -> dict[str, Any]:
+        subtitle = subtitles[position]
+        if id(subtitle) not in owned:
+            subtitle = copy.deepcopy(dict(subtitle))
+            subtitles[position] = subtitle
+            owned[id(subtitle)] = subtitle
+        positions.add(position)
+        return subtitle
+
+    for position, operation in enumerate(operations):
+        if not isinstance(operation, Mapping):
+            raise ValueError(f"Operação {position}: formato inválido")
+        kind = operation.get("op")
+
+        if kind == "edit_text":
+            index = _index(operation, len(subtitles), position)
+            text = operation.get("text")
+            if not isinstance(text, str):
+                raise ValueError(f"Operação {position}: 'text' deve ser texto")
+            own(index)["text"] = text
+
+        elif kind == "move":
+            index = _index(operation, len(subtitles), position)
+            subtitle = subtitles[index]
+            start = _number(operation, "start", position) if "start" in operation else subtitle["start"]
+            end = _number(operation, "end", position) if "end" in operation else subtitle["end"]
+            _check_interval(start, end, position)
+            subtitle = own(index)
+            subtitle["start"], subtitle["end"] = start, end
+
+        elif kind == "split":
+            index = _index(operation, len(subtitles), position)
+            subtitle = subtitles[index]
+            at = _number(operation, "at", position)
+            if not subtitle["start"] < at < subtitle["end"]:
+                raise ValueError(f"Operação {position}: ponto de divisão fora da legenda")
+            if next_id is None:
+                next_id = max((int(sub.get("id") or 0) for sub in subtitles), default=-1) + 1
+            subtitle = own(index)
+            fraction = (at - subtitle["start"]) / (subtitle["end"] - subtitle["start"])
+            text_before, text_after = _split_words(subtitle["text"], fraction)
+            second = dict(subtitle, id=next_id, start=at)
+            next_id += 1
+            subtitle["end"] = at
+            subtitle["text"] = str(operation.get("text_before", text_before))
+            second["text"] = str(operation.get("text_after", text_after))
+            if subtitle.get("raw_text") is not None:
+                subtitle["raw_text"], second["raw_text"] = _split_words(subtitle["raw_text"], fraction)
+            subtitles.insert(index + 1, second)
+            owned[id(second)] = second
+            created.add(id(second))
+            restructured = True
+
+        elif kind == "merge":
+            index = _index(operation, len(subtitles) - 1, position)
+            first = own(index)
+            second = subtitles.pop(index + 1)
+            if id(second) not in created:
+                removed.add(second.get("id"))
+            first["end"] = max(first["end"], second["end"])
+            first["text"] = " ".join(part for part in (first["text"], second["text"]) if part)
+            if first.get("raw_text") is not None or second.get("raw_text") is not None:
+                first["raw_text"] = " ".join(
+                    part for part in (first.get("raw_text"), second.get("raw_text")) if part
+                )
+            if "confidence" in first and "confidence" in second:
+                first["confidence"] = min(first["confidence"], second["confidence"])
+            restructured = True
+
+        elif kind == "add_beep":
+            start = _number(operation, "start", position)
+            end = _number(operation, "end", position)
+            _check_interval(start, end, position)
+            label = operation.get("label")
+            beeps.append([start, end] if label is None else [start, end, str(label)])
+            beeps.sort(key=lambda beep: (beep[0], beep[1]))
+
+        elif kind == "remove_beep":
+            beeps.pop(_index(operation, len(beeps), position))
+
+        else:
+            raise ValueError(f"Operação {position}: tipo desconhecido {kind!r}")
+
+    if restructured:
+        # Dividir/juntar deslocam as posições seguintes (a lista já foi movida por inteiro)
+        changed = [(index, subtitle) for index, subtitle in enumerate(subtitles) if id(subtitle) in owned]
+    else:
+        changed = [(index, subtitles[index]) for index in sorted(positions)]
+    return SubtitlePatch(subtitles, beeps, changed, removed)
+
+
+def ensure_subtitle_ids(subtitles: Sequence[Mapping[str, Any]]) -> list[dict[str, Any]]:
+    """Garante um ``id`` inteiro e único por legenda (a chave estável das linhas gravadas).
+
+    Legendas sem ``id`` ou com ``id`` repetido recebem um novo, depois do maior
+    existente; se todos já forem válidos a lista é devolvida sem cópias.
+    """
+    seen: set[int] = set()
+    missing = []
+    for position, subtitle in enumerate(subtitles):
+        subtitle_id = subtitle.get("id")
+        if isinstance(subtitle_id, bool) or not isinstance(subtitle_id, int) or subtitle_id in seen:
+            missing.append(position)
+        else:
+            seen.add(subtitle_id)
+    if not missing:
+        return subtitles if isinstance(subtitles, list) else list(subtitles)
+
+    result = [subtitle if isinstance(subtitle, dict) else dict(subtitle) for subtitle in subtitles]
+    next_id = max(seen, default=-1) + 1
+    for position in missing:
+        result[position] = dict(result[position], id=next_id)
+        next_id += 1
+    return result
+
+
+def touches_beeps(operations: Sequence[Mapping[str, Any]]) -> bool:
+    return any(isinstance(op, Mapping) and op.get("op") in BEEP_OPERATIONS for op in operations)
+
+
+def restructures_subtitles(operations: Sequence[Mapping[str, Any]]) -> bool:
+    return any(isinstance(op, Mapping) and op.get("op") in RESTRUCTURING_OPERATIONS for op in operations)
+
+
+def moved_positions(operations: Sequence[Mapping[str, Any]]) -> list[int]:
+    """Posições das legendas movidas (válidas só em lotes sem dividir/juntar)."""
+    return sorted({
+        op["index"] for op in operations if isinstance(op, Mapping) and op.get("op") == "move"
+    })
+
+
+def touches_subtitles(operations: Sequence[Mapping[str, Any]]) -> bool:
+    return any(isinstance(op, Mapping) and op.get("op") in SUBTITLE_OPERATIONS for op in operations)
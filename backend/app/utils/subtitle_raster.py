@@ -0,0 +1,123 @@
+"""Rasterização das legendas com Pillow, sem chamar o ImageMagick.
+
+O ``TextClip`` do MoviePy abre um processo do ImageMagick e lê um PNG de volta
+para cada linha de legenda. Aqui o texto é desenhado em memória com a fonte já
+resolvida e os bitmaps ficam em um cache LRU: linhas repetidas (como as
+mascaradas com ``****``) são desenhadas uma única vez.
+"""
+from __future__ import annotations
+
+import logging
+from functools import lru_cache
+
+import numpy as np
+from PIL import Image, ImageDraw, ImageFont
+
+from .subtitle_style import parse_color
+
+logger = logging.getLogger(__name__)
+
+RASTER_CACHE_SIZE = 512
+LINE_SPACING = 1.15
+
+
+@lru_cache(maxsize=16)
+def _load_font(font_path: str | None, font_size: int) -> ImageFont.FreeTypeFont | ImageFont.ImageFont:
+    if font_path:
+        try:
+            return ImageFont.truetype(font_path, size=font_size)
+        except OSError:
+            logger.warning("Não foi possível carregar a fonte %s; usando a fonte padrão", font_path)
+    return ImageFont.load_default(size=font_size)
+
+
+def _wrap_lines(text: str, font, max_width: int, stroke_width: int) -> list[str]:
+    """Quebra o texto em linhas que cabem em ``max_width``, como o modo caption."""
+    lines: list[str] = []
+    for paragraph in text.splitlines() or [""]:
+        words = paragraph.split()
+        if not words:
+            lines.append("")
+            continue
+        current = words[0]
+        for word in words[1:]:
+            candidate = f"{current} {word}"
+            if font.getlength(candidate) + 2 * stroke_width <= max_width:
+                current = candidate
+            else:
+                lines.append(current)
+                current = word
+        lines.append(current)
+    return lines
+
+
+@lru_cache(maxsize=RASTER_CACHE_SIZE)
+def render_text_image(
+    text: str,
+    font_path: str | None,
+    font_size: int,
+    color: str,
+    bg_color: str | None,
+    stroke_color: str | None,
+    stroke_width: int,
+    size: tuple[int, int] | None,
+    align: str = "center",
+    method: str = "caption",
+) -> np.ndarray:
+    """Desenha ``text`` e retorna um array RGBA ``uint8`` somente leitura.
+
+    Com ``size`` a imagem tem o tamanho da faixa da legenda, com o texto
+    centralizado verticalmente (no modo ``caption`` as linhas são quebradas na
+    largura da faixa); sem ``size`` a imagem se ajusta ao texto.
+    """
+    font = _load_font(font_path, font_size)
+    fill = parse_color(color) or (255, 255, 255, 255)
+    background = parse_color(bg_color) or (0, 0, 0, 0)
+    stroke = parse_color(stroke_color) if stroke_width > 0 else None
+    stroke_px = stroke_width if stroke is not None else 0
+
+    if size and method == "caption":
+        lines = _wrap_lines(text, font, size[0], stroke_px)
+    else:
+        lines = text.splitlines() or [""]
+
+    ascent, descent = font.getmetrics() if hasattr(font, "getmetrics") else (font_size, 0)
+    line_height = int(round((ascent + descent) * LINE_SPACING))
+    widths = [int(np.ceil(font.getlength(line))) + 2 * stroke_px for line in lines]
+    text_height = line_height * (len(lines) - 1) + ascent + descent + 2 * stroke_px
+
+    if size:
+        width, height = int(size[0]), int(size[1])
+    else:
+        width, height = max(widths, default=1) or 1, text_height
+
+    image = Image.new("RGBA", (max(1, width), max(1, height)), background)
+    draw = ImageDraw.Draw(image)
+    top = (height - text_height) // 2
+    for index, line in enumerate(lines):
+        if align in ("west", "left"):
+            left = 0
+        elif align in ("east", "right"):
+            left = width - widths[index]
+        else:
+            left = (width - widths[index]) // 2
+        draw.text(
+            (left + stroke_px, top + stroke_px + index * line_height),
+            line,
+            font=font,
+            fill=fill,
+            stroke_width=stroke_px,
+            stroke_fill=stroke,
+        )
+
+    pixels = np.asarray(image, dtype=np.uint8)
+    pixels.flags.writeable = False
+    return pixels
+
+
+def raster_cache_info():
+    return render_text_image.cache_info()
+
+
+def clear_raster_cache() -> None:
+    render_text_image.cache_clear()
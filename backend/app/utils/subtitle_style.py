@@ -0,0 +1,85 @@
+"""Cores e fontes das legendas em formatos independentes do MoviePy.
+
+As opções de ``SubtitleRenderingOptions`` usam a sintaxe de cores do
+ImageMagick (``white``, ``#ffcc00``, ``rgba(0,0,0,0.8)``). Estes utilitários
+convertem essas cores para RGBA e para o formato ``&HAABBGGRR`` do ASS, e
+descobrem o nome da família de uma fonte a partir do arquivo.
+"""
+from __future__ import annotations
+
+import logging
+import re
+from functools import lru_cache
+from pathlib import Path
+
+from PIL import ImageColor, ImageFont
+
+logger = logging.getLogger(__name__)
+
+RGBA = tuple[int, int, int, int]
+
+_FUNCTIONAL_COLOR = re.compile(r"^rgba?\(\s*([^)]*)\)$", re.IGNORECASE)
+
+
+def _channel(raw: str) -> int:
+    raw = raw.strip()
+    if raw.endswith("%"):
+        return round(float(raw[:-1]) * 2.55)
+    return int(float(raw))
+
+
+def _alpha(raw: str) -> int:
+    raw = raw.strip()
+    if raw.endswith("%"):
+        return round(float(raw[:-1]) * 2.55)
+    value = float(raw)
+    # rgba() do ImageMagick usa alfa entre 0 e 1
+    return round(value * 255) if value <= 1 else int(value)
+
+
+@lru_cache(maxsize=64)
+def parse_color(color: str | None) -> RGBA | None:
+    """Converte uma cor no formato do ImageMagick para RGBA; ``None`` se transparente."""
+    if color is None:
+        return None
+    value = str(color).strip()
+    if not value or value.lower() in {"none", "transparent"}:
+        return None
+
+    functional = _FUNCTIONAL_COLOR.match(value)
+    if functional:
+        parts = [part for part in functional.group(1).split(",")]
+        if len(parts) not in (3, 4):
+            raise ValueError(f"Cor inválida: {color}")
+        red, green, blue = (max(0, min(255, _channel(part))) for part in parts[:3])
+        alpha = max(0, min(255, _alpha(parts[3]))) if len(parts) == 4 else 255
+        rgba: RGBA = (red, green, blue, alpha)
+    else:
+        try:
+            parsed = ImageColor.getrgb(value)
+        except ValueError as exc:
+            raise ValueError(f"Cor inválida: {color}") from exc
+        rgba = parsed if len(parsed) == 4 else (*parsed, 255)
+
+    return None if rgba[3] == 0 else rgba
+
+
+def ass_color(rgba: RGBA | None) -> str:
+    """Formata a cor como ``&HAABBGGRR`` (no ASS o alfa é transparência: 00 é opaco)."""
+    if rgba is None:
+        return "&HFF000000"
+    red, green, blue, alpha = rgba
+    return f"&H{255 - alpha:02X}{blue:02X}{green:02X}{red:02X}"
+
+
+@lru_cache(maxsize=16)
+def font_family(font_path: str | None) -> str:
+    """Nome da família da fonte, usado pelo libass para localizá-la em ``fontsdir``."""
+    if not font_path:
+        return "Arial"
+    try:
+        family, _style = ImageFont.truetype(font_path, size=12).getname()
+    except (OSError, ValueError):
+        logger.warning("Não foi possível ler o nome da fonte %s; usando o nome do arquivo", font_path)
+        return Path(font_path).stem
+    return family or Path(font_path).stem
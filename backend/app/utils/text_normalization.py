@@ -0,0 +1,80 @@
+"""Normalização de texto para o filtro de palavrões.
+
+Remove acentos, desfaz substituições comuns de leetspeak (``p0rra``,
+``@belha``) e colapsa letras repetidas (``caralhooo``) em uma única passada,
+guardando para cada caractere normalizado o trecho do texto original de onde
+ele veio. Assim as ocorrências encontradas no texto normalizado podem ser
+mascaradas e cronometradas no texto original.
+"""
+from __future__ import annotations
+
+import unicodedata
+from dataclasses import dataclass
+from typing import Iterable
+
+# Dígitos só viram letras quando encostados em uma letra ("p0rra", mas não "2024")
+LEET_DIGITS = {"0": "o", "1": "i", "3": "e", "4": "a", "5": "s", "7": "t"}
+# Símbolos só viram letras dentro de palavras ("@belha", mas não "porra!")
+LEET_SYMBOLS = {"@": "a", "$": "s", "!": "i"}
+
+
+@dataclass(frozen=True, slots=True)
+class NormalizedText:
+    text: str
+    starts: tuple[int, ...]
+    ends: tuple[int, ...]
+
+    def original_span(self, start: int, end: int) -> tuple[int, int]:
+        """Converte o intervalo ``[start, end)`` normalizado para o texto original."""
+        return self.starts[start], self.ends[end - 1]
+
+
+def _is_word_char(char: str) -> bool:
+    return char.isalnum() or char == "_"
+
+
+def _fold_char(char: str) -> str:
+    if char.isascii():
+        return char.lower()
+    decomposed = unicodedata.normalize("NFKD", char)
+    return "".join(piece for piece in decomposed if not unicodedata.combining(piece)).lower()
+
+
+def normalize_with_offsets(text: str) -> NormalizedText:
+    pieces: list[str] = []
+    starts: list[int] = []
+    ends: list[int] = []
+    length = len(text)
+
+    for index, char in enumerate(text):
+        if char in LEET_DIGITS:
+            near_letter = (index > 0 and text[index - 1].isalpha()) or (
+                index + 1 < length and text[index + 1].isalpha()
+            )
+            folded = LEET_DIGITS[char] if near_letter else char
+        elif char in LEET_SYMBOLS:
+            next_is_word = index + 1 < length and _is_word_char(text[index + 1])
+            prev_is_word = index > 0 and _is_word_char(text[index - 1])
+            inside_word = next_is_word and (char != "!" or prev_is_word)
+            folded = LEET_SYMBOLS[char] if inside_word else char
+        else:
+            folded = _fold_char(char)
+
+        for piece in folded:
+            if pieces and piece.isalpha() and pieces[-1] == piece:
+                # Letra repetida: estende o trecho original do caractere anterior
+                ends[-1] = index + 1
+                continue
+            pieces.append(piece)
+            starts.append(index)
+            ends.append(index + 1)
+
+    return NormalizedText("".join(pieces), tuple(starts), tuple(ends))
+
+
+def normalize_word(word: str) -> str:
+    return normalize_with_offsets(word.strip()).text
+
+
+def normalize_words(words: Iterable[str]) -> tuple[str, ...]:
+    return tuple(normalized for normalized in (normalize_word(word) for word in words) if normalized)
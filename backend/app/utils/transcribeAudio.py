@@ -1,21 +1,116 @@
-import whisper
+import logging
 import os
+import time
+import wave
 
-def transcribe_audio(audio_path):
-    """Transcreve o áudio usando Whisper e retorna o texto e os tempos."""
-    if not os.path.exists(audio_path):
-        print(f"Erro: O arquivo {audio_path} não foi encontrado.")
+import numpy as np
+
+try:
+    from app.config import settings
+except ImportError:  # pragma: no cover - fallback for script execution
+    from config import settings
+from .audioExtract import WHISPER_SAMPLE_RATE
+from .chunked_transcription import transcribe_chunked
+from .model_registry import model_registry
+from .progress import ProgressReporter
+from .transcription_profiles import TranscriptionProfile, profile_metrics, resolve_profile
+
+logger = logging.getLogger(__name__)
+
+
+def _audio_duration_seconds(audio, transcribed_result=None) -> float:
+    if isinstance(audio, np.ndarray):
+        return len(audio) / float(WHISPER_SAMPLE_RATE)
+    try:
+        with wave.open(audio, 'rb') as wav_file:
+            return wav_file.getnframes() / float(wav_file.getframerate())
+    except (wave.Error, OSError, EOFError, ZeroDivisionError):
+        segments = (transcribed_result or {}).get('segments') or []
+        return float(segments[-1].get('end', 0.0)) if segments else 0.0
+
+
+def _should_chunk(audio) -> bool:
+    chunk_seconds = settings.transcription_chunk_seconds
+    return chunk_seconds > 0 and _audio_duration_seconds(audio) > chunk_seconds * 1.25
+
+
+def _transcribe_in_chunks(audio, profile: TranscriptionProfile, progress: ProgressReporter | None = None):
+    if not isinstance(audio, np.ndarray):
+        import whisper
+
+        audio = whisper.load_audio(audio)
+
+    return transcribe_chunked(
+        audio,
+        profile,
+        chunk_seconds=settings.transcription_chunk_seconds,
+        overlap_seconds=settings.transcription_chunk_overlap_seconds,
+        workers=settings.transcription_workers or None,
+        device=settings.whisper_device,
+        precision=settings.whisper_precision,
+        on_window_done=(
+            (lambda done, total: progress.update("transcription", done / total, f"janela {done}/{total}"))
+            if progress is not None
+            else None
+        ),
+    )
+
+
+def transcribe_audio(audio, profile: TranscriptionProfile | None = None, progress: ProgressReporter | None = None):
+    """Transcreve o áudio usando Whisper e retorna o texto e os tempos.
+
+    ``audio`` pode ser o caminho de um arquivo ou as amostras float32 mono em
+    16 kHz retornadas por ``load_audio_samples``. Com ``progress``, a etapa
+    ``transcription`` avança por janela (transcrição em pedaços) ou pela
+    duração prevista com o RTF médio do perfil.
+    """
+    if not isinstance(audio, np.ndarray) and not os.path.exists(audio):
+        logger.error("O arquivo %s não foi encontrado.", audio)
         return None
-    
+
+    profile = profile or resolve_profile()
+    model_key = model_registry.make_key(
+        profile.model,
+        settings.whisper_device,
+        settings.whisper_precision,
+    )
+
+    if progress is not None:
+        progress.start(
+            "transcription",
+            f"perfil {profile.name}",
+            profile_metrics.expected_seconds(profile, _audio_duration_seconds(audio)),
+        )
+
     try:
-        model = whisper.load_model("large")
-        transcribed_result = model.transcribe(
-            audio_path,
-            verbose=False,
-            word_timestamps=True,
-            task="transcribe",
+        if _should_chunk(audio):
+            started = time.perf_counter()
+            transcribed_result = _transcribe_in_chunks(audio, profile, progress)
+            elapsed = time.perf_counter() - started
+        else:
+            with model_registry.acquire(*model_key) as model:
+                started = time.perf_counter()
+                transcribed_result = model.transcribe(
+                    audio,
+                    verbose=False,
+                    task="transcribe",
+                    fp16=model_key[2] == "fp16",
+                    **profile.decode_options(),
+                )
+                elapsed = time.perf_counter() - started
+
+        audio_seconds = _audio_duration_seconds(audio, transcribed_result)
+        profile_metrics.record(profile, audio_seconds, elapsed)
+        if progress is not None:
+            progress.finish("transcription")
+        logger.info(
+            "Transcrição concluída (perfil=%s, modelo=%s) em %.1fs | RTF=%.2f",
+            profile.name,
+            profile.model,
+            elapsed,
+            elapsed / audio_seconds if audio_seconds > 0 else 0.0,
         )
         return transcribed_result
     except Exception as e:
-        print(f"Erro ao transcrever o áudio: {e}")
-        return None
\ No newline at end of file
+        logger.exception("Erro ao transcrever o áudio: %s", e)
+        return None
@@ -0,0 +1,170 @@
+"""Cache em disco dos resultados do Whisper, indexado por conteúdo + perfil."""
+from __future__ import annotations
+
+import hashlib
+import json
+import logging
+import os
+import tempfile
+import threading
+from pathlib import Path
+from typing import Any
+
+try:
+    from app.config import settings
+except ImportError:  # pragma: no cover - fallback for script execution
+    from config import settings
+from .shared_stats import LocalStats, shared_stats
+from .transcription_profiles import TranscriptionProfile
+
+logger = logging.getLogger(__name__)
+
+
+def _to_builtin(value: Any) -> Any:
+    # Resultados do Whisper podem conter escalares/arrays NumPy
+    if hasattr(value, "tolist"):
+        return value.tolist()
+    if hasattr(value, "item"):
+        return value.item()
+    raise TypeError(f"Tipo não serializável: {type(value).__name__}")
+
+
+class TranscriptionCache:
+    """Armazena transcrições como JSON compacto com despejo LRU limitado por tamanho.
+
+    A recência de cada entrada é o mtime do arquivo, atualizado a cada acerto;
+    ao ultrapassar ``max_bytes`` as entradas menos usadas são removidas.
+    Acertos e falhas vão para ``stats_store`` (o singleton usa o banco dos
+    jobs, para contar também as consultas feitas nos workers).
+    """
+
+    STATS_SCOPE = "transcription_cache"
+
+    def __init__(self, directory: Path | str, max_bytes: int, stats_store=None) -> None:
+        self.directory = Path(directory)
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self.stats_store = stats_store if stats_store is not None else LocalStats()
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_bytes > 0
+
+    @staticmethod
+    def make_key(content_hash: str, profile: TranscriptionProfile) -> str:
+        return hashlib.sha256(f"{content_hash}\n{profile.signature}".encode("utf-8")).hexdigest()
+
+    def _entry_path(self, key: str) -> Path:
+        return self.directory / f"{key}.json"
+
+    def _record_miss(self) -> None:
+        self.stats_store.update(self.STATS_SCOPE, {"misses": 1})
+
+    def get(self, content_hash: str, profile: TranscriptionProfile) -> dict | None:
+        """Retorna o resultado em cache ou ``None`` (contabilizando acerto/falha)."""
+        if not self.enabled:
+            return None
+
+        entry_path = self._entry_path(self.make_key(content_hash, profile))
+        try:
+            with entry_path.open("r", encoding="utf-8") as entry_file:
+                entry = json.load(entry_file)
+        except FileNotFoundError:
+            self._record_miss()
+            return None
+        except (OSError, json.JSONDecodeError) as exc:
+            logger.warning("Entrada de cache corrompida %s: %s", entry_path.name, exc)
+            entry_path.unlink(missing_ok=True)
+            self._record_miss()
+            return None
+
+        if entry.get("content_hash") != content_hash or entry.get("profile") != profile.signature:
+            self._record_miss()
+            return None
+
+        try:
+            os.utime(entry_path)
+        except OSError:
+            pass
+
+        self.stats_store.update(
+            self.STATS_SCOPE, {"hits": 1, "saved_seconds": float(entry.get("elapsed_seconds", 0.0))}
+        )
+        logger.info("Transcrição reaproveitada do cache (hash=%s, perfil=%s)", content_hash[:10], profile.name)
+        return entry["result"]
+
+    def put(
+        self,
+        content_hash: str,
+        profile: TranscriptionProfile,
+        result: dict | None,
+        *,
+        elapsed_seconds: float = 0.0,
+        audio_seconds: float = 0.0,
+    ) -> None:
+        if not self.enabled or result is None:
+            return
+
+        self.directory.mkdir(parents=True, exist_ok=True)
+        entry = {
+            "content_hash": content_hash,
+            "profile": profile.signature,
+            "elapsed_seconds": elapsed_seconds,
+            "audio_seconds": audio_seconds,
+            "result": result,
+        }
+        entry_path = self._entry_path(self.make_key(content_hash, profile))
+        fd, tmp_name = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "w", encoding="utf-8") as tmp_file:
+                json.dump(entry, tmp_file, ensure_ascii=False, separators=(",", ":"), default=_to_builtin)
+            os.replace(tmp_name, entry_path)
+        except Exception:
+            Path(tmp_name).unlink(missing_ok=True)
+            raise
+        self._evict()
+
+    def _entries(self) -> list[tuple[float, int, Path]]:
+        entries = []
+        for entry_path in self.directory.glob("*.json"):
+            try:
+                stat = entry_path.stat()
+            except OSError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, entry_path))
+        return entries
+
+    def _evict(self) -> None:
+        with self._lock:
+            entries = sorted(self._entries())
+            total = sum(size for _, size, _ in entries)
+            for _, size, entry_path in entries:
+                if total <= self.max_bytes:
+                    break
+                entry_path.unlink(missing_ok=True)
+                total -= size
+                logger.debug("Transcrição removida do cache (LRU): %s", entry_path.name)
+
+    def stats(self) -> dict[str, Any]:
+        entries = self._entries() if self.directory.exists() else []
+        counters = self.stats_store.get(self.STATS_SCOPE)
+        hits = counters.get("hits", 0)
+        misses = counters.get("misses", 0)
+        lookups = hits + misses
+        return {
+            "enabled": self.enabled,
+            "hits": hits,
+            "misses": misses,
+            "hit_rate": hits / lookups if lookups else 0.0,
+            "saved_seconds": counters.get("saved_seconds", 0.0),
+            "entries": len(entries),
+            "bytes": sum(size for _, size, _ in entries),
+            "max_bytes": self.max_bytes,
+        }
+
+
+transcription_cache = TranscriptionCache(
+    settings.cache_dir / "transcriptions",
+    settings.transcription_cache_max_mb * 1024 * 1024,
+    stats_store=shared_stats,
+)
@@ -0,0 +1,225 @@
+"""Perfis de transcrição (modelo + parâmetros de decodificação do Whisper)."""
+from __future__ import annotations
+
+import json
+from dataclasses import dataclass, replace
+from typing import Any, Mapping, Tuple
+
+try:
+    from app.config import settings
+except ImportError:  # pragma: no cover - fallback for script execution
+    from config import settings
+from .shared_stats import LocalStats, shared_stats
+
+MODEL_SIZES: Tuple[str, ...] = ("tiny", "base", "small", "medium", "large")
+DEFAULT_TEMPERATURES: Tuple[float, ...] = (0.0, 0.2, 0.4, 0.6, 0.8, 1.0)
+
+
+@dataclass(frozen=True, slots=True)
+class TranscriptionProfile:
+    name: str
+    model: str = "large"
+    beam_size: int | None = 5
+    temperature: Tuple[float, ...] = DEFAULT_TEMPERATURES
+    word_timestamps: bool = True
+
+    @property
+    def signature(self) -> str:
+        """Identificador estável dos parâmetros que influenciam o resultado."""
+        temperatures = ",".join(f"{value:g}" for value in self.temperature)
+        return (
+            f"model={self.model};beam={self.beam_size or 0};"
+            f"temperature={temperatures};words={int(self.word_timestamps)}"
+        )
+
+    def decode_options(self) -> dict[str, Any]:
+        options: dict[str, Any] = {
+            "temperature": self.temperature if len(self.temperature) > 1 else self.temperature[0],
+            "word_timestamps": self.word_timestamps,
+        }
+        if self.beam_size:
+            options["beam_size"] = self.beam_size
+        return options
+
+    def to_dict(self) -> dict[str, Any]:
+        return {
+            "name": self.name,
+            "model": self.model,
+            "beam_size": self.beam_size,
+            "temperature": list(self.temperature),
+            "word_timestamps": self.word_timestamps,
+        }
+
+
+def available_profiles() -> dict[str, TranscriptionProfile]:
+    """Perfis embutidos; o perfil ``accurate`` usa o modelo configurado em ``Settings``."""
+    return {
+        "draft": TranscriptionProfile(
+            "draft", model="base", beam_size=None, temperature=(0.0,), word_timestamps=False
+        ),
+        "fast": TranscriptionProfile(
+            "fast", model="small", beam_size=1, temperature=(0.0, 0.4, 0.8), word_timestamps=True
+        ),
+        "accurate": TranscriptionProfile("accurate", model=settings.whisper_model),
+    }
+
+
+_TRUE_VALUES = {"1", "true", "yes", "on"}
+_FALSE_VALUES = {"0", "false", "no", "off"}
+
+
+def _is_number(value: Any) -> bool:
+    return isinstance(value, (int, float)) and not isinstance(value, bool)
+
+
+def _coerce_temperature(value: Any) -> Tuple[float, ...]:
+    if _is_number(value):
+        values = (float(value),)
+    elif isinstance(value, (list, tuple)) and all(_is_number(item) for item in value):
+        values = tuple(float(item) for item in value)
+    else:
+        raise ValueError("temperature deve ser um número ou uma lista de números")
+    if not values or any(item < 0 or item > 1 for item in values):
+        raise ValueError("temperature deve conter valores entre 0 e 1")
+    return values
+
+
+def _coerce_beam_size(value: Any) -> int:
+    if isinstance(value, str) and value.strip().isdigit():
+        value = int(value.strip())
+    if not isinstance(value, int) or isinstance(value, bool):
+        raise ValueError("beam_size deve ser um número inteiro")
+    if value < 1:
+        raise ValueError("beam_size deve ser >= 1")
+    return value
+
+
+def _coerce_bool(value: Any, field_name: str) -> bool:
+    """Aceita booleanos, 0/1 e os mesmos textos de ``config._parse_bool`` (``"false"`` é falso)."""
+    if isinstance(value, bool):
+        return value
+    if isinstance(value, int) and value in (0, 1):
+        return bool(value)
+    if isinstance(value, str):
+        token = value.strip().lower()
+        if token in _TRUE_VALUES:
+            return True
+        if token in _FALSE_VALUES:
+            return False
+    raise ValueError(f"{field_name} deve ser verdadeiro ou falso")
+
+
+def resolve_profile(
+    name: str | None = None,
+    overrides: Mapping[str, Any] | None = None,
+) -> TranscriptionProfile:
+    """Resolve um perfil pelo nome e aplica ajustes opcionais.
+
+    Raises:
+        ValueError: perfil desconhecido ou parâmetros inválidos.
+    """
+    profiles = available_profiles()
+    if name is not None and not isinstance(name, str):
+        raise ValueError("O nome do perfil de transcrição deve ser texto")
+    profile_name = (name or settings.transcription_profile).strip().lower()
+    if profile_name not in profiles:
+        raise ValueError(
+            f"Perfil de transcrição desconhecido: {profile_name} "
+            f"(disponíveis: {', '.join(sorted(profiles))})"
+        )
+    profile = profiles[profile_name]
+    if not overrides:
+        return profile
+
+    changes: dict[str, Any] = {}
+    if overrides.get("model") is not None:
+        if not isinstance(overrides["model"], str):
+            raise ValueError("model deve ser texto")
+        model = overrides["model"].strip().lower()
+        if model not in MODEL_SIZES:
+            raise ValueError(f"Modelo inválido: {model} (use {', '.join(MODEL_SIZES)})")
+        changes["model"] = model
+    if "beam_size" in overrides:
+        beam_size = overrides["beam_size"]
+        if beam_size is not None:
+            beam_size = _coerce_beam_size(beam_size)
+        changes["beam_size"] = beam_size
+    if overrides.get("temperature") is not None:
+        changes["temperature"] = _coerce_temperature(overrides["temperature"])
+    if overrides.get("word_timestamps") is not None:
+        changes["word_timestamps"] = _coerce_bool(overrides["word_timestamps"], "word_timestamps")
+
+    return replace(profile, **changes) if changes else profile
+
+
+def parse_profile_request(raw_value: Any) -> TranscriptionProfile:
+    """Interpreta o perfil enviado pelo cliente.
+
+    Aceita o nome do perfil (``"fast"``), um objeto JSON serializado
+    (``'{"name": "fast", "model": "small"}'``) ou um dicionário já decodificado.
+    """
+    if raw_value is None or raw_value == "":
+        return resolve_profile()
+    if isinstance(raw_value, Mapping):
+        return resolve_profile(raw_value.get("name"), raw_value)
+    if isinstance(raw_value, str):
+        stripped = raw_value.strip()
+        if stripped.startswith("{"):
+            try:
+                parsed = json.loads(stripped)
+            except json.JSONDecodeError as exc:
+                raise ValueError(f"Perfil de transcrição inválido: {exc}") from exc
+            return parse_profile_request(parsed)
+        return resolve_profile(stripped)
+    raise ValueError("Perfil de transcrição inválido")
+
+
+class ProfileMetrics:
+    """Acumula o fator de tempo real (tempo de processamento / duração do áudio) por perfil.
+
+    Os totais ficam em ``stats_store``; o singleton usa o banco dos jobs, então
+    as transcrições feitas nos workers entram na média e na previsão de tempo.
+    """
+
+    SCOPE_PREFIX = "profile:"
+
+    def __init__(self, stats_store=None) -> None:
+        self.stats_store = stats_store if stats_store is not None else LocalStats()
+
+    def record(self, profile: TranscriptionProfile, audio_seconds: float, elapsed_seconds: float) -> None:
+        if audio_seconds <= 0:
+            return
+        self.stats_store.update(
+            self.SCOPE_PREFIX + profile.signature,
+            {"runs": 1, "audio_seconds": audio_seconds, "processing_seconds": elapsed_seconds},
+            {"profile": profile.to_dict(), "last_rtf": elapsed_seconds / audio_seconds},
+        )
+
+    def expected_seconds(self, profile: TranscriptionProfile, audio_seconds: float) -> float | None:
+        """Tempo de processamento previsto pelo RTF médio do perfil (``None`` sem histórico)."""
+        entry = self.stats_store.get(self.SCOPE_PREFIX + profile.signature)
+        if entry.get("audio_seconds", 0) <= 0:
+            return None
+        return audio_seconds * entry["processing_seconds"] / entry["audio_seconds"]
+
+    def snapshot(self) -> list[dict[str, Any]]:
+        result = []
+        for entry in self.stats_store.scan(self.SCOPE_PREFIX).values():
+            if entry.get("audio_seconds", 0) <= 0:
+                continue
+            item = {
+                "profile": entry.get("profile"),
+                "runs": entry.get("runs", 0),
+                "audio_seconds": entry["audio_seconds"],
+                "processing_seconds": entry.get("processing_seconds", 0.0),
+                "last_rtf": entry.get("last_rtf"),
+            }
+            item["rtf"] = item["processing_seconds"] / item["audio_seconds"]
+            result.append(item)
+        return result
+
+    def reset(self) -> None:
+        self.stats_store.clear(self.SCOPE_PREFIX)
+
+
+profile_metrics = ProfileMetrics(shared_stats)
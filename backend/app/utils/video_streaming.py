@@ -0,0 +1,76 @@
+"""Envio de vídeos com requisições parciais (Range) e condicionais (ETag/Last-Modified).
+
+O player do editor pede só os trechos que vai tocar ao buscar na linha do
+tempo; ``send_file`` com ``conditional=True`` responde ``206 Partial Content``
+para ``Range``, ``304 Not Modified`` para ``If-None-Match``/``If-Modified-Since``
+e respeita ``If-Range``. O ETag é o SHA-256 do conteúdo: o hash do upload para
+o vídeo original e, para vídeos gerados, o hash do arquivo calculado uma vez
+por versão (caminho, tamanho e mtime).
+
+O corpo usa o ``wsgi.file_wrapper`` do servidor (``sendfile`` sem cópia no
+gunicorn/uWSGI); com ``TEXTWAVES_VIDEO_X_SENDFILE`` o envio é delegado ao
+proxy reverso pelo cabeçalho ``X-Sendfile``.
+"""
+from __future__ import annotations
+
+import os
+import threading
+from pathlib import Path
+
+from flask import Response, send_file
+
+from .file_hashing import hash_file
+
+VIDEO_MIMETYPE = "video/mp4"
+
+_etag_cache: dict[tuple[str, int, int], str] = {}
+_etag_lock = threading.Lock()
+ETAG_CACHE_SIZE = 256
+
+
+def content_etag(path: str | os.PathLike) -> str:
+    """SHA-256 do arquivo, recalculado só quando o arquivo muda."""
+    resolved = Path(path).resolve()
+    stat = resolved.stat()
+    key = (str(resolved), stat.st_size, stat.st_mtime_ns)
+    with _etag_lock:
+        cached = _etag_cache.get(key)
+    if cached is not None:
+        return cached
+
+    etag = hash_file(resolved)
+    with _etag_lock:
+        if len(_etag_cache) >= ETAG_CACHE_SIZE:
+            _etag_cache.pop(next(iter(_etag_cache)))
+        _etag_cache[key] = etag
+    return etag
+
+
+def send_video(
+    path: str | os.PathLike,
+    *,
+    etag: str | None = None,
+    max_age: int | None = None,
+    download_name: str | None = None,
+    as_attachment: bool = False,
+) -> Response:
+    """Responde com o vídeo aceitando ``Range`` e requisições condicionais.
+
+    ``etag`` é o hash do conteúdo, quando já conhecido; sem ele o arquivo é
+    hasheado (uma vez por versão). ``max_age`` só deve ser usado quando a URL
+    identifica o conteúdo; sem ele o navegador revalida a cada uso.
+    """
+    absolute_path = os.path.abspath(path)
+    response = send_file(
+        absolute_path,
+        mimetype=VIDEO_MIMETYPE,
+        as_attachment=as_attachment,
+        download_name=download_name,
+        conditional=True,
+        etag=etag or content_etag(absolute_path),
+        max_age=max_age,
+    )
+    response.headers["Accept-Ranges"] = "bytes"
+    if not max_age:
+        response.headers["Cache-Control"] = "no-cache"
+    return response
@@ -0,0 +1,158 @@
+"""Busca de palavras proibidas com autômato Aho-Corasick.
+
+Substitui a alternância gigante de regex: o autômato é construído uma vez por
+lista de palavras e encontra todas as ocorrências de um texto em uma única
+passada, preservando a semântica de ``\\b`` e ``re.IGNORECASE`` do filtro
+antigo.
+"""
+from __future__ import annotations
+
+import hashlib
+import threading
+from collections import OrderedDict, deque
+from dataclasses import dataclass
+from typing import Iterable
+
+MATCHER_CACHE_SIZE = 16
+
+
+@dataclass(frozen=True, slots=True)
+class WordHit:
+    start: int
+    end: int
+    text: str
+
+
+def _is_word_char(char: str) -> bool:
+    # Mesmo critério do \w do módulo re em modo unicode
+    return char.isalnum() or char == "_"
+
+
+def _is_boundary(text: str, position: int) -> bool:
+    before = position > 0 and _is_word_char(text[position - 1])
+    after = position < len(text) and _is_word_char(text[position])
+    return before != after
+
+
+def fold_case(text: str) -> str:
+    """Minúsculas preservando o comprimento, para que os índices continuem válidos."""
+    lowered = text.lower()
+    if len(lowered) == len(text):
+        return lowered
+    return "".join(char.lower() if len(char.lower()) == 1 else char for char in text)
+
+
+class WordMatcher:
+    """Autômato Aho-Corasick sobre as palavras já em minúsculas.
+
+    Em cada posição vence a ocorrência mais longa que respeita os limites de
+    palavra; as ocorrências retornadas não se sobrepõem.
+    """
+
+    def __init__(self, words: Iterable[str]) -> None:
+        self.words = tuple(sorted({fold_case(word) for word in words if word}))
+        self._goto: list[dict[str, int]] = [{}]
+        self._fail: list[int] = [0]
+        self._outputs: list[tuple[int, ...]] = [()]
+        self._build()
+
+    def _build(self) -> None:
+        terminal_lengths: list[int | None] = [None]
+        for word in self.words:
+            node = 0
+            for char in word:
+                next_node = self._goto[node].get(char)
+                if next_node is None:
+                    next_node = len(self._goto)
+                    self._goto[node][char] = next_node
+                    self._goto.append({})
+                    self._fail.append(0)
+                    terminal_lengths.append(None)
+                node = next_node
+            terminal_lengths[node] = len(word)
+
+        # Busca em largura para calcular links de falha e saídas herdadas
+        self._outputs = [()] * len(self._goto)
+        queue: deque[int] = deque()
+        for child in self._goto[0].values():
+            queue.append(child)
+            length = terminal_lengths[child]
+            self._outputs[child] = (length,) if length else ()
+        while queue:
+            node = queue.popleft()
+            for char, child in self._goto[node].items():
+                queue.append(child)
+                fallback = self._fail[node]
+                while fallback and char not in self._goto[fallback]:
+                    fallback = self._fail[fallback]
+                self._fail[child] = self._goto[fallback].get(char, 0)
+                length = terminal_lengths[child]
+                own = (length,) if length else ()
+                self._outputs[child] = own + self._outputs[self._fail[child]]
+
+    def __bool__(self) -> bool:
+        return bool(self.words)
+
+    def find_all(self, text: str) -> list[WordHit]:
+        """Retorna as ocorrências, da esquerda para a direita, sem sobreposição."""
+        if not self.words or not text:
+            return []
+
+        folded = fold_case(text)
+        goto, fail, outputs = self._goto, self._fail, self._outputs
+        # Para cada início, guarda o fim mais distante que respeita os limites
+        best_end: dict[int, int] = {}
+        node = 0
+        for index, char in enumerate(folded):
+            while node and char not in goto[node]:
+                node = fail[node]
+            node = goto[node].get(char, 0)
+            if not outputs[node]:
+                continue
+            end = index + 1
+            if not _is_boundary(text, end):
+                continue
+            for length in outputs[node]:
+                start = end - length
+                if end > best_end.get(start, -1) and _is_boundary(text, start):
+                    best_end[start] = end
+
+        hits: list[WordHit] = []
+        cursor = 0
+        for start in sorted(best_end):
+            if start < cursor:
+                continue
+            end = best_end[start]
+            hits.append(WordHit(start, end, text[start:end]))
+            cursor = end
+        return hits
+
+    def search(self, text: str) -> bool:
+        return bool(self.find_all(text))
+
+
+def word_list_fingerprint(words: Iterable[str]) -> str:
+    normalized = sorted({fold_case(word) for word in words if word})
+    return hashlib.sha256("\n".join(normalized).encode("utf-8")).hexdigest()
+
+
+_matcher_cache: "OrderedDict[str, WordMatcher]" = OrderedDict()
+_matcher_lock = threading.Lock()
+
+
+def get_matcher(words: Iterable[str]) -> WordMatcher:
+    """Retorna o autômato da lista, reaproveitando-o pelo fingerprint das palavras."""
+    word_list = tuple(words)
+    fingerprint = word_list_fingerprint(word_list)
+    with _matcher_lock:
+        matcher = _matcher_cache.get(fingerprint)
+        if matcher is not None:
+            _matcher_cache.move_to_end(fingerprint)
+            return matcher
+
+    matcher = WordMatcher(word_list)
+    with _matcher_lock:
+        _matcher_cache[fingerprint] = matcher
+        while len(_matcher_cache) > MATCHER_CACHE_SIZE:
+            _matcher_cache.popitem(last=False)
+    return matcher
@@ -0,0 +1,84 @@
+"""Compara o envelope de ducking vetorizado com o laço por intervalo antigo.
+
+Simula o MoviePy pedindo o ganho de uma trilha de 1 hora em blocos; o laço
+antigo é medido em uma amostra de blocos e extrapolado para a trilha toda.
+
+Uso: python benchmarks/bench_ducking_envelope.py
+"""
+from __future__ import annotations
+
+import random
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+
+APP_PATH = Path(__file__).resolve().parents[1] / "app"
+if str(APP_PATH) not in sys.path:
+    sys.path.insert(0, str(APP_PATH))
+
+from utils.audio_ducking import DuckingEnvelope  # noqa: E402
+from utils.CreateVideoWinthSubtitles import AUDIO_BUFFER_SIZE  # noqa: E402
+
+SAMPLE_RATE = 44100
+TRACK_SECONDS = 3600.0
+BEEP_COUNTS = (10, 100, 1_000)
+LOOP_SAMPLE_CHUNKS = 200
+DUCK = 0.12
+
+
+def _loop_volume_curve(intervals, t):
+    # Implementação anterior de create_video_with_subtitles
+    t_array = np.atleast_1d(t)
+    result = np.ones_like(t_array, dtype=float)
+    for start, end in intervals:
+        mask = (t_array >= start) & (t_array <= end)
+        result[mask] = DUCK
+    return result
+
+
+def _intervals(rng: random.Random, count: int) -> list[tuple[float, float]]:
+    starts = sorted(rng.uniform(0, TRACK_SECONDS - 2) for _ in range(count))
+    return [(start, start + rng.uniform(0.2, 1.0)) for start in starts]
+
+
+def _chunk_times(chunk_size: int):
+    total = int(TRACK_SECONDS * SAMPLE_RATE)
+    for first in range(0, total, chunk_size):
+        yield np.arange(first, min(total, first + chunk_size)) / SAMPLE_RATE
+
+
+def _bench_loop(intervals, chunk_size: int) -> float:
+    chunks = int(np.ceil(TRACK_SECONDS * SAMPLE_RATE / chunk_size))
+    started = time.perf_counter()
+    for index, times in enumerate(_chunk_times(chunk_size)):
+        if index == LOOP_SAMPLE_CHUNKS:
+            break
+        _loop_volume_curve(intervals, times)
+    elapsed = time.perf_counter() - started
+    return elapsed * chunks / min(chunks, LOOP_SAMPLE_CHUNKS)
+
+
+def _bench_envelope(intervals, chunk_size: int) -> float:
+    started = time.perf_counter()
+    envelope = DuckingEnvelope(intervals, DUCK)
+    for times in _chunk_times(chunk_size):
+        envelope.gain(times)
+    return time.perf_counter() - started
+
+
+def main() -> None:
+    rng = random.Random(7)
+    print(f"Trilha de {TRACK_SECONDS / 60:.0f} min a {SAMPLE_RATE} Hz")
+    print(f"{'beeps':>6} | {'bloco':>6} | {'laço (s, estimado)':>18} | {'envelope (s)':>12}")
+    for count in BEEP_COUNTS:
+        intervals = _intervals(rng, count)
+        for chunk_size in (2000, AUDIO_BUFFER_SIZE):
+            loop = _bench_loop(intervals, chunk_size)
+            envelope = _bench_envelope(intervals, chunk_size)
+            print(f"{count:>6} | {chunk_size:>6} | {loop:>18.1f} | {envelope:>12.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,82 @@
+"""Mede a vazão da renderização em pedaços com 1 a N processos do FFmpeg.
+
+Gera um vídeo sintético, renderiza com cache de pedaços vazio para cada
+quantidade de processos e mostra quadros por segundo e o ganho sobre 1.
+
+Uso: python benchmarks/bench_parallel_render.py [segundos] [max_processos]
+"""
+from __future__ import annotations
+
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+APP_PATH = Path(__file__).resolve().parents[1] / "app"
+if str(APP_PATH) not in sys.path:
+    sys.path.insert(0, str(APP_PATH))
+
+from utils.chunked_render import ChunkCache, render_chunked  # noqa: E402
+from utils.CreateVideoWinthSubtitles import SubtitleRenderingOptions  # noqa: E402
+from utils.ffmpeg_tools import run_ffmpeg  # noqa: E402
+
+FPS = 30
+SIZE = "1280x720"
+
+
+def _make_source(path: Path, seconds: int) -> None:
+    run_ffmpeg(
+        [
+            "-y",
+            "-f", "lavfi", "-i", f"testsrc2=size={SIZE}:rate={FPS}",
+            "-f", "lavfi", "-i", "sine=frequency=440:sample_rate=44100",
+            "-t", str(seconds),
+            "-c:v", "libx264", "-preset", "veryfast", "-pix_fmt", "yuv420p",
+            "-c:a", "aac", "-shortest", str(path),
+        ]
+    )
+
+
+def _worker_counts(maximum: int) -> list[int]:
+    counts, value = [], 1
+    while value < maximum:
+        counts.append(value)
+        value *= 2
+    return counts + [maximum]
+
+
+def main() -> None:
+    seconds = int(sys.argv[1]) if len(sys.argv) > 1 else 60
+    max_workers = int(sys.argv[2]) if len(sys.argv) > 2 else (os.cpu_count() or 1)
+    subtitles = [(start, start + 2.5, f"Legenda número {start}") for start in range(0, seconds, 3)]
+    options = SubtitleRenderingOptions(font_path="")
+
+    with tempfile.TemporaryDirectory(prefix="bench_render_") as work_dir:
+        work_path = Path(work_dir)
+        source = work_path / "source.mp4"
+        _make_source(source, seconds)
+        print(f"Vídeo {SIZE} a {FPS} fps, {seconds}s, {len(subtitles)} legendas, {os.cpu_count()} núcleos")
+        print(f"{'processos':>9} | {'tempo (s)':>9} | {'quadros/s':>9} | ganho")
+
+        baseline = None
+        for workers in _worker_counts(max_workers):
+            cache = ChunkCache(work_path / f"chunks_{workers}", max_bytes=1 << 40)
+            started = time.perf_counter()
+            render_chunked(
+                str(source),
+                subtitles,
+                str(work_path / f"out_{workers}.mp4"),
+                options,
+                fps=FPS,
+                workers=workers,
+                cache=cache,
+            )
+            elapsed = time.perf_counter() - started
+            baseline = baseline or elapsed
+            throughput = seconds * FPS / elapsed
+            print(f"{workers:>9} | {elapsed:>9.1f} | {throughput:>9.0f} | {baseline / elapsed:.2f}x")
+
+
+if __name__ == "__main__":
+    main()
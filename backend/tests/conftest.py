@@ -21,3 +21,12 @@ def _restore_environment(monkeypatch):
         if key in os.environ:
             monkeypatch.delenv(key, raising=False)
     monkeypatch.setenv("JWT_SECRET_KEY", "test-secret-key")
+
+
+@pytest.fixture(autouse=True)
+def _isolate_shared_stats(monkeypatch, tmp_path):
+    """Keep counters recorded through the singletons out of the app cache directory."""
+    from utils.shared_stats import shared_stats
+
+    monkeypatch.setattr(shared_stats, "path", tmp_path / "shared_stats.sqlite3")
+    monkeypatch.setattr(shared_stats, "_schema_ready", False)
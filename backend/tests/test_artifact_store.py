@@ -0,0 +1,116 @@
+import hashlib
+import importlib
+import os
+import sys
+import time
+from pathlib import Path
+
+APP_PATH = Path(__file__).resolve().parents[1] / "app"
+if str(APP_PATH) not in sys.path:
+    sys.path.insert(0, str(APP_PATH))
+
+artifact_store = importlib.import_module("utils.artifact_store")
+
+
+def _video(tmp_path, name, content):
+    path = tmp_path / name
+    path.write_bytes(content)
+    return path
+
+
+def test_register_moves_file_under_content_hash(tmp_path):
+    store = artifact_store.ArtifactStore(tmp_path / "artifacts")
+    source = _video(tmp_path, "final_abc.mp4", b"video final")
+
+    artifact = store.register(source, "final_video", {"video_hash": "abc", "render_mode": "full"})
+
+    assert artifact.id == hashlib.sha256(b"video final").hexdigest()
+    assert not source.exists()
+    assert artifact.path == tmp_path / "artifacts" / artifact.id[:2] / f"{artifact.id}.mp4"
+    loaded = store.get(artifact.id)
+    assert loaded.size == len(b"video final")
+    assert loaded.metadata == {"video_hash": "abc", "render_mode": "full"}
+    assert loaded.kind == "final_video"
+
+
+def test_same_content_is_stored_once(tmp_path):
+    store = artifact_store.ArtifactStore(tmp_path / "artifacts")
+    first = store.register(_video(tmp_path, "a.mp4", b"igual"), "final_video")
+    second = store.register(_video(tmp_path, "b.mp4", b"igual"), "final_video", move=False)
+
+    assert first.id == second.id
+    assert len(list((tmp_path / "artifacts").glob("??/*.mp4"))) == 1
+    assert (tmp_path / "b.mp4").exists()
+
+
+def test_registering_known_content_keeps_metadata_and_retention(tmp_path):
+    store = artifact_store.ArtifactStore(tmp_path / "artifacts")
+    first = store.register(_video(tmp_path, "a.mp4", b"igual"), "final_video", {"render_mode": "full"})
+    past = time.time() - 7200
+    os.utime(first.path, (past, past))
+
+    second = store.register(_video(tmp_path, "b.mp4", b"igual"), "subtitled_video", {"render_mode": "remux"})
+
+    assert second == first
+    assert store.get(first.id, touch=False).metadata == {"render_mode": "full"}
+    assert first.path.stat().st_mtime == past
+    assert first.path.stat().st_atime > past
+    assert not (tmp_path / "b.mp4").exists()
+
+
+def test_invalid_or_missing_ids_are_not_found(tmp_path):
+    store = artifact_store.ArtifactStore(tmp_path / "artifacts")
+
+    assert store.get("../../etc/passwd") is None
+    assert store.get("0" * 64) is None
+
+
+def test_prune_applies_age_and_size_limits(tmp_path):
+    store = artifact_store.ArtifactStore(tmp_path / "artifacts")
+    old = store.register(_video(tmp_path, "old.mp4", b"a" * 100), "final_video")
+    middle = store.register(_video(tmp_path, "middle.mp4", b"b" * 100), "final_video")
+    recent = store.register(_video(tmp_path, "recent.mp4", b"c" * 100), "final_video")
+    now = time.time()
+    os.utime(old.path, (now - 7200, now - 7200))
+    os.utime(middle.path, (now - 60, now - 60))
+
+    assert store.prune(max_age_seconds=3600) == 1
+    assert store.get(old.id) is None
+
+    assert store.prune(max_bytes=150) == 1
+    assert store.get(middle.id, touch=False) is None
+    assert store.get(recent.id) is not None
+
+
+def test_register_prunes_when_over_budget_but_keeps_the_new_artifact(tmp_path):
+    store = artifact_store.ArtifactStore(tmp_path / "artifacts", max_bytes=250, prune_interval=3600)
+    first = store.register(_video(tmp_path, "first.mp4", b"a" * 100), "final_video")
+    second = store.register(_video(tmp_path, "second.mp4", b"b" * 100), "final_video")
+    now = time.time()
+    os.utime(first.path, (now - 120, now - 120))
+    os.utime(second.path, (now - 60, now - 60))
+
+    third = store.register(_video(tmp_path, "third.mp4", b"c" * 100), "final_video")
+
+    assert store.get(first.id, touch=False) is None
+    assert store.get(second.id, touch=False) is not None
+    assert store.get(third.id, touch=False) is not None
+
+    huge = store.register(_video(tmp_path, "huge.mp4", b"d" * 400), "final_video")
+    assert store.get(huge.id, touch=False) is not None
+
+
+def test_register_applies_age_retention_once_the_interval_elapses(tmp_path, monkeypatch):
+    store = artifact_store.ArtifactStore(tmp_path / "artifacts", max_age_seconds=3600, prune_interval=600)
+    old = store.register(_video(tmp_path, "old.mp4", b"a" * 100), "final_video")
+    past = time.time() - 7200
+    os.utime(old.path, (past, past))
+
+    store.register(_video(tmp_path, "soon.mp4", b"b" * 100), "final_video")
+    assert store.get(old.id, touch=False) is not None
+
+    clock = time.monotonic() + 601
+    monkeypatch.setattr(artifact_store.time, "monotonic", lambda: clock)
+    store.register(_video(tmp_path, "later.mp4", b"c" * 100), "final_video")
+
+    assert store.get(old.id, touch=False) is None
@@ -0,0 +1,58 @@
+import importlib
+import random
+import sys
+from pathlib import Path
+
+import numpy as np
+
+APP_PATH = Path(__file__).resolve().parents[1] / "app"
+if str(APP_PATH) not in sys.path:
+    sys.path.insert(0, str(APP_PATH))
+
+ducking = importlib.import_module("utils.audio_ducking")
+
+
+def _reference_gain(intervals, times, duck):
+    result = np.ones_like(times, dtype=float)
+    for start, end in intervals:
+        result[(times >= start) & (times <= end)] = duck
+    return result
+
+
+def test_merge_intervals_fuses_overlaps_and_drops_empty():
+    merged = ducking.merge_intervals([(5, 6), (1, 2), (1.5, 3), (3, 4), (7, 7)])
+    assert merged == [(1.0, 4.0), (5.0, 6.0)]
+
+
+def test_gain_matches_per_interval_loop():
+    rng = random.Random(3)
+    starts = [rng.uniform(0, 60) for _ in range(80)]
+    intervals = [(start, start + rng.uniform(0.05, 2.0)) for start in starts]
+    envelope = ducking.DuckingEnvelope(intervals, 0.2)
+
+    sorted_times = np.arange(0, 62, 1 / 800)
+    shuffled_times = sorted_times.copy()
+    np.random.default_rng(1).shuffle(shuffled_times)
+
+    for times in (sorted_times, shuffled_times):
+        assert np.array_equal(envelope.gain(times), _reference_gain(intervals, times, 0.2))
+    assert envelope.gain(intervals[0][0]) == 0.2
+    assert envelope.gain(-1.0) == 1.0
+
+
+def test_apply_broadcasts_over_stereo_frames():
+    envelope = ducking.DuckingEnvelope([(0.5, 1.0)], 0.0)
+    times = np.array([0.25, 0.75])
+    frame = np.ones((2, 2))
+
+    ducked = envelope.apply(frame, times)
+
+    assert ducked.tolist() == [[1.0, 1.0], [0.0, 0.0]]
+
+
+def test_sample_gains_fill_the_interval_slices():
+    envelope = ducking.DuckingEnvelope([(0.5, 0.75)], 0.25)
+
+    gains = envelope.sample_gains(sample_rate=8, num_samples=10)
+
+    assert gains.tolist() == [1, 1, 1, 1, 0.25, 0.25, 0.25, 1, 1, 1]
@@ -0,0 +1,37 @@
+import importlib
+import math
+import struct
+import sys
+import wave
+from pathlib import Path
+
+APP_PATH = Path(__file__).resolve().parents[1] / "app"
+if str(APP_PATH) not in sys.path:
+    sys.path.insert(0, str(APP_PATH))
+
+audio_module = importlib.import_module("utils.audioExtract")
+
+
+def _write_stereo_wav(path: Path, seconds: float, sample_rate: int = 44100) -> None:
+    frames = bytearray()
+    for index in range(int(seconds * sample_rate)):
+        value = int(12000 * math.sin(2 * math.pi * 440 * index / sample_rate))
+        frames += struct.pack("<hh", value, value)
+    with wave.open(str(path), "wb") as wav_file:
+        wav_file.setnchannels(2)
+        wav_file.setsampwidth(2)
+        wav_file.setframerate(sample_rate)
+        wav_file.writeframes(bytes(frames))
+
+
+def test_load_audio_samples_returns_mono_float32_at_16k(tmp_path):
+    source = tmp_path / "tone.wav"
+    _write_stereo_wav(source, seconds=1.5)
+
+    samples = audio_module.load_audio_samples(str(source))
+
+    assert samples.dtype.name == "float32"
+    assert samples.ndim == 1
+    assert abs(len(samples) - int(1.5 * audio_module.WHISPER_SAMPLE_RATE)) < 400
+    assert 0.2 < float(abs(samples).max()) <= 1.0
+    assert samples.flags.writeable
@@ -0,0 +1,93 @@
+import importlib
+import sys
+import wave
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+APP_PATH = Path(__file__).resolve().parents[1] / "app"
+if str(APP_PATH) not in sys.path:
+    sys.path.insert(0, str(APP_PATH))
+
+censor_audio = importlib.import_module("utils.censor_audio")
+
+RATE = 8000
+
+
+@pytest.fixture(autouse=True)
+def _clear_cache():
+    censor_audio.clear_censor_track_cache()
+    yield
+    censor_audio.clear_censor_track_cache()
+
+
+def test_pad_intervals_matches_previous_render_padding():
+    padded = censor_audio.pad_intervals([(1.0, 2.0, "porra"), (3.0, 3.0), ("x", 1)], duration=2.01)
+    assert padded == [(0.98, 2.01)]
+
+
+def test_track_stores_only_censored_samples_with_soft_edges():
+    track = censor_audio.CensorTrack([(1.0, 1.5), (1.4, 2.0), (10.0, 10.5)], RATE, 1000, 0.5)
+
+    assert track.intervals == [(1.0, 2.0), (10.0, 10.5)]
+    assert track.buffer.dtype == np.float32
+    assert track.buffer.size == int(1.5 * RATE)
+
+    block = track.block(int(1.0 * RATE), int(1.0 * RATE))
+    assert abs(block[0]) < 1e-6 and abs(block[-1]) < 0.01
+    assert 0.45 < np.abs(block).max() <= 0.5
+    assert not track.block(int(5 * RATE), 100).any()
+
+
+def test_at_reads_the_same_values_as_block():
+    track = censor_audio.CensorTrack([(0.5, 0.75)], RATE, 440, 0.6)
+    times = np.arange(0, 1, 1 / RATE)
+
+    assert np.allclose(track.at(times), track.block(0, RATE))
+
+
+def test_mix_ducks_and_adds_tone_to_every_channel():
+    track = censor_audio.CensorTrack([(0.5, 1.0)], RATE, 1000, 0.5)
+    envelope = track.ducking(0.0)
+    times = np.array([0.25, 0.7])
+    frame = np.ones((2, 2))
+
+    mixed = track.mix(frame, times, envelope)
+
+    assert mixed[0].tolist() == [1.0, 1.0]
+    assert mixed[1, 0] == mixed[1, 1] == pytest.approx(float(track.at(0.7)[0]))
+
+
+def test_silence_mutes_the_source():
+    track = censor_audio.get_censor_track([(0.5, 1.0)], RATE, sound="silence")
+
+    assert not track.buffer.any()
+    assert track.ducking(None).gain(0.75) == 0.0
+    assert track.ducking(None).gain(0.25) == 1.0
+
+
+def test_wav_sample_is_resampled_and_looped(tmp_path):
+    sample_path = tmp_path / "buzina.wav"
+    pcm = (np.sin(2 * np.pi * 200 * np.arange(1600) / 16000) * 16000).astype("<i2")
+    with wave.open(str(sample_path), "wb") as wav_file:
+        wav_file.setnchannels(1)
+        wav_file.setsampwidth(2)
+        wav_file.setframerate(16000)
+        wav_file.writeframes(pcm.tobytes())
+
+    track = censor_audio.get_censor_track([(0.0, 1.0)], RATE, volume=0.5, sound=str(sample_path))
+
+    assert track.buffer.size == RATE
+    assert 0.45 < np.abs(track.buffer).max() <= 0.5
+    with pytest.raises(ValueError):
+        censor_audio.parse_censor_sound(str(tmp_path / "faltando.wav"))
+
+
+def test_tracks_are_reused_for_identical_beeps():
+    first = censor_audio.get_censor_track([(1.0, 2.0)], RATE, 1000, 0.4)
+    second = censor_audio.get_censor_track([(1.0, 2.0)], RATE, 1000, 0.4)
+    other = censor_audio.get_censor_track([(1.0, 2.0)], RATE, 800, 0.4)
+
+    assert first is second
+    assert other is not first
@@ -0,0 +1,100 @@
+import importlib
+import json
+import sys
+from pathlib import Path
+
+APP_PATH = Path(__file__).resolve().parents[1] / "app"
+if str(APP_PATH) not in sys.path:
+    sys.path.insert(0, str(APP_PATH))
+
+index_module = importlib.import_module("utils.censor_index")
+profanity_module = importlib.import_module("utils.profanity_filter")
+
+SEGMENTS = [
+    {
+        "start": 0.0,
+        "end": 2.0,
+        "text": " que pôrra é essa abelha",
+        "words": [
+            {"word": " que", "start": 0.0, "end": 0.3},
+            {"word": " pôrra", "start": 0.3, "end": 0.8},
+            {"word": " é", "start": 0.8, "end": 0.9},
+            {"word": " essa", "start": 0.9, "end": 1.2},
+            {"word": " abelha", "start": 1.2, "end": 2.0},
+        ],
+    },
+    {"start": 2.0, "end": 4.0, "text": "Merda de dia, caralhooo"},
+    {"start": 4.0, "end": 6.0, "text": "não vale porra nenhuma"},
+]
+
+
+def test_index_results_match_censor_segments():
+    words = ["porra", "merda", "caralho", "porra nenhuma"]
+
+    index = index_module.CensorIndex.build(SEGMENTS, words, fuzzy=True)
+
+    assert index.results() == profanity_module.censor_segments(SEGMENTS, forbidden_words=words)
+
+
+def test_apply_words_only_touches_affected_segments():
+    index = index_module.CensorIndex.build(SEGMENTS, ["porra"], fuzzy=True)
+
+    changed = index.apply_words(["porra", "abelha"])
+
+    assert changed == {0}
+    assert index.sanitized_text(0) == " que ***** é essa ******"
+    assert [label for _, _, label in index.beep_intervals(0)] == ["pôrra", "abelha"]
+
+    assert index.apply_words(["abelha"]) == {0, 2}
+    assert index.sanitized_text(2) == "não vale porra nenhuma"
+
+
+def test_index_roundtrips_through_json():
+    index = index_module.CensorIndex.build(SEGMENTS, ["merda"], fuzzy=True)
+
+    restored = index_module.CensorIndex.from_dict(json.loads(json.dumps(index.to_dict())))
+
+    assert restored.results() == index.results()
+    assert restored.apply_words(["merda", "caralho"]) == {1}
+    assert restored.sanitized_text(1) == "***** de dia, *********"
+
+
+def test_recensor_session_preserves_manual_edits_and_beeps():
+    index = index_module.CensorIndex.build(SEGMENTS, ["porra"], fuzzy=True)
+    sanitized, beeps = index.results()
+    subtitles = [{"id": i, "text": text.strip()} for i, (_, _, text) in enumerate(sanitized)]
+    subtitles[2]["text"] = "texto corrigido à mão"
+    session_beeps = [list(beep) for beep in beeps] + [[5.5, 5.8, "manual"]]
+
+    changed, updated_beeps = index_module.recensor_session(
+        index, subtitles, session_beeps, ["abelha", "merda"]
+    )
+
+    assert changed == {0, 1, 2}
+    assert subtitles[0]["text"] == "que pôrra é essa ******"
+    assert subtitles[1]["text"] == "***** de dia, caralhooo"
+    assert subtitles[2]["text"] == "texto corrigido à mão"
+    labels = [beep[2] for beep in updated_beeps]
+    assert labels == ["abelha", "Merda", "manual"]
+
+
+def test_word_list_edit_touches_only_affected_segments(monkeypatch):
+    segments = [
+        {"start": float(i), "end": i + 1.0, "text": f"frase número {i} com palavras comuns"}
+        for i in range(2_000)
+    ]
+    for i in (7, 500, 1999):
+        segments[i]["text"] += " e merda"
+    index = index_module.CensorIndex.build(segments, ["abelha"], fuzzy=True)
+
+    def no_full_scan(*args, **kwargs):
+        raise AssertionError("a transcrição inteira não deve ser varrida")
+
+    # Termos comuns vêm da lista invertida: nenhum segmento é reprocessado
+    monkeypatch.setattr(index_module, "find_forbidden_words", no_full_scan)
+    monkeypatch.setattr(index, "_scan_term", no_full_scan)
+
+    assert index.apply_words(["abelha", "merda"]) == {7, 500, 1999}
+    assert index.apply_words(["abelha", "merda", "inexistente"]) == set()
+    assert index.apply_words(["abelha", "inexistente"]) == {7, 500, 1999}
+    assert index.diff_words(["abelha", "inexistente"]).changed == set()
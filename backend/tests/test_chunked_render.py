@@ -0,0 +1,139 @@
+import importlib
+import sys
+from pathlib import Path
+
+import pytest
+
+APP_PATH = Path(__file__).resolve().parents[1] / "app"
+if str(APP_PATH) not in sys.path:
+    sys.path.insert(0, str(APP_PATH))
+
+chunked_render = importlib.import_module("utils.chunked_render")
+ffmpeg_tools = importlib.import_module("utils.ffmpeg_tools")
+subtitles_module = importlib.import_module("utils.CreateVideoWinthSubtitles")
+
+OPTIONS = subtitles_module.SubtitleRenderingOptions(
+    font_path="/usr/share/fonts/truetype/dejavu/DejaVuSans.ttf"
+)
+
+
+@pytest.fixture
+def source_video(tmp_path):
+    path = tmp_path / "source.mp4"
+    ffmpeg_tools.run_ffmpeg(
+        [
+            "-f", "lavfi", "-i", "testsrc=size=160x120:rate=25",
+            "-f", "lavfi", "-i", "sine=frequency=300:sample_rate=44100",
+            "-t", "6", "-c:v", "libx264", "-pix_fmt", "yuv420p", "-c:a", "aac",
+            "-shortest", str(path),
+        ]
+    )
+    return path
+
+
+def _frame_count(path: Path) -> int:
+    frames = ffmpeg_tools.run_ffmpeg(
+        ["-i", str(path), "-map", "0:v", "-f", "rawvideo", "-pix_fmt", "gray", "-s", "8x8", "-"],
+        capture_stdout=True,
+    )
+    return len(frames) // 64
+
+
+def test_plan_chunks_keys_depend_only_on_overlapping_subtitles():
+    info = ffmpeg_tools.parse_probe_output("  Duration: 00:00:06.00, start: 0.000000, bitrate: 1 kb/s")
+    before = chunked_render.plan_chunks(info, [(0.5, 1.0, "um"), (4.5, 5.0, "dois")], 25, 2, "base")
+    after = chunked_render.plan_chunks(info, [(0.5, 1.0, "um"), (4.5, 5.0, "dois!")], 25, 2, "base")
+
+    assert [chunk.frames for chunk in before] == [50, 50, 50]
+    assert before[2].subtitles == ((0.5, 1.0, "dois"),)
+    assert [a.key == b.key for a, b in zip(before, after)] == [True, True, False]
+
+
+def test_editing_one_line_reencodes_only_its_chunk(tmp_path, source_video):
+    cache = chunked_render.ChunkCache(tmp_path / "chunks", max_bytes=1 << 30)
+    output = tmp_path / "final.mp4"
+
+    def render(subtitles):
+        return chunked_render.render_chunked(
+            str(source_video),
+            subtitles,
+            str(output),
+            OPTIONS,
+            beep_intervals=[(1.0, 1.5)],
+            fps=25,
+            chunk_seconds=2,
+            cache=cache,
+        )
+
+    first = render([(0.5, 1.5, "primeira"), (4.2, 5.0, "terceira")])
+    second = render([(0.5, 1.5, "primeira"), (4.2, 5.0, "terceira corrigida")])
+
+    assert (first.chunks, first.encoded, first.reused) == (3, 3, 0)
+    assert (second.encoded, second.reused) == (1, 2)
+
+    info = ffmpeg_tools.probe_video(output)
+    assert info.has_audio
+    assert abs(info.duration - 6.0) < 0.2
+    assert _frame_count(output) == 150
+
+
+def test_parallel_workers_produce_the_same_timeline(tmp_path, source_video):
+    cache = chunked_render.ChunkCache(tmp_path / "chunks", max_bytes=1 << 30)
+    output = tmp_path / "parallel.mp4"
+
+    stats = chunked_render.render_chunked(
+        str(source_video),
+        [(0.5, 5.5, "legenda longa")],
+        str(output),
+        OPTIONS,
+        fps=25,
+        chunk_seconds=1,
+        workers=3,
+        cache=cache,
+    )
+
+    assert (stats.chunks, stats.encoded) == (6, 6)
+    assert _frame_count(output) == 150
+
+
+def test_chunks_cap_bitrate_from_the_source(tmp_path, source_video, monkeypatch):
+    commands = []
+    real_run = chunked_render.run_ffmpeg
+
+    def spy(args, **kwargs):
+        commands.append(list(args))
+        return real_run(args, **kwargs)
+
+    monkeypatch.setattr(chunked_render, "run_ffmpeg", spy)
+    info = ffmpeg_tools.probe_video(str(source_video))
+    chunked_render.render_chunked(
+        str(source_video),
+        [(0.5, 2.0, "primeira")],
+        str(tmp_path / "out.mp4"),
+        OPTIONS,
+        chunk_seconds=3,
+        workers=1,
+        cache=chunked_render.ChunkCache(tmp_path / "chunks", 64 * 1024 * 1024),
+    )
+
+    chunk_commands = [args for args in commands if "-filter_complex_script" in args]
+    assert chunk_commands and info.bit_rate
+    for args in chunk_commands:
+        assert args[args.index("-maxrate") + 1] == str(info.bit_rate * 2)
+
+
+@pytest.mark.parametrize("chunked, expected", [(False, "single"), (True, "chunked")])
+def test_chunked_mode_follows_only_the_explicit_switch(tmp_path, monkeypatch, chunked, expected):
+    ffmpeg_renderer = importlib.import_module("utils.ffmpeg_renderer")
+    calls = []
+    monkeypatch.setattr(chunked_render, "render_chunked", lambda *args, **kwargs: calls.append("chunked"))
+    monkeypatch.setattr(ffmpeg_renderer, "render_with_ffmpeg", lambda *args, **kwargs: calls.append("single"))
+    monkeypatch.setattr(subtitles_module.settings, "render_chunked", chunked)
+    # Quantidade de processos não liga nem desliga os pedaços
+    monkeypatch.setattr(subtitles_module.settings, "render_workers", 8)
+
+    subtitles_module.create_video_with_subtitles(
+        "source.mp4", [(0.5, 2.0, "primeira")], str(tmp_path / "out.mp4"), OPTIONS, engine="ffmpeg"
+    )
+
+    assert calls == [expected]
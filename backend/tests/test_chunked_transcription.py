@@ -0,0 +1,106 @@
+import importlib
+import sys
+from pathlib import Path
+
+import numpy as np
+
+APP_PATH = Path(__file__).resolve().parents[1] / "app"
+if str(APP_PATH) not in sys.path:
+    sys.path.insert(0, str(APP_PATH))
+
+chunked_module = importlib.import_module("utils.chunked_transcription")
+profiles_module = importlib.import_module("utils.transcription_profiles")
+registry_module = importlib.import_module("utils.model_registry")
+
+
+def test_find_split_points_prefers_silence():
+    sample_rate = 1000
+    samples = np.ones(sample_rate * 30, dtype=np.float32)
+    samples[11_000:11_500] = 0.0  # silêncio perto do alvo de 10s
+
+    points = chunked_module.find_split_points(
+        samples, sample_rate, chunk_seconds=10.0, search_seconds=2.0
+    )
+
+    assert 11.0 <= points[0] <= 11.5
+    assert all(a < b for a, b in zip(points, points[1:]))
+
+
+def test_merge_chunk_results_deduplicates_overlap_words():
+    ChunkWindow = chunked_module.ChunkWindow
+    first = ChunkWindow(start=0.0, end=12.0, keep_start=0.0, keep_end=10.0)
+    second = ChunkWindow(start=8.0, end=20.0, keep_start=10.0, keep_end=20.0)
+    first_result = {
+        "language": "pt",
+        "segments": [
+            {
+                "start": 8.5,
+                "end": 11.5,
+                "text": " olá mundo",
+                "words": [
+                    {"word": " olá", "start": 8.5, "end": 9.5},
+                    {"word": " mundo", "start": 9.9, "end": 11.5},
+                ],
+            }
+        ],
+    }
+    second_result = {
+        "segments": [
+            {
+                "start": 9.8,
+                "end": 12.0,
+                "text": " mundo novo",
+                "words": [
+                    {"word": " mundo", "start": 9.8, "end": 11.2},
+                    {"word": " novo", "start": 11.1, "end": 12.0},
+                ],
+            }
+        ],
+    }
+
+    merged = chunked_module.merge_chunk_results([(first, first_result), (second, second_result)])
+
+    words = [word for segment in merged["segments"] for word in segment["words"]]
+    assert [word["word"].strip() for word in words] == ["olá", "mundo", "novo"]
+    starts = [word["start"] for word in words]
+    assert starts == sorted(starts)
+    assert all(a["end"] <= b["start"] for a, b in zip(words, words[1:]))
+    assert merged["segments"][0]["text"] == " olá"
+    assert [segment["id"] for segment in merged["segments"]] == [0, 1]
+    assert merged["language"] == "pt"
+
+
+def test_transcribe_chunked_inline_shifts_timestamps(monkeypatch):
+    class StubModel:
+        def transcribe(self, samples, **kwargs):
+            duration = len(samples) / 16000
+            return {
+                "segments": [
+                    {
+                        "start": 0.0,
+                        "end": duration,
+                        "text": " bloco",
+                        "words": [{"word": " bloco", "start": 0.0, "end": duration}],
+                    }
+                ]
+            }
+
+    registry = registry_module.WhisperModelRegistry(loader=lambda *args: StubModel())
+    monkeypatch.setattr(chunked_module, "model_registry", registry)
+
+    samples = np.zeros(16000 * 30, dtype=np.float32)
+    result = chunked_module.transcribe_chunked(
+        samples,
+        profiles_module.resolve_profile("fast"),
+        chunk_seconds=10.0,
+        overlap_seconds=0.0,
+        workers=1,
+        device="cpu",
+        precision="fp32",
+    )
+
+    segments = result["segments"]
+    assert len(segments) == 3
+    assert segments[0]["start"] == 0.0
+    assert segments[1]["start"] >= segments[0]["end"]
+    assert segments[-1]["end"] == 30.0
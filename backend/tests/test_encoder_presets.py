@@ -0,0 +1,50 @@
+import importlib
+import sys
+from pathlib import Path
+
+import pytest
+
+APP_PATH = Path(__file__).resolve().parents[1] / "app"
+if str(APP_PATH) not in sys.path:
+    sys.path.insert(0, str(APP_PATH))
+
+presets = importlib.import_module("utils.encoder_presets")
+ffmpeg_tools = importlib.import_module("utils.ffmpeg_tools")
+
+
+def test_draft_is_faster_and_lighter_than_quality():
+    available = presets.available_presets()
+    draft, quality = available["draft"], available["quality"]
+
+    assert draft.x264_preset == "ultrafast"
+    assert draft.crf > quality.crf
+    assert draft.signature != quality.signature
+
+
+def test_video_args_cap_bitrate_relative_to_source():
+    preset = presets.EncoderPreset("teste", x264_preset="veryfast", crf=23, threads=2)
+    info = ffmpeg_tools.VideoInfo(640, 360, 10.0, 30.0, "h264", "yuv420p", 1_000_000, False, None, None)
+
+    args = preset.video_args(info)
+
+    assert args[:6] == ["-c:v", "libx264", "-preset", "veryfast", "-crf", "23"]
+    assert args[args.index("-maxrate") + 1] == "2000000"
+    assert args[args.index("-threads") + 1] == "2"
+    assert preset.video_args(threads=1)[-1] == "1"
+    assert preset.container_args() == ["-movflags", "+faststart"]
+
+
+def test_moviepy_kwargs_carry_crf_and_faststart():
+    kwargs = presets.EncoderPreset("teste", crf=21, faststart=False).moviepy_kwargs()
+
+    assert kwargs["codec"] == "libx264" and kwargs["preset"] == "medium"
+    assert kwargs["threads"] is None
+    assert kwargs["ffmpeg_params"][:2] == ["-crf", "21"]
+    assert "+faststart" not in kwargs["ffmpeg_params"]
+
+
+def test_resolve_encoder_preset():
+    assert presets.resolve_encoder_preset("DRAFT").name == "draft"
+    assert presets.resolve_encoder_preset("quality", codec="libx265").codec == "libx265"
+    with pytest.raises(ValueError):
+        presets.resolve_encoder_preset("lento")
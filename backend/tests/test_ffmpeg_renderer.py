@@ -0,0 +1,86 @@
+import importlib
+import sys
+from pathlib import Path
+
+APP_PATH = Path(__file__).resolve().parents[1] / "app"
+if str(APP_PATH) not in sys.path:
+    sys.path.insert(0, str(APP_PATH))
+
+renderer = importlib.import_module("utils.ffmpeg_renderer")
+ffmpeg_tools = importlib.import_module("utils.ffmpeg_tools")
+style = importlib.import_module("utils.subtitle_style")
+subtitles_module = importlib.import_module("utils.CreateVideoWinthSubtitles")
+
+DEJAVU = "/usr/share/fonts/truetype/dejavu/DejaVuSans.ttf"
+
+
+def _options(**overrides):
+    return subtitles_module.SubtitleRenderingOptions(font_path=DEJAVU, **overrides)
+
+
+def test_parse_color_accepts_imagemagick_syntax():
+    assert style.parse_color("white") == (255, 255, 255, 255)
+    assert style.parse_color("rgba(0,0,0,0.8)") == (0, 0, 0, 204)
+    assert style.parse_color("#ff000080") == (255, 0, 0, 128)
+    assert style.parse_color("transparent") is None
+    assert style.ass_color((255, 204, 0, 255)) == "&H0000CCFF"
+    assert style.ass_color((0, 0, 0, 204)) == "&H33000000"
+
+
+def test_ass_document_uses_moviepy_sizing():
+    params = subtitles_module.calculate_subtitle_parameters(1280, 720)
+    document = renderer.build_ass_document(
+        [(0.0, 1.25, "Olá {mundo}\nfim"), (2.0, 2.0, "vazio")], 1280, 720, _options()
+    )
+
+    style_line = next(line for line in document.splitlines() if line.startswith("Style:"))
+    fields = style_line.split(",")
+    assert fields[2] == str(params["font_size"])
+    assert fields[15] == "3"  # caixa de fundo
+    assert fields[19] == fields[20] == str(params["side_margin"])
+    assert "PlayResX: 1280" in document
+
+    dialogues = [line for line in document.splitlines() if line.startswith("Dialogue:")]
+    assert dialogues == ["Dialogue: 0,0:00:00.00,0:00:01.25,Default,,0,0,0,,Olá \\{mundo\\}\\Nfim"]
+
+
+def test_filter_values_are_escaped_for_both_levels():
+    assert renderer._escape_filter_value("C:/legendas/a,b.ass") == "C\\\\:/legendas/a\\,b.ass"
+
+
+def test_render_with_ffmpeg_burns_subtitles_and_keeps_audio(tmp_path):
+    source = tmp_path / "source.mp4"
+    ffmpeg_tools.run_ffmpeg(
+        [
+            "-f", "lavfi", "-i", "color=c=black:size=320x240:rate=25",
+            "-f", "lavfi", "-i", "sine=frequency=300:sample_rate=44100",
+            "-t", "2", "-c:v", "libx264", "-pix_fmt", "yuv420p", "-c:a", "aac",
+            "-shortest", str(source),
+        ]
+    )
+    output = tmp_path / "output.mp4"
+
+    subtitles_module.create_video_with_subtitles(
+        str(source),
+        [(0.0, 2.0, "legenda")],
+        str(output),
+        _options(),
+        beep_intervals=[(0.5, 1.0, "porra")],
+        engine="ffmpeg",
+    )
+
+    info = ffmpeg_tools.probe_video(output)
+    assert (info.width, info.height) == (320, 240)
+    assert info.fps == 25  # taxa da origem preservada
+    assert info.has_audio
+    assert abs(info.duration - 2.0) < 0.2
+    # faststart: o índice (moov) vem antes dos dados
+    head = output.read_bytes()
+    assert head.index(b"moov") < head.index(b"mdat")
+
+    frame = ffmpeg_tools.run_ffmpeg(
+        ["-ss", "1", "-i", str(output), "-frames:v", "1", "-f", "rawvideo", "-pix_fmt", "gray", "-"],
+        capture_stdout=True,
+    )
+    # Fundo preto: só a legenda acende pixels
+    assert max(frame) > 200
@@ -0,0 +1,74 @@
+import hashlib
+import importlib
+import io
+import sys
+from pathlib import Path
+
+from werkzeug.datastructures import FileStorage
+
+APP_PATH = Path(__file__).resolve().parents[1] / "app"
+if str(APP_PATH) not in sys.path:
+    sys.path.insert(0, str(APP_PATH))
+
+hashing_module = importlib.import_module("utils.file_hashing")
+
+
+class _CountingStream(io.BytesIO):
+    def __init__(self, data):
+        super().__init__(data)
+        self.max_read = 0
+
+    def read(self, size=-1):
+        chunk = super().read(size)
+        self.max_read = max(self.max_read, len(chunk))
+        return chunk
+
+
+def test_save_upload_with_hash_streams_in_chunks(tmp_path):
+    payload = bytes(range(256)) * 4096  # 1 MiB
+    stream = _CountingStream(payload)
+    destination = tmp_path / "video.mp4"
+
+    digest = hashing_module.save_upload_with_hash(
+        FileStorage(stream=stream, filename="video.mp4"),
+        destination,
+        chunk_size=64 * 1024,
+    )
+
+    assert digest == hashlib.sha256(payload).hexdigest()
+    assert len(digest) == 64
+    assert destination.read_bytes() == payload
+    assert stream.max_read <= 64 * 1024
+
+
+def test_hash_file_matches_full_digest(tmp_path):
+    source = tmp_path / "video.mp4"
+    source.write_bytes(b"conteudo" * 10_000)
+
+    assert hashing_module.hash_file(source, chunk_size=1000) == hashlib.sha256(
+        source.read_bytes()
+    ).hexdigest()
+
+
+def test_store_upload_by_hash_keeps_same_named_uploads_apart(tmp_path):
+    first_path, first_hash = hashing_module.store_upload_by_hash(
+        FileStorage(stream=io.BytesIO(b"primeiro"), filename="video.MP4"), tmp_path
+    )
+    second_path, second_hash = hashing_module.store_upload_by_hash(
+        FileStorage(stream=io.BytesIO(b"segundo"), filename="video.MP4"), tmp_path
+    )
+
+    assert Path(first_path) == tmp_path / f"{first_hash}.mp4"
+    assert Path(second_path) == tmp_path / f"{second_hash}.mp4"
+    assert Path(first_path).read_bytes() == b"primeiro"
+    assert Path(second_path).read_bytes() == b"segundo"
+    assert sorted(path.name for path in tmp_path.iterdir()) == sorted(
+        [f"{first_hash}.mp4", f"{second_hash}.mp4"]
+    )
+
+
+def test_is_allowed_file_checks_the_video_extension():
+    assert hashing_module.is_allowed_file("clipe.MOV")
+    assert hashing_module.is_allowed_file("pasta/video.webm")
+    assert not hashing_module.is_allowed_file("notas.txt")
+    assert not hashing_module.is_allowed_file("sem_extensao")
@@ -0,0 +1,158 @@
+import importlib
+import importlib.util
+import socket
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+import pytest
+
+APP_PATH = Path(__file__).resolve().parents[1] / "app"
+if str(APP_PATH) not in sys.path:
+    sys.path.insert(0, str(APP_PATH))
+
+job_queue = importlib.import_module("utils.job_queue")
+
+
+def double_job(params, progress):
+    progress.update("render", 0.5)
+    return {"value": params["value"] * 2}
+
+
+def failing_job(params, progress):
+    raise RuntimeError("falhou de propósito")
+
+
+def echo_job(params, progress):
+    with progress.stage("render"):
+        return dict(params)
+
+
+@pytest.fixture
+def local_queue(tmp_path):
+    queue = job_queue.create_job_queue("local", tmp_path / "jobs.sqlite3")
+    queue.register("double", double_job)
+    queue.register("fail", failing_job)
+    return queue
+
+
+def test_local_backend_records_result_and_errors(local_queue):
+    record = local_queue.submit("double", {"value": 21})
+
+    assert record.status == job_queue.SUCCEEDED
+    assert record.result == {"value": 42}
+    assert record.started_at is not None and record.finished_at >= record.started_at
+
+    failed = local_queue.get(local_queue.submit("fail", {}).id)
+    assert failed.status == job_queue.FAILED
+    assert "falhou de propósito" in failed.error
+
+    with pytest.raises(ValueError):
+        local_queue.submit("desconhecido", {})
+
+
+def _dead_owner():
+    process = subprocess.Popen([sys.executable, "-c", "pass"])
+    process.wait()
+    return f"{socket.gethostname()}:{process.pid}"
+
+
+def test_pending_jobs_survive_a_restart(tmp_path):
+    db_path = tmp_path / "jobs.sqlite3"
+    store = job_queue.JobStore(db_path)
+    queued = store.create("double", {"value": 5})
+    running = store.create("double", {"value": 7})
+    assert store.claim(running.id, _dead_owner())
+
+    restarted = job_queue.create_job_queue("local", db_path)
+    restarted.register("double", double_job)
+
+    assert restarted.recover() == 2
+    assert restarted.get(queued.id).result == {"value": 10}
+    assert restarted.get(running.id).result == {"value": 14}
+    assert restarted.recover() == 0
+
+
+def test_recover_leaves_jobs_running_in_a_live_process(tmp_path):
+    db_path = tmp_path / "jobs.sqlite3"
+    store = job_queue.JobStore(db_path)
+    live = store.create("double", {"value": 1})
+    stale = store.create("double", {"value": 3})
+    assert store.claim(live.id, job_queue.current_owner())
+    assert store.claim(stale.id, job_queue.current_owner())
+    store._execute("UPDATE jobs SET heartbeat = ? WHERE id = ?", time.time() - 3600, stale.id)
+
+    other = job_queue.create_job_queue("local", db_path)
+    other.register("double", double_job)
+
+    assert other.recover() == 1
+    assert other.get(live.id).status == job_queue.RUNNING
+    assert other.get(stale.id).result == {"value": 6}
+
+
+def test_worker_skips_a_job_claimed_by_another_worker(tmp_path):
+    db_path = tmp_path / "jobs.sqlite3"
+    store = job_queue.JobStore(db_path)
+    record = store.create("double", {"value": 4})
+    assert store.claim(record.id, "outro-host:1")
+    assert not store.claim(record.id, job_queue.current_owner())
+
+    calls = []
+    with pytest.raises(job_queue.JobClaimed):
+        job_queue._execute_job(str(db_path), record.id, lambda params, progress: calls.append(params), {})
+    assert calls == []
+
+    # O envio duplicado não sobrescreve o estado do job em execução
+    queue = job_queue.JobQueue(store, job_queue.LocalBackend())
+    queue.register("double", double_job)
+    queue._dispatch(store.get(record.id))
+    assert store.get(record.id).status == job_queue.RUNNING
+    assert store.get(record.id).owner == "outro-host:1"
+
+
+def test_process_backend_runs_jobs_in_a_worker_process(tmp_path):
+    queue = job_queue.create_job_queue("process", tmp_path / "jobs.sqlite3", workers=1)
+    queue.register("copy", echo_job, stages=("render",))
+    try:
+        record = queue.submit("copy", {"texto": "olá"})
+        deadline = time.monotonic() + 60
+        while not queue.get(record.id).done and time.monotonic() < deadline:
+            time.sleep(0.05)
+    finally:
+        queue.shutdown()
+
+    finished = queue.get(record.id)
+    assert finished.status == job_queue.SUCCEEDED
+    assert finished.result == {"texto": "olá"}
+    assert finished.progress["stages"] == [
+        {**finished.progress["stages"][0], "name": "render", "fraction": 1.0, "done": True}
+    ]
+
+
+def test_status_and_result_endpoints(tmp_path, monkeypatch, local_queue):
+    spec = importlib.util.spec_from_file_location("app_jobs_module", APP_PATH / "app.py")
+    app_module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(app_module)
+    monkeypatch.setattr(job_queue, "_job_queue", local_queue)
+    client = app_module.app.test_client()
+
+    record = local_queue.submit("double", {"value": 2})
+
+    status = client.get(f"/api/jobs/{record.id}")
+    assert status.status_code == 200
+    assert status.get_json()["status"] == "succeeded"
+    assert client.get(f"/api/jobs/{record.id}/result").get_json() == {"value": 4}
+    progress = client.get(f"/api/jobs/{record.id}/progress").get_json()["progress"]
+    assert progress["stage"] == "render"
+
+    events = client.get(f"/api/jobs/{record.id}/events")
+    assert events.mimetype == "text/event-stream"
+    assert events.get_data(as_text=True).startswith("event: done\n")
+
+    failed = local_queue.submit("fail", {})
+    assert client.get(f"/api/jobs/{failed.id}/result").status_code == 500
+    assert client.get("/api/jobs/inexistente").status_code == 404
+
+    response = client.post("/api/jobs/render_final_video", json={})
+    assert response.status_code == 400
@@ -0,0 +1,40 @@
+import importlib
+import io
+import sys
+from pathlib import Path
+
+import pytest
+from flask import Flask
+
+APP_PATH = Path(__file__).resolve().parents[1] / "app"
+if str(APP_PATH) not in sys.path:
+    sys.path.insert(0, str(APP_PATH))
+
+job_routes = importlib.import_module("routes.job_routes")
+
+
+@pytest.fixture
+def client(monkeypatch):
+    def _unexpected_queue():
+        raise AssertionError("nenhum job deveria ser enfileirado")
+
+    def _unexpected_upload(*args, **kwargs):
+        raise AssertionError("o upload não deveria ser gravado")
+
+    monkeypatch.setattr(job_routes, "get_job_queue", _unexpected_queue)
+    monkeypatch.setattr(job_routes, "store_upload_by_hash", _unexpected_upload)
+    app = Flask(__name__)
+    app.register_blueprint(job_routes.jobs_bp, url_prefix="/api")
+    return app.test_client()
+
+
+@pytest.mark.parametrize("route", ["/api/jobs/process_video", "/api/jobs/process_video_preview"])
+def test_submit_rejects_unsupported_file_before_storing_it(client, route):
+    response = client.post(
+        route,
+        data={"video": (io.BytesIO(b"nao e video"), "notas.txt")},
+        content_type="multipart/form-data",
+    )
+
+    assert response.status_code == 400
+    assert response.get_json()["message"] == "Formato de arquivo não suportado."
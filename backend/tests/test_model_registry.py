@@ -0,0 +1,71 @@
+import importlib
+import sys
+import threading
+from pathlib import Path
+
+APP_PATH = Path(__file__).resolve().parents[1] / "app"
+if str(APP_PATH) not in sys.path:
+    sys.path.insert(0, str(APP_PATH))
+
+registry_module = importlib.import_module("utils.model_registry")
+transcribe_module = importlib.import_module("utils.transcribeAudio")
+
+
+class StubModel:
+    def __init__(self):
+        self.calls = []
+
+    def transcribe(self, audio, **kwargs):
+        self.calls.append((audio, kwargs))
+        return {"segments": [{"start": 0.0, "end": 1.0, "text": "ok"}]}
+
+
+def test_registry_loads_each_key_once_under_concurrency():
+    loads = []
+    release = threading.Event()
+
+    def slow_loader(name, device, precision):
+        loads.append((name, device, precision))
+        release.wait(timeout=1)
+        return StubModel()
+
+    registry = registry_module.WhisperModelRegistry(loader=slow_loader)
+    results = []
+    threads = [
+        threading.Thread(target=lambda: results.append(registry.get("tiny", "cpu", "fp32")))
+        for _ in range(4)
+    ]
+    for thread in threads:
+        thread.start()
+    release.set()
+    for thread in threads:
+        thread.join()
+
+    assert loads == [("tiny", "cpu", "fp32")]
+    assert len({id(model) for model in results}) == 1
+
+    registry.get("base", "cpu", "fp32")
+    assert len(loads) == 2
+
+    stats = {item["name"]: item for item in registry.stats()}
+    assert stats["tiny"]["load_seconds"] >= 0
+    assert "rss_after_mb" in stats["tiny"]
+
+
+def test_transcribe_audio_uses_registered_stub(monkeypatch, tmp_path):
+    audio_path = tmp_path / "audio.wav"
+    audio_path.write_bytes(b"fake")
+
+    registry = registry_module.WhisperModelRegistry(
+        loader=lambda *args: (_ for _ in ()).throw(AssertionError("não deveria carregar"))
+    )
+    stub = StubModel()
+    registry.register(stub, transcribe_module.settings.whisper_model, "cpu", "fp32")
+    monkeypatch.setattr(transcribe_module, "model_registry", registry)
+    monkeypatch.setattr(transcribe_module.settings, "whisper_device", "cpu")
+    monkeypatch.setattr(transcribe_module.settings, "whisper_precision", "fp32")
+
+    result = transcribe_module.transcribe_audio(str(audio_path))
+
+    assert result["segments"][0]["text"] == "ok"
+    assert stub.calls[0][1]["fp16"] is False
@@ -0,0 +1,72 @@
+import importlib
+import sys
+from pathlib import Path
+
+import pytest
+
+APP_PATH = Path(__file__).resolve().parents[1] / "app"
+if str(APP_PATH) not in sys.path:
+    sys.path.insert(0, str(APP_PATH))
+
+progress_module = importlib.import_module("utils.progress")
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_eta_follows_the_observed_rate():
+    clock = FakeClock()
+    reporter = progress_module.ProgressReporter(("audio", "render"), clock=clock)
+
+    reporter.record("audio", 4.0)
+    reporter.start("render")
+    clock.now += 10
+    reporter.update("render", 0.25)
+
+    snapshot = reporter.snapshot()
+    assert snapshot["stage"] == "render"
+    assert snapshot["eta_seconds"] == pytest.approx(30.0)
+    assert snapshot["fraction"] == pytest.approx(0.625)
+    assert reporter.timings() == {"audio": 4.0}
+
+
+def test_expected_duration_drives_eta_without_fractions():
+    clock = FakeClock()
+    reporter = progress_module.ProgressReporter(("transcription",), clock=clock)
+
+    reporter.start("transcription", expected_seconds=60)
+    clock.now += 15
+
+    stage = reporter.snapshot()["stages"][0]
+    assert stage["fraction"] == pytest.approx(0.25)
+    assert stage["eta_seconds"] == pytest.approx(45.0)
+
+
+def test_sink_is_throttled_but_stage_boundaries_always_publish():
+    published = []
+    reporter = progress_module.ProgressReporter(("render",), sink=published.append, min_interval=60)
+
+    reporter.start("render")
+    for index in range(100):
+        reporter.update("render", index / 100)
+    reporter.finish("render")
+
+    assert len(published) == 2
+    assert published[-1]["stages"][0]["done"]
+
+
+def test_proglog_logger_reports_frame_progress():
+    reporter = progress_module.ProgressReporter(("render",))
+    logger = reporter.proglog_logger("render")
+
+    for _ in logger.iter_bar(t=range(10)):
+        pass
+
+    stage = reporter.snapshot()["stages"][0]
+    assert stage["fraction"] == 1.0
+    assert stage["message"] == "quadro 10/10"
@@ -0,0 +1,63 @@
+import importlib
+import sys
+from pathlib import Path
+
+import pytest
+
+APP_PATH = Path(__file__).resolve().parents[1] / "app"
+if str(APP_PATH) not in sys.path:
+    sys.path.insert(0, str(APP_PATH))
+
+proxy_render = importlib.import_module("utils.proxy_render")
+renderer = importlib.import_module("utils.ffmpeg_renderer")
+render_cache_module = importlib.import_module("utils.render_cache")
+ffmpeg_tools = importlib.import_module("utils.ffmpeg_tools")
+subtitles_module = importlib.import_module("utils.CreateVideoWinthSubtitles")
+
+OPTIONS = subtitles_module.SubtitleRenderingOptions(font_path="")
+
+
+@pytest.fixture
+def source_video(tmp_path):
+    path = tmp_path / "source.mp4"
+    ffmpeg_tools.run_ffmpeg(
+        [
+            "-f", "lavfi", "-i", "color=c=black:size=1280x720:rate=30",
+            "-f", "lavfi", "-i", "sine=frequency=300:sample_rate=44100",
+            "-t", "1", "-c:v", "libx264", "-preset", "ultrafast", "-pix_fmt", "yuv420p",
+            "-c:a", "aac", "-shortest", str(path),
+        ]
+    )
+    return path
+
+
+def test_scaled_size_keeps_aspect_with_even_dimensions():
+    assert renderer.scaled_size(1280, 720, 360) == (640, 360)
+    assert renderer.scaled_size(1080, 1920, 360) == (202, 360)
+    assert renderer.scaled_size(320, 240, 360) == (320, 240)
+    assert renderer.scaled_size(1280, 720, None) == (1280, 720)
+
+
+def test_proxy_is_downscaled_and_cached_per_revision(tmp_path, source_video):
+    cache = render_cache_module.RenderCache(tmp_path / "proxies")
+    subtitles = [(0.0, 1.0, "legenda")]
+
+    def render(subs, beeps):
+        return proxy_render.render_proxy_preview(
+            "sessao1", str(source_video), subs, OPTIONS, beep_intervals=beeps, cache=cache
+        )
+
+    first, cached = render(subtitles, [(0.2, 0.4)])
+    assert not cached
+    info = ffmpeg_tools.probe_video(first)
+    assert (info.width, info.height) == (640, 360)
+    assert info.fps == 30 and info.has_audio
+
+    again, cached = render(subtitles, [(0.2, 0.4, "porra")])
+    assert cached and again == first
+
+    _, cached = render(subtitles, [(0.5, 0.7)])
+    assert not cached
+    _, cached = render([(0.0, 1.0, "editada")], [(0.5, 0.7)])
+    assert not cached
+    assert len(list((tmp_path / "proxies" / "sessao1").glob("*.mp4"))) == 1
@@ -0,0 +1,98 @@
+import importlib
+import sys
+from pathlib import Path
+
+import pytest
+
+APP_PATH = Path(__file__).resolve().parents[1] / "app"
+if str(APP_PATH) not in sys.path:
+    sys.path.insert(0, str(APP_PATH))
+
+render_cache_module = importlib.import_module("utils.render_cache")
+ffmpeg_tools = importlib.import_module("utils.ffmpeg_tools")
+subtitles_module = importlib.import_module("utils.CreateVideoWinthSubtitles")
+
+OPTIONS = subtitles_module.SubtitleRenderingOptions(font_path="")
+
+
+@pytest.fixture
+def source_video(tmp_path):
+    path = tmp_path / "source.mp4"
+    ffmpeg_tools.run_ffmpeg(
+        [
+            "-f", "lavfi", "-i", "testsrc=size=160x120:rate=25",
+            "-f", "lavfi", "-i", "sine=frequency=300:sample_rate=44100",
+            "-t", "2", "-c:v", "libx264", "-pix_fmt", "yuv420p", "-c:a", "aac",
+            "-shortest", str(path),
+        ]
+    )
+    return path
+
+
+def test_video_track_key_ignores_audio_but_tracks_subtitles():
+    key = render_cache_module.video_track_key("abc", [(0, 1, "oi")], OPTIONS, "ffmpeg", "libx264", 24)
+
+    assert key == render_cache_module.video_track_key(
+        "abc", [(0.0, 1.0, "oi")], OPTIONS, "ffmpeg", "libx264", 24
+    )
+    assert key != render_cache_module.video_track_key(
+        "abc", [(0, 1, "o*")], OPTIONS, "ffmpeg", "libx264", 24
+    )
+    assert key != render_cache_module.video_track_key("abc", [(0, 1, "oi")], OPTIONS, "ffmpeg", "libx264", 30)
+
+
+def test_only_beep_changes_remux_the_cached_video(tmp_path, source_video):
+    cache = render_cache_module.RenderCache(tmp_path / "renders")
+    output = tmp_path / "final.mp4"
+    subtitles = [(0.0, 2.0, "legenda")]
+
+    def render(beeps, subs=subtitles):
+        return render_cache_module.render_session_video(
+            "sessao1",
+            str(source_video),
+            subs,
+            str(output),
+            OPTIONS,
+            beep_intervals=beeps,
+            engine="ffmpeg",
+            cache=cache,
+        )
+
+    assert render([(0.5, 1.0)]) == "full"
+    assert render([(1.0, 1.5)]) == "remux"
+
+    info = ffmpeg_tools.probe_video(output)
+    assert info.has_audio and (info.width, info.height) == (160, 120)
+    assert abs(info.duration - 2.0) < 0.2
+
+    assert render([(1.0, 1.5)], subs=[(0.0, 2.0, "editada")]) == "full"
+    assert len(list((tmp_path / "renders" / "sessao1").glob("*.mp4"))) == 1
+
+    assert cache.discard("sessao1")
+    assert cache.lookup("sessao1", "qualquer") is None
+
+
+def test_session_ids_cannot_escape_the_cache_directory(tmp_path):
+    cache = render_cache_module.RenderCache(tmp_path)
+
+    with pytest.raises(ValueError):
+        cache.lookup("../fora", "chave")
+
+
+def test_store_links_the_render_instead_of_copying(tmp_path, monkeypatch):
+    cache = render_cache_module.RenderCache(tmp_path / "renders")
+    rendered = tmp_path / "final.mp4"
+    rendered.write_bytes(b"video renderizado")
+
+    linked = cache.store("sessao1", "a" * 64, rendered)
+    assert linked.samefile(rendered)
+
+    def no_links(*args):
+        raise OSError("sem hard links")
+
+    monkeypatch.setattr(render_cache_module.os, "link", no_links)
+    copied = cache.store("sessao1", "b" * 64, rendered)
+
+    assert copied.read_bytes() == b"video renderizado"
+    assert not copied.samefile(rendered)
+    assert list((tmp_path / "renders" / "sessao1").iterdir()) == [copied]
@@ -0,0 +1,178 @@
+import importlib
+import sqlite3
+import sys
+from pathlib import Path
+
+import pytest
+
+APP_PATH = Path(__file__).resolve().parents[1] / "app"
+if str(APP_PATH) not in sys.path:
+    sys.path.insert(0, str(APP_PATH))
+
+session_store = importlib.import_module("utils.session_store")
+session_cache = importlib.import_module("utils.session_cache")
+
+
+def _session(video_hash="abc"):
+    return {
+        "video_hash": video_hash,
+        "video_path": "uploads/video.mp4",
+        "subtitles": [
+            {"id": 0, "start": 0.0, "end": 1.0, "text": "um"},
+            {"id": 1, "start": 1.0, "end": 2.0, "text": "dois"},
+        ],
+        "forbidden_words": ["merda"],
+        "beep_intervals": [[0.2, 0.4, "merda"]],
+    }
+
+
+@pytest.fixture
+def repository(tmp_path):
+    return session_store.SessionRepository(tmp_path / "sessions.sqlite3", legacy_dirs=())
+
+
+@pytest.fixture
+def cache(repository):
+    # Intervalo longo: a thread não grava sozinha durante o teste
+    cache = session_cache.SessionCache(repository, max_entries=2, flush_interval=3600)
+    yield cache
+    cache.shutdown()
+
+
+def test_edits_stay_in_memory_until_flush(repository, cache):
+    cache.save(_session())
+
+    revision = cache.update("abc", subtitles=[{"id": 0, "start": 0.0, "end": 1.0, "text": "três"}], expected_revision=1)
+    revision, written, count, _ = cache.patch("abc", [{"op": "edit_text", "index": 0, "text": "quatro"}], revision)
+
+    assert revision == 3 and count == 1
+    assert written == [(0, {"id": 0, "start": 0.0, "end": 1.0, "text": "quatro"})]
+    assert cache.get("abc")["subtitles"][0]["text"] == "quatro"
+    assert repository.get("abc")["revision"] == 1
+    assert cache.pending() == ["abc"]
+
+    assert cache.flush() == 1
+
+    stored = repository.get("abc")
+    assert stored["revision"] == 3
+    assert [sub["text"] for sub in stored["subtitles"]] == ["quatro"]
+    assert cache.pending() == []
+
+
+def test_stale_revision_is_rejected_in_memory(cache):
+    cache.save(_session())
+    cache.update("abc", metadata={"forbidden_words": ["porra"]}, expected_revision=1)
+
+    with pytest.raises(session_store.RevisionConflict):
+        cache.patch("abc", [{"op": "remove_beep", "index": 0}], expected_revision=1)
+
+
+def test_external_write_invalidates_clean_entry(repository, cache):
+    cache.save(_session())
+    assert cache.get("abc")["revision"] == 1
+
+    repository.update("abc", subtitles=[{"id": 0, "start": 0.0, "end": 1.0, "text": "fora"}])
+
+    session = cache.get("abc")
+    assert session["revision"] == 2
+    assert session["subtitles"][0]["text"] == "fora"
+
+
+def test_lru_eviction_keeps_pending_entries(repository, cache):
+    for video_hash in ("a", "b"):
+        cache.save(_session(video_hash))
+    cache.update("a", beep_intervals=[])
+    cache.save(_session("c"))
+
+    assert cache.stats()["entries"] == 2
+    assert cache.pending() == ["a"]
+    cache.shutdown()
+    assert repository.beep_intervals("a") == []
+
+
+def test_flush_conflict_keeps_stored_version(repository, cache):
+    cache.save(_session())
+    cache.update("abc", beep_intervals=[])
+    with sqlite3.connect(repository.path) as connection:
+        connection.execute("UPDATE sessions SET revision = 7 WHERE video_hash = 'abc'")
+
+    assert cache.flush() == 0
+    assert cache.get("abc")["revision"] == 7
+    assert cache.get("abc")["beep_intervals"] == [[0.2, 0.4, "merda"]]
+
+
+def test_split_returns_only_the_touched_subtitles(repository, cache):
+    session = _session()
+    session["subtitles"] = [
+        {"id": i, "start": float(i), "end": i + 1.0, "text": f"frase {i} inteira"} for i in range(100)
+    ]
+    cache.save(session)
+
+    _, written, count, _ = cache.patch("abc", [{"op": "split", "index": 3, "at": 3.5}], 1)
+
+    assert count == 101
+    assert [(position, subtitle["id"]) for position, subtitle in written] == [(3, 3), (4, 100)]
+    cache.flush()
+    assert [sub["id"] for sub in repository.subtitles("abc")[3:6]] == [3, 100, 4]
+
+
+def test_flush_writes_only_the_subtitles_touched_by_operations(repository, cache, monkeypatch):
+    session = _session()
+    session["subtitles"] = [
+        {"id": i, "start": float(i), "end": i + 1.0, "text": f"frase {i} inteira"} for i in range(100)
+    ]
+    cache.save(session)
+    revision, _, _, _ = cache.patch("abc", [{"op": "merge", "index": 98}], 1)
+    # O id apagado (99) volta como legenda nova na divisão seguinte
+    revision, _, _, _ = cache.patch("abc", [{"op": "split", "index": 10, "at": 10.5}], revision)
+    cache.patch("abc", [{"op": "edit_text", "index": 0, "text": "primeira"}], revision)
+
+    def full_write(*args):
+        raise AssertionError("a lista inteira não deveria ser comparada")
+
+    monkeypatch.setattr(session_store.SessionRepository, "_write_subtitles", staticmethod(full_write))
+    assert cache.flush() == 1
+
+    assert repository.subtitles("abc") == cache.get("abc")["subtitles"]
+    assert [sub["id"] for sub in repository.subtitles("abc")[10:13]] == [10, 99, 11]
+
+
+def test_pending_edits_are_not_acknowledged_after_another_process_wrote(repository, cache):
+    # Duas instâncias sobre o mesmo banco simulam dois processos do servidor
+    other = session_cache.SessionCache(repository, flush_interval=3600)
+    cache.save(_session())
+    cache.update("abc", metadata={"forbidden_words": ["porra"]}, expected_revision=1)
+
+    other.update("abc", metadata={"forbidden_words": ["caralho"]}, expected_revision=1)
+    other.flush()
+
+    with pytest.raises(session_store.RevisionConflict) as excinfo:
+        cache.update("abc", beep_intervals=[], expected_revision=2)
+
+    assert excinfo.value.current == 2
+    assert cache.pending() == []
+    assert cache.get("abc")["forbidden_words"] == ["caralho"]
+    other.shutdown()
+
+
+def test_write_through_conflict_reaches_the_caller(repository, monkeypatch):
+    first = session_cache.SessionCache(repository, flush_interval=0)
+    second = session_cache.SessionCache(repository, flush_interval=0)
+    first.save(_session())
+    assert second.get("abc")["revision"] == 1
+    # Corrida: a entrada do segundo processo foi validada antes da gravação do primeiro
+    monkeypatch.setattr(second, "_db_signature", lambda: ("fixa",))
+    second._entries["abc"].db_signature = ("fixa",)
+
+    first.update("abc", metadata={"forbidden_words": ["porra"]}, expected_revision=1)
+
+    with pytest.raises(session_store.RevisionConflict):
+        second.update("abc", metadata={"forbidden_words": ["caralho"]}, expected_revision=1)
+    assert repository.get("abc")["forbidden_words"] == ["porra"]
+    assert "abc" not in second._entries
+
+
+def test_write_behind_is_disabled_with_several_server_processes():
+    assert session_cache.write_behind_interval(2.0, 1) == 2.0
+    assert session_cache.write_behind_interval(2.0, 4) == 0.0
+    assert session_cache.write_behind_interval(0.0, 4) == 0.0
@@ -0,0 +1,217 @@
+import importlib
+import sys
+from pathlib import Path
+
+import pytest
+from flask import Flask
+
+APP_PATH = Path(__file__).resolve().parents[1] / "app"
+if str(APP_PATH) not in sys.path:
+    sys.path.insert(0, str(APP_PATH))
+
+censor_index = importlib.import_module("utils.censor_index")
+preview_routes = importlib.import_module("routes.preview_routes")
+session_cache = importlib.import_module("utils.session_cache")
+session_store = importlib.import_module("utils.session_store")
+
+
+def _session(video_hash="abc"):
+    segments = [
+        {"start": 0.0, "end": 2.0, "text": "olá mundo isso e merda"},
+        {"start": 2.0, "end": 3.0, "text": "tudo bem"},
+    ]
+    index = censor_index.CensorIndex.build(segments, ["abelha"], fuzzy=True)
+    return {
+        "video_hash": video_hash,
+        "video_path": "uploads/video.mp4",
+        "subtitles": [
+            {"id": i, "start": seg["start"], "end": seg["end"], "text": seg["text"], "raw_text": seg["text"]}
+            for i, seg in enumerate(segments)
+        ],
+        "forbidden_words": ["abelha"],
+        "beep_intervals": [],
+        "censor_index": index.to_dict(),
+    }
+
+
+@pytest.fixture
+def cache(tmp_path, monkeypatch):
+    repository = session_store.SessionRepository(tmp_path / "sessions.sqlite3", legacy_dirs=())
+    cache = session_cache.SessionCache(repository, flush_interval=0)
+    monkeypatch.setattr(preview_routes, "session_cache", cache)
+    cache.save(_session())
+    yield cache
+    cache.shutdown()
+
+
+@pytest.fixture
+def client(cache):
+    app = Flask(__name__)
+    app.register_blueprint(preview_routes.preview_bp, url_prefix="/api")
+    return app.test_client()
+
+
+def test_word_list_change_after_split_masks_the_shifted_subtitle(client, cache):
+    split = client.patch(
+        "/api/session/abc", json={"operations": [{"op": "split", "index": 0, "at": 1.0}], "revision": 1}
+    )
+    assert split.status_code == 200
+    session = cache.get("abc")
+    assert session["censor_index"] is None
+    assert [sub["text"] for sub in session["subtitles"]] == ["olá mundo", "isso e merda", "tudo bem"]
+
+    response = client.post(
+        "/api/update_subtitles",
+        json={
+            "video_hash": "abc",
+            "subtitles": session["subtitles"],
+            "forbidden_words": ["abelha", "merda"],
+            "revision": session["revision"],
+        },
+    )
+
+    assert response.status_code == 200
+    texts = [sub["text"] for sub in cache.get("abc")["subtitles"]]
+    assert texts[0] == "olá mundo" and texts[2] == "tudo bem"
+    assert "merda" not in texts[1] and texts[1].startswith("isso e ")
+    assert [beep[0] >= 1.0 for beep in cache.get("abc")["beep_intervals"]] == [True]
+    assert len(cache.get("abc")["censor_index"]["segments"]) == 3
+
+
+def test_word_list_change_after_move_beeps_at_the_new_time(client, cache):
+    moved = client.patch(
+        "/api/session/abc",
+        json={"operations": [{"op": "move", "index": 0, "start": 10.0, "end": 12.0}], "revision": 1},
+    )
+    assert moved.status_code == 200
+    session = cache.get("abc")
+
+    response = client.post(
+        "/api/update_subtitles",
+        json={
+            "video_hash": "abc",
+            "subtitles": session["subtitles"],
+            "forbidden_words": ["abelha", "merda"],
+            "revision": session["revision"],
+        },
+    )
+
+    assert response.status_code == 200
+    beeps = cache.get("abc")["beep_intervals"]
+    assert len(beeps) == 1
+    assert 10.0 <= beeps[0][0] < beeps[0][1] <= 12.0
+
+
+def test_move_carries_the_automatic_beep_with_the_subtitle(client, cache):
+    session = cache.get("abc")
+    client.post(
+        "/api/update_subtitles",
+        json={
+            "video_hash": "abc",
+            "subtitles": session["subtitles"],
+            "forbidden_words": ["merda"],
+            "revision": session["revision"],
+        },
+    )
+    [automatic] = cache.get("abc")["beep_intervals"]
+    assert automatic[1] <= 2.0
+
+    moved = client.patch(
+        "/api/session/abc",
+        json={
+            "operations": [{"op": "move", "index": 0, "start": 10.0, "end": 12.0}],
+            "revision": cache.get("abc")["revision"],
+        },
+    )
+
+    assert moved.status_code == 200
+    [beep] = moved.get_json()["beep_intervals"]
+    assert beep[0] == pytest.approx(automatic[0] + 10.0)
+    assert cache.get("abc")["beep_intervals"] == [beep]
+
+
+def test_patch_session_returns_only_the_touched_subtitles(client):
+    response = client.patch(
+        "/api/session/abc",
+        json={
+            "operations": [
+                {"op": "edit_text", "index": 1, "text": "tudo ótimo"},
+                {"op": "add_beep", "start": 2.1, "end": 2.4},
+            ],
+            "revision": 1,
+        },
+    )
+
+    assert response.status_code == 200
+    payload = response.get_json()
+    assert payload["status"] == "success"
+    assert payload["revision"] == 2
+    assert payload["subtitle_count"] == 2
+    assert payload["updated_subtitles"] == [
+        {"id": 1, "start": 2.0, "end": 3.0, "text": "tudo ótimo", "raw_text": "tudo bem", "index": 1}
+    ]
+    assert payload["beep_intervals"] == [[2.1, 2.4]]
+
+
+def test_patch_session_without_beep_operations_omits_beeps(client):
+    payload = client.patch(
+        "/api/session/abc", json={"operations": [{"op": "merge", "index": 0}], "revision": 1}
+    ).get_json()
+
+    assert payload["subtitle_count"] == 1
+    assert [sub["index"] for sub in payload["updated_subtitles"]] == [0]
+    assert "beep_intervals" not in payload
+
+
+@pytest.mark.parametrize(
+    "body",
+    [
+        {"operations": [{"op": "merge", "index": 5}], "revision": 1},
+        {"operations": [{"op": "rename"}], "revision": 1},
+        {"operations": [], "revision": 1},
+        {"operations": [{"op": "edit_text", "index": 0, "text": "x"}]},
+        {"operations": [{"op": "edit_text", "index": 0, "text": "x"}], "revision": "abc"},
+        {"operations": [{"op": "edit_text", "index": 0, "text": "x"}], "revision": 3.9},
+        {"operations": [{"op": "edit_text", "index": 0, "text": "x"}], "revision": True},
+    ],
+)
+def test_patch_session_rejects_bad_requests(client, cache, body):
+    response = client.patch("/api/session/abc", json=body)
+
+    assert response.status_code == 400
+    assert response.get_json()["status"] == "error"
+    assert cache.get("abc")["revision"] == 1
+
+
+def test_patch_session_unknown_session_is_404(client):
+    response = client.patch(
+        "/api/session/inexistente", json={"operations": [{"op": "merge", "index": 0}], "revision": 1}
+    )
+
+    assert response.status_code == 404
+
+
+def test_patch_session_stale_revision_is_409(client, cache):
+    operations = [{"op": "edit_text", "index": 0, "text": "primeira"}]
+    assert client.patch("/api/session/abc", json={"operations": operations, "revision": 1}).status_code == 200
+
+    response = client.patch("/api/session/abc", json={"operations": operations, "revision": 1})
+
+    assert response.status_code == 409
+    assert response.get_json()["revision"] == 2
+    assert cache.get("abc")["revision"] == 2
+
+
+def test_update_subtitles_requires_the_revision_read_by_the_client(client, cache):
+    subtitles = cache.get("abc")["subtitles"]
+
+    missing = client.post("/api/update_subtitles", json={"video_hash": "abc", "subtitles": subtitles})
+    assert missing.status_code == 400
+
+    saved = client.post("/api/update_subtitles", json={"video_hash": "abc", "subtitles": subtitles, "revision": 1})
+    assert saved.status_code == 200
+    assert saved.get_json()["revision"] == 2
+
+    stale = client.post("/api/update_subtitles", json={"video_hash": "abc", "subtitles": subtitles, "revision": 1})
+    assert stale.status_code == 409
+    assert stale.get_json()["revision"] == 2
@@ -0,0 +1,251 @@
+import importlib
+import json
+import sqlite3
+import sys
+from pathlib import Path
+
+import pytest
+
+APP_PATH = Path(__file__).resolve().parents[1] / "app"
+if str(APP_PATH) not in sys.path:
+    sys.path.insert(0, str(APP_PATH))
+
+censor_index = importlib.import_module("utils.censor_index")
+session_store = importlib.import_module("utils.session_store")
+
+
+def _session(video_hash="abc"):
+    return {
+        "video_hash": video_hash,
+        "video_path": "uploads/video.mp4",
+        "subtitles": [
+            {"id": 0, "start": 0.0, "end": 1.5, "text": "olá ****", "raw_text": "olá merda", "confidence": 0.9},
+            {"id": 1, "start": 1.5, "end": 3.0, "text": "tudo bem", "raw_text": "tudo bem", "confidence": 0.8},
+        ],
+        "video_info": {"filename": "video.mp4", "duration": 3.0},
+        "forbidden_words": ["merda"],
+        "beep_intervals": [[0.5, 1.0, "merda"], [2.0, 2.2]],
+        "transcription_profile": {"name": "balanced"},
+        "censor_index": {"words": ["merda"], "segments": []},
+    }
+
+
+@pytest.fixture
+def repository(tmp_path):
+    return session_store.SessionRepository(tmp_path / "sessions.sqlite3", legacy_dirs=(tmp_path / "legacy",))
+
+
+def test_save_and_get_round_trip(repository):
+    assert repository.save(_session()) == 1
+
+    loaded = repository.get("abc")
+
+    assert loaded["revision"] == 1
+    assert loaded["subtitles"] == _session()["subtitles"]
+    assert loaded["beep_intervals"] == [[0.5, 1.0, "merda"], [2.0, 2.2]]
+    assert loaded["video_info"] == {"filename": "video.mp4", "duration": 3.0}
+    assert loaded["censor_index"] == {"words": ["merda"], "segments": []}
+    assert repository.video_path("abc") == "uploads/video.mp4"
+    assert repository.get("missing") is None
+
+
+def test_update_writes_only_changed_subtitle_rows(repository, monkeypatch):
+    repository.save(_session())
+    subtitles = repository.subtitles("abc")
+    subtitles[1]["text"] = "tudo ótimo"
+
+    statements = []
+    original_write = session_store.SessionRepository._write_subtitles
+
+    def spy(connection, video_hash, rows):
+        connection.set_trace_callback(statements.append)
+        original_write(connection, video_hash, rows)
+        connection.set_trace_callback(None)
+
+    monkeypatch.setattr(session_store.SessionRepository, "_write_subtitles", staticmethod(spy))
+    revision = repository.update("abc", subtitles=subtitles, expected_revision=1)
+
+    assert revision == 2
+    inserts = [sql for sql in statements if sql.startswith("INSERT OR REPLACE INTO subtitles")]
+    assert len(inserts) == 1 and "tudo ótimo" in inserts[0]
+    assert repository.get("abc")["subtitles"][1]["text"] == "tudo ótimo"
+    assert repository.beep_intervals("abc") == [[0.5, 1.0, "merda"], [2.0, 2.2]]
+
+
+def test_update_rejects_stale_revision(repository):
+    repository.save(_session())
+    repository.update("abc", metadata={"forbidden_words": ["porra"]}, expected_revision=1)
+
+    with pytest.raises(session_store.RevisionConflict) as excinfo:
+        repository.update("abc", beep_intervals=[], expected_revision=1)
+
+    assert excinfo.value.current == 2
+    loaded = repository.get("abc")
+    assert loaded["forbidden_words"] == ["porra"]
+    assert loaded["beep_intervals"] == [[0.5, 1.0, "merda"], [2.0, 2.2]]
+
+
+def test_shorter_subtitle_list_removes_trailing_rows(repository):
+    repository.save(_session())
+
+    repository.update("abc", subtitles=_session()["subtitles"][:1])
+
+    assert [sub["id"] for sub in repository.subtitles("abc")] == [0]
+
+
+def test_legacy_json_session_is_imported_on_first_read(repository, tmp_path):
+    legacy_dir = tmp_path / "legacy"
+    legacy_dir.mkdir()
+    legacy_file = legacy_dir / "session_abc.json"
+    legacy_file.write_text(json.dumps(_session()), encoding="utf-8")
+
+    loaded = repository.get("abc")
+
+    assert loaded["revision"] == 1
+    assert loaded["subtitles"][0]["raw_text"] == "olá merda"
+    assert not legacy_file.exists()
+    assert (legacy_dir / "session_abc.json.imported").exists()
+
+
+def test_unreadable_legacy_json_is_not_retried_forever(repository, tmp_path):
+    legacy_dir = tmp_path / "legacy"
+    legacy_dir.mkdir()
+    (legacy_dir / "session_bad.json").write_text("{", encoding="utf-8")
+
+    assert repository.get("bad") is None
+
+
+def test_delete_and_prune(repository):
+    repository.save(_session("old"))
+    repository.save(_session("new"))
+    with sqlite3.connect(repository.path) as connection:
+        connection.execute("UPDATE sessions SET updated_at = 0 WHERE video_hash = 'old'")
+
+    assert repository.prune(3600) == 1
+    assert not repository.exists("old")
+    assert repository.delete("new")
+    assert repository.subtitles("new") == []
+
+
+def test_patch_applies_operations_atomically(repository):
+    repository.save(_session())
+
+    revision, written, count, beeps = repository.patch(
+        "abc",
+        [{"op": "edit_text", "index": 1, "text": "tudo ótimo"}, {"op": "add_beep", "start": 2.5, "end": 2.7}],
+        expected_revision=1,
+    )
+
+    assert revision == 2
+    assert [position for position, _ in written] == [1]
+    assert count == 2
+    assert beeps[-1] == [2.5, 2.7]
+
+    with pytest.raises(ValueError):
+        repository.patch("abc", [{"op": "edit_text", "index": 0, "text": "x"}, {"op": "merge", "index": 9}], 2)
+
+    assert repository.revision("abc") == 2
+    assert repository.subtitles("abc")[0]["text"] == "olá ****"
+    with pytest.raises(session_store.RevisionConflict):
+        repository.patch("abc", [{"op": "remove_beep", "index": 0}], expected_revision=1)
+
+
+def _long_session(count):
+    session = _session()
+    session["subtitles"] = [
+        {"id": i, "start": float(i), "end": i + 1.0, "text": f"frase {i} com duas palavras"} for i in range(count)
+    ]
+    return session
+
+
+def _traced_subtitle_writes(repository, monkeypatch):
+    statements = []
+
+    def traced(original):
+        def spy(connection, *args):
+            connection.set_trace_callback(statements.append)
+            try:
+                return original(connection, *args)
+            finally:
+                connection.set_trace_callback(None)
+
+        return staticmethod(spy)
+
+    repository_class = session_store.SessionRepository
+    for name in ("_write_subtitles", "_write_subtitle_changes"):
+        monkeypatch.setattr(repository_class, name, traced(getattr(repository_class, name)))
+    return statements
+
+
+def test_split_and_merge_write_only_the_affected_rows(repository, monkeypatch):
+    repository.save(_long_session(500))
+    statements = _traced_subtitle_writes(repository, monkeypatch)
+
+    revision, written, count, _ = repository.patch("abc", [{"op": "split", "index": 0, "at": 0.5}], 1)
+
+    assert count == 501
+    assert [(position, subtitle["id"]) for position, subtitle in written] == [(0, 0), (1, 500)]
+    assert len([sql for sql in statements if sql.startswith("INSERT OR REPLACE")]) == 2
+    # Só as chaves das legendas tocadas e das vizinhas são lidas
+    assert not [sql for sql in statements if sql.startswith("SELECT") and "IN (" not in sql]
+    assert [sub["id"] for sub in repository.subtitles("abc")[:3]] == [0, 500, 1]
+
+    statements.clear()
+    _, written, count, _ = repository.patch("abc", [{"op": "merge", "index": 0}], revision)
+
+    assert count == 500
+    assert [(position, subtitle["id"]) for position, subtitle in written] == [(0, 0)]
+    assert len([sql for sql in statements if sql.startswith("INSERT OR REPLACE")]) == 1
+    assert len([sql for sql in statements if sql.startswith("DELETE FROM subtitles")]) == 1
+    assert [sub["id"] for sub in repository.subtitles("abc")[:2]] == [0, 1]
+    assert repository.subtitles("abc")[0]["text"] == "frase 0 com duas palavras"
+
+
+def test_order_keys_renumber_only_when_there_is_no_gap():
+    gap = session_store.ORDER_GAP
+
+    assert session_store._order_keys([gap, None, 2 * gap]) == [gap, gap + gap // 2, 2 * gap]
+    assert session_store._order_keys([3 * gap, gap, 2 * gap]) == [gap // 2, gap, 2 * gap]
+    assert session_store._order_keys([5, None, 6]) == [gap, 2 * gap, 3 * gap]
+
+
+def test_missing_or_repeated_ids_get_new_stable_ids(repository):
+    session = _session()
+    session["subtitles"][1]["id"] = 0
+    session["subtitles"].append({"start": 3.0, "end": 4.0, "text": "sem id"})
+    repository.save(session)
+
+    assert [sub["id"] for sub in repository.subtitles("abc")] == [0, 1, 2]
+
+
+def test_move_retimes_the_censor_index_and_its_beeps(repository):
+    session = _session()
+    index = censor_index.CensorIndex.build(
+        [{"start": sub["start"], "end": sub["end"], "text": sub["raw_text"]} for sub in session["subtitles"]],
+        ["merda"],
+        fuzzy=True,
+    )
+    _, automatic = index.results()
+    assert automatic
+    session["censor_index"] = index.to_dict()
+    session["beep_intervals"] = [list(beep) for beep in automatic] + [[2.5, 2.7]]
+    repository.save(session)
+
+    _, _, _, beeps = repository.patch("abc", [{"op": "move", "index": 0, "start": 5.0, "end": 7.0}], 1)
+
+    stored = repository.get("abc")
+    assert stored["censor_index"]["segments"][0]["start"] == 5.0
+    moved = [beep for beep in beeps if beep[:2] != [2.5, 2.7]]
+    assert [beep[0] >= 5.0 for beep in moved] == [True] * len(automatic)
+    assert [2.5, 2.7] in beeps
+    assert stored["beep_intervals"] == beeps
+
+
+def test_split_drops_the_positional_censor_index(repository):
+    repository.save(_session())
+
+    repository.patch("abc", [{"op": "edit_text", "index": 1, "text": "tudo ótimo"}], 1)
+    assert repository.get("abc")["censor_index"] == {"words": ["merda"], "segments": []}
+
+    repository.patch("abc", [{"op": "split", "index": 1, "at": 2.0}], 2)
+    assert "censor_index" not in repository.get("abc")
@@ -0,0 +1,95 @@
+import importlib
+import multiprocessing
+import sys
+from pathlib import Path
+
+import pytest
+
+APP_PATH = Path(__file__).resolve().parents[1] / "app"
+if str(APP_PATH) not in sys.path:
+    sys.path.insert(0, str(APP_PATH))
+
+stats_module = importlib.import_module("utils.shared_stats")
+cache_module = importlib.import_module("utils.transcription_cache")
+profiles_module = importlib.import_module("utils.transcription_profiles")
+registry_module = importlib.import_module("utils.model_registry")
+
+
+def _bump(path, times):
+    store = stats_module.SharedStats(path)
+    for _ in range(times):
+        store.update("contador", {"hits": 1})
+
+
+def test_shared_stats_adds_counters_from_other_processes(tmp_path):
+    path = tmp_path / "jobs.sqlite3"
+    context = multiprocessing.get_context("spawn")
+    workers = [context.Process(target=_bump, args=(path, 20)) for _ in range(3)]
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join(timeout=60)
+
+    store = stats_module.SharedStats(path)
+    store.update("contador", {"hits": 1}, {"ultimo": "web"})
+    assert store.get("contador") == {"hits": 61, "ultimo": "web"}
+
+
+def test_shared_stats_scan_and_clear_by_prefix(tmp_path):
+    store = stats_module.SharedStats(tmp_path / "jobs.sqlite3")
+    store.update("profile:a", {"runs": 1})
+    store.update("profile:b", {"runs": 2})
+    store.update("model:tiny", {"loads": 1})
+
+    assert set(store.scan("profile:")) == {"profile:a", "profile:b"}
+    store.clear("profile:")
+    assert store.scan("profile:") == {}
+    assert store.get("model:tiny") == {"loads": 1}
+
+
+def test_worker_cache_hits_show_up_in_server_stats(tmp_path):
+    path = tmp_path / "jobs.sqlite3"
+    profile = profiles_module.resolve_profile("fast")
+    result = {"segments": [{"start": 0.0, "end": 1.0, "text": "olá"}]}
+    worker = cache_module.TranscriptionCache(tmp_path / "cache", 10**6, stats_store=stats_module.SharedStats(path))
+    server = cache_module.TranscriptionCache(tmp_path / "cache", 10**6, stats_store=stats_module.SharedStats(path))
+
+    assert worker.get("a" * 64, profile) is None
+    worker.put("a" * 64, profile, result, elapsed_seconds=8.0)
+    assert worker.get("a" * 64, profile) is not None
+
+    stats = server.stats()
+    assert stats["hits"] == 1
+    assert stats["misses"] == 1
+    assert stats["saved_seconds"] == 8.0
+
+
+def test_worker_profile_metrics_feed_server_estimates(tmp_path):
+    path = tmp_path / "jobs.sqlite3"
+    profile = profiles_module.resolve_profile("fast")
+    worker = profiles_module.ProfileMetrics(stats_module.SharedStats(path))
+    server = profiles_module.ProfileMetrics(stats_module.SharedStats(path))
+
+    worker.record(profile, audio_seconds=60.0, elapsed_seconds=30.0)
+
+    [entry] = server.snapshot()
+    assert entry["runs"] == 1
+    assert entry["rtf"] == pytest.approx(0.5)
+    assert server.expected_seconds(profile, 10.0) == pytest.approx(5.0)
+    server.reset()
+    assert worker.snapshot() == []
+
+
+def test_model_loads_are_recorded_for_every_process(tmp_path):
+    path = tmp_path / "jobs.sqlite3"
+    worker = registry_module.WhisperModelRegistry(
+        loader=lambda *key: object(), stats_store=stats_module.SharedStats(path)
+    )
+    server = registry_module.WhisperModelRegistry(stats_store=stats_module.SharedStats(path))
+
+    worker.get("tiny", "cpu", "fp32")
+
+    assert server.stats() == []
+    [entry] = server.load_history()
+    assert entry["loads"] == 1
+    assert (entry["name"], entry["device"], entry["precision"]) == ("tiny", "cpu", "fp32")
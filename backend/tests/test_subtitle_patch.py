@@ -0,0 +1,82 @@
+import importlib
+import sys
+from pathlib import Path
+
+import pytest
+
+APP_PATH = Path(__file__).resolve().parents[1] / "app"
+if str(APP_PATH) not in sys.path:
+    sys.path.insert(0, str(APP_PATH))
+
+subtitle_patch = importlib.import_module("utils.subtitle_patch")
+
+SUBTITLES = [
+    {"id": 0, "start": 0.0, "end": 2.0, "text": "um dois três quatro", "raw_text": "um dois três quatro"},
+    {"id": 1, "start": 2.0, "end": 3.0, "text": "cinco", "raw_text": "cinco"},
+]
+BEEPS = [[0.5, 0.9, "dois"]]
+
+
+def test_edit_and_move_touch_only_the_target():
+    result = subtitle_patch.apply_operations(
+        SUBTITLES,
+        BEEPS,
+        [{"op": "edit_text", "index": 1, "text": "seis"}, {"op": "move", "index": 1, "end": 3.5}],
+    )
+
+    assert result.subtitles[1] == {"id": 1, "start": 2.0, "end": 3.5, "text": "seis", "raw_text": "cinco"}
+    assert result.subtitles[0] is SUBTITLES[0]
+    assert result.changed == [(1, result.subtitles[1])]
+    assert result.removed == set()
+    assert result.beep_intervals == BEEPS
+    assert SUBTITLES[1]["text"] == "cinco"
+
+
+def test_split_then_merge_round_trips_text():
+    split = subtitle_patch.apply_operations(SUBTITLES, BEEPS, [{"op": "split", "index": 0, "at": 1.0}])
+    subtitles = split.subtitles
+
+    assert [(sub["id"], sub["start"], sub["end"], sub["text"]) for sub in subtitles] == [
+        (0, 0.0, 1.0, "um dois"),
+        (2, 1.0, 2.0, "três quatro"),
+        (1, 2.0, 3.0, "cinco"),
+    ]
+    assert [(position, sub["id"]) for position, sub in split.changed] == [(0, 0), (1, 2)]
+    assert subtitles[2] is SUBTITLES[1]
+
+    result = subtitle_patch.apply_operations(subtitles, BEEPS, [{"op": "merge", "index": 0}])
+    merged = result.subtitles
+
+    assert [(position, sub["id"]) for position, sub in result.changed] == [(0, 0)]
+    assert result.removed == {2}
+    assert merged[0]["text"] == "um dois três quatro"
+    assert merged[0]["raw_text"] == "um dois três quatro"
+    assert (merged[0]["start"], merged[0]["end"]) == (0.0, 2.0)
+    assert len(merged) == 2
+
+
+def test_beep_operations_keep_beeps_sorted():
+    result = subtitle_patch.apply_operations(
+        SUBTITLES,
+        BEEPS,
+        [{"op": "add_beep", "start": 0.1, "end": 0.3}, {"op": "remove_beep", "index": 1}],
+    )
+
+    assert result.beep_intervals == [[0.1, 0.3]]
+    assert result.changed == []
+
+
+@pytest.mark.parametrize(
+    "operation",
+    [
+        {"op": "edit_text", "index": 5, "text": "x"},
+        {"op": "move", "index": 0, "start": 2.5},
+        {"op": "split", "index": 1, "at": 5.0},
+        {"op": "merge", "index": 1},
+        {"op": "add_beep", "start": "a", "end": 1},
+        {"op": "rename"},
+    ],
+)
+def test_invalid_operations_raise_value_error(operation):
+    with pytest.raises(ValueError):
+        subtitle_patch.apply_operations(SUBTITLES, BEEPS, [operation])
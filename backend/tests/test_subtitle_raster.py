@@ -0,0 +1,65 @@
+import importlib
+import sys
+from pathlib import Path
+
+APP_PATH = Path(__file__).resolve().parents[1] / "app"
+if str(APP_PATH) not in sys.path:
+    sys.path.insert(0, str(APP_PATH))
+
+raster = importlib.import_module("utils.subtitle_raster")
+
+DEJAVU = "/usr/share/fonts/truetype/dejavu/DejaVuSans.ttf"
+
+
+def _render(text, size=(300, 60), **overrides):
+    arguments = {
+        "font_path": DEJAVU,
+        "font_size": 18,
+        "color": "white",
+        "bg_color": "rgba(0,0,0,0.8)",
+        "stroke_color": None,
+        "stroke_width": 0,
+        "size": size,
+    }
+    arguments.update(overrides)
+    return raster.render_text_image(text, **arguments)
+
+
+def test_render_fills_box_with_background_and_text():
+    pixels = _render("legenda")
+
+    assert pixels.shape == (60, 300, 4)
+    assert not pixels.flags.writeable
+    # Cantos ficam com o fundo semitransparente, o centro tem texto branco
+    assert tuple(pixels[0, 0]) == (0, 0, 0, 204)
+    assert pixels[:, :, 0].max() > 200
+
+
+def test_identical_lines_are_rendered_once():
+    raster.clear_raster_cache()
+
+    first = _render("****")
+    second = _render("****")
+    _render("****", color="yellow")
+
+    info = raster.raster_cache_info()
+    assert first is second
+    assert info.hits == 1
+    assert info.misses == 2
+
+
+def test_caption_wraps_long_lines_inside_the_box():
+    single = _render("curta", size=(120, 80))
+    wrapped = _render("uma legenda comprida demais para uma linha", size=(120, 80))
+
+    def text_rows(pixels):
+        return {row for row in range(pixels.shape[0]) if pixels[row, :, 0].max() > 200}
+
+    assert len(text_rows(wrapped)) > len(text_rows(single)) * 1.5
+
+
+def test_render_without_size_fits_the_text():
+    pixels = _render("ok", size=None, bg_color=None)
+
+    assert pixels.shape[1] < 60
+    assert pixels[:, :, 3].min() == 0
@@ -0,0 +1,63 @@
+import importlib
+import sys
+from pathlib import Path
+
+APP_PATH = Path(__file__).resolve().parents[1] / "app"
+if str(APP_PATH) not in sys.path:
+    sys.path.insert(0, str(APP_PATH))
+
+normalization_module = importlib.import_module("utils.text_normalization")
+profanity_module = importlib.import_module("utils.profanity_filter")
+
+
+def test_normalize_with_offsets_maps_back_to_original_spans():
+    normalized = normalization_module.normalize_with_offsets("Ô caralhooo, p0rra!")
+
+    assert normalized.text == "o caralho, pora!"
+    start = normalized.text.index("caralho")
+    assert normalized.original_span(start, start + len("caralho")) == (2, 11)
+    start = normalized.text.index("pora")
+    assert normalized.original_span(start, start + len("pora")) == (13, 18)
+
+
+def test_normalization_keeps_plain_numbers_and_trailing_punctuation():
+    assert normalization_module.normalize_word("2024!") == "2024!"
+    assert normalization_module.normalize_word("@belha") == "abelha"
+
+
+def test_censor_segments_catches_accent_leet_and_repeated_variants(monkeypatch):
+    monkeypatch.setattr(profanity_module.settings, "profanity_fuzzy_matching", True)
+    segments = [
+        {"start": 0.0, "end": 2.0, "text": "que pôrra é essa"},
+        {
+            "start": 2.0,
+            "end": 4.0,
+            "text": " p0rra e caralhooo",
+            "words": [
+                {"word": " p0rra", "start": 2.0, "end": 2.5},
+                {"word": " e", "start": 2.5, "end": 2.7},
+                {"word": " caralhooo", "start": 2.7, "end": 3.6},
+            ],
+        },
+    ]
+
+    sanitized, beeps = profanity_module.censor_segments(
+        segments, forbidden_words=["porra", "caralho"]
+    )
+
+    assert sanitized[0][2] == "que ***** é essa"
+    assert sanitized[1][2] == " ***** e *********"
+    assert [(start, end) for start, end, _ in beeps[1:]] == [(2.0, 2.5), (2.7, 3.6)]
+    assert [label for _, _, label in beeps[1:]] == ["p0rra", "caralhooo"]
+
+
+def test_censor_segments_exact_mode_ignores_variants(monkeypatch):
+    monkeypatch.setattr(profanity_module.settings, "profanity_fuzzy_matching", False)
+
+    sanitized, beeps = profanity_module.censor_segments(
+        [{"start": 0.0, "end": 1.0, "text": "p0rra e porra"}],
+        forbidden_words=["porra"],
+    )
+
+    assert sanitized[0][2] == "p0rra e *****"
+    assert len(beeps) == 1
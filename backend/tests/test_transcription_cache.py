@@ -0,0 +1,56 @@
+import importlib
+import os
+import sys
+from pathlib import Path
+
+APP_PATH = Path(__file__).resolve().parents[1] / "app"
+if str(APP_PATH) not in sys.path:
+    sys.path.insert(0, str(APP_PATH))
+
+cache_module = importlib.import_module("utils.transcription_cache")
+profiles_module = importlib.import_module("utils.transcription_profiles")
+
+
+def _result(text):
+    return {"segments": [{"start": 0.0, "end": 1.0, "text": text}]}
+
+
+def test_cache_hits_only_for_same_content_and_profile(tmp_path):
+    cache = cache_module.TranscriptionCache(tmp_path, max_bytes=1024 * 1024)
+    fast = profiles_module.resolve_profile("fast")
+    draft = profiles_module.resolve_profile("draft")
+
+    assert cache.get("a" * 64, fast) is None
+    cache.put("a" * 64, fast, _result("olá"), elapsed_seconds=12.5, audio_seconds=30.0)
+
+    assert cache.get("a" * 64, fast)["segments"][0]["text"] == "olá"
+    assert cache.get("a" * 64, draft) is None
+    assert cache.get("b" * 64, fast) is None
+
+    stats = cache.stats()
+    assert stats["hits"] == 1
+    assert stats["misses"] == 3
+    assert stats["saved_seconds"] == 12.5
+    assert stats["entries"] == 1
+
+
+def test_cache_evicts_least_recently_used_entries(tmp_path):
+    profile = profiles_module.resolve_profile("fast")
+    probe = cache_module.TranscriptionCache(tmp_path / "probe", max_bytes=10**9)
+    probe.put("0" * 64, profile, _result("x" * 200))
+    entry_size = probe.stats()["bytes"]
+
+    cache = cache_module.TranscriptionCache(tmp_path / "lru", max_bytes=entry_size * 2 + 10)
+    cache.put("1" * 64, profile, _result("x" * 200))
+    cache.put("2" * 64, profile, _result("x" * 200))
+    first_path = cache._entry_path(cache.make_key("1" * 64, profile))
+    second_path = cache._entry_path(cache.make_key("2" * 64, profile))
+    os.utime(first_path, (1_000, 1_000))
+    os.utime(second_path, (2_000, 2_000))
+    assert cache.get("1" * 64, profile) is not None  # renova a entrada 1
+
+    cache.put("3" * 64, profile, _result("x" * 200))
+
+    assert cache.get("2" * 64, profile) is None
+    assert cache.get("1" * 64, profile) is not None
+    assert cache.get("3" * 64, profile) is not None
@@ -0,0 +1,66 @@
+import importlib
+import sys
+from pathlib import Path
+
+import pytest
+
+APP_PATH = Path(__file__).resolve().parents[1] / "app"
+if str(APP_PATH) not in sys.path:
+    sys.path.insert(0, str(APP_PATH))
+
+profiles_module = importlib.import_module("utils.transcription_profiles")
+
+
+def test_parse_profile_request_accepts_name_and_overrides():
+    fast = profiles_module.parse_profile_request("fast")
+    assert fast.model == "small"
+    assert fast.decode_options()["beam_size"] == 1
+
+    custom = profiles_module.parse_profile_request(
+        '{"name": "draft", "model": "tiny", "temperature": [0.0, 0.5], "word_timestamps": true}'
+    )
+    assert custom.name == "draft"
+    assert custom.model == "tiny"
+    assert custom.temperature == (0.0, 0.5)
+    assert custom.word_timestamps is True
+    assert custom.signature != profiles_module.resolve_profile("draft").signature
+
+
+@pytest.mark.parametrize(
+    "raw_value",
+    [
+        "desconhecido",
+        '{"name": "fast", "model": "gigante"}',
+        '{"beam_size": 0}',
+        "{invalid",
+        '{"name": 1}',
+        '{"beam_size": [5]}',
+        '{"beam_size": true}',
+        '{"model": 3}',
+        '{"temperature": ["a"]}',
+        '{"word_timestamps": "talvez"}',
+    ],
+)
+def test_parse_profile_request_rejects_invalid_values(raw_value):
+    with pytest.raises(ValueError):
+        profiles_module.parse_profile_request(raw_value)
+
+
+def test_word_timestamps_accepts_boolean_strings():
+    assert profiles_module.parse_profile_request({"name": "fast", "word_timestamps": "false"}).word_timestamps is False
+    assert profiles_module.parse_profile_request({"name": "draft", "word_timestamps": "on"}).word_timestamps is True
+    assert profiles_module.parse_profile_request({"beam_size": "3"}).beam_size == 3
+
+
+def test_profile_metrics_reports_real_time_factor():
+    metrics = profiles_module.ProfileMetrics()
+    profile = profiles_module.resolve_profile("fast")
+
+    metrics.record(profile, audio_seconds=60.0, elapsed_seconds=15.0)
+    metrics.record(profile, audio_seconds=60.0, elapsed_seconds=45.0)
+
+    [entry] = metrics.snapshot()
+    assert entry["runs"] == 2
+    assert entry["rtf"] == pytest.approx(0.5)
+    assert entry["last_rtf"] == pytest.approx(0.75)
+    assert entry["profile"]["name"] == "fast"
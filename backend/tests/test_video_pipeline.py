@@ -2,6 +2,8 @@ import importlib
 import sys
 from pathlib import Path
 
+import numpy as np
+
 APP_DIR = Path(__file__).resolve().parents[1] / "app"
 
 for path in (APP_DIR,):
@@ -18,10 +20,10 @@ def test_generate_pipeline_masks_profanity_and_beeps(monkeypatch, tmp_path):
     input_video = tmp_path / "input.mp4"
     input_video.write_bytes(b"fake video content")
 
-    def fake_extract_audio(video_path: str, audio_path: str):
-        Path(audio_path).write_bytes(b"fake")
+    def fake_load_audio(video_path: str):
+        return np.zeros(16000 * 3, dtype=np.float32)
 
-    def fake_transcribe(audio_path: str):
+    def fake_transcribe(audio, profile=None, **kwargs):
         return {
             "segments": [
                 {"start": 0.0, "end": 1.0, "text": "A abelha chegou aqui"},
@@ -35,7 +37,12 @@ def test_generate_pipeline_masks_profanity_and_beeps(monkeypatch, tmp_path):
         Path(output_video_path).write_bytes(b"")
         return output_video_path
 
-    monkeypatch.setattr(generate_module, "extract_audio_from_video", fake_extract_audio)
+    monkeypatch.setattr(
+        generate_module,
+        "transcription_cache",
+        generate_module.transcription_cache.__class__(tmp_path / "cache", max_bytes=0),
+    )
+    monkeypatch.setattr(generate_module, "load_audio_samples", fake_load_audio)
     monkeypatch.setattr(generate_module, "transcribe_audio", fake_transcribe)
     monkeypatch.setattr(generate_module, "create_video_with_subtitles", fake_create_video)
 
@@ -57,8 +64,9 @@ def test_generate_pipeline_masks_profanity_and_beeps(monkeypatch, tmp_path):
 
     # Beeps agora são precisos por palavra, não por segmento inteiro
     assert len(captured["beep_intervals"]) == 1  # Uma ocorrência de "abelha"
-    beep_start, beep_end = captured["beep_intervals"][0]
+    beep_start, beep_end, beep_word = captured["beep_intervals"][0]
     # O beep deve estar dentro do segmento (0.0, 1.0)
     assert 0.0 <= beep_start < beep_end <= 1.0
+    assert beep_word == "abelha"
     
     assert captured["subtitles"][0][2] == "A ****** chegou aqui"
\ No newline at end of file
@@ -0,0 +1,62 @@
+import hashlib
+import importlib
+import sys
+from pathlib import Path
+
+import pytest
+from flask import Flask
+
+APP_PATH = Path(__file__).resolve().parents[1] / "app"
+if str(APP_PATH) not in sys.path:
+    sys.path.insert(0, str(APP_PATH))
+
+video_streaming = importlib.import_module("utils.video_streaming")
+
+CONTENT = bytes(range(256)) * 64
+
+
+@pytest.fixture
+def client(tmp_path):
+    video = tmp_path / "video.mp4"
+    video.write_bytes(CONTENT)
+    app = Flask(__name__)
+
+    @app.route("/original")
+    def original():
+        return video_streaming.send_video(video, etag="abc123", max_age=60)
+
+    @app.route("/rendered")
+    def rendered():
+        return video_streaming.send_video(video)
+
+    return app.test_client()
+
+
+def test_range_request_returns_only_requested_bytes(client):
+    response = client.get("/original", headers={"Range": "bytes=100-199"})
+
+    assert response.status_code == 206
+    assert response.data == CONTENT[100:200]
+    assert response.headers["Content-Range"] == f"bytes 100-199/{len(CONTENT)}"
+    assert response.headers["Accept-Ranges"] == "bytes"
+
+
+def test_conditional_requests_use_content_hash(client):
+    response = client.get("/rendered")
+    etag = hashlib.sha256(CONTENT).hexdigest()
+
+    assert response.status_code == 200
+    assert response.headers["ETag"] == f'"{etag}"'
+    assert response.headers["Cache-Control"] == "no-cache"
+    assert client.get("/rendered", headers={"If-None-Match": f'"{etag}"'}).status_code == 304
+    assert client.get("/original", headers={"If-None-Match": '"abc123"'}).status_code == 304
+
+    last_modified = response.headers["Last-Modified"]
+    assert client.get("/rendered", headers={"If-Modified-Since": last_modified}).status_code == 304
+
+
+def test_if_range_with_stale_etag_sends_whole_file(client):
+    response = client.get("/original", headers={"Range": "bytes=0-9", "If-Range": '"outro"'})
+
+    assert response.status_code == 200
+    assert response.data == CONTENT
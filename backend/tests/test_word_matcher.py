@@ -0,0 +1,57 @@
+import importlib
+import random
+import sys
+from pathlib import Path
+
+APP_PATH = Path(__file__).resolve().parents[1] / "app"
+if str(APP_PATH) not in sys.path:
+    sys.path.insert(0, str(APP_PATH))
+
+matcher_module = importlib.import_module("utils.word_matcher")
+profanity_module = importlib.import_module("utils.profanity_filter")
+
+
+def _regex_hits(words, text):
+    pattern = profanity_module._build_pattern(words)
+    return [(m.start(), m.end()) for m in pattern.finditer(text)]
+
+
+def _matcher_hits(words, text):
+    return [(hit.start, hit.end) for hit in matcher_module.WordMatcher(words).find_all(text)]
+
+
+def test_matcher_respects_word_boundaries_and_case():
+    words = ["porra", "merda", "abelha"]
+    text = "PORRA! abelhas, Merda_x e merda. porra"
+
+    assert _matcher_hits(words, text) == _regex_hits(words, text)
+    hits = matcher_module.WordMatcher(words).find_all(text)
+    assert [hit.text for hit in hits] == ["PORRA", "merda", "porra"]
+
+
+def test_matcher_agrees_with_regex_on_random_texts():
+    rng = random.Random(7)
+    vocabulary = ["ab", "abc", "bca", "ção", "xy", "a b", "pôrra"]
+    words = ["abc", "bca", "ção", "a b", "pôrra"]
+    for _ in range(300):
+        text = "".join(
+            rng.choice(vocabulary) + rng.choice([" ", "", ",", ". ", "_"])
+            for _ in range(rng.randint(1, 12))
+        )
+        assert _matcher_hits(words, text) == _regex_hits(words, text), text
+
+
+def test_matcher_prefers_longest_overlapping_phrase():
+    matcher = matcher_module.WordMatcher(["porra", "porra nenhuma"])
+
+    [hit] = matcher.find_all("isso não vale porra nenhuma")
+
+    assert hit.text == "porra nenhuma"
+
+
+def test_get_matcher_reuses_automaton_by_fingerprint():
+    first = matcher_module.get_matcher(["Merda", "porra"])
+    second = matcher_module.get_matcher(["porra", "merda", "porra"])
+
+    assert first is second
+    assert matcher_module.get_matcher(["outra"]) is not first
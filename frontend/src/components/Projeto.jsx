@@ -1,6 +1,7 @@
 import React, { useState, useEffect } from "react";
 import { useNavigate } from "react-router-dom";
 import ForbiddenWordsSelector from "./ForbiddenWordsSelector";
+import { runJob } from "../helpers/jobs";
 import styles from "./Projeto.module.css";
 
 const API_BASE = "http://127.0.0.1:5000";
@@ -66,28 +67,21 @@ const Projeto = () => {
     }
 
     try {
-      const response = await fetch(`${API_BASE}/api/process_video_preview`, {
-        method: "POST",
-        body: formData,
-      });
-
-      if (response.ok) {
-        const data = await response.json();
-        if (data.status === "success") {
-          setResponseMessage(
-            "Vídeo processado! Redirecionando para o editor..."
-          );
-          // Redirecionar para o editor com o hash do vídeo
-          setTimeout(() => {
-            navigate(`/Editor?video_hash=${data.video_hash}`);
-          }, 1000);
-        } else {
-          setResponseMessage(`Erro: ${data.message}`);
+      // Transcrição roda na fila de jobs; acompanhar a etapa atual até terminar
+      const data = await runJob(
+        "/api/jobs/process_video_preview",
+        { method: "POST", body: formData },
+        (progress) => {
+          if (progress.stage) {
+            setResponseMessage(`Processando vídeo (${progress.stage})...`);
+          }
         }
-      } else {
-        const errorData = await response.json();
-        setResponseMessage(`Erro: ${errorData.message}`);
-      }
+      );
+      setResponseMessage("Vídeo processado! Redirecionando para o editor...");
+      // Redirecionar para o editor com o hash do vídeo
+      setTimeout(() => {
+        navigate(`/Editor?video_hash=${data.video_hash}`);
+      }, 1000);
     } catch (error) {
       setResponseMessage(`Erro de conexão: ${error.message}`);
     } finally {
@@ -3,12 +3,14 @@ import ForbiddenWordsSelector, {
   buildMaskRegExp,
 } from "./ForbiddenWordsSelector";
 import styles from "./VideoPreview.module.css";
+import { jobDownloadUrl, runJob } from "../helpers/jobs";
 
 const API_BASE = "http://127.0.0.1:5000";
 
 const VideoPreview = () => {
   const [videoFile, setVideoFile] = useState(null);
   const [videoHash, setVideoHash] = useState(null);
+  const [sessionRevision, setSessionRevision] = useState(null); // Revisão lida do servidor (controle de concorrência)
   const [subtitles, setSubtitles] = useState([]);
   const [currentTime, setCurrentTime] = useState(0);
   const [isLoading, setIsLoading] = useState(false);
@@ -172,6 +174,7 @@ const VideoPreview = () => {
 
       if (data.status === "success") {
         setVideoHash(data.data.video_hash);
+        setSessionRevision(data.data.revision);
         setSubtitles(data.data.subtitles);
         setVideoFile({ name: data.data.video_info.filename });
 
@@ -221,15 +224,15 @@ const VideoPreview = () => {
     }
 
     try {
-      const response = await fetch(`${API_BASE}/api/process_video_preview`, {
+      // Transcrição roda na fila de jobs; o resultado é a sessão criada
+      const data = await runJob("/api/jobs/process_video_preview", {
         method: "POST",
         body: formData,
       });
 
-      const data = await response.json();
-
       if (data.status === "success") {
         setVideoHash(data.video_hash);
+        setSessionRevision(data.revision);
         setSubtitles(data.subtitles);
         if (
           Array.isArray(data.forbidden_words) &&
@@ -366,6 +369,7 @@ const VideoPreview = () => {
         },
         body: JSON.stringify({
           video_hash: videoHash,
+          revision: sessionRevision,
           subtitles: subtitles,
           forbidden_words: selectedWords,
           beep_intervals: beepIntervals.map((b) => [
@@ -377,8 +381,39 @@ const VideoPreview = () => {
       });
 
       const data = await response.json();
+      if (response.status === 409) {
+        // Outra aba ou usuário salvou antes: recarregar a versão do servidor
+        alert(`${data.message}. A sessão será recarregada.`);
+        await loadExistingSession(videoHash);
+        return;
+      }
       if (data.status === "success") {
+        setSessionRevision(data.revision);
+
+        // Aplicar legendas recensuradas pelo servidor após mudança de palavras
+        if (Array.isArray(data.updated_subtitles) && data.updated_subtitles.length) {
+          const updatedById = new Map(
+            data.updated_subtitles.map((subtitle) => [subtitle.id, subtitle])
+          );
+          setSubtitles((current) =>
+            current.map((subtitle) => updatedById.get(subtitle.id) || subtitle)
+          );
+        }
+
+        if (Array.isArray(data.beep_intervals)) {
+          setBeepIntervals(
+            data.beep_intervals.map((interval, index) => ({
+              id: index,
+              start: interval[0],
+              end: interval[1],
+              word: interval[2] || "desconhecida",
+            }))
+          );
+        }
+
         alert("Legendas e beeps salvos com sucesso!");
+      } else {
+        alert(`Erro ao salvar: ${data.message}`);
       }
     } catch (error) {
       alert(`Erro ao salvar: ${error.message}`);
@@ -392,7 +427,7 @@ const VideoPreview = () => {
     setIsProcessing(true);
 
     try {
-      const response = await fetch(`${API_BASE}/api/render_final_video`, {
+      const result = await runJob("/api/jobs/render_final_video", {
         method: "POST",
         headers: {
           "Content-Type": "application/json",
@@ -409,22 +444,13 @@ const VideoPreview = () => {
         }),
       });
 
-      if (response.ok) {
-        const blob = await response.blob();
-        const url = URL.createObjectURL(blob);
-
-        // Criar link para download
-        const a = document.createElement("a");
-        a.href = url;
-        a.download = "video_com_legendas.mp4";
-        document.body.appendChild(a);
-        a.click();
-        document.body.removeChild(a);
-        URL.revokeObjectURL(url);
-      } else {
-        const errorData = await response.json();
-        alert(`Erro: ${errorData.message}`);
-      }
+      // O vídeo fica guardado no servidor; baixar pela URL do artefato
+      const a = document.createElement("a");
+      a.href = jobDownloadUrl(result);
+      a.download = "video_com_legendas.mp4";
+      document.body.appendChild(a);
+      a.click();
+      document.body.removeChild(a);
     } catch (error) {
       alert(`Erro: ${error.message}`);
     } finally {
@@ -0,0 +1,44 @@
+const API_URL = 'http://127.0.0.1:5000';
+
+// Intervalo entre consultas ao estado do job
+const POLL_INTERVAL_MS = 1000;
+
+const sleep = (ms) => new Promise((resolve) => setTimeout(resolve, ms));
+
+// Envia o job para a fila do backend; a resposta (202) traz o id e as URLs de acompanhamento
+export const submitJob = async (path, options) => {
+  const response = await fetch(`${API_URL}${path}`, options);
+  const data = await response.json();
+  if (response.status !== 202) {
+    throw new Error(data.message || 'Erro ao enviar o job');
+  }
+  return data;
+};
+
+// Consulta o job até terminar; devolve o resultado ou lança o erro do job
+export const waitForJob = async (job, onProgress) => {
+  for (;;) {
+    const response = await fetch(`${API_URL}${job.status_url}`);
+    const record = await response.json();
+    if (!response.ok) {
+      throw new Error(record.message || 'Erro ao consultar o job');
+    }
+    if (onProgress && record.progress) {
+      onProgress(record.progress);
+    }
+    if (record.status === 'succeeded') {
+      return record.result;
+    }
+    if (record.status === 'failed') {
+      throw new Error(record.error || 'Falha no processamento');
+    }
+    await sleep(POLL_INTERVAL_MS);
+  }
+};
+
+export const runJob = async (path, options, onProgress) => {
+  const job = await submitJob(path, options);
+  return waitForJob(job, onProgress);
+};
+
+export const jobDownloadUrl = (result) => `${API_URL}${result.artifact.download_url}`;